@@ -0,0 +1,68 @@
+# Warnungen für abgelaufene Medikamente, die Trigger bei jeder Änderung am Lagerbestand fortschreiben.
+# Als abgelaufen gilt eine Ware, deren Verfallsdatum vor dem Stichtag der letzten Auswertung (warnungsauswertung) liegt.
+# Die Trigger brauchen so keine Uhrzeit, der tägliche Tageswechsel rückt den Stichtag vor und ergänzt nur die
+# Waren, deren Verfallsdatum seit dem alten Stichtag erreicht wurde.
+
+STATUS_ABGELAUFEN = "Medikament abgelaufen"
+
+STICHTAG = "(SELECT stichtag FROM warnungsauswertung)"
+
+
+def _warnungen_abgleich(bedingung=""):
+    """
+    Baut den mengenbasierten Abgleich: ein INSERT ... SELECT mit UPSERT statt einer Abfrage und Schreiboperation je Medikament.
+
+    :param bedingung: Optionale zusätzliche Bedingung für den Lagerbestand
+    :return: Die SQL-Anweisung mit den Parametern (Status, Stichtag, ...)
+    """
+    return f"""
+        INSERT INTO warnungen (barcode, artikel_id, verfallsdatum, ort, status)
+        SELECT barcode, artikel_id, verfallsdatum, ort, ? FROM lagerbestand WHERE verfallsdatum < ?{bedingung}
+        ON CONFLICT (barcode) DO UPDATE SET ort = excluded.ort, status = excluded.status
+        WHERE warnungen.ort IS NOT excluded.ort OR warnungen.status IS NOT excluded.status
+    """
+
+
+WARNUNGEN_ABGELAUFEN = _warnungen_abgleich()
+# Tageswechsel: nur Waren, deren Verfallsdatum seit dem alten Stichtag (letzter Parameter) erreicht wurde
+WARNUNGEN_ABGELAUFEN_SEIT = _warnungen_abgleich(" AND verfallsdatum >= ?")
+
+ABLAUF_ANWEISUNGEN = [
+    "CREATE INDEX IF NOT EXISTS idx_warnungen_ort ON warnungen (ort)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_warnungen_einfuegen AFTER INSERT ON lagerbestand
+    WHEN NEW.verfallsdatum < {STICHTAG} BEGIN
+        INSERT INTO warnungen (barcode, artikel_id, verfallsdatum, ort, status)
+        VALUES (NEW.barcode, NEW.artikel_id, NEW.verfallsdatum, NEW.ort, '{STATUS_ABGELAUFEN}')
+        ON CONFLICT (barcode) DO UPDATE SET artikel_id = excluded.artikel_id, verfallsdatum = excluded.verfallsdatum,
+                                            ort = excluded.ort, status = excluded.status;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_warnungen_loeschen AFTER DELETE ON lagerbestand BEGIN
+        DELETE FROM warnungen WHERE barcode = OLD.barcode;
+    END
+    """,
+    # Verschieben zwischen Lager und Automat, Änderungen von Artikel oder Verfallsdatum und neue Barcodes;
+    # solange noch nie ausgewertet wurde (kein Stichtag), bleiben die Warnungen der Tagesauswertung überlassen
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_warnungen_aendern AFTER UPDATE OF barcode, artikel_id, verfallsdatum, ort ON lagerbestand
+    WHEN {STICHTAG} IS NOT NULL BEGIN
+        DELETE FROM warnungen WHERE barcode = OLD.barcode
+            AND (OLD.barcode IS NOT NEW.barcode OR NOT COALESCE(NEW.verfallsdatum < {STICHTAG}, 0));
+        INSERT INTO warnungen (barcode, artikel_id, verfallsdatum, ort, status)
+        SELECT NEW.barcode, NEW.artikel_id, NEW.verfallsdatum, NEW.ort, '{STATUS_ABGELAUFEN}' WHERE NEW.verfallsdatum < {STICHTAG}
+        ON CONFLICT (barcode) DO UPDATE SET artikel_id = excluded.artikel_id, verfallsdatum = excluded.verfallsdatum,
+                                            ort = excluded.ort, status = excluded.status
+        WHERE warnungen.artikel_id IS NOT excluded.artikel_id OR warnungen.verfallsdatum IS NOT excluded.verfallsdatum
+           OR warnungen.ort IS NOT excluded.ort OR warnungen.status IS NOT excluded.status;
+    END
+    """,
+    # Einmaliger Abgleich mit dem Stichtag, damit die Trigger auf einem vollständigen Stand aufsetzen
+    "DELETE FROM warnungen WHERE barcode NOT IN (SELECT barcode FROM lagerbestand)",
+    f"""
+    INSERT INTO warnungen (barcode, artikel_id, verfallsdatum, ort, status)
+    SELECT barcode, artikel_id, verfallsdatum, ort, '{STATUS_ABGELAUFEN}' FROM lagerbestand WHERE verfallsdatum < {STICHTAG}
+    ON CONFLICT (barcode) DO UPDATE SET ort = excluded.ort, status = excluded.status
+    """,
+]
@@ -1,8 +1,10 @@
 import os
 import pandas as pd
 import sqlite3
-import csv
 from datenbank import Datenbank
+from protokoll import lies_protokoll, lies_protokoll_seite
+from logdateien import lies_neue_eintraege
+from ereignisse import Aktion
 
 
 class Admin:
@@ -10,18 +12,21 @@ class Admin:
     Die Admin-Klasse verwaltet die Bestellungen, Benutzer und Logdateien in der Anwendung.
     """
 
-    def __init__(self):
+    def __init__(self, datenbank=None):
         """
         Initialisiert die Verbindung zur Datenbank und erstellt ein Datenbank-Objekt.
+
+        :param datenbank: Optionale gemeinsam genutzte Datenbankinstanz
         """
-        base_dir = os.path.dirname(__file__)
-        self.db_path = os.path.join(base_dir, 'databases', 'lagerbestand.db')
-        self.user_db_path = os.path.join(base_dir, 'databases', 'users.db')
-        self.log_path = os.path.join(base_dir, 'logs', 'log_protokoll.csv')
+        self.datenbank = datenbank or Datenbank()
+        self.db_path = self.datenbank.db_path
+        self.user_db_path = self.datenbank.user_db_path
+        self.log_path = self.datenbank.log_path
 
-        self.db_conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.cursor = self.db_conn.cursor()
-        self.datenbank = Datenbank()
+        # Verbindungen werden pro Anfrage aus den gemeinsamen Pools geliehen
+        self.pool = self.datenbank.pool
+        self.user_pool = self.datenbank.user_pool
+        self.protokoll_pool = self.datenbank.protokoll_pool
 
     def get_bestellungen(
         self,
@@ -31,7 +36,7 @@ class Admin:
     ):
         query = """
             SELECT bestellgruppe_id, kundennummer, GROUP_CONCAT(name, ', ') AS medikamente, bestelldatum, status
-            FROM bestellungen
+            FROM bestellungen JOIN artikel ON artikel.id = bestellungen.artikel_id
             WHERE status IN ({})
         """.format(",".join(["?"] * len(status)))
 
@@ -47,38 +52,104 @@ class Admin:
 
         query += " GROUP BY bestellgruppe_id, kundennummer ORDER BY bestelldatum DESC"
 
-        self.cursor.execute(query, params)
+        with self.pool.verbindung() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            data = cursor.fetchall()
         return pd.DataFrame(
-            self.cursor.fetchall(),
+            data,
             columns=["Bestell-ID", "Kundennummer", "Medikamente", "Bestelldatum", "Status"],
         )
 
-    def get_logdatei(self, action_filter=None):
+    def get_logdatei(self, action_filter=None, von=None, bis=None, kundennummer=None, aktionstyp=None, limit=None,
+                     code=None, ergebnis=None):
         """
-        Liest die Logdatei aus und filtert nach Aktionen, falls gewünscht.
+        Liest das Protokoll aus der Protokolldatenbank. Alle Filter werden in der Datenbank ausgeführt.
+
+        :param action_filter: Optionaler Text, der in der Aktion enthalten sein muss ("Alle" = kein Filter)
+        :param von: Optionaler Beginn des Zeitraums ("YYYY-MM-DD HH:MM:SS")
+        :param bis: Optionales Ende des Zeitraums ("YYYY-MM-DD HH:MM:SS")
+        :param kundennummer: Optionaler Filter auf einen Benutzer
+        :param aktionstyp: Optionaler Filter auf einen Aktionstyp ("Alle" = kein Filter)
+        :param limit: Optionale maximale Anzahl Einträge
+        :param code: Optionaler Aktionscode (Aktion oder Wert, "Alle" = kein Filter)
+        :param ergebnis: Optionales Ergebnis (Ergebnis oder Wert, "Alle" = kein Filter)
+        :return: DataFrame mit den Spalten Zeitstempel, Benutzer und Aktion
         """
-        try:
-            with open(self.log_path, encoding="utf-8") as file:
-                reader = csv.reader(file)
-                logs = list(reader)
+        # Gepufferte Einträge zuerst schreiben, damit die Ansicht aktuell ist
+        self.datenbank.protokoll.flush()
+
+        logs = lies_protokoll(
+            self.protokoll_pool,
+            von=von,
+            bis=bis,
+            kundennummer=kundennummer,
+            aktionstyp=aktionstyp if aktionstyp != "Alle" else None,
+            suchtext=action_filter if action_filter != "Alle" else None,
+            code=code if code != "Alle" else None,
+            ergebnis=ergebnis if ergebnis != "Alle" else None,
+            limit=limit,
+        )
+        return pd.DataFrame(logs, columns=["Zeitstempel", "Benutzer", "Aktion"])
 
-                if not logs:
-                    return pd.DataFrame(columns=["Zeitstempel", "Benutzer", "Aktion"])
+    def get_logseite(self, nach=None, groesse=200, von=None, bis=None, kundennummer=None, aktionstyp=None, action_filter=None,
+                     code=None, ergebnis=None):
+        """
+        Liest eine Seite des Protokolls. Es werden nie mehr Einträge geladen, als auf einer Seite angezeigt werden.
+
+        :param nach: Optionaler Cursor der vorherigen Seite
+        :param groesse: Anzahl Einträge pro Seite
+        :param von: Optionaler Beginn des Zeitraums ("YYYY-MM-DD HH:MM:SS")
+        :param bis: Optionales Ende des Zeitraums ("YYYY-MM-DD HH:MM:SS")
+        :param kundennummer: Optionaler Filter auf einen Benutzer
+        :param aktionstyp: Optionaler Filter auf einen Aktionstyp ("Alle" = kein Filter)
+        :param action_filter: Optionaler Text, der in der Aktion enthalten sein muss ("Alle" = kein Filter)
+        :param code: Optionaler Aktionscode (Aktion oder Wert, "Alle" = kein Filter)
+        :param ergebnis: Optionales Ergebnis (Ergebnis oder Wert, "Alle" = kein Filter)
+        :return: Tupel (DataFrame mit Zeitstempel, Benutzer und Aktion, Cursor der nächsten Seite oder None)
+        """
+        self.datenbank.protokoll.flush()
+
+        logs, naechster = lies_protokoll_seite(
+            self.protokoll_pool,
+            groesse=groesse,
+            nach=nach,
+            von=von,
+            bis=bis,
+            kundennummer=kundennummer,
+            aktionstyp=aktionstyp if aktionstyp != "Alle" else None,
+            suchtext=action_filter if action_filter != "Alle" else None,
+            code=code if code != "Alle" else None,
+            ergebnis=ergebnis if ergebnis != "Alle" else None,
+        )
+        return pd.DataFrame(logs, columns=["Zeitstempel", "Benutzer", "Aktion"]), naechster
 
-                df = pd.DataFrame(logs, columns=["Zeitstempel", "Benutzer", "Aktion"])
+    def get_neue_logeintraege(self, cursor=None):
+        """
+        Liest nur die seit dem letzten Abruf neu geschriebenen Logeinträge aus den Tagesdateien (Live-Ansicht).
+
+        :param cursor: Optionaler Cursor des letzten Abrufs (ohne Cursor wird das aktuelle Ende bestimmt)
+        :return: Tupel (DataFrame mit den neuen Einträgen, neuer Cursor)
+        """
+        self.datenbank.protokoll.flush()
+        logs, cursor = lies_neue_eintraege(self.log_path, cursor)
+        return pd.DataFrame([ereignis.als_zeile() for ereignis in logs], columns=["Zeitstempel", "Benutzer", "Aktion"]), cursor
 
-                if action_filter and action_filter != "Alle":
-                    df = df[df["Aktion"].str.contains(action_filter, na=False, case=False)]
+    def hat_logeintraege(self):
+        """
+        Überprüft, ob das Protokoll mindestens einen Eintrag enthält.
 
-                return df
-        except FileNotFoundError:
-            return pd.DataFrame(columns=["Zeitstempel", "Benutzer", "Aktion"])
+        :return: True, wenn Einträge vorhanden sind, sonst False
+        """
+        self.datenbank.protokoll.flush()
+        with self.protokoll_pool.verbindung() as conn:
+            return conn.execute("SELECT 1 FROM protokoll LIMIT 1").fetchone() is not None
 
     def get_users(self, username_filter=None):
         """
         Holt Benutzer aus der Datenbank und ermöglicht eine Filterung nach Benutzername.
         """
-        with sqlite3.connect(self.user_db_path) as conn:
+        with self.user_pool.verbindung() as conn:
             cursor = conn.cursor()
             query = "SELECT id, kundennummer, username, role FROM users WHERE 1=1"
             params = []
@@ -97,17 +168,18 @@ class Admin:
         """
         Aktualisiert den Bestellstatus in der Datenbank und protokolliert die Aktion.
         """
-        self.cursor.execute(
+        self.pool.schreiben(lambda cursor: cursor.execute(
             "UPDATE bestellungen SET status = ? WHERE bestellgruppe_id = ?",
             (status, bestell_id),
-        )
-        self.db_conn.commit()
+        ))
 
         if bestellgruppe_id and medikamenten_namen:
             self.datenbank.log_aktion(
-                f"📦 Bestellung {bestellgruppe_id} aufgegeben mit Medikamenten: {', '.join(medikamenten_namen)}"
+                f"📦 Bestellung {bestellgruppe_id} aufgegeben mit Medikamenten: {', '.join(medikamenten_namen)}",
+                code=Aktion.BESTELLSTATUS_GEAENDERT, bestellgruppe_id=bestellgruppe_id,
             )
         else:
             self.datenbank.log_aktion(
-                f"📦 Bestellstatus für ID {bestell_id} wurde auf '{status}' gesetzt."
+                f"📦 Bestellstatus für ID {bestell_id} wurde auf '{status}' gesetzt.",
+                code=Aktion.BESTELLSTATUS_GEAENDERT, bestellgruppe_id=bestell_id,
             )
@@ -2,6 +2,7 @@ import os
 import sqlite3
 import bcrypt
 import random
+from datenbank import get_pool
 
 
 class Anmeldung:
@@ -9,16 +10,19 @@ class Anmeldung:
     Diese Klasse verwaltet die Benutzerregistrierung und Authentifizierung.
     """
 
-    def __init__(self):
+    def __init__(self, pool=None):
         """
         Konstruktor, der den Datenbankpfad korrekt relativ zum Dateispeicherort setzt.
+
+        :param pool: Optionaler Verbindungspool (Standard: Pool der Benutzerdatenbank)
         """
         base_dir = os.path.dirname(__file__)  # src/lagersystem
-        self.db_path = os.path.join(base_dir, 'databases', 'users.db')
+        self.pool = pool or get_pool(os.path.join(base_dir, 'databases', 'users.db'))
+        self.db_path = self.pool.db_path
 
     def connect_db(self):
-        """Erstellt eine Verbindung zur SQLite-Datenbank."""
-        return sqlite3.connect(self.db_path)
+        """Leiht eine Verbindung zur Benutzerdatenbank aus dem gemeinsamen Pool aus."""
+        return self.pool.verbindung()
 
     def hash_password(self, password):
         """Hashing des Passworts mit bcrypt."""
@@ -36,37 +40,42 @@ class Anmeldung:
         """
         Registriert einen neuen Benutzer in der Datenbank.
         """
-        with self.connect_db() as conn:
-            cursor = conn.cursor()
+        # Hashing vor der Transaktion, damit die Schreibsperre nur kurz gehalten wird
+        hashed_pw = self.hash_password(password)
 
-            # Benutzername prüfen
-            cursor.execute("SELECT COUNT(*) FROM users WHERE username = ?", (username,))
-            if cursor.fetchone()[0] > 0:
-                return None, "🚫 Fehler: Benutzername bereits vergeben! Bitte wählen Sie einen anderen."
+        try:
+            return self.pool.schreiben(
+                lambda cursor: self._benutzer_anlegen(cursor, username, hashed_pw, role)
+            )
+        except sqlite3.IntegrityError:
+            return None, "🚫 Fehler: Registrierung fehlgeschlagen!"
 
-            # Admin automatisch setzen, wenn keiner existiert
-            cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
+    def _benutzer_anlegen(self, cursor, username, hashed_pw, role):
+        """
+        Legt einen Benutzer innerhalb einer laufenden Transaktion an.
+        """
+        # Benutzername prüfen
+        cursor.execute("SELECT COUNT(*) FROM users WHERE username = ?", (username,))
+        if cursor.fetchone()[0] > 0:
+            return None, "🚫 Fehler: Benutzername bereits vergeben! Bitte wählen Sie einen anderen."
+
+        # Admin automatisch setzen, wenn keiner existiert
+        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
+        if cursor.fetchone()[0] == 0:
+            role = "admin"
+
+        # Einzigartige Kundennummer generieren
+        while True:
+            kundennummer = self.generate_kundennummer()
+            cursor.execute("SELECT COUNT(*) FROM users WHERE kundennummer = ?", (kundennummer,))
             if cursor.fetchone()[0] == 0:
-                role = "admin"
-
-            # Einzigartige Kundennummer generieren
-            while True:
-                kundennummer = self.generate_kundennummer()
-                cursor.execute("SELECT COUNT(*) FROM users WHERE kundennummer = ?", (kundennummer,))
-                if cursor.fetchone()[0] == 0:
-                    break
-
-            hashed_pw = self.hash_password(password)
-
-            try:
-                cursor.execute(
-                    "INSERT INTO users (kundennummer, username, password_hash, role) VALUES (?, ?, ?, ?)",
-                    (kundennummer, username, hashed_pw, role)
-                )
-                conn.commit()
-                return kundennummer, role
-            except sqlite3.IntegrityError:
-                return None, "🚫 Fehler: Registrierung fehlgeschlagen!"
+                break
+
+        cursor.execute(
+            "INSERT INTO users (kundennummer, username, password_hash, role) VALUES (?, ?, ?, ?)",
+            (kundennummer, username, hashed_pw, role)
+        )
+        return kundennummer, role
 
     def get_user(self, username):
         """
@@ -82,7 +91,6 @@ class Anmeldung:
 
     def loesche_user(self, username):
         """Löscht einen Benutzer aus der Datenbank, falls vorhanden."""
-        with self.connect_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM users WHERE username = ?", (username,))
-            conn.commit()
+        self.pool.schreiben(
+            lambda cursor: cursor.execute("DELETE FROM users WHERE username = ?", (username,))
+        )
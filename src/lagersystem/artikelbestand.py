@@ -0,0 +1,76 @@
+# Summen je Artikel und Ort (Lager/Automat), die Trigger bei jeder Änderung am Lagerbestand fortschreiben.
+# Die Artikelübersicht liest damit eine Zeile je Artikel und Ort statt den gesamten Bestand zu summieren.
+
+# Die Summen aus dem Lagerbestand selbst, mit denen die Tabelle aufgebaut und geprüft wird
+BESTAND_SUMMEN = """
+    SELECT artikel_id, ort, COUNT(*), SUM(COALESCE(menge, 0)) FROM lagerbestand
+    WHERE artikel_id IS NOT NULL AND ort IS NOT NULL GROUP BY artikel_id, ort
+"""
+
+ARTIKELBESTAND_ANWEISUNGEN = [
+    """
+    CREATE TABLE IF NOT EXISTS artikelbestand (
+        artikel_id INTEGER NOT NULL REFERENCES artikel(id),
+        ort TEXT NOT NULL,
+        anzahl INTEGER NOT NULL,
+        menge INTEGER NOT NULL,
+        PRIMARY KEY (artikel_id, ort)
+    ) WITHOUT ROWID
+    """,
+    f"INSERT INTO artikelbestand (artikel_id, ort, anzahl, menge) {BESTAND_SUMMEN}",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_artikelbestand_einfuegen AFTER INSERT ON lagerbestand
+    WHEN NEW.artikel_id IS NOT NULL AND NEW.ort IS NOT NULL BEGIN
+        INSERT INTO artikelbestand (artikel_id, ort, anzahl, menge) VALUES (NEW.artikel_id, NEW.ort, 1, COALESCE(NEW.menge, 0))
+        ON CONFLICT (artikel_id, ort) DO UPDATE SET anzahl = anzahl + 1, menge = menge + excluded.menge;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_artikelbestand_loeschen AFTER DELETE ON lagerbestand
+    WHEN OLD.artikel_id IS NOT NULL AND OLD.ort IS NOT NULL BEGIN
+        UPDATE artikelbestand SET anzahl = anzahl - 1, menge = menge - COALESCE(OLD.menge, 0)
+        WHERE artikel_id = OLD.artikel_id AND ort = OLD.ort;
+        DELETE FROM artikelbestand WHERE artikel_id = OLD.artikel_id AND ort = OLD.ort AND anzahl = 0;
+    END
+    """,
+    # Eine Änderung von Artikel, Ort oder Menge bucht die Zeile vom alten auf den neuen Eintrag um
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_artikelbestand_aendern AFTER UPDATE OF artikel_id, ort, menge ON lagerbestand
+    WHEN OLD.artikel_id IS NOT NEW.artikel_id OR OLD.ort IS NOT NEW.ort OR OLD.menge IS NOT NEW.menge BEGIN
+        UPDATE artikelbestand SET anzahl = anzahl - 1, menge = menge - COALESCE(OLD.menge, 0)
+        WHERE artikel_id = OLD.artikel_id AND ort = OLD.ort;
+        DELETE FROM artikelbestand WHERE artikel_id = OLD.artikel_id AND ort = OLD.ort AND anzahl = 0;
+        INSERT INTO artikelbestand (artikel_id, ort, anzahl, menge)
+        SELECT NEW.artikel_id, NEW.ort, 1, COALESCE(NEW.menge, 0) WHERE NEW.artikel_id IS NOT NULL AND NEW.ort IS NOT NULL
+        ON CONFLICT (artikel_id, ort) DO UPDATE SET anzahl = anzahl + 1, menge = menge + excluded.menge;
+    END
+    """,
+]
+
+
+def pruefe_artikelbestand(cursor):
+    """
+    Vergleicht die fortgeschriebenen Summen mit den tatsächlichen Summen des Lagerbestands.
+
+    :param cursor: Ein Datenbank-Cursor
+    :return: Liste der abweichenden Zeilen (Artikel-ID, Ort, Anzahl, Menge) aus beiden Richtungen, leer wenn konsistent
+    """
+    cursor.execute(f"""
+        SELECT * FROM ({BESTAND_SUMMEN} EXCEPT SELECT artikel_id, ort, anzahl, menge FROM artikelbestand)
+        UNION
+        SELECT * FROM (SELECT artikel_id, ort, anzahl, menge FROM artikelbestand EXCEPT {BESTAND_SUMMEN})
+        ORDER BY 1, 2
+    """)
+    return cursor.fetchall()
+
+
+def baue_artikelbestand_neu(cursor):
+    """
+    Berechnet alle Summen neu aus dem Lagerbestand. Muss innerhalb einer Schreibtransaktion aufgerufen werden.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :return: Anzahl der neu geschriebenen Zeilen
+    """
+    cursor.execute("DELETE FROM artikelbestand")
+    cursor.execute(f"INSERT INTO artikelbestand (artikel_id, ort, anzahl, menge) {BESTAND_SUMMEN}")
+    return cursor.rowcount
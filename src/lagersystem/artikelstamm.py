@@ -0,0 +1,33 @@
+import json
+
+# Lagerbestand, Bestellungen und Warnungen speichern statt des Medikamentennamens nur die Artikel-ID.
+# Der Name steht genau einmal in der Tabelle artikel (Artikelstamm) und wird über einen Join gelesen.
+
+
+def artikel_id(cursor, name):
+    """
+    Liefert die ID eines Artikels und legt ihn bei Bedarf im Artikelstamm an.
+    Muss innerhalb einer Schreibtransaktion aufgerufen werden.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :param name: Der Name des Medikaments
+    :return: Die Artikel-ID
+    """
+    cursor.execute("INSERT OR IGNORE INTO artikel (name) VALUES (?)", (name,))
+    cursor.execute("SELECT id FROM artikel WHERE name = ?", (name,))
+    return cursor.fetchone()[0]
+
+
+def artikel_ids(cursor, namen):
+    """
+    Liefert die IDs mehrerer Artikel mit zwei mengenbasierten Abfragen und legt fehlende Artikel an.
+    Muss innerhalb einer Schreibtransaktion aufgerufen werden.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :param namen: Die Namen der Medikamente
+    :return: Dictionary Name -> Artikel-ID
+    """
+    namen_json = json.dumps(sorted(set(namen)))
+    cursor.execute("INSERT OR IGNORE INTO artikel (name) SELECT value FROM json_each(?)", (namen_json,))
+    cursor.execute("SELECT name, id FROM artikel WHERE name IN (SELECT value FROM json_each(?))", (namen_json,))
+    return dict(cursor.fetchall())
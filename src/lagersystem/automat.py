@@ -3,9 +3,15 @@ import pandas as pd
 import sqlite3
 import random
 import re
+import json
 import os
+import time
 from datetime import datetime
-from datenbank import Datenbank
+from datenbank import Datenbank, TransaktionAbgebrochen
+from warnung import Warnung
+from ereignisse import Aktion, Ergebnis
+from kanaele import weise_kanal_zu, weise_kanaele_zu, pruefe_kanalbelegung, KANAL_BEZEICHNUNG
+from nachfuellung import plane_nachfuellung
 
 
 class Automat:
@@ -14,18 +20,18 @@ class Automat:
     Diese Klasse ermöglicht das Hinzufügen und Entfernen von Waren,
     das Verwalten von Bestellungen und die Kommunikation mit einer SQLite-Datenbank.
     """
-    def __init__(self):
+    def __init__(self, datenbank=None, warnung=None):
         """
         Initialisiert die Automat-Klasse und stellt eine Verbindung zur Datenbank her.
+
+        :param datenbank: Optionale gemeinsam genutzte Datenbankinstanz
+        :param warnung: Optionale gemeinsam genutzte Warnungsinstanz
         """
-        base_dir = os.path.dirname(__file__)  # src/lagersystem
-        db_path = os.path.join(base_dir, 'databases', 'lagerbestand.db')
+        self.datenbank = datenbank or Datenbank()
+        self.warnung = warnung or Warnung(pool=self.datenbank.pool)
 
-        # Verbindung herstellen
-        self.db_conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.db_conn.cursor()
-        self.datenbank = Datenbank()
-        self.kanal_liste = []
+        # Verbindungen werden pro Anfrage aus dem gemeinsamen Pool geliehen
+        self.pool = self.datenbank.pool
 
     def ist_gueltiger_barcode(self, barcode):
         """
@@ -42,6 +48,8 @@ class Automat:
         :param barcode: Der Barcode der Ware, die verschoben werden soll.
         :return: Eine Nachricht über das Ergebnis der Operation.
         """
+        start = time.perf_counter()
+        ergebnis = None
         try:
             if "warenkorb" not in st.session_state:
                 st.session_state.warenkorb = []
@@ -52,50 +60,19 @@ class Automat:
             if not self.ist_gueltiger_barcode(barcode):
                 return "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."
 
-            # Ware aus der Datenbank abrufen
-            self.cursor.execute("SELECT name, verfallsdatum FROM lagerbestand WHERE barcode = ?", (barcode,))
-            row = self.cursor.fetchone()
-
-            if row:
-                name, verfallsdatum = row
-                today = datetime.today().strftime('%Y-%m-%d')
-
-                if verfallsdatum < today:
-                    print("\033[91m" + f"🚫 Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Automaten verschoben werden!" + "\033[0m")
-                    return f"🚫 Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Automaten verschoben werden!"
-
-                # Prüfen, ob bereits ein Kanal für dieses Medikament existiert
-                self.cursor.execute("SELECT DISTINCT kanal FROM lagerbestand WHERE name = ? AND ort = 'Automat'", (name,))
-                existing_kanal = self.cursor.fetchone()
+            # Kanalwahl und Verschiebung in einer gemeinsamen Schreibtransaktion
+            message = self.pool.schreiben(lambda cursor: self._ware_in_kanal_verschieben(cursor, barcode))
+            print("\033[92m" + message + "\033[0m")
 
-                if existing_kanal and existing_kanal[0]:  # Falls das Medikament bereits in einem Kanal ist
-                    kanal = existing_kanal[0]
-                else:
-                    # Falls noch kein Kanal existiert, den nächsten verfügbaren zuweisen
-                    self.cursor.execute("SELECT DISTINCT kanal FROM lagerbestand WHERE ort = 'Automat'")
-                    vorhandene_kanaele = {row[0] for row in self.cursor.fetchall() if row[0]}
-                    
-                    neue_kanalnummer = 1
-                    while f"Kanal {neue_kanalnummer}" in vorhandene_kanaele:
-                        neue_kanalnummer += 1
-                    
-                    kanal = f"Kanal {neue_kanalnummer}"
-
-                # Medikament in den Automaten verschieben
-                self.cursor.execute("UPDATE lagerbestand SET ort = 'Automat', kanal = ? WHERE barcode = ?", (kanal, barcode))
-                self.db_conn.commit()
-                
-                print("\033[92m" + f"✅ Erfolg: Ware {name} wurde in den Automaten verschoben (Kanal: {kanal})." + "\033[0m")
-                message = f"✅ Erfolg: Ware {name} wurde in den Automaten verschoben (Kanal: {kanal})."
-
-            else:
-                print("\033[91m" + f"🚫 Fehler: Ware {barcode} nicht im Lagerbestand!" + "\033[0m")
-                message = f"🚫 Fehler: Ware {barcode} nicht im Lagerbestand!"
+        except TransaktionAbgebrochen as abbruch:
+            print("\033[91m" + str(abbruch) + "\033[0m")
+            message = str(abbruch)
 
         except sqlite3.OperationalError:
             # Fehler, wenn die Datenbank nicht verfügbar ist
             print("\033[91m" + "🚫 Fehler: Datenbank ist nicht verfügbar!" + "\033[0m")
             message = "🚫 Fehler: Datenbank ist nicht verfügbar!"
+            ergebnis = Ergebnis.KRITISCH
 
         except sqlite3.IntegrityError:
             # Fehler bei Datenbankintegrität
@@ -106,13 +83,151 @@ class Automat:
             # Allgemeiner Fehlerfall
             print("\033[91m" + f"🚫 Unbekannter Fehler: {str(e)}" + "\033[0m")
             message = f"🚫 Unbekannter Fehler: {str(e)}"
+            ergebnis = Ergebnis.KRITISCH
         
         # Aktion protokollieren und Nachricht zurückgeben
-        self.datenbank.log_aktion(f"Automatenzugabe: {message}")
+        self.datenbank.log_aktion(
+            f"Automatenzugabe: {message}", code=Aktion.AUTOMAT_ZUGABE, ergebnis=ergebnis,
+            barcode=barcode, dauer_ms=(time.perf_counter() - start) * 1000,
+        )
         return message
 
 
 
+    def _ware_in_kanal_verschieben(self, cursor, barcode):
+        """
+        Verschiebt eine Ware innerhalb einer laufenden Transaktion in einen Kanal des Automaten.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param barcode: Der Barcode der Ware, die verschoben werden soll.
+        :return: Die Erfolgsmeldung.
+        """
+        # Ware aus der Datenbank abrufen
+        cursor.execute(
+            "SELECT artikel_id, name, verfallsdatum, ort, kanal FROM lagerbestand JOIN artikel ON artikel.id = artikel_id "
+            "WHERE barcode = ?",
+            (barcode,),
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            raise TransaktionAbgebrochen(f"🚫 Fehler: Ware {barcode} nicht im Lagerbestand!")
+
+        artikel_id, name, verfallsdatum, ort, kanal = row
+        today = datetime.today().strftime('%Y-%m-%d')
+
+        if verfallsdatum < today:
+            raise TransaktionAbgebrochen(f"🚫 Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Automaten verschoben werden!")
+
+        # Eine Ware, die bereits in einem Kanal liegt, belegt keinen weiteren Platz
+        if ort == 'Automat' and kanal:
+            return f"✅ Erfolg: Ware {name} ist bereits im Automaten (Kanal: {kanal})."
+
+        # Kanal des Medikaments mit freiem Platz oder den nächsten freien Kanal aus der Freiliste wählen
+        kanal_id = weise_kanal_zu(cursor, artikel_id)
+        if kanal_id is None:
+            raise TransaktionAbgebrochen(f"🚫 Fehler: Kein freier Kanal im Automaten für {name}!")
+
+        # Medikament in den Automaten verschieben, die Belegung des Kanals schreibt ein Trigger fort
+        cursor.execute("UPDATE lagerbestand SET ort = 'Automat', kanal_id = ? WHERE barcode = ?", (kanal_id, barcode))
+        return f"✅ Erfolg: Ware {name} wurde in den Automaten verschoben (Kanal: Kanal {kanal_id})."
+
+    def befuellen_bulk(self, barcodes):
+        """
+        Verschiebt viele Waren in einer einzigen Transaktion aus dem Lager in den Automaten.
+        Die Prüfungen entsprechen ware_zum_automaten_hinzufuegen, Bestand, Verfallsdatum und Kanäle werden aber
+        mengenbasiert mit je einer Abfrage für alle Barcodes ermittelt.
+
+        :param barcodes: Liste der Barcodes in der Reihenfolge des Scannens
+        :return: Liste von Tupeln (Zeilennummer, Barcode, Meldung) in der Reihenfolge der Eingabe
+        """
+        start = time.perf_counter()
+        bericht = []
+        kandidaten = {}
+
+        # Prüfungen ohne Datenbank: leere Eingaben, Barcodeformat und doppelt gescannte Barcodes
+        for zeile, barcode in enumerate(barcodes, start=1):
+            barcode = str(barcode).strip() if barcode is not None else ""
+            if not barcode:
+                meldung = "🚫 Fehler: Barcode darf nicht leer sein!"
+            elif not self.ist_gueltiger_barcode(barcode):
+                meldung = "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."
+            elif barcode in kandidaten:
+                meldung = f"🚫 Fehler: Barcode {barcode} wurde mehrfach gescannt!"
+            else:
+                kandidaten[barcode] = zeile
+                meldung = None
+            bericht.append((zeile, barcode, meldung))
+
+        try:
+            meldungen = self.pool.schreiben(
+                lambda cursor: self._befuellung_buchen(cursor, kandidaten)
+            ) if kandidaten else {}
+        except sqlite3.Error as e:
+            meldungen = {barcode: f"🚫 Fehler bei der Datenbank: {str(e)}" for barcode in kandidaten}
+
+        bericht = [(zeile, barcode, meldung or meldungen[barcode]) for zeile, barcode, meldung in bericht]
+        verschoben = sum(1 for _, _, meldung in bericht if meldung.startswith("✅"))
+        self.datenbank.log_aktion(
+            f"📥 Automat befüllt: {verschoben} von {len(bericht)} Medikamenten verschoben",
+            code=Aktion.AUTOMAT_ZUGABE, ergebnis=Ergebnis.ERFOLG if verschoben == len(bericht) else Ergebnis.WARNUNG,
+            dauer_ms=(time.perf_counter() - start) * 1000,
+        )
+        return bericht
+
+    def _befuellung_buchen(self, cursor, kandidaten):
+        """
+        Prüft die Barcodes einer Befüllung innerhalb einer laufenden Transaktion, weist die Kanäle für alle
+        Artikel gemeinsam zu und verschiebt alle gültigen Waren mit einer Anweisung.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param kandidaten: Dictionary Barcode -> Zeilennummer
+        :return: Dictionary Barcode -> Meldung
+        """
+        cursor.execute(
+            "SELECT barcode, artikel_id, name, verfallsdatum, ort, kanal FROM lagerbestand "
+            "JOIN artikel ON artikel.id = artikel_id WHERE barcode IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(kandidaten)),),
+        )
+        waren = {row[0]: row[1:] for row in cursor.fetchall()}
+        today = datetime.today().strftime('%Y-%m-%d')
+
+        meldungen = {}
+        zu_verschieben = []
+        for barcode in kandidaten:
+            if barcode not in waren:
+                meldungen[barcode] = f"🚫 Fehler: Ware {barcode} nicht im Lagerbestand!"
+                continue
+            artikel_id, name, verfallsdatum, ort, kanal = waren[barcode]
+            if verfallsdatum < today:
+                meldungen[barcode] = f"🚫 Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Automaten verschoben werden!"
+            elif ort == 'Automat' and kanal:
+                meldungen[barcode] = f"✅ Erfolg: Ware {name} ist bereits im Automaten (Kanal: {kanal})."
+            else:
+                zu_verschieben.append(barcode)
+
+        # Kanäle für alle Waren gemeinsam wählen, in der Reihenfolge des Scannens
+        zuordnung = weise_kanaele_zu(cursor, [waren[barcode][0] for barcode in zu_verschieben])
+        kanal_ids = {}
+        for barcode, kanal_id in zip(zu_verschieben, zuordnung):
+            name = waren[barcode][1]
+            if kanal_id is None:
+                meldungen[barcode] = f"🚫 Fehler: Kein freier Kanal im Automaten für {name}!"
+            else:
+                kanal_ids[barcode] = kanal_id
+                meldungen[barcode] = f"✅ Erfolg: Ware {name} wurde in den Automaten verschoben (Kanal: Kanal {kanal_id})."
+
+        # Alle Waren mit einer Anweisung verschieben, die Belegung der Kanäle schreiben die Trigger fort
+        # (ohne UPDATE ... FROM, das erst ab SQLite 3.33 zur Verfügung steht)
+        zuordnung = json.dumps(kanal_ids)
+        cursor.execute(
+            "UPDATE lagerbestand SET ort = 'Automat', "
+            "kanal_id = (SELECT value FROM json_each(?) WHERE key = lagerbestand.barcode) "
+            "WHERE barcode IN (SELECT key FROM json_each(?))",
+            (zuordnung, zuordnung),
+        )
+        return meldungen
+
     def ware_aus_automaten_entfernen(self, barcode):
         """
         Entfernt eine Ware aus dem Automaten und legt sie zurück ins Lager.
@@ -120,6 +235,8 @@ class Automat:
         :param barcode: Der Barcode der Ware, die entfernt werden soll.
         :return: Eine Nachricht über das Ergebnis der Operation.
         """
+        start = time.perf_counter()
+        ergebnis = None
         try:
             # Überprüfen, ob der Barcode überhaupt eingegeben wurde
             if not barcode:
@@ -128,56 +245,62 @@ class Automat:
             if not self.ist_gueltiger_barcode(barcode):
                 return "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."
 
-            # Überprüfen, ob die Ware im Automaten ist
-            self.cursor.execute("SELECT kanal, name FROM lagerbestand WHERE barcode = ? AND ort = 'Automat'", (barcode,))
-            row = self.cursor.fetchone()
-
-            if row:
-                kanal, name = row
-                # Ware aus dem Automaten entfernen und ins Lager legen
-                self.cursor.execute("UPDATE lagerbestand SET ort = 'Lager', kanal = NULL WHERE barcode = ?", (barcode,))
-                self.db_conn.commit()
-                
-                # Prüfen, ob noch weitere Medikamente im selben Kanal vorhanden sind
-                self.cursor.execute("SELECT COUNT(*) FROM lagerbestand WHERE kanal = ? AND ort = 'Automat'", (kanal,))
-                count = self.cursor.fetchone()[0]
-                if count == 0:
-                    # Wenn der Kanal leer ist, aus der Kanal-Liste entfernen
-                    if name in self.kanal_liste:
-                        del self.kanal_liste[name]
-
-                print("\033[92m" + f"✅ Erfolg: Ware {barcode} aus Kanal {kanal} entfernt und zurück ins Lager gelegt." + "\033[0m")
-                message = f"✅ Erfolg: Ware {barcode} aus Kanal {kanal} entfernt und zurück ins Lager gelegt."
-            
-            else:
-                # Fehler, wenn die Ware nicht im Automaten gefunden wurde
-                print("\033[91m" + f"🚫 Fehler: Ware {barcode} nicht im Automaten!" + "\033[0m")
-                message = f"🚫 Fehler: Ware {barcode} nicht im Automaten!"
+            message = self.pool.schreiben(lambda cursor: self._ware_aus_kanal_nehmen(cursor, barcode))
+            print("\033[92m" + message + "\033[0m")
+
+        except TransaktionAbgebrochen as abbruch:
+            # Fehler, wenn die Ware nicht im Automaten gefunden wurde
+            print("\033[91m" + str(abbruch) + "\033[0m")
+            message = str(abbruch)
 
         except sqlite3.OperationalError:
             # Fehler, wenn die Datenbank nicht verfügbar ist
             print("\033[91m" + "🚫 Fehler: Datenbank ist nicht verfügbar!" + "\033[0m")
             message = "🚫 Fehler: Datenbank ist nicht verfügbar!"
+            ergebnis = Ergebnis.KRITISCH
 
         except sqlite3.IntegrityError:
             # Fehler bei Datenbankintegrität
             print("\033[91m" + "🚫 Fehler: Integritätsproblem in der Datenbank!" + "\033[0m")
             message = "🚫 Fehler: Integritätsproblem in der Datenbank!"
 
-        except KeyError:
-            # Fehler, wenn der Name nicht in kanal_liste gefunden wird
-            print("\033[91m" + "🚫 Fehler: Kanal konnte nicht aus der Liste entfernt werden!" + "\033[0m")
-            message = "🚫 Fehler: Kanal konnte nicht aus der Liste entfernt werden!"
-
         except Exception as e:
             # Allgemeiner Fehlerfall
             print("\033[91m" + f"🚫 Unbekannter Fehler: {str(e)}" + "\033[0m")
             message = f"🚫 Unbekannter Fehler: {str(e)}"
+            ergebnis = Ergebnis.KRITISCH
         
         # Aktion protokollieren und Nachricht zurückgeben
-        self.datenbank.log_aktion(f"Automatenentfernung: {message}")
+        self.datenbank.log_aktion(
+            f"Automatenentfernung: {message}", code=Aktion.AUTOMAT_ENTNAHME, ergebnis=ergebnis,
+            barcode=barcode, dauer_ms=(time.perf_counter() - start) * 1000,
+        )
         return message
     
+    def _ware_aus_kanal_nehmen(self, cursor, barcode):
+        """
+        Legt eine Ware innerhalb einer laufenden Transaktion aus dem Automaten zurück ins Lager.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param barcode: Der Barcode der Ware, die entfernt werden soll.
+        :return: Die Erfolgsmeldung.
+        """
+        # Überprüfen, ob die Ware im Automaten ist
+        cursor.execute(
+            "SELECT kanal, name FROM lagerbestand JOIN artikel ON artikel.id = artikel_id WHERE barcode = ? AND ort = 'Automat'",
+            (barcode,),
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            raise TransaktionAbgebrochen(f"🚫 Fehler: Ware {barcode} nicht im Automaten!")
+
+        kanal, name = row
+        # Ware aus dem Automaten entfernen und ins Lager legen, ein geleerter Kanal wird per Trigger wieder frei
+        cursor.execute("UPDATE lagerbestand SET ort = 'Lager', kanal_id = NULL WHERE barcode = ?", (barcode,))
+
+        return f"✅ Erfolg: Ware {barcode} aus Kanal {kanal} entfernt und zurück ins Lager gelegt."
+
     def ware_zum_warenkorb_hinzufuegen(self, barcode):
         """
         Fügt eine Ware in den Warenkorb hinzu, wenn sie sich im Automaten befindet und nicht abgelaufen ist.
@@ -185,49 +308,68 @@ class Automat:
         :param barcode: Der Barcode der Ware, die hinzugefügt werden soll.
         :return: Eine Nachricht über das Ergebnis der Operation.
         """
+        start = time.perf_counter()
+        ergebnis = None
         try:
-            # Überprüfen, ob der Barcode überhaupt eingegeben wurde
-            if not barcode:
-                print("\033[91m" + "🚫 Fehler: Barcode darf nicht leer sein!" + "\033[0m")
-                return "🚫 Fehler: Barcode darf nicht leer sein!"
-            if not self.ist_gueltiger_barcode(barcode):
-                return "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."
-
-            # Überprüfen, ob das Medikament bereits im Warenkorb ist
-            if any(item["barcode"] == barcode for item in st.session_state.warenkorb):
-                print("\033[91m" + f"🚫 Fehler: Barcode {barcode} ist bereits im Warenkorb!" + "\033[0m")
-                return f"🚫 Fehler: Barcode {barcode} ist bereits im Warenkorb!"
-
-            # Überprüfen, ob das Medikament im Automaten ist
-            self.cursor.execute("SELECT name, verfallsdatum FROM lagerbestand WHERE barcode = ? AND ort = 'Automat'", (barcode,))
-            row = self.cursor.fetchone()
-
-            if not row:
-                print("\033[91m" + f"🚫 Fehler: Medikament {barcode} ist nicht im Automaten!" + "\033[0m")
-                self.datenbank.log_aktion(f"🚫 Fehler: Medikament {barcode} ist nicht im Automaten und kann nicht in den Warenkorb gelegt werden!")
-                return f"🚫 Fehler: Medikament {barcode} ist nicht im Automaten!"
+            with self.pool.verbindung() as conn:
+                cursor = conn.cursor()
+                # Überprüfen, ob der Barcode überhaupt eingegeben wurde
+                if not barcode:
+                    print("\033[91m" + "🚫 Fehler: Barcode darf nicht leer sein!" + "\033[0m")
+                    return "🚫 Fehler: Barcode darf nicht leer sein!"
+                if not self.ist_gueltiger_barcode(barcode):
+                    return "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."
+
+                # Überprüfen, ob das Medikament bereits im Warenkorb ist
+                if any(item["barcode"] == barcode for item in st.session_state.warenkorb):
+                    print("\033[91m" + f"🚫 Fehler: Barcode {barcode} ist bereits im Warenkorb!" + "\033[0m")
+                    return f"🚫 Fehler: Barcode {barcode} ist bereits im Warenkorb!"
+
+                # Überprüfen, ob das Medikament im Automaten ist
+                cursor.execute(
+                    "SELECT name, verfallsdatum FROM lagerbestand JOIN artikel ON artikel.id = artikel_id "
+                    "WHERE barcode = ? AND ort = 'Automat'",
+                    (barcode,),
+                )
+                row = cursor.fetchone()
 
-            name, verfallsdatum = row
-            today = datetime.today().strftime('%Y-%m-%d')
+                if not row:
+                    print("\033[91m" + f"🚫 Fehler: Medikament {barcode} ist nicht im Automaten!" + "\033[0m")
+                    self.datenbank.log_aktion(
+                        f"🚫 Fehler: Medikament {barcode} ist nicht im Automaten und kann nicht in den Warenkorb gelegt werden!",
+                        code=Aktion.WARENKORB_HINZUGEFUEGT, barcode=barcode, dauer_ms=(time.perf_counter() - start) * 1000,
+                    )
+                    return f"🚫 Fehler: Medikament {barcode} ist nicht im Automaten!"
 
-            # Überprüfen, ob das Medikament abgelaufen ist
-            if verfallsdatum < today:
-                print("\033[93m" + f"⚠️ Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Warenkorb gelegt werden!" + "\033[0m")
-                self.log_aktion(f"⚠️ Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Warenkorb gelegt werden!")
-                return f"⚠️ Fehler: {name} (Barcode: {barcode}) ist abgelaufen!"
+                name, verfallsdatum = row
+                today = datetime.today().strftime('%Y-%m-%d')
 
-            # Medikament in den Warenkorb legen
-            st.session_state.warenkorb.append({"barcode": barcode, "name": name, "verfallsdatum": verfallsdatum})
+                # Überprüfen, ob das Medikament abgelaufen ist
+                if verfallsdatum < today:
+                    print("\033[93m" + f"⚠️ Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Warenkorb gelegt werden!" + "\033[0m")
+                    self.datenbank.log_aktion(
+                        f"⚠️ Fehler: {name} (Barcode: {barcode}) ist abgelaufen und kann nicht in den Warenkorb gelegt werden!",
+                        code=Aktion.WARENKORB_HINZUGEFUEGT, ergebnis=Ergebnis.WARNUNG, barcode=barcode,
+                        dauer_ms=(time.perf_counter() - start) * 1000,
+                    )
+                    return f"⚠️ Fehler: {name} (Barcode: {barcode}) ist abgelaufen!"
+
+                # Medikament in den Warenkorb legen
+                st.session_state.warenkorb.append({"barcode": barcode, "name": name, "verfallsdatum": verfallsdatum})
             
-            print("\033[92m" + f"✅ {name} wurde dem Warenkorb hinzugefügt!" + "\033[0m")
-            self.datenbank.log_aktion(f"✅ Medikament {name} (Barcode: {barcode}) zum Warenkorb hinzugefügt")
+                print("\033[92m" + f"✅ {name} wurde dem Warenkorb hinzugefügt!" + "\033[0m")
+                self.datenbank.log_aktion(
+                    f"✅ Medikament {name} (Barcode: {barcode}) zum Warenkorb hinzugefügt",
+                    code=Aktion.WARENKORB_HINZUGEFUEGT, barcode=barcode, dauer_ms=(time.perf_counter() - start) * 1000,
+                )
 
-            return f"✅ {name} wurde dem Warenkorb hinzugefügt!"
+                return f"✅ {name} wurde dem Warenkorb hinzugefügt!"
         
         except sqlite3.OperationalError:
             # Fehler, wenn die Datenbank nicht verfügbar ist
             print("\033[91m" + "🚫 Fehler: Datenbank ist nicht verfügbar!" + "\033[0m")
             message = "🚫 Fehler: Datenbank ist nicht verfügbar!"
+            ergebnis = Ergebnis.KRITISCH
 
         except sqlite3.IntegrityError:
             # Fehler bei Datenbankintegrität
@@ -243,9 +385,13 @@ class Automat:
             # Allgemeiner Fehlerfall
             print("\033[91m" + f"🚫 Unbekannter Fehler: {str(e)}" + "\033[0m")
             message = f"🚫 Unbekannter Fehler: {str(e)}"
+            ergebnis = Ergebnis.KRITISCH
         
         # Aktion protokollieren und Nachricht zurückgeben
-        self.datenbank.log_aktion(f"Warenkorb-Hinzufügen: {message}")
+        self.datenbank.log_aktion(
+            f"Warenkorb-Hinzufügen: {message}", code=Aktion.WARENKORB_HINZUGEFUEGT, ergebnis=ergebnis,
+            barcode=barcode, dauer_ms=(time.perf_counter() - start) * 1000,
+        )
         return message
 
 
@@ -257,9 +403,9 @@ class Automat:
         :param kundennummer: Die Kundennummer für die Bestellung.
         :return: Eine Nachricht über das Ergebnis der Bestellung.
         """
+        start = time.perf_counter()
+        ergebnis = None
         try:
-            
-            
             # Überprüfen, ob die Kundennummer eingegeben wurde
             if not kundennummer:
                 print("\033[91m" + "🚫 Fehler: Kundennummer darf nicht leer sein!" + "\033[0m")
@@ -272,41 +418,34 @@ class Automat:
 
             bestelldatum = datetime.today().strftime('%Y-%m-%d %H:%M:%S')
             bestellgruppe_id = random.randint(100000, 999999)
-            medikamenten_namen = []
-
-            for item in st.session_state.warenkorb:
-                barcode, name = item["barcode"], item["name"]
-                medikamenten_namen.append(name)
-
-                # Überprüfen, ob das Medikament noch im Automaten ist
-                self.cursor.execute("SELECT ort FROM lagerbestand WHERE barcode = ?", (barcode,))
-                ort = self.cursor.fetchone()
-                if not ort or ort[0] != 'Automat':
-                    print("\033[91m" + f"🚫 Fehler: {name} (Barcode: {barcode}) ist nicht im Automaten und kann nicht bestellt werden!" + "\033[0m")
-                    return f"🚫 Fehler: {name} (Barcode: {barcode}) ist nicht im Automaten und kann nicht bestellt werden!"
-
-                # Bestellung in die Datenbank eintragen
-                self.cursor.execute(
-                    "INSERT INTO bestellungen (bestellgruppe_id, kundennummer, barcode, name, bestelldatum) VALUES (?, ?, ?, ?, ?)",
-                    (bestellgruppe_id, kundennummer, barcode, name, bestelldatum)
-                )
+            warenkorb = list(st.session_state.warenkorb)
+            medikamenten_namen = [item["name"] for item in warenkorb]
 
-                # Medikament aus dem Automaten entfernen
-                self.cursor.execute("DELETE FROM lagerbestand WHERE barcode = ?", (barcode,))
-
-            self.db_conn.commit()
+            # Alle Positionen werden gemeinsam gebucht oder gar nicht
+            self.pool.schreiben(
+                lambda cursor: self._bestellung_buchen(cursor, warenkorb, kundennummer, bestellgruppe_id, bestelldatum)
+            )
             st.session_state.warenkorb = []
 
             # Erfolgreiche Bestellung visuell anzeigen
             print("\033[92m" + f"✅ Bestellung {bestellgruppe_id} erfolgreich aufgegeben mit Medikamenten: {', '.join(medikamenten_namen)}" + "\033[0m")
-            self.datenbank.log_aktion(f"📦 Bestellung {bestellgruppe_id} aufgegeben mit Medikamenten: {', '.join(medikamenten_namen)}")
+            self.datenbank.log_aktion(
+                f"📦 Bestellung {bestellgruppe_id} aufgegeben mit Medikamenten: {', '.join(medikamenten_namen)}",
+                code=Aktion.BESTELLUNG_AUFGEGEBEN, ergebnis=Ergebnis.ERFOLG, bestellgruppe_id=bestellgruppe_id,
+                dauer_ms=(time.perf_counter() - start) * 1000,
+            )
 
             return f"✅ Bestellung {bestellgruppe_id} erfolgreich aufgegeben mit Medikamenten: {', '.join(medikamenten_namen)}"
 
+        except TransaktionAbgebrochen as abbruch:
+            print("\033[91m" + str(abbruch) + "\033[0m")
+            return str(abbruch)
+
         except sqlite3.OperationalError:
             # Fehler, wenn die Datenbank nicht verfügbar ist
             print("\033[91m" + "🚫 Fehler: Datenbank ist nicht verfügbar!" + "\033[0m")
             message = "🚫 Fehler: Datenbank ist nicht verfügbar!"
+            ergebnis = Ergebnis.KRITISCH
 
         except sqlite3.IntegrityError:
             # Fehler bei Datenbankintegrität
@@ -322,12 +461,44 @@ class Automat:
             # Allgemeiner Fehlerfall
             print("\033[91m" + f"🚫 Unbekannter Fehler: {str(e)}" + "\033[0m")
             message = f"🚫 Unbekannter Fehler: {str(e)}"
+            ergebnis = Ergebnis.KRITISCH
         
         # Aktion protokollieren und Nachricht zurückgeben
-        self.datenbank.log_aktion(f"Bestellung: {message}")
+        self.datenbank.log_aktion(
+            f"Bestellung: {message}", code=Aktion.BESTELLUNG_AUFGEGEBEN, ergebnis=ergebnis,
+            dauer_ms=(time.perf_counter() - start) * 1000,
+        )
         return message
 
 
+    def _bestellung_buchen(self, cursor, warenkorb, kundennummer, bestellgruppe_id, bestelldatum):
+        """
+        Trägt alle Positionen eines Warenkorbs innerhalb einer laufenden Transaktion als Bestellung ein.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param warenkorb: Liste der Warenkorb-Positionen.
+        :param kundennummer: Die Kundennummer für die Bestellung.
+        :param bestellgruppe_id: Die gemeinsame Bestellgruppen-ID.
+        :param bestelldatum: Zeitstempel der Bestellung.
+        """
+        for item in warenkorb:
+            barcode, name = item["barcode"], item["name"]
+
+            # Überprüfen, ob das Medikament noch im Automaten ist
+            cursor.execute("SELECT ort, artikel_id FROM lagerbestand WHERE barcode = ?", (barcode,))
+            row = cursor.fetchone()
+            if not row or row[0] != 'Automat':
+                raise TransaktionAbgebrochen(f"🚫 Fehler: {name} (Barcode: {barcode}) ist nicht im Automaten und kann nicht bestellt werden!")
+
+            # Bestellung in die Datenbank eintragen
+            cursor.execute(
+                "INSERT INTO bestellungen (bestellgruppe_id, kundennummer, barcode, artikel_id, bestelldatum) VALUES (?, ?, ?, ?, ?)",
+                (bestellgruppe_id, kundennummer, barcode, row[1], bestelldatum)
+            )
+
+            # Medikament aus dem Automaten entfernen
+            cursor.execute("DELETE FROM lagerbestand WHERE barcode = ?", (barcode,))
+
     def get_bestellungen_gruppiert(self, kundennummer, status='Offen'):
         """
         Ruft alle Bestellungen eines Kunden ab und gruppiert sie nach Bestellgruppen-ID.
@@ -336,24 +507,30 @@ class Automat:
         :param status: Der Bestellstatus (Standard: 'Offen').
         :return: Ein DataFrame mit den gruppierten Bestellungen.
         """
-        self.cursor.execute("""
-            SELECT bestellgruppe_id, GROUP_CONCAT(name, ', ') AS medikamente, bestelldatum, status
-            FROM bestellungen
-            WHERE kundennummer = ? AND status = ?
-            GROUP BY bestellgruppe_id
-            ORDER BY bestelldatum DESC
-        """, (kundennummer, status))
-        
-        data = self.cursor.fetchall()
+        with self.pool.verbindung() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT bestellgruppe_id, GROUP_CONCAT(name, ', ') AS medikamente, bestelldatum, status
+                FROM bestellungen JOIN artikel ON artikel.id = bestellungen.artikel_id
+                WHERE kundennummer = ? AND status = ?
+                GROUP BY bestellgruppe_id
+                ORDER BY bestelldatum DESC
+            """, (kundennummer, status))
+            
+            data = cursor.fetchall()
         return pd.DataFrame(data, columns=["Bestell-ID", "Medikamente", "Bestelldatum", "Status"])
     
     def get_kanal_liste(self):
         """
-        Gibt eine Liste aller gespeicherten Kanäle zurück.
-        
-        :return: Eine Liste der belegten Kanäle.
+        Gibt alle Kanäle des Automaten mit Artikel, Belegung und Kapazität zurück.
+
+        :return: Ein DataFrame mit Kanal, Name, Belegung und Kapazität (freie Kanäle ohne Namen).
         """
-        return list(self.kanal_liste.keys())
+        data = self.pool.abfragen(
+            f"SELECT {KANAL_BEZEICHNUNG.format('kanaele.id')}, name, belegung, kapazitaet "
+            "FROM kanaele LEFT JOIN artikel ON artikel.id = kanaele.artikel_id ORDER BY kanaele.id"
+        )
+        return pd.DataFrame(data, columns=["Kanal", "Name", "Belegung", "Kapazität"])
 
     def get_belegte_kanaele(self):
         """
@@ -361,9 +538,82 @@ class Automat:
         
         :return: Eine Liste mit belegten Kanalnamen.
         """
-        self.cursor.execute("SELECT DISTINCT kanal FROM lagerbestand WHERE ort = 'Automat' AND kanal IS NOT NULL")
-        return [row[0] for row in self.cursor.fetchall()]
-    
+        data = self.pool.abfragen(f"SELECT {KANAL_BEZEICHNUNG.format('id')} FROM kanaele WHERE belegung > 0 ORDER BY id")
+        return [row[0] for row in data]
+
+    def set_kanal_kapazitaet(self, kanal_id, kapazitaet):
+        """
+        Legt die Kapazität eines Kanals fest und legt ihn an, falls er noch nicht existiert.
+
+        :param kanal_id: Die Nummer des Kanals
+        :param kapazitaet: Die Anzahl der Waren, die der Kanal aufnehmen kann
+        :return: Eine Erfolgsmeldung oder eine Fehlermeldung
+        """
+        if not isinstance(kanal_id, int) or kanal_id < 1:
+            return "🚫 Fehler: Die Kanalnummer muss eine ganze Zahl ab 1 sein!"
+        if not isinstance(kapazitaet, int) or kapazitaet < 1:
+            return "🚫 Fehler: Die Kapazität muss eine ganze Zahl ab 1 sein!"
+
+        try:
+            self.pool.schreiben(lambda cursor: self._kapazitaet_buchen(cursor, kanal_id, kapazitaet))
+        except TransaktionAbgebrochen as abbruch:
+            return str(abbruch)
+        except sqlite3.Error as e:
+            return f"🚫 Fehler bei der Datenbank: {str(e)}"
+
+        self.datenbank.log_aktion(
+            f"🗄 Kapazität von Kanal {kanal_id} auf {kapazitaet} gesetzt", code=Aktion.SONSTIGE, ergebnis=Ergebnis.ERFOLG,
+        )
+        return f"✅ Erfolg: Kapazität von Kanal {kanal_id} auf {kapazitaet} gesetzt."
+
+    def _kapazitaet_buchen(self, cursor, kanal_id, kapazitaet):
+        """
+        Schreibt die Kapazität eines Kanals innerhalb einer laufenden Transaktion.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param kanal_id: Die Nummer des Kanals.
+        :param kapazitaet: Die neue Kapazität.
+        """
+        cursor.execute("SELECT belegung FROM kanaele WHERE id = ?", (kanal_id,))
+        row = cursor.fetchone()
+        if row and row[0] > kapazitaet:
+            raise TransaktionAbgebrochen(
+                f"🚫 Fehler: Kanal {kanal_id} ist mit {row[0]} Waren belegt, die Kapazität kann nicht kleiner sein!"
+            )
+        cursor.execute(
+            "INSERT INTO kanaele (id, kapazitaet) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET kapazitaet = excluded.kapazitaet",
+            (kanal_id, kapazitaet),
+        )
+
+    def get_nachfuellplan(self):
+        """
+        Erstellt den Nachfüllplan für den Automaten: je Artikel die zuerst ablaufenden, noch gültigen Waren aus dem Lager,
+        so viele, wie in seine Kanäle passen oder für den Mindestbestand im Automaten fehlen.
+
+        :return: Ein DataFrame mit Barcode, Name und Verfallsdatum in der Reihenfolge des Nachfüllens.
+        """
+        today = datetime.today().strftime('%Y-%m-%d')
+        with self.pool.verbindung() as conn:
+            plan = plane_nachfuellung(conn.cursor(), today)
+        return pd.DataFrame(plan, columns=["Barcode", "Name", "Verfallsdatum"])
+
+    def nachfuellen(self):
+        """
+        Erstellt den Nachfüllplan und verschiebt alle eingeplanten Waren mit einer Befüllung in den Automaten.
+
+        :return: Liste von Tupeln (Zeilennummer, Barcode, Meldung) wie bei befuellen_bulk, leer wenn nichts fehlt
+        """
+        barcodes = self.get_nachfuellplan()["Barcode"].tolist()
+        return self.befuellen_bulk(barcodes) if barcodes else []
+
+    def pruefe_kanalbelegung(self):
+        """
+        Überprüft, ob die fortgeschriebene Belegung der Kanäle mit dem Lagerbestand übereinstimmt.
+
+        :return: Liste der abweichenden Zeilen (Kanal-ID, Belegung), leer wenn konsistent
+        """
+        with self.pool.verbindung() as conn:
+            return pruefe_kanalbelegung(conn.cursor())
 
     def bestellung_stornieren(self, bestellgruppe_id, kundennummer):
         """
@@ -373,69 +623,36 @@ class Automat:
         :param kundennummer: Die Kundennummer des Kunden.
         :return: Eine Nachricht über das Ergebnis der Stornierung.
         """
+        start = time.perf_counter()
+        ergebnis = None
         try:
             # Überprüfen, ob die Bestellgruppen-ID und die Kundennummer eingegeben wurden
             if not bestellgruppe_id or not kundennummer:
                 print("\033[91m" + "🚫 Fehler: Bestellgruppen-ID und Kundennummer dürfen nicht leer sein!" + "\033[0m")
                 return "🚫 Fehler: Bestellgruppen-ID und Kundennummer dürfen nicht leer sein!"
 
-            # Bestellungen abrufen, die storniert werden sollen
-            self.cursor.execute(
-                "SELECT barcode, name FROM bestellungen WHERE bestellgruppe_id = ? AND kundennummer = ? AND status = 'Offen'",
-                (bestellgruppe_id, kundennummer)
+            medikamente_zurueck = self.pool.schreiben(
+                lambda cursor: self._bestellung_zuruecklegen(cursor, bestellgruppe_id, kundennummer)
             )
-            bestellungen = self.cursor.fetchall()
-
-            # Überprüfen, ob die Bestellung existiert und noch offen ist
-            if not bestellungen:
-                print("\033[91m" + "🚫 Fehler: Bestellung nicht gefunden oder bereits bearbeitet!" + "\033[0m")
-                return "🚫 Fehler: Bestellung nicht gefunden oder bereits bearbeitet!"
-
-            medikamente_zurueck = []
-
-            # Medikamente zurück ins Lager einfügen
-            for barcode, name in bestellungen:
-                try:
-                    # Überprüfen, ob das Medikament bereits im Lager ist
-                    self.cursor.execute("SELECT menge FROM lagerbestand WHERE barcode = ? AND ort = 'Lager'", (barcode,))
-                    vorhandenes_lager = self.cursor.fetchone()
-
-                    if vorhandenes_lager:
-                        # Wenn bereits vorhanden, Menge erhöhen
-                        neue_menge = vorhandenes_lager[0] + 1
-                        self.cursor.execute(
-                            "UPDATE lagerbestand SET menge = ? WHERE barcode = ? AND ort = 'Lager'",
-                            (neue_menge, barcode)
-                        )
-                    else:
-                        # Ansonsten als neue Ware ins Lager einfügen
-                        self.cursor.execute(
-                            "INSERT INTO lagerbestand (barcode, name, menge, verfallsdatum, ort) VALUES (?, ?, 1, DATE('now', '+1 year'), 'Lager')",
-                            (barcode, name)
-                        )
-                    medikamente_zurueck.append(name)
-
-                except sqlite3.IntegrityError:
-                    print("\033[91m" + f"🚫 Fehler: Integritätsproblem beim Zurücklegen von {name} (Barcode: {barcode})!" + "\033[0m")
-                    return f"🚫 Fehler: Integritätsproblem beim Zurücklegen von {name} (Barcode: {barcode})!"
-
-            # Bestellungen auf "Storniert" setzen anstatt zu löschen
-            self.cursor.execute(
-                "UPDATE bestellungen SET status = 'Storniert' WHERE bestellgruppe_id = ? AND kundennummer = ?",
-                (bestellgruppe_id, kundennummer)
-            )
-
-            self.db_conn.commit()
 
             print("\033[92m" + f"✅ Bestellung {bestellgruppe_id} storniert! Alle Medikamente wurden zurück ins Lager gelegt." + "\033[0m")
-            self.datenbank.log_aktion(f"📦 Bestellung {bestellgruppe_id} storniert, Medikamente zurück ins Lager: {', '.join(medikamente_zurueck)}")
+            self.datenbank.log_aktion(
+                f"📦 Bestellung {bestellgruppe_id} storniert, Medikamente zurück ins Lager: {', '.join(medikamente_zurueck)}",
+                code=Aktion.BESTELLUNG_STORNIERT, ergebnis=Ergebnis.ERFOLG, bestellgruppe_id=bestellgruppe_id,
+                dauer_ms=(time.perf_counter() - start) * 1000,
+            )
 
             return f"✅ Bestellung {bestellgruppe_id} storniert! Alle Medikamente wurden zurück ins Lager gelegt und als 'Storniert' markiert."
 
+        except TransaktionAbgebrochen as abbruch:
+            print("\033[91m" + str(abbruch) + "\033[0m")
+            return str(abbruch)
+
         except sqlite3.OperationalError:
             # Fehler, wenn die Datenbank nicht verfügbar ist
             print("\033[91m" + "🚫 Fehler: Datenbank ist nicht verfügbar!" + "\033[0m")
             message = "🚫 Fehler: Datenbank ist nicht verfügbar!"
+            ergebnis = Ergebnis.KRITISCH
 
         except sqlite3.IntegrityError:
             # Fehler bei Datenbankintegrität
@@ -446,7 +663,67 @@ class Automat:
             # Allgemeiner Fehlerfall
             print("\033[91m" + f"🚫 Unbekannter Fehler: {str(e)}" + "\033[0m")
             message = f"🚫 Unbekannter Fehler: {str(e)}"
+            ergebnis = Ergebnis.KRITISCH
 
         # Aktion protokollieren und Nachricht zurückgeben
-        self.datenbank.log_aktion(f"Bestellung Stornierung: {message}")
-        return message
\ No newline at end of file
+        self.datenbank.log_aktion(
+            f"Bestellung Stornierung: {message}", code=Aktion.BESTELLUNG_STORNIERT, ergebnis=ergebnis,
+            bestellgruppe_id=bestellgruppe_id, dauer_ms=(time.perf_counter() - start) * 1000,
+        )
+        return message
+
+    def _bestellung_zuruecklegen(self, cursor, bestellgruppe_id, kundennummer):
+        """
+        Legt die Medikamente einer offenen Bestellung innerhalb einer laufenden Transaktion zurück ins Lager
+        und setzt die Bestellung auf 'Storniert'.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param bestellgruppe_id: Die ID der Bestellgruppe, die storniert werden soll.
+        :param kundennummer: Die Kundennummer des Kunden.
+        :return: Liste der Namen der zurückgelegten Medikamente.
+        """
+        # Bestellungen abrufen, die storniert werden sollen
+        cursor.execute(
+            "SELECT barcode, artikel_id, name FROM bestellungen JOIN artikel ON artikel.id = bestellungen.artikel_id "
+            "WHERE bestellgruppe_id = ? AND kundennummer = ? AND status = 'Offen'",
+            (bestellgruppe_id, kundennummer)
+        )
+        bestellungen = cursor.fetchall()
+
+        # Überprüfen, ob die Bestellung existiert und noch offen ist
+        if not bestellungen:
+            raise TransaktionAbgebrochen("🚫 Fehler: Bestellung nicht gefunden oder bereits bearbeitet!")
+
+        medikamente_zurueck = []
+
+        # Medikamente zurück ins Lager einfügen
+        for barcode, artikel_id, name in bestellungen:
+            try:
+                # Überprüfen, ob das Medikament bereits im Lager ist
+                cursor.execute("SELECT menge FROM lagerbestand WHERE barcode = ? AND ort = 'Lager'", (barcode,))
+                vorhandenes_lager = cursor.fetchone()
+
+                if vorhandenes_lager:
+                    # Wenn bereits vorhanden, Menge erhöhen
+                    neue_menge = vorhandenes_lager[0] + 1
+                    cursor.execute(
+                        "UPDATE lagerbestand SET menge = ? WHERE barcode = ? AND ort = 'Lager'",
+                        (neue_menge, barcode)
+                    )
+                else:
+                    # Ansonsten als neue Ware ins Lager einfügen
+                    cursor.execute(
+                        "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) VALUES (?, ?, 1, DATE('now', '+1 year'), 'Lager')",
+                        (barcode, artikel_id)
+                    )
+                medikamente_zurueck.append(name)
+
+            except sqlite3.IntegrityError:
+                raise TransaktionAbgebrochen(f"🚫 Fehler: Integritätsproblem beim Zurücklegen von {name} (Barcode: {barcode})!")
+
+        # Bestellungen auf "Storniert" setzen anstatt zu löschen
+        cursor.execute(
+            "UPDATE bestellungen SET status = 'Storniert' WHERE bestellgruppe_id = ? AND kundennummer = ?",
+            (bestellgruppe_id, kundennummer)
+        )
+        return medikamente_zurueck
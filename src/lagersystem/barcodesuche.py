@@ -0,0 +1,143 @@
+import os
+import re
+
+# Barcodes bestehen aus höchstens 13 Ziffern. ':' folgt in ASCII direkt auf '9' und begrenzt damit jeden Präfixbereich.
+MAX_BARCODE_LAENGE = 13
+BEREICHSENDE = ":"
+NGRAMM_LAENGE = 3
+NGRAMM_INDEX = os.environ.get("BARCODE_NGRAMME", "0") == "1"  # Optionaler N-Gramm-Index für Teilstring-Suchen
+
+PRAEFIX = "präfix"
+SUFFIX = "suffix"
+TEIL = "teil"
+
+# Umgekehrter Barcode als reiner SQL-Ausdruck (substr außerhalb der Länge liefert einen leeren Text)
+UMGEKEHRT_AUSDRUCK = " || ".join(f"substr(barcode, {i}, 1)" for i in range(MAX_BARCODE_LAENGE, 0, -1))
+
+NGRAMM_ANWEISUNGEN = [
+    "CREATE TABLE IF NOT EXISTS barcode_positionen (n INTEGER PRIMARY KEY)",
+    f"INSERT OR IGNORE INTO barcode_positionen (n) VALUES {', '.join(f'({n})' for n in range(1, MAX_BARCODE_LAENGE + 1))}",
+    """
+    CREATE TABLE IF NOT EXISTS barcode_ngramme (
+        ngramm TEXT NOT NULL,
+        barcode TEXT NOT NULL,
+        PRIMARY KEY (ngramm, barcode)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_barcode_ngramme_einfuegen AFTER INSERT ON lagerbestand BEGIN
+        INSERT OR IGNORE INTO barcode_ngramme (ngramm, barcode)
+        SELECT substr(NEW.barcode, n, {NGRAMM_LAENGE}), NEW.barcode FROM barcode_positionen
+        WHERE n <= length(NEW.barcode) - {NGRAMM_LAENGE - 1};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_barcode_ngramme_loeschen AFTER DELETE ON lagerbestand BEGIN
+        DELETE FROM barcode_ngramme WHERE barcode = OLD.barcode;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_barcode_ngramme_aendern AFTER UPDATE OF barcode ON lagerbestand BEGIN
+        DELETE FROM barcode_ngramme WHERE barcode = OLD.barcode;
+        INSERT OR IGNORE INTO barcode_ngramme (ngramm, barcode)
+        SELECT substr(NEW.barcode, n, {NGRAMM_LAENGE}), NEW.barcode FROM barcode_positionen
+        WHERE n <= length(NEW.barcode) - {NGRAMM_LAENGE - 1};
+    END
+    """,
+]
+
+
+def zerlege_suchbegriff(suchbegriff):
+    """
+    Bestimmt Suchart und Ziffern eines Barcode-Suchbegriffs.
+    "123" sucht Barcodes, die mit 123 beginnen, "*123" solche, die auf 123 enden, und "*123*" beliebige Teilstrings.
+
+    :param suchbegriff: Der eingegebene Suchbegriff
+    :return: Tupel (Suchart, Ziffern) oder None bei ungültigem Suchbegriff
+    """
+    treffer = re.fullmatch(r"(\*?)(\d{1,%d})(\*?)" % MAX_BARCODE_LAENGE, str(suchbegriff).strip())
+    if not treffer:
+        return None
+    anfang, ziffern, ende = treffer.groups()
+    if anfang and ende:
+        return TEIL, ziffern
+    if anfang:
+        return SUFFIX, ziffern
+    return PRAEFIX, ziffern
+
+
+def barcode_bedingung(suchbegriff, ngramme=False):
+    """
+    Baut eine indexfähige SQL-Bedingung für einen Barcode-Suchbegriff auf.
+    Präfixe werden als Bereich auf dem Barcode gesucht, Suffixe als Bereich auf dem umgekehrten Barcode
+    und Teilstrings über den N-Gramm-Index (falls vorhanden, sonst mit LIKE).
+
+    :param suchbegriff: Der eingegebene Suchbegriff
+    :param ngramme: True, wenn der N-Gramm-Index vorhanden ist
+    :return: Tupel (SQL-Bedingung, Parameterliste) oder None bei ungültigem Suchbegriff
+    """
+    zerlegt = zerlege_suchbegriff(suchbegriff)
+    if zerlegt is None:
+        return None
+    suchart, ziffern = zerlegt
+
+    if suchart == PRAEFIX:
+        return "barcode >= ? AND barcode < ?", [ziffern, ziffern + BEREICHSENDE]
+
+    if suchart == SUFFIX:
+        umgekehrt = ziffern[::-1]
+        return "barcode_umgekehrt >= ? AND barcode_umgekehrt < ?", [umgekehrt, umgekehrt + BEREICHSENDE]
+
+    if ngramme and len(ziffern) >= NGRAMM_LAENGE:
+        # Kandidaten enthalten alle N-Gramme des Suchbegriffs; instr prüft anschließend die Reihenfolge
+        ngramm_liste = sorted({ziffern[i:i + NGRAMM_LAENGE] for i in range(len(ziffern) - NGRAMM_LAENGE + 1)})
+        platzhalter = ", ".join("?" for _ in ngramm_liste)
+        bedingung = (
+            f"barcode IN (SELECT barcode FROM barcode_ngramme WHERE ngramm IN ({platzhalter}) "
+            f"GROUP BY barcode HAVING COUNT(*) = ?) AND instr(barcode, ?) > 0"
+        )
+        return bedingung, ngramm_liste + [len(ngramm_liste), ziffern]
+
+    return "barcode LIKE ?", [f"%{ziffern}%"]
+
+
+def hat_ngramm_index(cursor):
+    """
+    Überprüft, ob der N-Gramm-Index in der Datenbank angelegt ist.
+
+    :param cursor: Ein Datenbank-Cursor
+    :return: True, wenn die Tabelle barcode_ngramme existiert
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'barcode_ngramme'")
+    return cursor.fetchone() is not None
+
+
+def aktiviere_ngramm_index(cursor):
+    """
+    Legt den N-Gramm-Index mit seinen Triggern an und füllt ihn für den vorhandenen Bestand.
+    Muss innerhalb einer Schreibtransaktion aufgerufen werden.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :return: True, wenn der Index neu angelegt wurde
+    """
+    if hat_ngramm_index(cursor):
+        return False
+    for anweisung in NGRAMM_ANWEISUNGEN:
+        cursor.execute(anweisung)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO barcode_ngramme (ngramm, barcode)
+        SELECT substr(barcode, n, {NGRAMM_LAENGE}), barcode FROM lagerbestand, barcode_positionen
+        WHERE n <= length(barcode) - {NGRAMM_LAENGE - 1}
+    """)
+    return True
+
+
+def deaktiviere_ngramm_index(cursor):
+    """
+    Entfernt den N-Gramm-Index und seine Trigger wieder.
+
+    :param cursor: Cursor der laufenden Transaktion
+    """
+    for trigger in ("trg_barcode_ngramme_einfuegen", "trg_barcode_ngramme_loeschen", "trg_barcode_ngramme_aendern"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS barcode_ngramme")
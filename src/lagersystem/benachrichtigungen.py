@@ -0,0 +1,205 @@
+import os
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+
+# Standardwerte für Benachrichtigungen und Ablaufplaner, über Umgebungsvariablen anpassbar
+BENACHRICHTIGUNGEN_PUFFER = int(os.environ.get("LAGER_BENACHRICHTIGUNGEN_PUFFER", "200"))
+PLANER_INTERVALL = float(os.environ.get("LAGER_PLANER_INTERVALL", "10"))
+PLANER_VORLAUF_TAGE = int(os.environ.get("LAGER_PLANER_VORLAUF_TAGE", "7"))
+
+# Themen der veröffentlichten Ereignisse
+ABGELAUFEN = "abgelaufen"
+BALD_ABLAUFEND = "bald_ablaufend"
+UNTER_SCHWELLENWERT = "unter_schwellenwert"
+
+MELDUNGEN = {
+    ABGELAUFEN: "⚠️ {ort}: {anzahl} abgelaufene Medikamente",
+    BALD_ABLAUFEND: "⏳ {ort}: {anzahl} Medikamente laufen in den nächsten {tage} Tagen ab",
+    UNTER_SCHWELLENWERT: "📉 {ort}: {anzahl} Artikel unter dem Mindestbestand",
+}
+
+
+class Benachrichtigungen:
+    """
+    Ein prozessinterner Verteiler (Publish/Subscribe) für Ereignisse an alle Streamlit-Sitzungen.
+    Ereignisse liegen einmal in einem begrenzten Ringpuffer mit fortlaufender Nummer, jedes Abonnement merkt sich
+    nur die Nummer des zuletzt gelesenen Ereignisses. Veröffentlichen kostet so unabhängig von der Anzahl der Abonnenten
+    gleich viel, und die Prüfung auf Neues ist ein Zahlenvergleich.
+    """
+
+    def __init__(self, max_ereignisse=BENACHRICHTIGUNGEN_PUFFER):
+        """
+        Initialisiert einen leeren Verteiler.
+
+        :param max_ereignisse: Maximale Anzahl vorgehaltener Ereignisse
+        """
+        self._ereignisse = deque(maxlen=max_ereignisse)
+        self._lock = threading.Lock()
+        self.letzte_nummer = 0
+        self.verpasst = 0
+
+    def veroeffentlichen(self, thema, text, **daten):
+        """
+        Veröffentlicht ein Ereignis an alle Abonnenten.
+
+        :param thema: Das Thema des Ereignisses (z. B. ABGELAUFEN)
+        :param text: Die anzuzeigende Meldung
+        :param daten: Weitere Angaben zum Ereignis
+        :return: Die fortlaufende Nummer des Ereignisses
+        """
+        with self._lock:
+            self.letzte_nummer += 1
+            self._ereignisse.append({
+                "Nummer": self.letzte_nummer, "Thema": thema, "Text": text,
+                "Zeitpunkt": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **daten,
+            })
+            return self.letzte_nummer
+
+    def abonnieren(self, themen=None):
+        """
+        Legt ein Abonnement an, das nur Ereignisse ab jetzt erhält.
+
+        :param themen: Optionale Liste von Themen (Standard: alle Themen)
+        :return: Das Abonnement (Dictionary), z. B. für den Session State
+        """
+        return {"themen": set(themen) if themen else None, "gelesen_bis": self.letzte_nummer}
+
+    def abholen(self, abonnement):
+        """
+        Gibt die seit dem letzten Abholen veröffentlichten Ereignisse eines Abonnements zurück.
+
+        :param abonnement: Das Abonnement aus abonnieren()
+        :return: Liste der neuen Ereignisse, älteste zuerst
+        """
+        # Ohne neue Ereignisse genügt ein Zahlenvergleich, ohne Sperre
+        if abonnement["gelesen_bis"] >= self.letzte_nummer:
+            return []
+
+        with self._lock:
+            neue = [ereignis for ereignis in self._ereignisse if ereignis["Nummer"] > abonnement["gelesen_bis"]]
+            aelteste = neue[0]["Nummer"] if neue else self.letzte_nummer + 1
+            # Ereignisse, die vor dem Abholen aus dem Ringpuffer gefallen sind
+            self.verpasst += max(aelteste - abonnement["gelesen_bis"] - 1, 0)
+            abonnement["gelesen_bis"] = self.letzte_nummer
+
+        themen = abonnement["themen"]
+        return [ereignis for ereignis in neue if themen is None or ereignis["Thema"] in themen]
+
+
+class Ablaufplaner:
+    """
+    Ein Hintergrund-Thread, der in festen Abständen den Tageswechsel der Warnungen anstößt und den Warnungsstand
+    (abgelaufen, bald ablaufend, unter Mindestbestand je Ort) ermittelt. Steigt eine Anzahl, wird ein Ereignis veröffentlicht.
+    Der Stand wird nur neu gelesen, wenn sich die Datenversion der Datenbank geändert hat.
+    """
+
+    def __init__(self, warnung, benachrichtigungen, intervall=PLANER_INTERVALL, vorlauf_tage=PLANER_VORLAUF_TAGE,
+                 starten=True):
+        """
+        Initialisiert den Planer, ermittelt den ersten Stand und startet den Hintergrund-Thread.
+
+        :param warnung: Die Warnungsinstanz
+        :param benachrichtigungen: Der Verteiler für Ereignisse
+        :param intervall: Abstand der Prüfungen in Sekunden
+        :param vorlauf_tage: Anzahl Tage, innerhalb derer ein Verfallsdatum als bald ablaufend gilt
+        :param starten: False, um den Hintergrund-Thread nicht zu starten (Prüfungen dann über pruefen())
+        """
+        self.warnung = warnung
+        self.benachrichtigungen = benachrichtigungen
+        self.intervall = intervall
+        self.vorlauf_tage = vorlauf_tage
+
+        self._stand = {}
+        self._version = None
+        self._lock = threading.Lock()
+        self._pruef_lock = threading.Lock()
+        self.pruefungen = 0
+        self.auswertungen = 0
+        self.fehlgeschlagen = 0
+
+        self.pruefen()
+
+        self._gestoppt = threading.Event()
+        self._thread = None
+        if starten:
+            self._thread = threading.Thread(target=self._planerschleife, name="Ablaufplaner", daemon=True)
+            self._thread.start()
+            atexit.register(self.stoppen)
+
+    def get_stand(self):
+        """
+        Gibt den zuletzt ermittelten Warnungsstand zurück, ohne die Datenbank abzufragen.
+
+        :return: Dictionary (Thema, Ort) -> Anzahl
+        """
+        with self._lock:
+            return dict(self._stand)
+
+    def pruefen(self, today=None):
+        """
+        Stößt den Tageswechsel an und ermittelt den Warnungsstand neu, falls sich die Daten geändert haben.
+
+        :param today: Optionales Datum im Format 'YYYY-MM-DD' (Standard: heute)
+        :return: Liste der veröffentlichten Ereignisnummern
+        """
+        today = today or datetime.today().strftime("%Y-%m-%d")
+        # Planer-Thread und direkte Aufrufe können gleichzeitig prüfen, Ereignisse sollen aber nur einmal erscheinen
+        with self._pruef_lock:
+            self.warnung.tagesauswertung(today)
+            self.pruefungen += 1
+
+            # Der bald ablaufende Bestand hängt auch vom Datum ab, nicht nur von der Datenversion
+            version = (self.warnung.pool.lesecache.version(), today)
+            if version == self._version:
+                return []
+
+            neuer_stand = self.warnung.get_warnungsstand(self.vorlauf_tage, today)
+            self.auswertungen += 1
+            with self._lock:
+                alter_stand = self._stand
+                self._stand = neuer_stand
+            erster_stand = self._version is None
+            self._version = version
+            if erster_stand:
+                return []
+
+            nummern = []
+            for (thema, ort), anzahl in sorted(neuer_stand.items()):
+                if anzahl > alter_stand.get((thema, ort), 0):
+                    text = MELDUNGEN[thema].format(anzahl=anzahl, ort=ort, tage=self.vorlauf_tage)
+                    nummern.append(self.benachrichtigungen.veroeffentlichen(thema, text, Ort=ort, Anzahl=anzahl))
+            return nummern
+
+    def stoppen(self):
+        """
+        Beendet den Hintergrund-Thread (wird beim Beenden automatisch aufgerufen).
+        """
+        self._gestoppt.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def statistik(self):
+        """
+        Gibt Kennzahlen des Planers zurück.
+
+        :return: Dictionary mit Prüfungen, Auswertungen, Fehlern und veröffentlichten Ereignissen
+        """
+        return {
+            "Prüfungen": self.pruefungen,
+            "Auswertungen": self.auswertungen,
+            "Fehlgeschlagen": self.fehlgeschlagen,
+            "Ereignisse": self.benachrichtigungen.letzte_nummer,
+        }
+
+    def _planerschleife(self):
+        """
+        Prüft in festen Abständen, bis der Planer gestoppt wird. Fehler beenden den Thread nicht.
+        """
+        while not self._gestoppt.wait(self.intervall):
+            try:
+                self.pruefen()
+            except Exception as e:
+                self.fehlgeschlagen += 1
+                print(f"🚫 Fehler im Ablaufplaner: {e}")
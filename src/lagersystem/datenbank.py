@@ -2,17 +2,236 @@ import os
 import streamlit as st
 import sqlite3
 import time
-import csv
-from datetime import datetime
+import threading
+import queue
+import random
+from contextlib import contextmanager
+from lesecache import Lesecache
+from protokoll import get_protokollschreiber, importiere_logdateien
+from logdateien import teile_altdatei, rotiere
+from ereignisse import Ereignis, Aktion
+from barcodesuche import NGRAMM_INDEX, aktiviere_ngramm_index, deaktiviere_ngramm_index, hat_ngramm_index
+from migrationen import migriere, pruefe_sqlite_version, LAGER_MIGRATIONEN, USER_MIGRATIONEN, PROTOKOLL_MIGRATIONEN, HAEUFIGE_ABFRAGEN
+
+# Standardwerte für den Mehrbenutzerbetrieb, über Umgebungsvariablen anpassbar
+BUSY_TIMEOUT_MS = int(os.environ.get("LAGER_BUSY_TIMEOUT_MS", "5000"))
+SCHREIB_VERSUCHE = int(os.environ.get("LAGER_SCHREIB_VERSUCHE", "5"))
+JOURNAL_MODE = os.environ.get("LAGER_JOURNAL_MODE", "WAL")
+
+
+def ist_sperrfehler(fehler):
+    """
+    Überprüft, ob ein Datenbankfehler durch eine Sperre verursacht wurde und wiederholt werden kann.
+
+    :param fehler: Der aufgetretene sqlite3.OperationalError
+    :return: True bei "database is locked" oder "database is busy", sonst False
+    """
+    meldung = str(fehler).lower()
+    return "locked" in meldung or "busy" in meldung
+
+
+class TransaktionAbgebrochen(Exception):
+    """
+    Bricht eine Schreibtransaktion fachlich ab. Alle Änderungen der Transaktion werden zurückgerollt,
+    die Nachricht kann dem Benutzer angezeigt werden.
+    """
+
+
+class Verbindungspool:
+    """
+    Ein begrenzter Pool von SQLite-Verbindungen für eine Datenbankdatei.
+    Jede Anfrage leiht sich eine eigene Verbindung aus, sodass sich parallele Sitzungen keinen Cursor teilen.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        max_verbindungen=8,
+        wartezeit=5.0,
+        busy_timeout_ms=BUSY_TIMEOUT_MS,
+        journal_mode=JOURNAL_MODE,
+        schreib_versuche=SCHREIB_VERSUCHE,
+    ):
+        """
+        Initialisiert den Pool. Verbindungen werden erst bei Bedarf geöffnet.
+
+        :param db_path: Pfad zur SQLite-Datenbankdatei
+        :param max_verbindungen: Maximale Anzahl gleichzeitig geöffneter Verbindungen
+        :param wartezeit: Maximale Wartezeit in Sekunden, wenn alle Verbindungen belegt sind
+        :param busy_timeout_ms: Wartezeit in Millisekunden, bevor eine gesperrte Datenbank einen Fehler meldet
+        :param journal_mode: Journal-Modus der Datenbank (Standard: 'WAL')
+        :param schreib_versuche: Maximale Anzahl Versuche für Schreibtransaktionen
+        """
+        self.db_path = db_path
+        self.max_verbindungen = max_verbindungen
+        self.wartezeit = wartezeit
+        self.busy_timeout_ms = busy_timeout_ms
+        self.journal_mode = journal_mode
+        self.schreib_versuche = schreib_versuche
+        self._freie_verbindungen = queue.LifoQueue()
+        self._plaetze = threading.BoundedSemaphore(max_verbindungen)
+        self._lokal = threading.local()
+        self.lesecache = Lesecache(db_path)
+
+    def _neue_verbindung(self):
+        """
+        Öffnet eine neue Verbindung zur Datenbank.
+        Im WAL-Modus blockieren Schreibvorgänge keine gleichzeitigen Lesezugriffe.
+        """
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if self.journal_mode:
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            if self.journal_mode.upper() == "WAL":
+                conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _ist_gesund(self, conn):
+        """Überprüft, ob eine Verbindung aus dem Pool noch benutzbar ist."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _hole_verbindung(self):
+        """Gibt eine gesunde Verbindung aus dem Pool zurück oder öffnet eine neue."""
+        while True:
+            try:
+                conn = self._freie_verbindungen.get_nowait()
+            except queue.Empty:
+                return self._neue_verbindung()
+
+            if self._ist_gesund(conn):
+                return conn
+            conn.close()
+
+    @contextmanager
+    def verbindung(self):
+        """
+        Leiht eine Verbindung für die Dauer des with-Blocks aus.
+        Verschachtelte Aufrufe im selben Thread erhalten dieselbe Verbindung.
+        Nicht abgeschlossene Transaktionen werden bei der Rückgabe zurückgerollt.
+
+        :return: Eine SQLite-Verbindung
+        """
+        conn = getattr(self._lokal, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        if not self._plaetze.acquire(timeout=self.wartezeit):
+            raise sqlite3.OperationalError("Verbindungspool erschöpft")
+
+        conn = None
+        try:
+            conn = self._hole_verbindung()
+            self._lokal.conn = conn
+            yield conn
+        finally:
+            self._lokal.conn = None
+            if conn is not None:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    self._freie_verbindungen.put(conn)
+                except sqlite3.Error:
+                    conn.close()
+            self._plaetze.release()
+
+    def schreiben(self, funktion):
+        """
+        Führt eine Schreibtransaktion aus und wiederholt sie bei Sperrkonflikten mit exponentiellem Backoff.
+        Die Transaktion wird mit BEGIN IMMEDIATE gestartet, damit die Schreibsperre sofort angefordert wird.
+        Läuft im selben Thread bereits eine Transaktion, wird die Funktion ohne eigene Transaktion ausgeführt.
+
+        :param funktion: Funktion, die einen Cursor erhält und die Schreibvorgänge ausführt
+        :return: Der Rückgabewert der Funktion
+        """
+        for versuch in range(1, self.schreib_versuche + 1):
+            with self.verbindung() as conn:
+                if conn.in_transaction:
+                    return funktion(conn.cursor())
+
+                try:
+                    aenderungen = conn.total_changes
+                    conn.execute("BEGIN IMMEDIATE")
+                    ergebnis = funktion(conn.cursor())
+                    conn.commit()
+                    if conn.total_changes != aenderungen:
+                        self.lesecache.aendern()
+                    return ergebnis
+                except sqlite3.OperationalError as e:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    if not ist_sperrfehler(e) or versuch == self.schreib_versuche:
+                        raise
+                except BaseException:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+
+            # Exponentieller Backoff mit Zufallsanteil, damit sich Sitzungen nicht gegenseitig blockieren
+            time.sleep(min(0.05 * 2 ** (versuch - 1), 1.0) * random.uniform(0.5, 1.5))
+
+    def abfragen(self, sql, params=()):
+        """
+        Führt eine lesende Abfrage über den Lesecache aus. Solange sich die Daten nicht ändern,
+        wird dieselbe Abfrage mit denselben Parametern aus dem Speicher beantwortet.
+        Innerhalb einer laufenden Transaktion wird immer direkt gelesen.
+
+        :param sql: Die SQL-Abfrage
+        :param params: Die Parameter der Abfrage
+        :return: Liste der Ergebniszeilen (nicht verändern)
+        """
+        with self.verbindung() as conn:
+            if conn.in_transaction:
+                return conn.execute(sql, params).fetchall()
+            return self.lesecache.lesen(conn, sql, params)
+
+    def schliessen(self):
+        """Schließt alle derzeit freien Verbindungen des Pools und die Beobachterverbindung des Lesecaches."""
+        while True:
+            try:
+                self._freie_verbindungen.get_nowait().close()
+            except queue.Empty:
+                break
+        self.lesecache.schliessen()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """
+    Gibt den prozessweit gemeinsamen Verbindungspool für eine Datenbankdatei zurück.
+
+    :param db_path: Pfad zur SQLite-Datenbankdatei
+    :return: Der Verbindungspool
+    """
+    db_path = os.path.abspath(db_path)
+    with _pools_lock:
+        if db_path not in _pools:
+            _pools[db_path] = Verbindungspool(db_path)
+        return _pools[db_path]
+
 
 class Datenbank:
     """
     Diese Klasse verwaltet die Datenbankverbindungen und -operationen für das Lager- und Bestellsystem.
     """
 
-    def __init__(self):
+    def __init__(self, db_path=None, user_db_path=None, log_path=None, protokoll_db_path=None):
         """
-        Initialisiert die Datenbankverbindung und ruft die Methode zur Erstellung der Tabellen auf.
+        Initialisiert die Verbindungspools und ruft die Methode zur Erstellung der Tabellen auf.
+
+        :param db_path: Optionaler Pfad zur Lagerdatenbank (Standard: databases/lagerbestand.db)
+        :param user_db_path: Optionaler Pfad zur Benutzerdatenbank (Standard: databases/users.db)
+        :param log_path: Optionaler Basis-Pfad der Logdateien, je Tag entsteht z.B. logs/log_protokoll_2025-02-03.csv
+        :param protokoll_db_path: Optionaler Pfad zur Protokolldatenbank (Standard: protokoll.db neben der Lagerdatenbank)
         """
         start_time = time.time()
 
@@ -20,93 +239,78 @@ class Datenbank:
         base_dir = os.path.dirname(__file__)
 
         # Datenbankpfade absolut auflösen
-        self.db_path = os.path.join(base_dir, 'databases', 'lagerbestand.db')
-        self.user_db_path = os.path.join(base_dir, 'databases', 'users.db')
-        self.log_path = os.path.join(base_dir, 'logs', 'log_protokoll.csv')
+        self.db_path = db_path or os.path.join(base_dir, 'databases', 'lagerbestand.db')
+        self.user_db_path = user_db_path or os.path.join(base_dir, 'databases', 'users.db')
+        self.log_path = log_path or os.path.join(base_dir, 'logs', 'log_protokoll.csv')
+        self.protokoll_db_path = protokoll_db_path or os.path.join(os.path.dirname(self.db_path), 'protokoll.db')
 
-        # Verbindung zur Hauptdatenbank
-        self.db_conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.cursor = self.db_conn.cursor()
+        # Gemeinsame Verbindungspools für Haupt- und Benutzerdatenbank
+        self.pool = get_pool(self.db_path)
+        self.user_pool = get_pool(self.user_db_path)
+        self.protokoll_pool = get_pool(self.protokoll_db_path)
         self._initialize_database()
-        self.kanal_liste = {}  # Dynamische Kanäle mit Medikamentennamen
+        self.protokoll = get_protokollschreiber(self.log_path, self.protokoll_pool)  # Asynchroner, gemeinsamer Protokollschreiber
         print(f"Datenbankinitialisierung: {time.time() - start_time:.5f} Sekunden")
 
     def _initialize_database(self):
         """
-        Erstellt die erforderlichen Tabellen, falls sie nicht existieren.
-        """
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS lagerbestand (
-                barcode TEXT PRIMARY KEY,
-                name TEXT,
-                menge INTEGER,
-                verfallsdatum TEXT,
-                ort TEXT DEFAULT 'Lager',
-                kanal TEXT DEFAULT NULL
-            )
-        """)
-
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS automatenbestand (
-                barcode TEXT PRIMARY KEY,
-                name TEXT,
-                menge INTEGER,
-                verfallsdatum TEXT,
-                ort TEXT DEFAULT 'Automat',
-                FOREIGN KEY (barcode) REFERENCES lagerbestand(barcode)
-            )
-        """)
-
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS warnungen (
-                barcode TEXT PRIMARY KEY,
-                name TEXT,
-                verfallsdatum TEXT,
-                ort TEXT,
-                status TEXT DEFAULT 'Offen'
-            )
-        """)
-
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS bestellungen (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                bestellgruppe_id INTEGER,
-                kundennummer TEXT,
-                barcode TEXT,
-                name TEXT,
-                bestelldatum TEXT,
-                status TEXT DEFAULT 'Offen'
-            )
-        """)
-
-        self.db_conn.commit()
-
-        # Benutzer-Datenbank anlegen
-        with sqlite3.connect(self.user_db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    kundennummer TEXT UNIQUE,
-                    username TEXT UNIQUE,
-                    password_hash TEXT,
-                    role TEXT DEFAULT 'user'
-                )
-            """)
-            conn.commit()
-
-    def log_aktion(self, aktion):
-        """
-        Protokolliert eine Aktion im Log-Protokoll.
-        :param aktion: Beschreibung der durchgeführten Aktion
-        """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        kundennummer = st.session_state.get("kundennummer", "Unbekannt")
-        log_entry = [timestamp, kundennummer, aktion]
-
-        # Sicherstellen, dass der Ordner existiert
-        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
-
-        with open(self.log_path, mode="a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(log_entry)
+        Bringt alle Datenbanken über versionierte Migrationen (PRAGMA user_version) auf den aktuellen Stand,
+        teilt eine bestehende Logdatei in Tagesdateien auf und archiviert abgeschlossene Tage.
+        Eine neu angelegte Protokolldatenbank wird einmalig aus den Tagesdateien befüllt.
+        Eine zu alte SQLite-Version wird vor der ersten Migration mit einer eindeutigen Fehlermeldung abgewiesen.
+        """
+        pruefe_sqlite_version()
+        self.migrationsbericht = migriere(self.pool, LAGER_MIGRATIONEN, abfragen=HAEUFIGE_ABFRAGEN)
+        migriere(self.user_pool, USER_MIGRATIONEN)
+
+        # Der N-Gramm-Index für Teilstring-Suchen ist optional (BARCODE_NGRAMME=1),
+        # ohne die Einstellung werden ein früher angelegter Index und seine Trigger wieder entfernt
+        if NGRAMM_INDEX:
+            self.aktiviere_ngramm_index()
+        else:
+            self.deaktiviere_ngramm_index()
+
+        teile_altdatei(self.log_path)
+        rotiere(self.log_path)
+        angewendet = migriere(self.protokoll_pool, PROTOKOLL_MIGRATIONEN)["angewendet"]
+        if any(version == 1 for version, _ in angewendet):
+            importiere_logdateien(self.protokoll_pool, self.log_path)
+
+    def aktiviere_ngramm_index(self):
+        """
+        Legt den N-Gramm-Index für Teilstring-Suchen nach Barcodes an (einmalig) und verwendet ihn ab sofort.
+        """
+        self.pool.schreiben(aktiviere_ngramm_index)
+        self.ngramm_index = True
+
+    def deaktiviere_ngramm_index(self):
+        """
+        Entfernt den N-Gramm-Index mit seinen Triggern, falls er angelegt ist. Teilstring-Suchen verwenden danach LIKE.
+        """
+        with self.pool.verbindung() as conn:
+            vorhanden = hat_ngramm_index(conn.cursor())
+        if vorhanden:
+            self.pool.schreiben(deaktiviere_ngramm_index)
+        self.ngramm_index = False
+
+    def log_aktion(self, aktion, code=Aktion.SONSTIGE, ergebnis=None, barcode=None, bestellgruppe_id=None, dauer_ms=None):
+        """
+        Protokolliert eine Aktion als typisiertes Ereignis. Der Eintrag wird gepuffert und im Hintergrund geschrieben.
+        :param aktion: Lesbare Beschreibung der durchgeführten Aktion
+        :param code: Aktionscode (Aktion) für exakte Filterung und Auswertung
+        :param ergebnis: Optionales Ergebnis (Ergebnis), Standard: aus der Beschreibung abgeleitet
+        :param barcode: Optionaler Barcode des betroffenen Medikaments
+        :param bestellgruppe_id: Optionale ID der betroffenen Bestellung
+        :param dauer_ms: Optionale Dauer der Aktion in Millisekunden
+        """
+        # Kundennummer im Thread der Sitzung erfassen (session_state ist nur hier verfügbar)
+        kundennummer = st.session_state.get("kundennummer") or "Unbekannt"
+        self.protokoll.schreiben(Ereignis(
+            aktion,
+            aktion=code,
+            ergebnis=ergebnis,
+            kundennummer=kundennummer,
+            barcode=barcode,
+            bestellgruppe_id=bestellgruppe_id,
+            dauer_ms=dauer_ms,
+        ))
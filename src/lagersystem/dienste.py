@@ -0,0 +1,62 @@
+import time
+import streamlit as st
+from admin import Admin
+from anmeldung import Anmeldung
+from automat import Automat
+from lager import Lager
+from datenbank import Datenbank
+from warnung import Warnung
+from benachrichtigungen import Benachrichtigungen, Ablaufplaner
+
+
+class Dienste:
+    """
+    Diese Klasse bündelt alle Fachobjekte der Anwendung.
+    Sie wird pro Prozess nur einmal erzeugt und von allen Streamlit-Sitzungen gemeinsam genutzt.
+    """
+
+    def __init__(self):
+        """
+        Erzeugt die Fachobjekte einmalig und teilt eine gemeinsame Datenbank- und Warnungsinstanz.
+        """
+        start_time = time.time()
+
+        self.datenbank = Datenbank()
+        self.warnung = Warnung(pool=self.datenbank.pool)
+        self.lager = Lager(datenbank=self.datenbank, warnung=self.warnung)
+        self.automat = Automat(datenbank=self.datenbank, warnung=self.warnung)
+        self.admin = Admin(datenbank=self.datenbank)
+        self.anmeldung = Anmeldung(pool=self.datenbank.user_pool)
+        # Der Ablaufplaner prüft im Hintergrund und verteilt neue Warnungen an alle Sitzungen
+        self.benachrichtigungen = Benachrichtigungen()
+        self.ablaufplaner = Ablaufplaner(self.warnung, self.benachrichtigungen)
+
+        self.kaltstart_dauer = time.time() - start_time
+        self.letzte_bereitstellung = None
+        print(f"Dienste initialisiert (Kaltstart): {self.kaltstart_dauer:.5f} Sekunden")
+
+    def zeitmessung(self):
+        """
+        Gibt die Dauer des Kaltstarts und der letzten (warmen) Bereitstellung zurück.
+
+        :return: Dictionary mit den Zeiten in Sekunden
+        """
+        return {"Kaltstart": self.kaltstart_dauer, "Warmstart": self.letzte_bereitstellung}
+
+
+@st.cache_resource
+def _erzeuge_dienste():
+    """Erzeugt die Dienste genau einmal pro Prozess (thread-sicher durch Streamlit)."""
+    return Dienste()
+
+
+def get_dienste():
+    """
+    Liefert die prozessweit gecachten Dienste und misst die Dauer der Bereitstellung.
+
+    :return: Die gemeinsame Dienste-Instanz
+    """
+    start_time = time.time()
+    dienste = _erzeuge_dienste()
+    dienste.letzte_bereitstellung = time.time() - start_time
+    return dienste
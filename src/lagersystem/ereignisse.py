@@ -0,0 +1,171 @@
+import csv
+import json
+from enum import Enum
+from datetime import datetime
+
+
+class Aktion(Enum):
+    """
+    Aufzählung der protokollierten Aktionen. Der Wert wird als Code im Protokoll gespeichert.
+    """
+    USER_LOGIN = "user_login"
+    ADMIN_LOGIN = "admin_login"
+    REGISTRIERUNG = "registrierung"
+    LOGOUT = "logout"
+    ANSICHT = "ansicht"
+    WARE_EINGELAGERT = "ware_eingelagert"
+    WARE_ENTFERNT = "ware_entfernt"
+    AUTOMAT_ZUGABE = "automat_zugabe"
+    AUTOMAT_ENTNAHME = "automat_entnahme"
+    WARENKORB_HINZUGEFUEGT = "warenkorb_hinzugefuegt"
+    WARENKORB_GELEERT = "warenkorb_geleert"
+    BESTELLUNG_AUFGEGEBEN = "bestellung_aufgegeben"
+    BESTELLUNG_STORNIERT = "bestellung_storniert"
+    BESTELLSTATUS_GEAENDERT = "bestellstatus_geaendert"
+    SONSTIGE = "sonstige"
+
+
+class Ergebnis(Enum):
+    """
+    Aufzählung der möglichen Ergebnisse einer Aktion. KRITISCH kennzeichnet Systemausfälle (z.B. für die MTBF).
+    """
+    ERFOLG = "erfolg"
+    WARNUNG = "warnung"
+    FEHLER = "fehler"
+    KRITISCH = "kritisch"
+    INFO = "info"
+
+
+def ergebnis_aus_text(text):
+    """
+    Leitet das Ergebnis aus einer Meldung ab, wenn es nicht angegeben wurde (z.B. bei alten Logeinträgen).
+
+    :param text: Text der Meldung
+    :return: Das Ergebnis
+    """
+    text = text or ""
+    if "Datenbank ist nicht verfügbar" in text or "Unbekannter Fehler" in text:
+        return Ergebnis.KRITISCH
+    if "🚫" in text or "Fehler" in text:
+        return Ergebnis.FEHLER
+    if "⚠️" in text:
+        return Ergebnis.WARNUNG
+    if "✅" in text:
+        return Ergebnis.ERFOLG
+    return Ergebnis.INFO
+
+
+class Ereignis:
+    """
+    Diese Klasse beschreibt einen typisierten Protokolleintrag mit Aktionscode, Ergebnis und optionalen Fachdaten.
+    """
+
+    # Kurze Feldnamen für die kompakte JSON-Lines-Darstellung
+    FELDER = {
+        "zeitstempel": "t",
+        "kundennummer": "k",
+        "aktion": "a",
+        "ergebnis": "e",
+        "text": "m",
+        "barcode": "b",
+        "bestellgruppe_id": "g",
+        "dauer_ms": "d",
+    }
+
+    def __init__(self, text, aktion=Aktion.SONSTIGE, ergebnis=None, kundennummer="Unbekannt",
+                 zeitstempel=None, barcode=None, bestellgruppe_id=None, dauer_ms=None):
+        """
+        Initialisiert ein Ereignis.
+
+        :param text: Lesbare Meldung für die Anzeige
+        :param aktion: Aktionscode (Aktion)
+        :param ergebnis: Optionales Ergebnis (Standard: aus dem Text abgeleitet)
+        :param kundennummer: Kundennummer des auslösenden Benutzers
+        :param zeitstempel: Optionaler Zeitstempel "YYYY-MM-DD HH:MM:SS" (Standard: jetzt)
+        :param barcode: Optionaler Barcode des betroffenen Medikaments
+        :param bestellgruppe_id: Optionale ID der betroffenen Bestellung
+        :param dauer_ms: Optionale Dauer der Aktion in Millisekunden
+        """
+        self.zeitstempel = zeitstempel or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.kundennummer = kundennummer
+        self.aktion = Aktion(aktion)
+        self.ergebnis = Ergebnis(ergebnis) if ergebnis else ergebnis_aus_text(text)
+        self.text = text
+        self.barcode = str(barcode) if barcode else None
+        self.bestellgruppe_id = int(bestellgruppe_id) if bestellgruppe_id else None
+        self.dauer_ms = round(dauer_ms, 3) if dauer_ms is not None else None
+
+    def als_dict(self):
+        """
+        Gibt das Ereignis in kompakter Form zurück. Leere Felder werden weggelassen.
+
+        :return: Dictionary mit Kurzschlüsseln
+        """
+        werte = {
+            "zeitstempel": self.zeitstempel,
+            "kundennummer": self.kundennummer,
+            "aktion": self.aktion.value,
+            "ergebnis": self.ergebnis.value,
+            "text": self.text,
+            "barcode": self.barcode,
+            "bestellgruppe_id": self.bestellgruppe_id,
+            "dauer_ms": self.dauer_ms,
+        }
+        return {self.FELDER[feld]: wert for feld, wert in werte.items() if wert is not None}
+
+    def als_json(self):
+        """
+        Gibt das Ereignis als einzelne JSON-Zeile zurück.
+
+        :return: JSON-Text ohne Zeilenumbruch
+        """
+        return json.dumps(self.als_dict(), ensure_ascii=False, separators=(",", ":"))
+
+    def als_zeile(self):
+        """
+        Gibt das Ereignis im bisherigen Zeilenformat zurück.
+
+        :return: Liste (Zeitstempel, Kundennummer, Text)
+        """
+        return [self.zeitstempel, self.kundennummer, self.text]
+
+    @classmethod
+    def aus_dict(cls, daten):
+        """
+        Erzeugt ein Ereignis aus der kompakten Darstellung.
+
+        :param daten: Dictionary mit Kurzschlüsseln
+        :return: Das Ereignis
+        """
+        return cls(**{feld: daten.get(kurz) for feld, kurz in cls.FELDER.items() if kurz in daten})
+
+    @classmethod
+    def aus_zeile(cls, zeile):
+        """
+        Erzeugt ein Ereignis aus einem alten Logeintrag (Zeitstempel, Kundennummer, Text).
+
+        :param zeile: Liste mit drei Spalten
+        :return: Das Ereignis
+        """
+        return cls(zeile[2], kundennummer=zeile[1], zeitstempel=zeile[0])
+
+    @classmethod
+    def aus_text(cls, zeile):
+        """
+        Erzeugt ein Ereignis aus einer gespeicherten Textzeile (JSON-Lines oder altes CSV-Format).
+
+        :param zeile: Die Zeile ohne Zeilenumbruch
+        :return: Das Ereignis oder None bei leeren oder unvollständigen Zeilen
+        """
+        if zeile.startswith("{"):
+            return cls.aus_dict(json.loads(zeile))
+        spalten = next(csv.reader([zeile]), None)
+        if not spalten or len(spalten) < 3:
+            return None
+        return cls.aus_zeile(spalten)
+
+    def __eq__(self, other):
+        return isinstance(other, Ereignis) and self.als_dict() == other.als_dict()
+
+    def __repr__(self):
+        return f"Ereignis({self.als_json()})"
@@ -0,0 +1,200 @@
+import os
+import json
+from barcodesuche import UMGEKEHRT_AUSDRUCK
+from tabellenumbau import baue_tabelle_um
+
+# Kanäle des Automaten mit numerischer ID, Kapazität und Belegung (Anzahl Waren im Kanal).
+# Die Belegung schreiben Trigger bei jeder Änderung am Lagerbestand fort, in derselben Transaktion wie die Verschiebung.
+# Ein Kanal gehört solange zu einem Artikel, wie er belegt ist; ein leerer Kanal wird wieder frei.
+# Zwei Teilindizes dienen als Freilisten: Kanäle eines Artikels mit Platz und freie Kanäle, jeweils nach ID sortiert.
+# Die Zuweisung liest so nur den kleinsten Eintrag eines B-Baums (O(log n)) statt alle Kanäle zu durchsuchen.
+
+# Kapazität neu angelegter Kanäle und Anzahl der Kanäle des Automaten, über Umgebungsvariablen anpassbar
+KANAL_KAPAZITAET = int(os.environ.get("LAGER_KANAL_KAPAZITAET", "20"))
+MAX_KANAELE = int(os.environ.get("LAGER_AUTOMAT_KANAELE", "100"))
+
+# Anzeigename eines Kanals, wie er bisher im Lagerbestand stand
+KANAL_BEZEICHNUNG = "'Kanal ' || {}"
+
+# Die Belegung aus dem Lagerbestand selbst, mit der die Kanäle aufgebaut und geprüft werden
+KANAL_BELEGUNG = """
+    SELECT kanal_id, COUNT(*) FROM lagerbestand WHERE kanal_id IS NOT NULL GROUP BY kanal_id
+"""
+
+
+def _belegung_aendern(zeile, aenderung):
+    """
+    Ändert die Belegung eines Kanals, für den Rumpf eines Triggers.
+    Ein belegter Kanal gehört zum Artikel der Ware, ein geleerter Kanal wird wieder frei.
+
+    :param zeile: NEW oder OLD, je nach Trigger
+    :param aenderung: 1 beim Einlegen, -1 beim Entnehmen
+    :return: Die SQL-Anweisung des Triggerrumpfs
+    """
+    if aenderung > 0:
+        artikel = f"COALESCE(artikel_id, {zeile}.artikel_id)"
+    else:
+        artikel = f"CASE WHEN belegung {aenderung} = 0 THEN NULL ELSE artikel_id END"
+    return f"""
+        UPDATE kanaele SET belegung = belegung + {aenderung}, artikel_id = {artikel} WHERE id = {zeile}.kanal_id;
+    """
+
+
+KANAL_ANWEISUNGEN = [
+    f"""
+    CREATE TABLE IF NOT EXISTS kanaele (
+        id INTEGER PRIMARY KEY,
+        artikel_id INTEGER REFERENCES artikel(id),
+        kapazitaet INTEGER NOT NULL DEFAULT {KANAL_KAPAZITAET} CHECK (kapazitaet > 0),
+        belegung INTEGER NOT NULL DEFAULT 0 CHECK (belegung >= 0 AND belegung <= kapazitaet)
+    )
+    """,
+    "ALTER TABLE lagerbestand ADD COLUMN kanal_id INTEGER REFERENCES kanaele(id)",
+    # Bisherige Kanäle ('Kanal 3') übernehmen, die Nummer wird zur ID
+    f"""
+    INSERT INTO kanaele (id, artikel_id, kapazitaet, belegung)
+    SELECT CAST(SUBSTR(kanal, 7) AS INTEGER), MIN(artikel_id), MAX(COUNT(*), {KANAL_KAPAZITAET}), COUNT(*)
+    FROM lagerbestand WHERE ort = 'Automat' AND kanal GLOB 'Kanal [1-9]*' GROUP BY CAST(SUBSTR(kanal, 7) AS INTEGER)
+    """,
+    "UPDATE lagerbestand SET kanal_id = CAST(SUBSTR(kanal, 7) AS INTEGER) WHERE ort = 'Automat' AND kanal GLOB 'Kanal [1-9]*'",
+    # Der Kanalname wird aus der ID abgeleitet, Filter und Anzeige bleiben unverändert
+    "DROP INDEX IF EXISTS idx_lagerbestand_ort_kanal",
+    baue_tabelle_um(
+        "lagerbestand",
+        f"""
+        barcode TEXT PRIMARY KEY,
+        menge INTEGER,
+        verfallsdatum TEXT,
+        ort TEXT DEFAULT 'Lager',
+        barcode_umgekehrt TEXT GENERATED ALWAYS AS ({UMGEKEHRT_AUSDRUCK}) VIRTUAL,
+        artikel_id INTEGER REFERENCES artikel(id),
+        kanal_id INTEGER REFERENCES kanaele(id),
+        kanal TEXT GENERATED ALWAYS AS ({KANAL_BEZEICHNUNG.format('kanal_id')}) VIRTUAL
+        """,
+        ["barcode", "menge", "verfallsdatum", "ort", "artikel_id", "kanal_id"],
+    ),
+    "CREATE INDEX IF NOT EXISTS idx_lagerbestand_ort_kanal ON lagerbestand (ort, kanal)",
+    "CREATE INDEX IF NOT EXISTS idx_lagerbestand_kanal_id ON lagerbestand (kanal_id)",
+    # Freilisten: Kanäle eines Artikels mit freien Plätzen und unbelegte Kanäle
+    "CREATE INDEX IF NOT EXISTS idx_kanaele_artikel_frei ON kanaele (artikel_id, id) WHERE belegung < kapazitaet",
+    "CREATE INDEX IF NOT EXISTS idx_kanaele_frei ON kanaele (id) WHERE artikel_id IS NULL",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_kanaele_einfuegen AFTER INSERT ON lagerbestand
+    WHEN NEW.kanal_id IS NOT NULL BEGIN
+        {_belegung_aendern("NEW", 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_kanaele_loeschen AFTER DELETE ON lagerbestand
+    WHEN OLD.kanal_id IS NOT NULL BEGIN
+        {_belegung_aendern("OLD", -1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_kanaele_aendern AFTER UPDATE OF kanal_id ON lagerbestand
+    WHEN OLD.kanal_id IS NOT NEW.kanal_id BEGIN
+        {_belegung_aendern("OLD", -1)}
+        {_belegung_aendern("NEW", 1)}
+    END
+    """,
+]
+
+
+def weise_kanal_zu(cursor, artikel_id):
+    """
+    Wählt einen Kanal für eine Ware. Muss innerhalb einer Schreibtransaktion aufgerufen werden.
+    Bevorzugt wird der Kanal des Artikels mit der kleinsten ID und freiem Platz, sonst der kleinste freie Kanal,
+    sonst wird ein neuer Kanal angelegt, solange der Automat noch Platz hat.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :param artikel_id: Die ID des Artikels
+    :return: Die ID des Kanals oder None, wenn kein Kanal frei ist
+    """
+    cursor.execute(
+        "SELECT id FROM kanaele WHERE artikel_id = ? AND belegung < kapazitaet ORDER BY id LIMIT 1", (artikel_id,)
+    )
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+
+    cursor.execute("SELECT id FROM kanaele WHERE artikel_id IS NULL ORDER BY id LIMIT 1")
+    row = cursor.fetchone()
+    if row:
+        cursor.execute("UPDATE kanaele SET artikel_id = ? WHERE id = ?", (artikel_id, row[0]))
+        return row[0]
+
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM kanaele")
+    letzte_id = cursor.fetchone()[0]
+    if letzte_id >= MAX_KANAELE:
+        return None
+    cursor.execute("INSERT INTO kanaele (id, artikel_id) VALUES (?, ?)", (letzte_id + 1, artikel_id))
+    return letzte_id + 1
+
+
+def weise_kanaele_zu(cursor, waren):
+    """
+    Wählt die Kanäle für eine ganze Befüllung mit je einer Abfrage für alle Artikel. Die Waren erhalten in ihrer
+    Reihenfolge dieselben Kanäle wie mit einzelnen Aufrufen von weise_kanal_zu. Muss innerhalb einer Schreibtransaktion
+    aufgerufen werden; neu vergebene Kanäle werden sofort dem Artikel zugeordnet, die Belegung schreiben die Trigger
+    beim Verschieben fort.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :param waren: Liste der Artikel-IDs, ein Eintrag je Ware
+    :return: Liste der Kanal-IDs in derselben Reihenfolge, None für Waren ohne freien Kanal
+    """
+    cursor.execute(
+        "SELECT artikel_id, id, kapazitaet - belegung FROM kanaele "
+        "WHERE artikel_id IN (SELECT value FROM json_each(?)) AND belegung < kapazitaet ORDER BY artikel_id, id",
+        (json.dumps(list(set(waren))),),
+    )
+    plaetze = {}
+    for artikel_id, kanal_id, frei in cursor.fetchall():
+        plaetze.setdefault(artikel_id, []).append([kanal_id, frei])
+
+    # Höchstens ein neuer Kanal je Ware, mehr freie Kanäle werden nie gebraucht
+    cursor.execute("SELECT id, kapazitaet FROM kanaele WHERE artikel_id IS NULL ORDER BY id LIMIT ?", (len(waren),))
+    freie_kanaele = cursor.fetchall()
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM kanaele")
+    letzte_id = cursor.fetchone()[0]
+
+    zuordnung = []
+    vergeben = []
+    neue_kanaele = []
+    for artikel_id in waren:
+        kanaele = plaetze.setdefault(artikel_id, [])
+        while kanaele and kanaele[0][1] == 0:
+            kanaele.pop(0)
+        if not kanaele:
+            if len(vergeben) < len(freie_kanaele):
+                kanal_id, kapazitaet = freie_kanaele[len(vergeben)]
+                vergeben.append((artikel_id, kanal_id))
+            elif letzte_id < MAX_KANAELE:
+                letzte_id += 1
+                kanal_id, kapazitaet = letzte_id, KANAL_KAPAZITAET
+                neue_kanaele.append((letzte_id, artikel_id))
+            else:
+                zuordnung.append(None)
+                continue
+            kanaele.append([kanal_id, kapazitaet])
+        kanaele[0][1] -= 1
+        zuordnung.append(kanaele[0][0])
+
+    cursor.executemany("UPDATE kanaele SET artikel_id = ? WHERE id = ?", vergeben)
+    cursor.executemany("INSERT INTO kanaele (id, artikel_id) VALUES (?, ?)", neue_kanaele)
+    return zuordnung
+
+
+def pruefe_kanalbelegung(cursor):
+    """
+    Vergleicht die fortgeschriebene Belegung der Kanäle mit dem Lagerbestand.
+
+    :param cursor: Ein Datenbank-Cursor
+    :return: Liste der abweichenden Zeilen (Kanal-ID, Belegung) aus beiden Richtungen, leer wenn konsistent
+    """
+    cursor.execute(f"""
+        SELECT * FROM ({KANAL_BELEGUNG} EXCEPT SELECT id, belegung FROM kanaele WHERE belegung > 0)
+        UNION
+        SELECT * FROM (SELECT id, belegung FROM kanaele WHERE belegung > 0 EXCEPT {KANAL_BELEGUNG})
+        ORDER BY 1
+    """)
+    return cursor.fetchall()
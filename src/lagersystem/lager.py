@@ -1,10 +1,27 @@
 import pandas as pd
 import sqlite3
 import re
+import json
 import os
 from datetime import datetime
 from warnung import Warnung  
-from datenbank import Datenbank
+from datenbank import Datenbank, TransaktionAbgebrochen
+from ereignisse import Aktion, Ergebnis
+from barcodesuche import barcode_bedingung
+from namenssuche import NAMEN_TABELLE, volltext_anfrage, artikelstamm_bedingung
+from artikelstamm import artikel_id, artikel_ids
+from artikelbestand import pruefe_artikelbestand, baue_artikelbestand_neu
+
+# Erlaubte Sortierspalten der Bestandsanzeige und ihre Position in der Ergebniszeile
+SORTIERUNGEN = {"barcode": 0, "name": 1, "verfallsdatum": 3}
+
+# Bestandsabfragen lesen den Namen über die Artikel-ID aus dem Artikelstamm
+BESTAND_SPALTEN = "barcode, name, menge, verfallsdatum, ort, kanal"
+BESTAND_QUELLE = "lagerbestand JOIN artikel ON artikel.id = lagerbestand.artikel_id"
+# Beim Sortieren nach Name legt CROSS JOIN den Artikelstamm als äußere Schleife fest,
+# so liefert der eindeutige Namensindex die Reihenfolge ohne zusätzlichen Sortierschritt
+BESTAND_QUELLE_NACH_NAME = "artikel CROSS JOIN lagerbestand ON artikel.id = lagerbestand.artikel_id"
+
 
 class Lager:
     """
@@ -12,19 +29,19 @@ class Lager:
     Sie ermöglicht das Hinzufügen, Entfernen und Abfragen von Waren.
     """
     
-    def __init__(self):
+    def __init__(self, datenbank=None, warnung=None):
         """
         Initialisiert die Lagerklasse mit einer Verbindung zur SQLite-Datenbank,
         einer Warnungsinstanz und einer Datenbankinstanz.
+
+        :param datenbank: Optionale gemeinsam genutzte Datenbankinstanz
+        :param warnung: Optionale gemeinsam genutzte Warnungsinstanz
         """
-        base_dir = os.path.dirname(__file__)  # src/lagersystem
-        db_path = os.path.join(base_dir, 'databases', 'lagerbestand.db')
+        self.datenbank = datenbank or Datenbank()
+        self.warnung = warnung or Warnung(pool=self.datenbank.pool)
 
-        # Verbindung herstellen
-        self.db_conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.db_conn.cursor()
-        self.warnung = Warnung()
-        self.datenbank = Datenbank()
+        # Verbindungen werden pro Anfrage aus dem gemeinsamen Pool geliehen
+        self.pool = self.datenbank.pool
 
     def ist_gueltiger_barcode(self, barcode):
         """
@@ -36,13 +53,17 @@ class Lager:
 
     def _ist_barcode_in_bestellung(self, barcode):
         """Überprüft, ob der Barcode in einer offenen Bestellung ist."""
-        self.cursor.execute("SELECT COUNT(*) FROM bestellungen WHERE barcode = ? AND status = 'Offen'", (barcode,))
-        return self.cursor.fetchone()[0] > 0
+        with self.pool.verbindung() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM bestellungen WHERE barcode = ? AND status = 'Offen'", (barcode,))
+            return cursor.fetchone()[0] > 0
 
     def _ist_barcode_im_lager(self, barcode):
         """Überprüft, ob ein Barcode bereits im Lager existiert."""
-        self.cursor.execute("SELECT COUNT(*) FROM lagerbestand WHERE barcode = ?", (barcode,))
-        return self.cursor.fetchone()[0] > 0
+        with self.pool.verbindung() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM lagerbestand WHERE barcode = ?", (barcode,))
+            return cursor.fetchone()[0] > 0
 
     def _ist_verfallsdatum_gueltig(self, verfallsdatum):
         """Überprüft, ob das Verfallsdatum im richtigen Format ist und nicht abgelaufen ist."""
@@ -75,16 +96,107 @@ class Lager:
             return "⚠️ Fehler: Verfallsdatum ungültig oder Ware ist abgelaufen!"
 
         try:
-            self.cursor.execute(
-                "INSERT INTO lagerbestand (barcode, name, menge, verfallsdatum, ort) VALUES (?, ?, 1, ?, ?)", 
-                (barcode, name, verfallsdatum, ort)
+            self.pool.schreiben(lambda cursor: cursor.execute(
+                "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) VALUES (?, ?, 1, ?, ?)",
+                (barcode, artikel_id(cursor, name), verfallsdatum, ort)
+            ))
+            self.datenbank.log_aktion(
+                f"📦 Medikament hinzugefügt: {name} (Barcode: {barcode})",
+                code=Aktion.WARE_EINGELAGERT, ergebnis=Ergebnis.ERFOLG, barcode=barcode,
             )
-            self.db_conn.commit()
-            self.datenbank.log_aktion(f"📦 Medikament hinzugefügt: {name} (Barcode: {barcode})")
             return f"✅ Erfolg: {name} hinzugefügt."
         except sqlite3.Error as e:
             return f"🚫 Fehler bei der Datenbank: {str(e)}"
 
+    def ware_hinzufuegen_bulk(self, rows, ort='Lager'):
+        """
+        Fügt eine ganze Lieferung in einer einzigen Transaktion zum Lagerbestand hinzu.
+        Die Prüfungen entsprechen ware_hinzufuegen, Abgleiche mit Lager und offenen Bestellungen
+        erfolgen aber mengenbasiert mit je einer Abfrage für alle Barcodes.
+
+        :param rows: Liste von Zeilen (barcode, name, verfallsdatum)
+        :param ort: Lagerort (Standard: 'Lager')
+        :return: Liste von Tupeln (Zeilennummer, Barcode, Meldung) in der Reihenfolge der Eingabe
+        """
+        bericht = []
+        kandidaten = {}
+        daten_gueltig = {}
+
+        # Prüfungen ohne Datenbank: Pflichtfelder, Barcodeformat, Dubletten in der Lieferung und Verfallsdatum
+        for zeile, (barcode, name, verfallsdatum) in enumerate(rows, start=1):
+            barcode = str(barcode).strip() if barcode is not None else ""
+            if hasattr(verfallsdatum, "strftime"):
+                verfallsdatum = verfallsdatum.strftime('%Y-%m-%d')
+            verfallsdatum = str(verfallsdatum) if verfallsdatum else ""
+
+            if not all([barcode, name, verfallsdatum]):
+                meldung = "🚫 Fehler: Alle Felder müssen ausgefüllt sein!"
+            elif not self.ist_gueltiger_barcode(barcode):
+                meldung = "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."
+            elif barcode in kandidaten:
+                meldung = f"🚫 Fehler: Barcode {barcode} ist mehrfach in der Lieferung enthalten!"
+            else:
+                if verfallsdatum not in daten_gueltig:
+                    daten_gueltig[verfallsdatum] = self._ist_verfallsdatum_gueltig(verfallsdatum)
+                kandidaten[barcode] = (zeile, name, verfallsdatum)
+                meldung = None
+            bericht.append((zeile, barcode, meldung))
+
+        try:
+            meldungen = self.pool.schreiben(
+                lambda cursor: self._lieferung_buchen(cursor, kandidaten, daten_gueltig, ort)
+            ) if kandidaten else {}
+        except sqlite3.Error as e:
+            meldungen = {barcode: f"🚫 Fehler bei der Datenbank: {str(e)}" for barcode in kandidaten}
+
+        bericht = [(zeile, barcode, meldung or meldungen[barcode]) for zeile, barcode, meldung in bericht]
+        eingelagert = sum(1 for _, _, meldung in bericht if meldung.startswith("✅"))
+        self.datenbank.log_aktion(
+            f"📦 Lieferung eingelagert: {eingelagert} von {len(bericht)} Medikamenten hinzugefügt",
+            code=Aktion.WARE_EINGELAGERT, ergebnis=Ergebnis.ERFOLG if eingelagert == len(bericht) else Ergebnis.WARNUNG,
+        )
+        return bericht
+
+    def _lieferung_buchen(self, cursor, kandidaten, daten_gueltig, ort):
+        """
+        Gleicht die Barcodes einer Lieferung innerhalb einer laufenden Transaktion mit Lager und
+        offenen Bestellungen ab und fügt alle gültigen Zeilen mit einem executemany ein.
+
+        :param cursor: Cursor der laufenden Transaktion
+        :param kandidaten: Dictionary Barcode -> (Zeilennummer, Name, Verfallsdatum)
+        :param daten_gueltig: Dictionary Verfallsdatum -> True, wenn gültig
+        :param ort: Lagerort
+        :return: Dictionary Barcode -> Meldung
+        """
+        barcodes = json.dumps(list(kandidaten))
+        cursor.execute(
+            "SELECT DISTINCT barcode FROM bestellungen WHERE status = 'Offen' AND barcode IN (SELECT value FROM json_each(?))",
+            (barcodes,),
+        )
+        in_bestellung = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT barcode FROM lagerbestand WHERE barcode IN (SELECT value FROM json_each(?))", (barcodes,))
+        im_lager = {row[0] for row in cursor.fetchall()}
+
+        meldungen = {}
+        neue_waren = []
+        ids = artikel_ids(cursor, (name for _, name, _ in kandidaten.values()))
+        for barcode, (_, name, verfallsdatum) in kandidaten.items():
+            if barcode in in_bestellung:
+                meldungen[barcode] = "🚫 Fehler: Dieser Barcode ist in einer offenen Bestellung!"
+            elif barcode in im_lager:
+                meldungen[barcode] = f"🚫 Fehler: Barcode {barcode} existiert bereits im Lager!"
+            elif not daten_gueltig[verfallsdatum]:
+                meldungen[barcode] = "⚠️ Fehler: Verfallsdatum ungültig oder Ware ist abgelaufen!"
+            else:
+                meldungen[barcode] = f"✅ Erfolg: {name} hinzugefügt."
+                neue_waren.append((barcode, ids[name], verfallsdatum, ort))
+
+        cursor.executemany(
+            "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) VALUES (?, ?, 1, ?, ?)",
+            neue_waren,
+        )
+        return meldungen
+
     def ware_entfernen(self, barcode):
         """
         Entfernt eine Ware aus dem Lagerbestand, falls sie nicht in einem Automaten gespeichert ist.
@@ -96,54 +208,227 @@ class Lager:
             return "🚫 Fehler: Ungültiger oder leerer Barcode!"
 
         try:
-            self.cursor.execute("SELECT ort FROM lagerbestand WHERE barcode = ?", (barcode,))
-            row = self.cursor.fetchone()
-            if not row:
-                return f"🚫 Fehler: Barcode {barcode} nicht im Lager gefunden!"
-
-            if row[0] == "Automat":
-                return f"🚫 Fehler: Ware {barcode} ist im Automaten und kann nicht gelöscht werden!"
-
-            self.cursor.execute("DELETE FROM lagerbestand WHERE barcode = ?", (barcode,))
-            self.db_conn.commit()
-            self.datenbank.log_aktion(f"✅ Ware {barcode} entfernt.")
+            self.pool.schreiben(lambda cursor: self._ware_loeschen(cursor, barcode))
+            self.datenbank.log_aktion(f"✅ Ware {barcode} entfernt.", code=Aktion.WARE_ENTFERNT, barcode=barcode)
             return f"✅ Erfolg: Ware {barcode} entfernt."
+        except TransaktionAbgebrochen as abbruch:
+            return str(abbruch)
         except sqlite3.Error as e:
             return f"🚫 Fehler bei der Datenbank: {str(e)}"
 
+    def _ware_loeschen(self, cursor, barcode):
+        """
+        Löscht eine Ware innerhalb einer laufenden Transaktion, sofern sie nicht im Automaten liegt.
+
+        :param cursor: Cursor der laufenden Transaktion
+        :param barcode: Der Barcode der zu entfernenden Ware
+        """
+        cursor.execute("SELECT ort FROM lagerbestand WHERE barcode = ?", (barcode,))
+        row = cursor.fetchone()
+        if not row:
+            raise TransaktionAbgebrochen(f"🚫 Fehler: Barcode {barcode} nicht im Lager gefunden!")
+
+        if row[0] == "Automat":
+            raise TransaktionAbgebrochen(f"🚫 Fehler: Ware {barcode} ist im Automaten und kann nicht gelöscht werden!")
+
+        cursor.execute("DELETE FROM lagerbestand WHERE barcode = ?", (barcode,))
+
     def get_artikel_anzahl(self):
-        """Gibt eine DataFrame mit der Anzahl der vorhandenen Artikel zurück."""
-        self.cursor.execute("SELECT name, SUM(menge) as total FROM lagerbestand GROUP BY name")
-        data = self.cursor.fetchall()
-        return pd.DataFrame(data, columns=["Name", "Menge"])
+        """
+        Gibt eine DataFrame mit der Menge der vorhandenen Artikel insgesamt sowie im Lager und im Automaten zurück.
+        Die Summen werden aus der per Trigger fortgeschriebenen Tabelle artikelbestand gelesen.
+        """
+        data = self.pool.abfragen("""
+            SELECT name, SUM(menge),
+                   SUM(CASE WHEN ort = 'Lager' THEN menge ELSE 0 END),
+                   SUM(CASE WHEN ort = 'Automat' THEN menge ELSE 0 END)
+            FROM artikel CROSS JOIN artikelbestand ON artikel.id = artikelbestand.artikel_id
+            GROUP BY name ORDER BY name
+        """)
+        return pd.DataFrame(data, columns=["Name", "Menge", "Lager", "Automat"])
+
+    def pruefe_artikelbestand(self):
+        """
+        Überprüft, ob die fortgeschriebenen Bestandssummen mit dem Lagerbestand übereinstimmen.
+
+        :return: Liste der abweichenden Zeilen (Artikel-ID, Ort, Anzahl, Menge), leer wenn konsistent
+        """
+        with self.pool.verbindung() as conn:
+            abweichungen = pruefe_artikelbestand(conn.cursor())
+        if abweichungen:
+            self.datenbank.log_aktion(
+                f"⚠️ Bestandssummen weichen in {len(abweichungen)} Zeilen vom Lagerbestand ab",
+                code=Aktion.SONSTIGE, ergebnis=Ergebnis.WARNUNG,
+            )
+        return abweichungen
+
+    def artikelbestand_neu_aufbauen(self):
+        """
+        Berechnet die Bestandssummen in einer Transaktion vollständig neu aus dem Lagerbestand.
+
+        :return: Eine Erfolgsmeldung oder eine Fehlermeldung
+        """
+        try:
+            zeilen = self.pool.schreiben(baue_artikelbestand_neu)
+        except sqlite3.Error as e:
+            return f"🚫 Fehler bei der Datenbank: {str(e)}"
+        self.datenbank.log_aktion(
+            f"🔄 Bestandssummen neu aufgebaut: {zeilen} Einträge", code=Aktion.SONSTIGE, ergebnis=Ergebnis.ERFOLG,
+        )
+        return f"✅ Erfolg: Bestandssummen mit {zeilen} Einträgen neu aufgebaut."
 
     def get_artikel_namen(self):
         """Gibt eine Liste mit den Namen aller im Lager vorhandenen Artikel zurück."""
-        self.cursor.execute("SELECT DISTINCT name FROM lagerbestand")
-        return [row[0] for row in self.cursor.fetchall()]
+        data = self.pool.abfragen(
+            "SELECT name FROM artikel WHERE EXISTS (SELECT 1 FROM lagerbestand WHERE artikel_id = artikel.id) ORDER BY name"
+        )
+        return [row[0] for row in data]
 
-    def get_lagerbestand(self, barcode_filter=None, ort_filter=None):
+    def suche_artikelnamen(self, suchtext, limit=10, ohne_bestand=False):
         """
-        Ruft den aktuellen Lagerbestand ab, mit optionalen Filtern für Barcode und Ort.
+        Sucht Medikamentennamen für die Autovervollständigung im Volltextindex.
+        Jedes eingegebene Wort wird als Wortanfang gesucht, die Treffer sind nach Relevanz (bm25) sortiert.
+        Der Volltextindex enthält nur Artikel mit Bestand; mit ohne_bestand wird stattdessen der gesamte
+        Artikelstamm nach Namen sortiert durchsucht, etwa für Mindestbestände ausverkaufter Artikel.
 
-        :param barcode_filter: Optionaler Filter für Barcode (Substring-Suche)
-        :param ort_filter: Optionaler Filter für Lagerort ('Lager' oder 'Automat')
-        :return: Pandas DataFrame mit den Lagerdaten
+        :param suchtext: Der bisher eingegebene Suchtext
+        :param limit: Maximale Anzahl Vorschläge
+        :param ohne_bestand: Auch Artikel ohne Bestand finden
+        :return: Liste der passenden Namen (leer bei leerem Suchtext)
+        """
+        if ohne_bestand:
+            bedingung = artikelstamm_bedingung(suchtext)
+            if bedingung is None:
+                return []
+            sql, params = bedingung
+            data = self.pool.abfragen(f"SELECT name FROM artikel WHERE {sql} ORDER BY name LIMIT ?", (*params, limit))
+            return [row[0] for row in data]
+
+        anfrage = volltext_anfrage(suchtext)
+        if anfrage is None:
+            return []
+
+        data = self.pool.abfragen(
+            f"SELECT name FROM {NAMEN_TABELLE} WHERE {NAMEN_TABELLE} MATCH ? ORDER BY rank, name LIMIT ?",
+            (anfrage, limit),
+        )
+        return [row[0] for row in data]
+
+    def _lagerbestand_filter(self, barcode_filter=None, ort_filter=None, kanal_filter=None, name_filter=None):
         """
-        self.warnung._pruefe_warnungen()
+        Baut die WHERE-Bedingung für Bestandsabfragen auf.
 
-        query = "SELECT barcode, name, menge, verfallsdatum, ort, kanal FROM lagerbestand WHERE 1=1"
+        :param barcode_filter: Optionaler Barcode-Suchbegriff ("123" Präfix, "*123" Suffix, "*123*" Teilstring)
+        :param ort_filter: Optionaler Filter für Lagerort ('Lager' oder 'Automat')
+        :param kanal_filter: Optionaler Filter für einen Automatenkanal ("Alle" = kein Filter)
+        :param name_filter: Optionaler exakter Medikamentenname
+        :return: Tupel (SQL-Bedingung, Parameterliste) oder None bei ungültigem Barcode-Filter
+        """
+        bedingung = "WHERE 1=1"
         params = []
 
         if ort_filter in ["Lager", "Automat"]:
-            query += " AND ort = ?"
+            bedingung += " AND ort = ?"
             params.append(ort_filter)
 
+        if kanal_filter and kanal_filter != "Alle":
+            bedingung += " AND kanal = ?"
+            params.append(kanal_filter)
+
+        if name_filter:
+            bedingung += " AND artikel_id = (SELECT id FROM artikel WHERE name = ?)"
+            params.append(name_filter)
+
         if barcode_filter:
-            if not self.ist_gueltiger_barcode(barcode_filter):
-                return "🚫 Fehler: Ungültiger Barcode-Filter!"
-            query += " AND barcode LIKE ?"
-            params.append(f"%{barcode_filter}%")
+            suche = barcode_bedingung(barcode_filter, ngramme=self.datenbank.ngramm_index)
+            if suche is None:
+                return None
+            bedingung += f" AND {suche[0]}"
+            params.extend(suche[1])
+
+        return bedingung, params
+
+    def get_lagerbestand_seite(self, groesse=100, nach=None, sortierung="barcode", absteigend=False,
+                               barcode_filter=None, ort_filter=None, kanal_filter=None, name_filter=None):
+        """
+        Ruft eine Seite des Lagerbestands ab (Keyset-Paginierung). Die Sortierung erfolgt in der Datenbank,
+        der Barcode dient als eindeutiger Zusatzschlüssel, damit keine Zeile doppelt oder gar nicht erscheint.
+
+        :param groesse: Anzahl Zeilen pro Seite
+        :param nach: Optionaler Cursor (Sortierwert, Barcode) der letzten Zeile der vorherigen Seite
+        :param sortierung: Sortierspalte ('barcode', 'name' oder 'verfallsdatum')
+        :param absteigend: True für absteigende Sortierung
+        :param barcode_filter: Optionaler Barcode-Suchbegriff ("123" Präfix, "*123" Suffix, "*123*" Teilstring)
+        :param ort_filter: Optionaler Filter für Lagerort ('Lager' oder 'Automat')
+        :param kanal_filter: Optionaler Filter für einen Automatenkanal
+        :param name_filter: Optionaler exakter Medikamentenname
+        :return: Tupel (DataFrame mit den Lagerdaten, Cursor der nächsten Seite oder None)
+        """
+        if sortierung not in SORTIERUNGEN:
+            raise ValueError(f"Unbekannte Sortierung: {sortierung}")
+
+        filterung = self._lagerbestand_filter(barcode_filter, ort_filter, kanal_filter, name_filter)
+        if filterung is None:
+            return "🚫 Fehler: Ungültiger Barcode-Filter!", None
+        bedingung, params = filterung
+
+        richtung, vergleich = ("DESC", "<") if absteigend else ("ASC", ">")
+        if nach:
+            if sortierung == "barcode":
+                bedingung += f" AND barcode {vergleich} ?"
+                params.append(nach[1])
+            else:
+                bedingung += f" AND ({sortierung}, barcode) {vergleich} (?, ?)"
+                params.extend(nach)
+
+        reihenfolge = "barcode" if sortierung == "barcode" else f"{sortierung} {richtung}, barcode"
+        quelle = BESTAND_QUELLE_NACH_NAME if sortierung == "name" else BESTAND_QUELLE
+        query = f"""
+            SELECT {BESTAND_SPALTEN} FROM {quelle} {bedingung}
+            ORDER BY {reihenfolge} {richtung} LIMIT ?
+        """
+        params.append(groesse + 1)
+
+        data = self.pool.abfragen(query, params)
+
+        # Eine zusätzliche Zeile zeigt an, ob eine weitere Seite existiert
+        naechster = None
+        if len(data) > groesse:
+            data = data[:groesse]
+            letzte = data[-1]
+            naechster = (letzte[SORTIERUNGEN[sortierung]], letzte[0])
+        return pd.DataFrame(data, columns=["Barcode", "Name", "Menge", "Verfallsdatum", "Ort", "Kanal"]), naechster
+
+    def zaehle_lagerbestand(self, barcode_filter=None, ort_filter=None, kanal_filter=None, name_filter=None):
+        """
+        Zählt die Zeilen des Lagerbestands mit denselben Filtern wie get_lagerbestand_seite.
+
+        :param barcode_filter: Optionaler Barcode-Suchbegriff ("123" Präfix, "*123" Suffix, "*123*" Teilstring)
+        :param ort_filter: Optionaler Filter für Lagerort ('Lager' oder 'Automat')
+        :param kanal_filter: Optionaler Filter für einen Automatenkanal
+        :param name_filter: Optionaler exakter Medikamentenname
+        :return: Anzahl der Zeilen (0 bei ungültigem Barcode-Filter)
+        """
+        filterung = self._lagerbestand_filter(barcode_filter, ort_filter, kanal_filter, name_filter)
+        if filterung is None:
+            return 0
+        bedingung, params = filterung
+
+        return self.pool.abfragen(f"SELECT COUNT(*) FROM lagerbestand {bedingung}", params)[0][0]
+
+    def get_lagerbestand(self, barcode_filter=None, ort_filter=None):
+        """
+        Ruft den aktuellen Lagerbestand ab, mit optionalen Filtern für Barcode und Ort.
+
+        :param barcode_filter: Optionaler Barcode-Suchbegriff ("123" Präfix, "*123" Suffix, "*123*" Teilstring)
+        :param ort_filter: Optionaler Filter für Lagerort ('Lager' oder 'Automat')
+        :return: Pandas DataFrame mit den Lagerdaten
+        """
+        filterung = self._lagerbestand_filter(barcode_filter, ort_filter)
+        if filterung is None:
+            return "🚫 Fehler: Ungültiger Barcode-Filter!"
+        bedingung, params = filterung
+        query = f"SELECT {BESTAND_SPALTEN} FROM {BESTAND_QUELLE} {bedingung}"
 
-        self.cursor.execute(query, params)
-        return pd.DataFrame(self.cursor.fetchall(), columns=["Barcode", "Name", "Menge", "Verfallsdatum", "Ort", "Kanal"])
+        data = self.pool.abfragen(query, params)
+        return pd.DataFrame(data, columns=["Barcode", "Name", "Menge", "Verfallsdatum", "Ort", "Kanal"])
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Obergrenzen des Lesecaches je Datenbank, über Umgebungsvariablen anpassbar (0 Einträge = Cache aus)
+MAX_EINTRAEGE = int(os.environ.get("LESECACHE_EINTRAEGE", "256"))
+MAX_ZEILEN = int(os.environ.get("LESECACHE_ZEILEN", "500000"))
+
+
+class Lesecache:
+    """
+    Ein LRU-Cache für Abfrageergebnisse, Schlüssel ist die SQL-Abfrage mit ihren Parametern.
+    Jeder Eintrag merkt sich die Datenversion, unter der er gelesen wurde, und ist nur bei unveränderter Version gültig.
+    Die Version besteht aus dem Schreibzähler des Pools und PRAGMA data_version einer eigenen Beobachterverbindung,
+    die auch Änderungen anderer Prozesse oder direkter Verbindungen bemerkt.
+    """
+
+    def __init__(self, db_path, max_eintraege=MAX_EINTRAEGE, max_zeilen=MAX_ZEILEN):
+        """
+        Initialisiert einen leeren Cache. Die Beobachterverbindung wird erst bei Bedarf geöffnet.
+
+        :param db_path: Pfad zur SQLite-Datenbankdatei
+        :param max_eintraege: Maximale Anzahl zwischengespeicherter Abfragen
+        :param max_zeilen: Maximale Summe der zwischengespeicherten Ergebniszeilen
+        """
+        self.db_path = db_path
+        self.max_eintraege = max_eintraege
+        self.max_zeilen = max_zeilen
+        self.schreibzaehler = 0
+        self._eintraege = OrderedDict()
+        self._zeilen = 0
+        self._lock = threading.Lock()
+        self._beobachter = None
+        self._beobachter_lock = threading.Lock()
+        self.treffer = 0
+        self.fehlzugriffe = 0
+        self.verdraengungen = 0
+
+    def aendern(self):
+        """Erhöht den Schreibzähler nach einer Schreibtransaktion mit Änderungen und macht alle Einträge ungültig."""
+        with self._lock:
+            self.schreibzaehler += 1
+
+    def version(self):
+        """
+        Ermittelt die aktuelle Datenversion.
+
+        :return: Tupel (Schreibzähler, PRAGMA data_version der Beobachterverbindung)
+        """
+        with self._beobachter_lock:
+            if self._beobachter is None:
+                self._beobachter = sqlite3.connect(self.db_path, check_same_thread=False)
+            data_version = self._beobachter.execute("PRAGMA data_version").fetchall()[0][0]
+        return self.schreibzaehler, data_version
+
+    def lesen(self, conn, sql, params=()):
+        """
+        Liefert das Ergebnis einer Abfrage aus dem Cache oder führt sie auf der Verbindung aus und speichert es.
+
+        :param conn: Die Verbindung, auf der die Abfrage bei einem Fehlzugriff ausgeführt wird
+        :param sql: Die SQL-Abfrage
+        :param params: Die Parameter der Abfrage
+        :return: Liste der Ergebniszeilen (nicht verändern, sie wird mit anderen Aufrufern geteilt)
+        """
+        if self.max_eintraege <= 0:
+            return conn.execute(sql, params).fetchall()
+
+        schluessel = (sql, tuple(params))
+        version = self.version()
+        with self._lock:
+            eintrag = self._eintraege.get(schluessel)
+            if eintrag is not None and eintrag[0] == version:
+                self._eintraege.move_to_end(schluessel)
+                self.treffer += 1
+                return eintrag[1]
+            self.fehlzugriffe += 1
+
+        # Die Abfrage startet nach dem Lesen der Version und sieht daher mindestens diesen Datenstand
+        zeilen = conn.execute(sql, params).fetchall()
+
+        with self._lock:
+            alter_eintrag = self._eintraege.pop(schluessel, None)
+            if alter_eintrag is not None:
+                self._zeilen -= len(alter_eintrag[1])
+            if len(zeilen) <= self.max_zeilen:
+                self._eintraege[schluessel] = (version, zeilen)
+                self._zeilen += len(zeilen)
+                while len(self._eintraege) > self.max_eintraege or self._zeilen > self.max_zeilen:
+                    _, (_, verdraengt) = self._eintraege.popitem(last=False)
+                    self._zeilen -= len(verdraengt)
+                    self.verdraengungen += 1
+        return zeilen
+
+    def leeren(self):
+        """Entfernt alle Einträge aus dem Cache."""
+        with self._lock:
+            self._eintraege.clear()
+            self._zeilen = 0
+
+    def statistik(self):
+        """
+        Gibt die Trefferstatistik des Caches zurück.
+
+        :return: Dictionary mit Treffern, Fehlzugriffen, Verdrängungen, Einträgen, Zeilen und Trefferquote
+        """
+        with self._lock:
+            zugriffe = self.treffer + self.fehlzugriffe
+            return {
+                "Treffer": self.treffer,
+                "Fehlzugriffe": self.fehlzugriffe,
+                "Verdrängungen": self.verdraengungen,
+                "Einträge": len(self._eintraege),
+                "Zeilen": self._zeilen,
+                "Trefferquote": self.treffer / zugriffe if zugriffe else 0.0,
+            }
+
+    def schliessen(self):
+        """Schließt die Beobachterverbindung."""
+        with self._beobachter_lock:
+            if self._beobachter is not None:
+                self._beobachter.close()
+                self._beobachter = None
@@ -0,0 +1,380 @@
+import os
+import re
+import csv
+import gzip
+import shutil
+import threading
+from datetime import date, datetime
+from ereignisse import Ereignis, Aktion, Ergebnis
+
+PARTITION_ENDUNG = ".jsonl"  # Neue Tagesdateien werden als JSON-Lines geschrieben
+ENDUNGEN = (".csv", ".jsonl")  # Ältere Tagesdateien im CSV-Format werden weiterhin gelesen
+
+_rotations_lock = threading.Lock()
+
+
+def _als_datum(wert):
+    """
+    Wandelt ein Datum oder einen Zeitstempel-Text in ein date-Objekt um.
+
+    :param wert: date, datetime oder Text im Format "YYYY-MM-DD[ HH:MM:SS]"
+    :return: Das Datum oder None
+    """
+    if wert is None or isinstance(wert, date) and not isinstance(wert, datetime):
+        return wert
+    if isinstance(wert, datetime):
+        return wert.date()
+    return datetime.strptime(str(wert)[:10], "%Y-%m-%d").date()
+
+
+def partition_pfad(log_path, datum, komprimiert=False, endung=PARTITION_ENDUNG):
+    """
+    Gibt den Pfad der Tagesdatei für ein Datum zurück, z.B. logs/log_protokoll_2025-02-03.jsonl(.gz).
+
+    :param log_path: Pfad der (bisherigen) Logdatei, aus dem Verzeichnis und Dateiname abgeleitet werden
+    :param datum: Datum der Partition
+    :param komprimiert: True für das gzip-Archiv eines abgeschlossenen Tages
+    :param endung: Dateiendung der Tagesdatei (Standard: JSON-Lines)
+    :return: Pfad der Tagesdatei
+    """
+    basis = os.path.splitext(log_path)[0]
+    pfad = f"{basis}_{_als_datum(datum).isoformat()}{endung}"
+    return pfad + ".gz" if komprimiert else pfad
+
+
+def get_partitionen(log_path, von=None, bis=None):
+    """
+    Ermittelt die Tagesdateien, die sich mit dem angefragten Zeitraum überschneiden.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param von: Optionales erstes Datum (inklusive)
+    :param bis: Optionales letztes Datum (inklusive)
+    :return: Nach Datum sortierte Liste von (Datum, Pfad); je Tag stehen ältere CSV- vor JSON-Lines-Dateien
+             und archivierte vor offenen Dateien
+    """
+    verzeichnis = os.path.dirname(log_path)
+    basis = os.path.splitext(os.path.basename(log_path))[0]
+    endungen = "|".join(re.escape(endung) for endung in ENDUNGEN)
+    muster = re.compile(rf"^{re.escape(basis)}_(\d{{4}}-\d{{2}}-\d{{2}})({endungen})(\.gz)?$")
+    von, bis = _als_datum(von), _als_datum(bis)
+
+    if not os.path.isdir(verzeichnis):
+        return []
+
+    partitionen = []
+    for dateiname in os.listdir(verzeichnis):
+        treffer = muster.match(dateiname)
+        if not treffer:
+            continue
+        datum = _als_datum(treffer.group(1))
+        if (von and datum < von) or (bis and datum > bis):
+            continue
+        # Das Archiv (gz) enthält die älteren Einträge eines Tages und wird zuerst gelesen
+        reihenfolge = (ENDUNGEN.index(treffer.group(2)), 0 if treffer.group(3) else 1)
+        partitionen.append((datum, reihenfolge, os.path.join(verzeichnis, dateiname)))
+
+    return [(datum, pfad) for datum, _, pfad in sorted(partitionen)]
+
+
+def _oeffne(pfad, modus="rt"):
+    """Öffnet eine Tagesdatei und entpackt archivierte Dateien transparent."""
+    if pfad.endswith(".gz"):
+        return gzip.open(pfad, modus, encoding="utf-8", newline="")
+    return open(pfad, modus, encoding="utf-8", newline="")
+
+
+def lies_logdateien(log_path, von=None, bis=None):
+    """
+    Liest die Logeinträge eines Zeitraums. Es werden nur die Tagesdateien geöffnet, die den Zeitraum betreffen.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param von: Optionales erstes Datum (inklusive)
+    :param bis: Optionales letztes Datum (inklusive)
+    :return: Generator über die Einträge als Ereignis-Objekte
+    """
+    for _, _, ereignis in _streame(log_path, von, bis):
+        yield ereignis
+
+
+def _zerlege_cursor(cursor):
+    """
+    Zerlegt einen Lese-Cursor der Form "YYYY-MM-DD:Byte-Position".
+
+    :param cursor: Der Cursor oder None
+    :return: Tupel (Datum, Byte-Position) oder (None, 0)
+    """
+    if not cursor:
+        return None, 0
+    datum, position = cursor.rsplit(":", 1)
+    return _als_datum(datum), int(position)
+
+
+def _ueberspringe(file, anzahl):
+    """
+    Überspringt bis zu anzahl Bytes einer Datei. Archive werden dabei entpackt, unkomprimierte Dateien direkt positioniert.
+
+    :return: Anzahl der tatsächlich übersprungenen Bytes
+    """
+    if anzahl <= 0:
+        return 0
+    if isinstance(file, gzip.GzipFile):
+        uebersprungen = 0
+        while uebersprungen < anzahl:
+            block = file.read(min(anzahl - uebersprungen, 1 << 20))
+            if not block:
+                break
+            uebersprungen += len(block)
+        return uebersprungen
+    uebersprungen = min(anzahl, os.fstat(file.fileno()).st_size)
+    file.seek(uebersprungen)
+    return uebersprungen
+
+
+def _streame(log_path, von=None, bis=None, cursor=None):
+    """
+    Liest die Tagesdateien zeilenweise ab einem Cursor, ohne den Inhalt vollständig in den Speicher zu laden.
+    Die Byte-Position bezieht sich auf den entpackten Inhalt aller Dateien eines Tages (Archiv vor offener Datei).
+
+    :return: Generator über (Datum, Byte-Position nach der Zeile, Ereignis)
+    """
+    start_datum, start_position = _zerlege_cursor(cursor)
+    if start_datum and (von is None or _als_datum(von) < start_datum):
+        von = start_datum
+
+    tage = {}
+    for datum, pfad in get_partitionen(log_path, von, bis):
+        tage.setdefault(datum, []).append(pfad)
+
+    for datum, pfade in sorted(tage.items()):
+        ab = start_position if datum == start_datum else 0
+        position = 0
+        for pfad in pfade:
+            with gzip.open(pfad, "rb") if pfad.endswith(".gz") else open(pfad, "rb") as file:
+                position += _ueberspringe(file, ab - position)
+                if position < ab:
+                    continue
+
+                puffer = b""
+                while True:
+                    zeile = file.readline()
+                    if not zeile.endswith(b"\n"):
+                        # Unvollständige Zeile (wird gerade geschrieben) erst beim nächsten Lesen verarbeiten
+                        break
+                    puffer += zeile
+                    # CSV-Zeilenumbrüche innerhalb eines Feldes: weiterlesen, bis alle Anführungszeichen geschlossen sind
+                    if not puffer.startswith(b"{") and puffer.count(b'"') % 2:
+                        continue
+                    position += len(puffer)
+                    ereignis = Ereignis.aus_text(puffer.decode("utf-8").rstrip("\r\n"))
+                    puffer = b""
+                    if ereignis:
+                        yield datum, position, ereignis
+                if puffer:
+                    break
+
+
+def streame_log(log_path, von=None, bis=None, zeit_von=None, zeit_bis=None, kundennummer=None,
+                aktion=None, code=None, ergebnis=None, barcode=None, bestellgruppe_id=None, cursor=None):
+    """
+    Liest Logeinträge als Datenstrom und wendet die Filter direkt beim Lesen an.
+    Der Speicherbedarf ist unabhängig von der Größe der Logdateien.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param von: Optionales erstes Datum (inklusive)
+    :param bis: Optionales letztes Datum (inklusive)
+    :param zeit_von: Optionale früheste Uhrzeit je Tag ("HH:MM:SS", inklusive)
+    :param zeit_bis: Optionale späteste Uhrzeit je Tag ("HH:MM:SS", inklusive)
+    :param kundennummer: Optionaler Filter auf einen Benutzer
+    :param aktion: Optionaler Text, der in der Meldung enthalten sein muss (ohne Groß-/Kleinschreibung)
+    :param code: Optionaler Aktionscode (Aktion), exakter Vergleich
+    :param ergebnis: Optionales Ergebnis (Ergebnis), exakter Vergleich
+    :param barcode: Optionaler Barcode, exakter Vergleich
+    :param bestellgruppe_id: Optionale Bestellgruppen-ID, exakter Vergleich
+    :param cursor: Optionaler Cursor, ab dem weitergelesen wird
+    :return: Generator über (Cursor nach dem Eintrag, Ereignis)
+    """
+    aktion = aktion.casefold() if aktion else None
+    code = Aktion(code) if code else None
+    ergebnis = Ergebnis(ergebnis) if ergebnis else None
+    barcode = str(barcode) if barcode else None
+    bestellgruppe_id = int(bestellgruppe_id) if bestellgruppe_id else None
+
+    for datum, position, ereignis in _streame(log_path, von, bis, cursor):
+        uhrzeit = ereignis.zeitstempel[11:19]
+        if zeit_von and uhrzeit < zeit_von:
+            continue
+        if zeit_bis and uhrzeit > zeit_bis:
+            continue
+        if kundennummer and ereignis.kundennummer != kundennummer:
+            continue
+        if code and ereignis.aktion != code:
+            continue
+        if ergebnis and ereignis.ergebnis != ergebnis:
+            continue
+        if barcode and ereignis.barcode != barcode:
+            continue
+        if bestellgruppe_id and ereignis.bestellgruppe_id != bestellgruppe_id:
+            continue
+        if aktion and aktion not in (ereignis.text or "").casefold():
+            continue
+        yield f"{datum.isoformat()}:{position}", ereignis
+
+
+def lies_seite(log_path, groesse=100, cursor=None, **filterwerte):
+    """
+    Liest eine Seite gefilterter Logeinträge ab einem Cursor.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param groesse: Anzahl Einträge pro Seite
+    :param cursor: Optionaler Cursor der vorherigen Seite
+    :param filterwerte: Filter wie bei streame_log
+    :return: Tupel (Liste der Einträge, Cursor der nächsten Seite oder None, wenn keine weiteren Einträge folgen)
+    """
+    eintraege = []
+    naechster = None
+    for position, eintrag in streame_log(log_path, cursor=cursor, **filterwerte):
+        if len(eintraege) == groesse:
+            return eintraege, naechster
+        eintraege.append(eintrag)
+        naechster = position
+    return eintraege, None
+
+
+def lies_neue_eintraege(log_path, cursor=None):
+    """
+    Liest nur die seit dem Cursor neu angehängten Bytes (Tail-Modus).
+    Ohne Cursor wird das aktuelle Ende der Logdateien bestimmt, ohne ältere Tage zu lesen.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param cursor: Optionaler Cursor des letzten Aufrufs
+    :return: Tupel (Liste der neuen Einträge, neuer Cursor)
+    """
+    if cursor is None:
+        heute = date.today()
+        position = 0
+        for _, pfad in get_partitionen(log_path, heute, heute):
+            if pfad.endswith(".gz"):
+                with gzip.open(pfad, "rb") as file:
+                    position += _ueberspringe(file, 1 << 62)
+            else:
+                position += os.path.getsize(pfad)
+        return [], f"{heute.isoformat()}:{position}"
+
+    eintraege = []
+    for position, eintrag in streame_log(log_path, cursor=cursor):
+        eintraege.append(eintrag)
+        cursor = position
+    return eintraege, cursor
+
+
+def verfolge_log(log_path, cursor=None, intervall=1.0, abbruch=None):
+    """
+    Verfolgt die Logdateien fortlaufend und liefert neue Einträge, sobald sie geschrieben wurden.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param cursor: Optionaler Startcursor (Standard: aktuelles Ende)
+    :param intervall: Wartezeit zwischen zwei Prüfungen in Sekunden
+    :param abbruch: Optionales threading.Event zum Beenden
+    :return: Generator über neue Einträge
+    """
+    abbruch = abbruch or threading.Event()
+    if cursor is None:
+        _, cursor = lies_neue_eintraege(log_path)
+    while not abbruch.is_set():
+        eintraege, cursor = lies_neue_eintraege(log_path, cursor)
+        yield from eintraege
+        abbruch.wait(intervall)
+
+
+def tages_ziel(log_path):
+    """
+    Erzeugt eine Schreibfunktion, die Protokolleinträge in die Tagesdatei ihres Zeitstempels schreibt.
+    Beginnt ein neuer Tag, werden die abgeschlossenen Tage archiviert.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :return: Funktion, die eine Liste von Ereignissen (oder Zeilen im alten Format) schreibt
+    """
+    zustand = {"letzter_tag": None}
+
+    def schreibe(eintraege):
+        tage = {}
+        for eintrag in eintraege:
+            ereignis = eintrag if isinstance(eintrag, Ereignis) else Ereignis.aus_zeile(eintrag)
+            tage.setdefault(_als_datum(ereignis.zeitstempel), []).append(ereignis)
+
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        heute = date.today()
+
+        with _rotations_lock:
+            for tag, ereignisse in tage.items():
+                # Nachzügler für bereits archivierte Tage werden als weiteres gzip-Segment angehängt
+                archiv = partition_pfad(log_path, tag, komprimiert=True)
+                pfad = archiv if tag < heute and os.path.exists(archiv) else partition_pfad(log_path, tag)
+                with _oeffne(pfad, "at") as file:
+                    file.writelines(ereignis.als_json() + "\n" for ereignis in ereignisse)
+
+        if zustand["letzter_tag"] != heute:
+            zustand["letzter_tag"] = heute
+            rotiere(log_path, heute)
+
+    return schreibe
+
+
+def rotiere(log_path, heute=None):
+    """
+    Komprimiert die Tagesdateien aller abgeschlossenen Tage mit gzip.
+
+    :param log_path: Pfad der (bisherigen) Logdatei
+    :param heute: Optionales Datum des laufenden Tages (Standard: heute)
+    :return: Liste der erzeugten Archive
+    """
+    heute = _als_datum(heute) or date.today()
+    archive = []
+
+    with _rotations_lock:
+        for datum, pfad in get_partitionen(log_path):
+            if datum >= heute or pfad.endswith(".gz"):
+                continue
+            archiv = pfad + ".gz"
+            # Existiert bereits ein Archiv, wird ein weiteres gzip-Segment angehängt
+            with open(pfad, "rb") as quelle, gzip.open(archiv, "ab") as ziel:
+                shutil.copyfileobj(quelle, ziel)
+            os.remove(pfad)
+            archive.append(archiv)
+
+    return archive
+
+
+def teile_altdatei(log_path):
+    """
+    Verteilt eine bestehende, nicht partitionierte Logdatei einmalig auf Tagesdateien und entfernt sie anschließend.
+
+    :param log_path: Pfad der bisherigen Logdatei
+    :return: Anzahl der übernommenen Einträge
+    """
+    if not os.path.exists(log_path):
+        return 0
+
+    ziel = tages_ziel(log_path)
+    anzahl = 0
+    block = []
+    with open(log_path, encoding="utf-8", newline="") as file:
+        for zeile in csv.reader(file):
+            if len(zeile) != 3:
+                continue
+            try:
+                _als_datum(zeile[0])
+            except ValueError:
+                continue
+            block.append(zeile)
+            if len(block) >= 5000:
+                ziel(block)
+                anzahl += len(block)
+                block = []
+    if block:
+        ziel(block)
+        anzahl += len(block)
+
+    os.remove(log_path)
+    print(f"Logdatei {log_path} in Tagesdateien aufgeteilt: {anzahl} Einträge")
+    return anzahl
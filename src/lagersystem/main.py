@@ -5,13 +5,16 @@ import time
 import sqlite3
 import csv
 import random
+import re
+import os
 from datetime import datetime
-from admin import Admin
-from anmeldung import Anmeldung
-from automat import Automat
-from lager import Lager
-from datenbank import Datenbank
-from warnung import Warnung
+from dienste import get_dienste
+from warnung import WARNUNGSARTEN, STATUS_ABGELAUFEN
+from benachrichtigungen import ABGELAUFEN, BALD_ABLAUFEND
+from kanaele import KANAL_KAPAZITAET
+from ereignisse import Aktion, Ergebnis
+from protokoll import AKTIONSTYPEN, AKTIONSTYP_SONSTIGE
+from wareneingang import importiere_lieferung, fehlerbericht_csv
 import traceback
 
 
@@ -20,12 +23,106 @@ st.set_page_config(page_title="Lagersystem für Medikamente", layout="centered")
 
 
 
-admin = Admin()
-anmeldung = Anmeldung()
-lager = Lager()
-automat = Automat()
-datenbank = Datenbank()
-warnung = Warnung()     
+# Fachobjekte werden pro Prozess nur einmal erzeugt und bei jedem Rerun wiederverwendet
+dienste = get_dienste()
+admin = dienste.admin
+anmeldung = dienste.anmeldung
+lager = dienste.lager
+automat = dienste.automat
+datenbank = dienste.datenbank
+warnung = dienste.warnung
+benachrichtigungen = dienste.benachrichtigungen
+ablaufplaner = dienste.ablaufplaner
+# Der Ablaufplaner rückt im Hintergrund den Stichtag vor und zählt die Warnungen nach Datenänderungen neu,
+# die Hinweise auf den Seiten lesen nur seinen zuletzt ermittelten Stand
+warnungsstand = ablaufplaner.get_stand()
+
+LOG_SEITENGROESSE = 200  # Anzahl Logeinträge pro Seite in der Admin-Ansicht
+LAGER_SEITENGROESSE = 100  # Anzahl Medikamente pro Seite in den Bestandsansichten
+SORTIEROPTIONEN = {"Barcode": "barcode", "Name": "name", "Verfallsdatum": "verfallsdatum"}
+NAMENSVORSCHLAEGE = 20  # Maximale Anzahl Vorschläge der Namenssuche
+
+
+def zeige_lagerbestand(schluessel, barcode_filter=None, ort_filter=None, kanal_filter=None, height=300, name_filter=None):
+    """
+    Zeigt den Lagerbestand seitenweise mit Sortierung und Gesamtanzahl an.
+    Pro Seite werden nur LAGER_SEITENGROESSE Zeilen geladen, die Cursor der Seiten liegen im Session State.
+
+    :param schluessel: Eindeutiger Präfix für Widgets und Session State der Ansicht
+    :param barcode_filter: Optionaler Filter für Barcode
+    :param ort_filter: Optionaler Filter für Lagerort
+    :param kanal_filter: Optionaler Filter für einen Automatenkanal
+    :param height: Höhe der Tabelle in Pixeln
+    :param name_filter: Optionaler exakter Medikamentenname
+    :return: Gesamtanzahl der gefundenen Medikamente oder None bei ungültigem Filter
+    """
+    col_sortierung, col_richtung = st.columns([2, 1])
+    with col_sortierung:
+        sortierung = st.selectbox("↕️ Sortieren nach", list(SORTIEROPTIONEN), key=f"{schluessel}_sortierung")
+    with col_richtung:
+        absteigend = st.checkbox("🔽 Absteigend", key=f"{schluessel}_absteigend")
+
+    # Bei geänderten Filtern oder geänderter Sortierung wieder auf der ersten Seite beginnen
+    ansicht = (barcode_filter, ort_filter, kanal_filter, name_filter, sortierung, absteigend)
+    if st.session_state.get(f"{schluessel}_ansicht") != ansicht:
+        st.session_state[f"{schluessel}_ansicht"] = ansicht
+        st.session_state[f"{schluessel}_cursor"] = [None]
+    cursor = st.session_state[f"{schluessel}_cursor"]
+
+    seite, naechster_cursor = lager.get_lagerbestand_seite(
+        groesse=LAGER_SEITENGROESSE,
+        nach=cursor[-1],
+        sortierung=SORTIEROPTIONEN[sortierung],
+        absteigend=absteigend,
+        barcode_filter=barcode_filter,
+        ort_filter=ort_filter,
+        kanal_filter=kanal_filter,
+        name_filter=name_filter,
+    )
+    if isinstance(seite, str):
+        st.error(seite)
+        return None
+
+    gesamt = lager.zaehle_lagerbestand(barcode_filter, ort_filter, kanal_filter, name_filter)
+    if seite.empty:
+        return gesamt
+
+    st.dataframe(seite, use_container_width=True, height=height)
+    seiten = max(1, -(-gesamt // LAGER_SEITENGROESSE))
+    st.caption(f"Seite {len(cursor)} von {seiten} · {gesamt} Medikamente")
+
+    col_zurueck, col_weiter = st.columns([1, 1])
+    with col_zurueck:
+        if st.button("⬅️ Vorherige Seite", disabled=len(cursor) == 1, key=f"{schluessel}_zurueck"):
+            cursor.pop()
+            st.rerun()
+    with col_weiter:
+        if st.button("➡️ Nächste Seite", disabled=naechster_cursor is None, key=f"{schluessel}_weiter"):
+            cursor.append(naechster_cursor)
+            st.rerun()
+    return gesamt
+
+
+def waehle_artikelname(schluessel, alle="Alle", ohne_bestand=False):
+    """
+    Sucht Medikamentennamen während der Eingabe im Volltextindex und bietet die Treffer zur Auswahl an.
+    Statt aller Namen werden pro Eingabe nur die NAMENSVORSCHLAEGE besten Treffer geladen.
+
+    :param schluessel: Eindeutiger Präfix für die Widgets
+    :param alle: Auswahloption für alle Treffer
+    :param ohne_bestand: Im gesamten Artikelstamm suchen, auch nach Artikeln ohne Bestand
+    :return: Tupel (Suchtext, Liste der Treffer, ausgewählter Name oder der Wert von alle)
+    """
+    suchtext = st.text_input(
+        "🔎 Artikelname suchen",
+        key=f"{schluessel}_suchtext",
+        help="Anfang eines oder mehrerer Wörter eingeben, z. B. 'ibu 400' für 'Ibuprofen 400mg'."
+    )
+    treffer = lager.suche_artikelnamen(suchtext, limit=NAMENSVORSCHLAEGE, ohne_bestand=ohne_bestand) if suchtext else []
+    if suchtext and not treffer:
+        st.info("🔍 Kein passender Artikelname gefunden.")
+    auswahl = st.selectbox("🆔 Artikelname auswählen", [alle] + treffer, key=f"{schluessel}_auswahl")
+    return suchtext, treffer, auswahl
 
 
 # **Streamlit Custom Styles für ein seriöses Design**
@@ -130,12 +227,12 @@ if not st.session_state.authenticated:
                     st.session_state.authenticated = True
                     st.session_state.kundennummer = user_data[0]
                     st.session_state.username = username
-                    datenbank.log_aktion("✅ User-Login erfolgreich")
+                    datenbank.log_aktion("✅ User-Login erfolgreich", code=Aktion.USER_LOGIN)
                     st.toast("✅ Erfolgreich angemeldet!", icon="✅")
                     time.sleep(0.75)
                     st.rerun()
                 else:
-                    datenbank.log_aktion("🚫 User-Login fehlgeschlagen")
+                    datenbank.log_aktion("🚫 User-Login fehlgeschlagen", code=Aktion.USER_LOGIN)
                     st.toast("🚫 Falscher Benutzername oder Passwort!", icon="🚫")
 
         # **Benutzer-Registrierung**
@@ -151,13 +248,13 @@ if not st.session_state.authenticated:
                         st.session_state.authenticated = True
                         st.session_state.kundennummer = kundennummer
                         st.session_state.username = new_username
-                        datenbank.log_aktion("✅ Registrierung erfolgreich")
+                        datenbank.log_aktion("✅ Registrierung erfolgreich", code=Aktion.REGISTRIERUNG)
                         time.sleep(0.75)
                         st.rerun()
                     else:
                         st.toast(message, icon="🚫")  # 🚫 Fehlermeldung anzeigen
                 else:
-                    datenbank.log_aktion("🚫 Registrierung fehlgeschlagen")
+                    datenbank.log_aktion("🚫 Registrierung fehlgeschlagen", code=Aktion.REGISTRIERUNG)
                     st.toast("⚠️ Bitte alle Felder ausfüllen!", icon="⚠️")
 
         # **Admin-Login**
@@ -176,12 +273,12 @@ if not st.session_state.authenticated:
                     st.session_state.kundennummer = admin_data[0]
                     st.session_state.username = admin_username
                     st.session_state.role = "admin"
-                    datenbank.log_aktion("✅ Admin-Login erfolgreich")
+                    datenbank.log_aktion("✅ Admin-Login erfolgreich", code=Aktion.ADMIN_LOGIN)
                     st.toast("✅ Erfolgreich als Admin angemeldet!", icon="✅")
                     time.sleep(0.75)
                     st.rerun()
                 else:
-                    datenbank.log_aktion("🚫 Admin-Login fehlgeschlagen")
+                    datenbank.log_aktion("🚫 Admin-Login fehlgeschlagen", code=Aktion.ADMIN_LOGIN)
                     st.toast("🚫 Falscher Admin-Benutzername oder Passwort!", icon="🚫")
 
 elif st.session_state.authenticated and st.session_state.role == "admin":
@@ -194,7 +291,8 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
         admin_menu = {
             "📋 Bestellungen": "📋 Bestellungen",
             "📜 Logdatei": "📜 Logdatei",
-            "👥 Benutzerverwaltung": "👥 Benutzerverwaltung"
+            "👥 Benutzerverwaltung": "👥 Benutzerverwaltung",
+            "🩺 Diagnose": "🩺 Diagnose"
         }
         choice = st.sidebar.radio("**Wählen Sie eine Option:**", list(admin_menu.keys()), format_func=lambda x: admin_menu[x])
 
@@ -218,7 +316,7 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
         # **Logout-Button am unteren Rand mit Icon**
         if st.sidebar.button("🚪 Abmelden", help="Sicher abmelden", use_container_width=True, key="logout_button"):
             st.session_state.authenticated = False
-            datenbank.log_aktion("✅ Admin-Logout erfolgreich")
+            datenbank.log_aktion("✅ Admin-Logout erfolgreich", code=Aktion.LOGOUT)
             st.session_state.kundennummer = None
             st.session_state.username = None
             st.session_state.role = None
@@ -249,11 +347,11 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
 
                 if not bestellungen.empty:
                     st.dataframe(bestellungen, use_container_width=True)
-                    datenbank.log_aktion(f"📋 Admin hat Bestellungen gefiltert: Bestell-ID: {bestell_id_filter}, Status: {ausgewählter_status}")
+                    datenbank.log_aktion(f"📋 Admin hat Bestellungen gefiltert: Bestell-ID: {bestell_id_filter}, Status: {ausgewählter_status}", code=Aktion.ANSICHT)
                 else:
                     st.error("🚫 Keine Bestellungen für die gewählten Kriterien gefunden.")
                     st.toast("🚫 Keine Bestellungen für die gewählten Kriterien gefunden!", icon="🚫")
-                    datenbank.log_aktion(f"🚫 Keine Bestellungen gefunden für Bestell-ID: {bestell_id_filter}, Status: {ausgewählter_status}")
+                    datenbank.log_aktion(f"🚫 Keine Bestellungen gefunden für Bestell-ID: {bestell_id_filter}, Status: {ausgewählter_status}", code=Aktion.ANSICHT)
 
             # ✅ TAB 2: Offene Bestellungen genehmigen
             with tab2:
@@ -270,14 +368,14 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
                     if st.button("✔️ Genehmigen", use_container_width=True):
                             admin.update_bestellstatus(bestell_id, "Genehmigt")
                             st.toast(f"✅ Bestellung {bestell_id} genehmigt!", icon="✅")
-                            datenbank.log_aktion(f"✅ Bestellung {bestell_id} wurde genehmigt")
+                            datenbank.log_aktion(f"✅ Bestellung {bestell_id} wurde genehmigt", code=Aktion.BESTELLSTATUS_GEAENDERT, bestellgruppe_id=bestell_id)
                             time.sleep(0.75)
                             st.rerun()
 
                 else:
                     st.error("🚫 Keine offenen Bestellungen vorhanden.")
                     st.toast("🚫 Keine offenen Bestellungen im System!", icon="🚫")
-                    datenbank.log_aktion("🚫 Keine offenen Bestellungen gefunden.")
+                    datenbank.log_aktion("🚫 Keine offenen Bestellungen gefunden.", code=Aktion.ANSICHT)
 
 
 
@@ -312,39 +410,103 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
                         help="Endzeit des gewünschten Zeitraums auswählen."
                     )
 
-            # **Daten aus Logdatei abrufen**
-            logs = admin.get_logdatei()
+                col4, col5, col6, col7 = st.columns([1, 1, 1, 1])
+
+                with col4:
+                    kundennummer_filter = st.text_input(
+                        "👤 Kundennummer",
+                        key="log_kunden_filter",
+                        help="Nur Logeinträge dieses Benutzers anzeigen (leer = alle)."
+                    )
+
+                with col5:
+                    aktionstyp_filter = st.selectbox(
+                        "🏷️ Aktionstyp",
+                        ["Alle"] + [aktionstyp for aktionstyp, _ in AKTIONSTYPEN] + [AKTIONSTYP_SONSTIGE],
+                        key="log_typ_filter"
+                    )
+
+                with col6:
+                    code_filter = st.selectbox(
+                        "🔖 Aktion",
+                        ["Alle"] + [aktion.value for aktion in Aktion],
+                        key="log_code_filter"
+                    )
+
+                with col7:
+                    ergebnis_filter = st.selectbox(
+                        "🎯 Ergebnis",
+                        ["Alle"] + [ergebnis.value for ergebnis in Ergebnis],
+                        key="log_ergebnis_filter"
+                    )
+
+            # **Zeitraum als Bereichsabfrage an die Datenbank übergeben**
+            selected_date_str = selected_date.strftime('%Y-%m-%d')
+            von = f"{selected_date_str} {start_time.strftime('%H:%M')}:00"
+            bis = f"{selected_date_str} {end_time.strftime('%H:%M')}:59"
 
-            if logs.empty:
+            if not admin.hat_logeintraege():
                 st.info("🔍 Keine Logeinträge vorhanden.")
                 st.toast("ℹ️ Es sind keine Logeinträge vorhanden.", icon="ℹ️")
-                datenbank.log_aktion("🚫 Keine Logeinträge gefunden.")
+                datenbank.log_aktion("🚫 Keine Logeinträge gefunden.", code=Aktion.ANSICHT)
             else:
-                # **Datum in das passende Format umwandeln**
-                selected_date_str = selected_date.strftime('%Y-%m-%d')
-
-                # **Logdatei nach Datum filtern**
-                filtered_logs = logs[logs["Zeitstempel"].str.startswith(selected_date_str)]
+                # **Seitenweise Anzeige: Cursor je Seite merken, bei geänderten Filtern neu beginnen**
+                log_filter = (von, bis, kundennummer_filter.strip(), aktionstyp_filter, code_filter, ergebnis_filter)
+                if st.session_state.get("log_filter") != log_filter:
+                    st.session_state.log_filter = log_filter
+                    st.session_state.log_cursor = [None]
+
+                filtered_logs, naechster_cursor = admin.get_logseite(
+                    nach=st.session_state.log_cursor[-1],
+                    groesse=LOG_SEITENGROESSE,
+                    von=von,
+                    bis=bis,
+                    kundennummer=kundennummer_filter.strip() or None,
+                    aktionstyp=aktionstyp_filter,
+                    code=code_filter,
+                    ergebnis=ergebnis_filter,
+                )
 
+                # 📊 Gefilterte Logs anzeigen
                 if not filtered_logs.empty:
-                    # 🕒 Zeitstempel umwandeln in Uhrzeit-Format für weitere Filterung
-                    filtered_logs["Uhrzeit"] = pd.to_datetime(filtered_logs["Zeitstempel"]).dt.time
-
-                    # 🕒 Logeinträge nach Start- und Endzeit filtern
-                    filtered_logs = filtered_logs[
-                        (filtered_logs["Uhrzeit"] >= start_time) & 
-                        (filtered_logs["Uhrzeit"] <= end_time)
-                    ]
-
-                    # 📊 Gefilterte Logs anzeigen
-                    if not filtered_logs.empty:
-                        st.dataframe(filtered_logs.drop(columns=["Uhrzeit"]), use_container_width=True)
-                        st.toast(f"📜 {len(filtered_logs)} Logeinträge für {selected_date_str} zwischen {start_time} - {end_time} gefunden!", icon="📜")
-                        datenbank.log_aktion(f"📜 Admin hat Logeinträge für {selected_date_str} von {start_time} bis {end_time} aufgerufen.")
-                    else:
-                        st.warning(f"🚫 Keine Logeinträge für {selected_date_str} zwischen {start_time} und {end_time} gefunden.")
-                        st.toast(f"🚫 Keine Logeinträge im gewählten Zeitraum!", icon="⚠️")
-                        datenbank.log_aktion(f"🚫 Keine Logeinträge für {selected_date_str} zwischen {start_time} und {end_time} gefunden.")
+                    seite = len(st.session_state.log_cursor)
+                    st.dataframe(filtered_logs, use_container_width=True)
+                    st.caption(f"Seite {seite} · {len(filtered_logs)} Einträge")
+
+                    col_zurueck, col_weiter = st.columns([1, 1])
+                    with col_zurueck:
+                        if st.button("⬅️ Vorherige Seite", disabled=seite == 1, key="log_zurueck"):
+                            st.session_state.log_cursor.pop()
+                            st.rerun()
+                    with col_weiter:
+                        if st.button("➡️ Nächste Seite", disabled=naechster_cursor is None, key="log_weiter"):
+                            st.session_state.log_cursor.append(naechster_cursor)
+                            st.rerun()
+
+                    st.toast(f"📜 {len(filtered_logs)} Logeinträge für {selected_date_str} zwischen {start_time} - {end_time} gefunden!", icon="📜")
+                    datenbank.log_aktion(f"📜 Admin hat Logeinträge für {selected_date_str} von {start_time} bis {end_time} aufgerufen.", code=Aktion.ANSICHT)
+                else:
+                    st.warning(f"🚫 Keine Logeinträge für {selected_date_str} zwischen {start_time} und {end_time} gefunden.")
+                    st.toast(f"🚫 Keine Logeinträge im gewählten Zeitraum!", icon="⚠️")
+                    datenbank.log_aktion(f"🚫 Keine Logeinträge für {selected_date_str} zwischen {start_time} und {end_time} gefunden.", code=Aktion.ANSICHT)
+
+            # 🔴 Live-Protokoll: liest nur die seit dem letzten Abruf angehängten Einträge
+            with st.expander("🔴 Live-Protokoll", expanded=False):
+                if "log_live_cursor" not in st.session_state:
+                    _, st.session_state.log_live_cursor = admin.get_neue_logeintraege()
+                    st.session_state.log_live = []
+
+                if st.button("🔄 Neue Einträge laden", key="log_live_laden"):
+                    neue_logs, st.session_state.log_live_cursor = admin.get_neue_logeintraege(st.session_state.log_live_cursor)
+                    st.session_state.log_live = (st.session_state.log_live + neue_logs.values.tolist())[-LOG_SEITENGROESSE:]
+
+                if st.session_state.log_live:
+                    st.dataframe(
+                        pd.DataFrame(st.session_state.log_live, columns=["Zeitstempel", "Benutzer", "Aktion"]),
+                        use_container_width=True,
+                    )
+                else:
+                    st.caption("Seit dem Öffnen der Seite wurden keine neuen Einträge geschrieben.")
 
 
 
@@ -356,7 +518,7 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
             if users_df.empty:
                 st.info("🔍 Keine Benutzer gefunden.")
                 st.toast("ℹ️ Es sind keine Benutzer im System registriert.", icon="ℹ️")
-                datenbank.log_aktion("🚫 Keine Benutzer im System gefunden.")
+                datenbank.log_aktion("🚫 Keine Benutzer im System gefunden.", code=Aktion.ANSICHT)
             else:
                 with st.expander("🔍 Benutzername suchen", expanded=True):
                     username_search = st.text_input("🔍 Benutzername eingeben:", help="Geben Sie einen Benutzernamen ein, um nach einem bestimmten Benutzer zu suchen.")
@@ -365,11 +527,32 @@ elif st.session_state.authenticated and st.session_state.role == "admin":
 
                 if not filtered_users.empty:
                     st.dataframe(filtered_users, use_container_width=True)
-                    datenbank.log_aktion(f"👥 Admin hat Benutzer gesucht: {username_search}")
+                    datenbank.log_aktion(f"👥 Admin hat Benutzer gesucht: {username_search}", code=Aktion.ANSICHT)
                 else:
                     st.warning("🚫 Keine Benutzer mit diesem Namen gefunden.")
                     st.toast("🚫 Kein Benutzer mit diesem Namen gefunden!", icon="⚠️")
-                    datenbank.log_aktion(f"🚫 Benutzername nicht gefunden: {username_search}")
+                    datenbank.log_aktion(f"🚫 Benutzername nicht gefunden: {username_search}", code=Aktion.ANSICHT)
+
+
+        elif admin_menu[choice] == "🩺 Diagnose":
+            st.subheader("🩺 Diagnose")
+
+            # ⏱ Bereitstellung der Fachobjekte: einmaliger Kaltstart und zuletzt gemessener Warmstart
+            with st.expander("⏱ Dienste", expanded=True):
+                zeiten = dienste.zeitmessung()
+                col1, col2 = st.columns(2)
+                col1.metric("Kaltstart", f"{zeiten['Kaltstart']:.5f} s")
+                col2.metric("Warmstart", f"{zeiten['Warmstart']:.5f} s")
+
+            # 🗃 Trefferstatistik des gemeinsamen Lesecaches seit dem Start des Prozesses
+            with st.expander("🗃 Lesecache", expanded=True):
+                lesecache = datenbank.pool.lesecache.statistik()
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Treffer", lesecache["Treffer"])
+                col2.metric("Fehlzugriffe", lesecache["Fehlzugriffe"])
+                col3.metric("Verdrängungen", lesecache["Verdrängungen"])
+                col4.metric("Trefferquote", f"{lesecache['Trefferquote']:.0%}")
+                st.caption(f"{lesecache['Einträge']} Einträge mit {lesecache['Zeilen']} Zeilen im Cache.")
 
 
 else:
@@ -377,6 +560,17 @@ else:
         if "warenkorb" not in st.session_state:
             st.session_state.warenkorb = []
 
+        # 🔔 Neue Warnungen des Ablaufplaners als Toast anzeigen (nur ein Zahlenvergleich, solange nichts Neues vorliegt)
+        if "benachrichtigungen_abo" not in st.session_state:
+            st.session_state.benachrichtigungen_abo = benachrichtigungen.abonnieren()
+
+        @st.fragment(run_every=ablaufplaner.intervall)
+        def zeige_benachrichtigungen():
+            for ereignis in benachrichtigungen.abholen(st.session_state.benachrichtigungen_abo):
+                st.toast(ereignis["Text"], icon="🔔")
+
+        zeige_benachrichtigungen()
+
         with st.sidebar:
             # **Menü mit Icons und besserer Abtrennung**
             st.markdown("""
@@ -412,7 +606,7 @@ else:
             # **Logout-Button am unteren Rand mit Icon**
             if st.button("🚪 Abmelden", help="Klicken Sie hier, um sich sicher abzumelden", use_container_width=True, key="logout_button"):
                 st.session_state.authenticated = False
-                datenbank.log_aktion("✅ User-Logout erfolgreich")
+                datenbank.log_aktion("✅ User-Logout erfolgreich", code=Aktion.LOGOUT)
                 st.session_state.kundennummer = None
                 st.session_state.username = None
                 st.session_state.role = None
@@ -433,10 +627,9 @@ else:
                 st.subheader("📋 Gesamtübersicht der Medikamente")
 
                 # 🔔 Warnungen für abgelaufene Medikamente anzeigen
-                warnungen = warnung.get_warnungen()
-                if not warnungen.empty:
+                if any(anzahl for (thema, _), anzahl in warnungsstand.items() if thema == ABGELAUFEN):
                     st.warning("⚠️ Es gibt abgelaufene Medikamente! Überprüfen Sie den Reiter 'Warnungen verwalten'.")
-                    datenbank.log_aktion("⚠️ Benutzer hat die Gesamtübersicht aufgerufen - Abgelaufene Medikamente vorhanden")
+                    datenbank.log_aktion("⚠️ Benutzer hat die Gesamtübersicht aufgerufen - Abgelaufene Medikamente vorhanden", code=Aktion.ANSICHT)
 
                 # 🔍 Expander für Suche & Filteroptionen
                 with st.expander("🔍 Such- & Filteroptionen anzeigen", expanded=True):
@@ -445,7 +638,7 @@ else:
                     with col1:
                         barcode_search_startseite = st.text_input(
                             "🔍 Barcode suchen", 
-                            help="Scannen oder geben Sie einen Barcode ein, um gezielt nach Medikamenten zu suchen."
+                            help="Scannen oder geben Sie einen Barcode ein, um gezielt nach Medikamenten zu suchen. Teilsuche: \"123\" = beginnt mit, \"*123\" = endet auf, \"*123*\" = enthält."
                         )
 
                     with col2:
@@ -456,19 +649,19 @@ else:
                             help="Wählen Sie einen Standort aus, um die Medikamentensuche einzugrenzen."
                         )
 
-                # 📊 Medikamentenbestand abrufen
-                lager_items_startseite = lager.get_lagerbestand(
+                # 📊 Medikamentenbestand seitenweise abrufen
+                anzahl_startseite = zeige_lagerbestand(
+                    "bestand_startseite",
                     barcode_filter=barcode_search_startseite, 
                     ort_filter=ort_filter_startseite
                 )
 
                 # 🚫 Falls keine Medikamente gefunden werden
-                if lager_items_startseite.empty:
+                if anzahl_startseite == 0:
                     st.error("🚫 Keine Medikamente gefunden! Bitte überprüfen Sie Ihre Suchkriterien.")
-                    datenbank.log_aktion(f"🔍 Keine Medikamente gefunden für Filter - Barcode: {barcode_search_startseite}, Ort: {ort_filter_startseite}")
-                else:
-                    st.dataframe(lager_items_startseite, use_container_width=True, height=300)
-                    datenbank.log_aktion(f"📊 Benutzer hat Medikamente gefiltert - Barcode: {barcode_search_startseite}, Ort: {ort_filter_startseite}")
+                    datenbank.log_aktion(f"🔍 Keine Medikamente gefunden für Filter - Barcode: {barcode_search_startseite}, Ort: {ort_filter_startseite}", code=Aktion.ANSICHT)
+                elif anzahl_startseite:
+                    datenbank.log_aktion(f"📊 Benutzer hat Medikamente gefiltert - Barcode: {barcode_search_startseite}, Ort: {ort_filter_startseite}", code=Aktion.ANSICHT)
 
             ### 🔍 TAB 2: Artikelübersicht
             with tab2:
@@ -479,26 +672,39 @@ else:
                     col1 = st.columns(1)[0]  # Bessere Strukturierung der Auswahl
 
                     with col1:
-                        artikel_namen = lager.get_artikel_namen()
-                        artikel_namen.insert(0, "Alle")  # "Alle" als Standardoption
-                        selected_artikel = st.selectbox(
-                            "🆔 Artikelname auswählen", 
-                            artikel_namen, 
-                            help="Wählen Sie einen spezifischen Artikel oder 'Alle', um alle Artikel anzuzeigen."
-                        )
+                        suchtext, treffer, selected_artikel = waehle_artikelname("artikeluebersicht")
 
                 # 📊 Artikelbestand abrufen & nach Namen filtern
                 artikel_anzahl = lager.get_artikel_anzahl()
                 if selected_artikel != "Alle":
                     artikel_anzahl = artikel_anzahl[artikel_anzahl["Name"] == selected_artikel]
+                elif suchtext:
+                    artikel_anzahl = artikel_anzahl[artikel_anzahl["Name"].isin(treffer)]
 
                 # 🚫 Falls keine Artikel gefunden wurden
                 if artikel_anzahl.empty:
                     st.error("🚫 Keine Artikel gefunden! Bitte überprüfen Sie Ihre Auswahl.")
-                    datenbank.log_aktion(f"🔍 Keine Artikel gefunden für Auswahl: {selected_artikel}")
+                    datenbank.log_aktion(f"🔍 Keine Artikel gefunden für Auswahl: {selected_artikel}", code=Aktion.ANSICHT)
                 else:
                     st.dataframe(artikel_anzahl, use_container_width=True, height=300)
-                    datenbank.log_aktion(f"📊 Benutzer hat Artikel gefiltert: {selected_artikel}")
+                    datenbank.log_aktion(f"📊 Benutzer hat Artikel gefiltert: {selected_artikel}", code=Aktion.ANSICHT)
+
+                # 🛠 Expander für die Prüfung der fortgeschriebenen Bestandssummen
+                with st.expander("🛠 Bestandssummen prüfen", expanded=False):
+                    st.write("Die Artikelübersicht liest fortgeschriebene Summen. Hier können diese mit dem Lagerbestand abgeglichen werden.")
+
+                    col1, col2 = st.columns([1, 1])
+                    with col1:
+                        if st.button("🔍 Summen prüfen", key="btn_artikelbestand_pruefen", use_container_width=True):
+                            abweichungen = lager.pruefe_artikelbestand()
+                            if abweichungen:
+                                st.warning(f"⚠️ {len(abweichungen)} Einträge weichen vom Lagerbestand ab. Bitte neu aufbauen.")
+                            else:
+                                st.success("✅ Die Bestandssummen stimmen mit dem Lagerbestand überein.")
+                    with col2:
+                        if st.button("🔄 Summen neu aufbauen", key="btn_artikelbestand_neu", use_container_width=True):
+                            message = lager.artikelbestand_neu_aufbauen()
+                            st.toast(message, icon="🚫" if "Fehler" in message else "✅")
 
 
 
@@ -512,10 +718,9 @@ else:
                 st.subheader("📦 Verfügbare Medikamente im Lager")
 
                 # 🔔 Warnungen für abgelaufene Medikamente anzeigen
-                warnungen = warnung.get_warnungen(ort_filter="Lager")
-                if not warnungen.empty:
+                if warnungsstand.get((ABGELAUFEN, "Lager")):
                     st.warning("⚠️ Achtung: Es gibt abgelaufene Medikamente im Lager!")
-                    datenbank.log_aktion("⚠️ Benutzer hat Lagerbestand aufgerufen - Abgelaufene Medikamente vorhanden")
+                    datenbank.log_aktion("⚠️ Benutzer hat Lagerbestand aufgerufen - Abgelaufene Medikamente vorhanden", code=Aktion.ANSICHT)
 
                 # 🔍 Expander für Barcode-Suche & Filter
                 with st.expander("🔍 Lagerbestand durchsuchen", expanded=True):
@@ -525,23 +730,23 @@ else:
                     barcode_search = st.text_input(
                             "🔍 Barcode eingeben", 
                             key="barcode_search_lager",
-                            help="Scannen oder geben Sie einen Barcode ein, um ein Medikament zu finden."
+                            help="Scannen oder geben Sie einen Barcode ein, um ein Medikament zu finden. Teilsuche: \"123\" = beginnt mit, \"*123\" = endet auf, \"*123*\" = enthält."
                         )
                         
 
-                # 📊 Lagerbestand abrufen
-                lager_items = lager.get_lagerbestand(
+                # 📊 Lagerbestand seitenweise abrufen
+                anzahl_lager = zeige_lagerbestand(
+                    "bestand_lager",
                     barcode_filter=barcode_search, 
-                    ort_filter = "Lager"
+                    ort_filter="Lager"
                 )
 
                 # 🚫 Falls keine Medikamente gefunden werden
-                if lager_items.empty:
+                if anzahl_lager == 0:
                     st.error("🚫 Keine Medikamente gefunden.")
-                    datenbank.log_aktion(f"🔍 Keine Medikamente gefunden - Barcode: {barcode_search}")
-                else:
-                    st.dataframe(lager_items, use_container_width=True, height=300)
-                    datenbank.log_aktion(f"📊 Benutzer hat Lagerbestand gefiltert - Barcode: {barcode_search}")
+                    datenbank.log_aktion(f"🔍 Keine Medikamente gefunden - Barcode: {barcode_search}", code=Aktion.ANSICHT)
+                elif anzahl_lager:
+                    datenbank.log_aktion(f"📊 Benutzer hat Lagerbestand gefiltert - Barcode: {barcode_search}", code=Aktion.ANSICHT)
 
             # ⚙️ TAB 2: Aktionen (Hinzufügen/Entfernen)
             with tab2:
@@ -581,14 +786,59 @@ else:
 
                                 if "Fehler" in message:
                                     st.toast(f" {message}", icon="🚫")
-                                    datenbank.log_aktion(f"🚫 Fehler beim Hinzufügen von {name} - {message}")
+                                    datenbank.log_aktion(f"🚫 Fehler beim Hinzufügen von {name} - {message}", code=Aktion.WARE_EINGELAGERT, barcode=barcode)
                                 else:
                                     st.toast(f"✅ Medikament erfolgreich hinzugefügt!", icon="✅")
-                                    datenbank.log_aktion(f"✅ Medikament {name} wurde erfolgreich hinzugefügt.")
+                                    datenbank.log_aktion(f"✅ Medikament {name} wurde erfolgreich hinzugefügt.", code=Aktion.WARE_EINGELAGERT, barcode=barcode)
 
                                 time.sleep(0.75)  # ⏳ Kurzes Delay für UI-Aktualisierung
                                 st.rerun()
 
+                # 📥 Expander für den Import einer ganzen Lieferung
+                with st.expander("📥 Lieferung importieren", expanded=False):
+                    st.write("Laden Sie einen Lieferschein als CSV- oder Excel-Datei mit den Spalten Barcode, Name und Verfallsdatum hoch.")
+
+                    lieferung = st.file_uploader(
+                        "📄 Lieferschein auswählen",
+                        type=["csv", "xlsx"],
+                        key="upload_lieferung",
+                        help="Die Datei wird blockweise gelesen und in einzelnen Transaktionen eingelagert."
+                    )
+
+                    if lieferung is not None and st.button("📥 Lieferung einlagern", key="btn_import_lieferung", use_container_width=True):
+                        fortschrittsbalken = st.progress(0.0, text="📥 Lieferung wird eingelagert...")
+                        start_time = time.time()
+                        try:
+                            bericht = importiere_lieferung(
+                                lager, lieferung, lieferung.name,
+                                fortschritt=lambda anteil, anzahl: fortschrittsbalken.progress(
+                                    anteil, text=f"📥 {anzahl} Zeilen verarbeitet..."
+                                ),
+                            )
+                            fortschrittsbalken.progress(1.0, text=f"✅ {len(bericht)} Zeilen in {time.time() - start_time:.2f} Sekunden verarbeitet")
+                            st.session_state.lieferung_bericht = (lieferung.name, bericht)
+                        except ValueError as fehler:
+                            fortschrittsbalken.empty()
+                            st.error(str(fehler))
+                            datenbank.log_aktion(f"🚫 Fehler beim Import der Lieferung {lieferung.name} - {fehler}", code=Aktion.WARE_EINGELAGERT)
+
+                    # 📊 Ergebnis des letzten Imports (bleibt für den Download des Fehlerberichts erhalten)
+                    if st.session_state.get("lieferung_bericht"):
+                        dateiname, bericht = st.session_state.lieferung_bericht
+                        fehler_anzahl = sum(1 for _, _, meldung in bericht if not meldung.startswith("✅"))
+                        st.success(f"✅ {len(bericht) - fehler_anzahl} von {len(bericht)} Medikamenten aus {dateiname} eingelagert.")
+
+                        if fehler_anzahl:
+                            st.warning(f"⚠️ {fehler_anzahl} Zeilen wurden nicht übernommen.")
+                            st.download_button(
+                                "📄 Fehlerbericht herunterladen",
+                                data=fehlerbericht_csv(bericht),
+                                file_name=f"fehlerbericht_{os.path.splitext(dateiname)[0]}.csv",
+                                mime="text/csv",
+                                key="btn_fehlerbericht",
+                                use_container_width=True
+                            )
+
                 # 🗑 Expander für "Ware entfernen"
                 with st.expander("🗑 Ware entfernen", expanded=True):
                     st.write("Geben Sie den Barcode eines Medikaments ein, um es aus dem Lagerbestand zu entfernen.")
@@ -606,10 +856,10 @@ else:
 
                                 if "Fehler" in message:
                                     st.toast(f" {message}", icon="🚫")
-                                    datenbank.log_aktion(f"🚫 Fehler beim Entfernen von Medikament mit Barcode {barcode_remove} - {message}")
+                                    datenbank.log_aktion(f"🚫 Fehler beim Entfernen von Medikament mit Barcode {barcode_remove} - {message}", code=Aktion.WARE_ENTFERNT, barcode=barcode_remove)
                                 else:
                                     st.toast(f"✅ Medikament erfolgreich entfernt!", icon="✅")
-                                    datenbank.log_aktion(f"✅ Medikament mit Barcode {barcode_remove} erfolgreich entfernt.")
+                                    datenbank.log_aktion(f"✅ Medikament mit Barcode {barcode_remove} erfolgreich entfernt.", code=Aktion.WARE_ENTFERNT, barcode=barcode_remove)
 
                                 time.sleep(0.75)
                                 st.rerun()
@@ -627,10 +877,9 @@ else:
                 st.subheader("📦 Verfügbare Medikamente im Automaten")
 
                 # 🔔 Warnungen für abgelaufene Medikamente anzeigen
-                warnungen = warnung.get_warnungen(ort_filter="Automat")
-                if not warnungen.empty:
+                if warnungsstand.get((ABGELAUFEN, "Automat")):
                     st.warning("⚠️ Achtung: Es gibt abgelaufene Medikamente im Automaten!")
-                    datenbank.log_aktion("⚠️ Benutzer hat Automatenbestand aufgerufen - Abgelaufene Medikamente vorhanden")
+                    datenbank.log_aktion("⚠️ Benutzer hat Automatenbestand aufgerufen - Abgelaufene Medikamente vorhanden", code=Aktion.ANSICHT)
 
                 # 🔍 Expander für Suche & Filteroptionen
                 with st.expander("🔍 Filter- und Suchoptionen ", expanded=True):
@@ -642,7 +891,7 @@ else:
                         barcode_search_automat = st.text_input(
                             "🔍 Barcode eingeben oder scannen",
                             key="barcode_search_automat",
-                            help="Geben Sie einen Barcode ein oder scannen Sie ihn, um gezielt nach einem Medikament zu suchen."
+                            help="Geben Sie einen Barcode ein oder scannen Sie ihn, um gezielt nach einem Medikament zu suchen. Teilsuche: \"123\" = beginnt mit, \"*123\" = endet auf, \"*123*\" = enthält."
                         )
 
                     with col2:
@@ -654,19 +903,21 @@ else:
                             help="Wählen Sie einen spezifischen Kanal, um die Suche einzuschränken."
                         )
 
-                # 📊 Tabelle mit Lagerbestand im Automaten abrufen
-                automat_items = lager.get_lagerbestand(
+                # 📊 Tabelle mit Lagerbestand im Automaten seitenweise abrufen
+                anzahl_automat = zeige_lagerbestand(
+                    "bestand_automat",
                     barcode_filter=barcode_search_automat,
-                    ort_filter="Automat"
+                    ort_filter="Automat",
+                    kanal_filter=kanal_filter,
+                    height=250
                 )
 
                 # 🚫 Falls keine Medikamente gefunden werden
-                if automat_items.empty:
+                if anzahl_automat == 0:
                     st.error("🚫 Keine Medikamente im Automaten gefunden.")
-                    datenbank.log_aktion(f"🔍 Keine Medikamente im Automaten gefunden - Filter: {barcode_search_automat}, Kanal: {kanal_filter}")
-                else:
-                    st.dataframe(automat_items, use_container_width=True, height=250)
-                    datenbank.log_aktion(f"📊 Benutzer hat Automatenbestand gefiltert - Barcode: {barcode_search_automat}, Kanal: {kanal_filter}")
+                    datenbank.log_aktion(f"🔍 Keine Medikamente im Automaten gefunden - Filter: {barcode_search_automat}, Kanal: {kanal_filter}", code=Aktion.ANSICHT)
+                elif anzahl_automat:
+                    datenbank.log_aktion(f"📊 Benutzer hat Automatenbestand gefiltert - Barcode: {barcode_search_automat}, Kanal: {kanal_filter}", code=Aktion.ANSICHT)
 
             # ⚙️ TAB 2: Aktionen (Hinzufügen/Entfernen)
             with tab2:
@@ -692,10 +943,10 @@ else:
 
                                 if "Fehler" in message:
                                     st.toast(f" {message}", icon="🚫")
-                                    datenbank.log_aktion(f"🚫 Fehler beim Verschieben in den Automaten - {message}")
+                                    datenbank.log_aktion(f"🚫 Fehler beim Verschieben in den Automaten - {message}", code=Aktion.AUTOMAT_ZUGABE, barcode=barcode_add)
                                 else:
                                     st.toast(f"✅ Medikament erfolgreich verschoben!", icon="✅")
-                                    datenbank.log_aktion(f"✅ Medikament {barcode_add} erfolgreich in den Automaten verschoben.")
+                                    datenbank.log_aktion(f"✅ Medikament {barcode_add} erfolgreich in den Automaten verschoben.", code=Aktion.AUTOMAT_ZUGABE, barcode=barcode_add)
 
                                 time.sleep(0.75)  # ⏳ Verzögerung für eine sanfte Aktualisierung
                                 st.rerun()
@@ -717,14 +968,88 @@ else:
 
                                 if "Fehler" in message:
                                     st.toast(f"{message}", icon="🚫")
-                                    datenbank.log_aktion(f"🚫 Fehler beim Entfernen aus dem Automaten - {message}")
+                                    datenbank.log_aktion(f"🚫 Fehler beim Entfernen aus dem Automaten - {message}", code=Aktion.AUTOMAT_ENTNAHME, barcode=barcode_remove)
                                 else:
                                     st.toast(f"✅ Medikament erfolgreich entfernt!", icon="✅")
-                                    datenbank.log_aktion(f"✅ Medikament {barcode_remove} erfolgreich aus dem Automaten entfernt.")
+                                    datenbank.log_aktion(f"✅ Medikament {barcode_remove} erfolgreich aus dem Automaten entfernt.", code=Aktion.AUTOMAT_ENTNAHME, barcode=barcode_remove)
 
                                 time.sleep(0.75)  # ⏳ Verzögerung für UI-Aktualisierung
                                 st.rerun()
 
+                # 📥 Mehrfach-Scan: viele Waren in einer Transaktion in den Automaten verschieben
+                with st.expander("📥 Automat befüllen (Mehrfach-Scan)"):
+                    st.write("Scannen Sie beliebig viele Barcodes nacheinander, einen pro Zeile. Alle Waren werden gemeinsam verschoben.")
+
+                    barcodes_scan = st.text_area(
+                        "📌 Barcodes",
+                        key="barcodes_befuellung",
+                        height=150,
+                        help="Der Scanner schließt jeden Barcode mit einem Zeilenumbruch ab."
+                    )
+
+                    if st.button("📥 Alle in den Automaten verschieben", key="btn_befuellen_bulk", use_container_width=True):
+                        gescannt = [barcode for barcode in re.split(r"[\s,;]+", barcodes_scan) if barcode]
+                        if not gescannt:
+                            st.error("🚫 Fehler: Bitte mindestens einen Barcode scannen!")
+                        else:
+                            bericht_befuellung = pd.DataFrame(
+                                automat.befuellen_bulk(gescannt), columns=["Zeile", "Barcode", "Meldung"]
+                            )
+                            verschoben = int(bericht_befuellung["Meldung"].str.startswith("✅").sum())
+                            if verschoben == len(bericht_befuellung):
+                                st.success(f"✅ Alle {verschoben} Medikamente sind im Automaten.")
+                            else:
+                                st.warning(f"⚠️ {verschoben} von {len(bericht_befuellung)} Medikamenten sind im Automaten, die übrigen wurden nicht verschoben.")
+                            st.dataframe(bericht_befuellung, use_container_width=True, height=250)
+
+                # 🔄 Nachfüllplan: zuerst ablaufende Waren für freie Plätze und fehlende Mindestbestände
+                with st.expander("🔄 Automat nachfüllen (FEFO)"):
+                    st.write("Der Plan füllt die Kanäle und fehlende Mindestbestände mit den zuerst ablaufenden Waren aus dem Lager auf.")
+
+                    # Der Plan wird nur auf Anforderung erstellt, nicht bei jedem Neuladen der Seite
+                    if st.button("📋 Plan anzeigen", key="btn_nachfuellplan", use_container_width=True):
+                        st.session_state.nachfuellplan = automat.get_nachfuellplan()
+
+                    nachfuellplan = st.session_state.get("nachfuellplan")
+                    if nachfuellplan is not None and nachfuellplan.empty:
+                        st.info("ℹ️ Im Automaten fehlt nichts, oder das Lager enthält keine passenden Waren.")
+                    elif nachfuellplan is not None:
+                        st.dataframe(nachfuellplan, use_container_width=True, height=250)
+
+                        if st.button(f"🔄 {len(nachfuellplan)} Medikamente nachfüllen", key="btn_nachfuellen", use_container_width=True):
+                            # Der angezeigte Plan wird ausgeführt, die Befüllung prüft jede Ware erneut
+                            bericht_nachfuellung = automat.befuellen_bulk(nachfuellplan["Barcode"].tolist())
+                            del st.session_state.nachfuellplan
+                            verschoben = sum(1 for _, _, meldung in bericht_nachfuellung if meldung.startswith("✅"))
+                            if verschoben == len(bericht_nachfuellung):
+                                st.success(f"✅ {verschoben} Medikamente wurden nachgefüllt.")
+                                time.sleep(0.75)  # ⏳ Verzögerung für UI-Aktualisierung
+                                st.rerun()
+                            else:
+                                st.warning(f"⚠️ {verschoben} von {len(bericht_nachfuellung)} Medikamenten wurden nachgefüllt.")
+                                st.dataframe(
+                                    pd.DataFrame(bericht_nachfuellung, columns=["Zeile", "Barcode", "Meldung"]),
+                                    use_container_width=True, height=250,
+                                )
+
+                # 🗄 Belegung und Kapazität der Kanäle
+                with st.expander("🗄 Kanalbelegung"):
+                    st.write("Jeder Kanal nimmt Waren eines Artikels bis zu seiner Kapazität auf, leere Kanäle werden wieder frei.")
+                    st.dataframe(automat.get_kanal_liste(), use_container_width=True, height=250)
+
+                    col1, col2 = st.columns([2, 2])
+                    with col1:
+                        kanal_nummer = st.number_input("🔢 Kanal", min_value=1, step=1, value=1, key="kanal_nummer")
+                    with col2:
+                        kanal_kapazitaet = st.number_input("📦 Kapazität", min_value=1, step=1, value=KANAL_KAPAZITAET, key="kanal_kapazitaet")
+
+                    if st.button("💾 Kapazität speichern", key="kanal_kapazitaet_speichern"):
+                        meldung = automat.set_kanal_kapazitaet(int(kanal_nummer), int(kanal_kapazitaet))
+                        if "Fehler" in meldung:
+                            st.error(meldung)
+                        else:
+                            st.success(meldung)
+
 
             # 🛒 TAB 3: Bestellungen & Warenkorb
             with tab3:
@@ -746,14 +1071,26 @@ else:
 
                             if "Fehler" in message:
                                 st.toast(f"{message}", icon="🚫")
-                                datenbank.log_aktion(f"🚫 Fehler beim Hinzufügen zum Warenkorb - {message}")
+                                datenbank.log_aktion(f"🚫 Fehler beim Hinzufügen zum Warenkorb - {message}", code=Aktion.WARENKORB_HINZUGEFUEGT, barcode=barcode_bestellung)
                             else:
                                 st.toast(f"✅ Medikament hinzugefügt!", icon="✅")
-                                datenbank.log_aktion(f"✅ Medikament {barcode_bestellung} zum Warenkorb hinzugefügt.")
+                                datenbank.log_aktion(f"✅ Medikament {barcode_bestellung} zum Warenkorb hinzugefügt.", code=Aktion.WARENKORB_HINZUGEFUEGT, barcode=barcode_bestellung)
 
                             time.sleep(0.75)
                             st.rerun()
 
+                # 💊 Expander für die Suche nach Medikamentennamen im Automaten
+                with st.expander("💊 Medikament nach Namen suchen", expanded=False):
+                    st.write("Suchen Sie ein Medikament nach Namen, um die verfügbaren Barcodes im Automaten zu sehen.")
+
+                    _, _, bestell_artikel = waehle_artikelname("bestellung_artikel", alle="Bitte wählen")
+                    if bestell_artikel != "Bitte wählen":
+                        anzahl_verfuegbar = zeige_lagerbestand(
+                            "bestand_bestellung", ort_filter="Automat", name_filter=bestell_artikel, height=200
+                        )
+                        if not anzahl_verfuegbar:
+                            st.warning(f"⚠️ {bestell_artikel} ist derzeit nicht im Automaten verfügbar.")
+
                 # 📦 Expander für Warenkorb-Anzeige
                 with st.expander("🛒 Warenkorb anzeigen", expanded=True):
                     if st.session_state.warenkorb:
@@ -776,10 +1113,10 @@ else:
                                     bestellgruppe_id = message.split(" ")[1]  # Extrahiere Bestell-ID
                                     medikamenten_namen = message.split(":")[-1]  # Extrahiere Medikamentennamen
                                     st.toast(f"✅ Bestellung {bestellgruppe_id} erfolgreich!", icon="✅")
-                                    datenbank.log_aktion(f"✅ Bestellung {bestellgruppe_id} aufgegeben mit {medikamenten_namen}")
+                                    datenbank.log_aktion(f"✅ Bestellung {bestellgruppe_id} aufgegeben mit {medikamenten_namen}", code=Aktion.BESTELLUNG_AUFGEGEBEN)
                                 else:
                                     st.toast(f" {message}", icon="🚫")
-                                    datenbank.log_aktion(f"🚫 Fehler bei Bestellung - {message}")
+                                    datenbank.log_aktion(f"🚫 Fehler bei Bestellung - {message}", code=Aktion.BESTELLUNG_AUFGEGEBEN)
 
                                 time.sleep(0.75)
                                 st.rerun()
@@ -788,7 +1125,7 @@ else:
                             if st.button("🗑 Warenkorb leeren", key="btn_clear_cart", use_container_width=True):
                                 st.session_state.warenkorb = []
                                 st.toast("🗑 Warenkorb wurde erfolgreich geleert!", icon="✅")
-                                datenbank.log_aktion("🗑 Benutzer hat den Warenkorb geleert")
+                                datenbank.log_aktion("🗑 Benutzer hat den Warenkorb geleert", code=Aktion.WARENKORB_GELEERT)
                                 time.sleep(0.75)
                                 st.rerun()
 
@@ -823,54 +1160,104 @@ else:
 
                                 if "Fehler" in message:
                                     st.toast(f"{message}", icon="🚫")
-                                    datenbank.log_aktion(f"🚫 Fehler bei der Stornierung von Bestellung {bestell_id}: {message}")
+                                    datenbank.log_aktion(f"🚫 Fehler bei der Stornierung von Bestellung {bestell_id}: {message}", code=Aktion.BESTELLUNG_STORNIERT, bestellgruppe_id=bestell_id)
                                 else:
                                     st.toast(f"✅ Bestellung {bestell_id} storniert!", icon="✅")
-                                    datenbank.log_aktion(f"✅ Bestellung {bestell_id} erfolgreich storniert!")
+                                    datenbank.log_aktion(f"✅ Bestellung {bestell_id} erfolgreich storniert!", code=Aktion.BESTELLUNG_STORNIERT, bestellgruppe_id=bestell_id)
 
                                 time.sleep(1)
                                 st.rerun()
                         else:
                             st.info("🚫 Keine offenen Bestellungen vorhanden.")
-                            datenbank.log_aktion("📋 Benutzer hat Bestellübersicht aufgerufen - Keine offenen Bestellungen gefunden.")
+                            datenbank.log_aktion("📋 Benutzer hat Bestellübersicht aufgerufen - Keine offenen Bestellungen gefunden.", code=Aktion.ANSICHT)
                     else:
                         st.info("🚫 Keine Bestellungen vorhanden.")
-                        datenbank.log_aktion("📋 Benutzer hat Bestellübersicht aufgerufen - Keine Bestellungen gefunden.")
+                        datenbank.log_aktion("📋 Benutzer hat Bestellübersicht aufgerufen - Keine Bestellungen gefunden.", code=Aktion.ANSICHT)
 
 
 
         elif menu[choice] == "⚠️ Warnungen verwalten":
 
             
-                st.subheader("📋 Abgelaufene Medikamente")
+                st.subheader("📋 Abgelaufene Medikamente und unterschrittene Mindestbestände")
 
 
                 # 🔍 Expander für die Filteroptionen
                 with st.expander("🔍 Warnungen filtern", expanded=True):
-                    st.write("Filtern Sie die Warnungen nach Lager oder Automat.")
-
-                    ort_filter_warnungen = st.selectbox(
-                        "📌 Ort auswählen", 
-                        ["Alle", "Lager", "Automat"], 
-                        index=0, 
-                        key="warnungen_filter", 
-                        help="Filtern Sie nach Lager oder Automat."
-                    )
+                    st.write("Filtern Sie die Warnungen nach Lager oder Automat und nach der Art der Warnung.")
+
+                    col1, col2 = st.columns([2, 2])
+                    with col1:
+                        ort_filter_warnungen = st.selectbox(
+                            "📌 Ort auswählen", 
+                            ["Alle", "Lager", "Automat"], 
+                            index=0, 
+                            key="warnungen_filter", 
+                            help="Filtern Sie nach Lager oder Automat."
+                        )
+                    with col2:
+                        art_filter_warnungen = st.selectbox(
+                            "🏷 Art der Warnung",
+                            ["Alle"] + WARNUNGSARTEN,
+                            index=0,
+                            key="warnungen_art_filter",
+                            help="Abgelaufene Medikamente oder Artikel unter ihrem Mindestbestand."
+                        )
+
+                # ⏳ Hinweis auf bald ablaufende Medikamente aus dem Stand des Ablaufplaners
+                bald_ablaufend = sum(
+                    anzahl for (thema, ort), anzahl in warnungsstand.items()
+                    if thema == BALD_ABLAUFEND and ort_filter_warnungen in ("Alle", ort)
+                )
+                if bald_ablaufend:
+                    st.info(f"⏳ {bald_ablaufend} Medikamente laufen in den nächsten {ablaufplaner.vorlauf_tage} Tagen ab.")
 
-                # 📋 Lade die abgelaufenen Medikamente basierend auf dem Filter
-                warnungen = warnung.get_warnungen(ort_filter=ort_filter_warnungen if ort_filter_warnungen != "Alle" else None)
+                # 📋 Lade die Warnungen basierend auf den Filtern
+                warnungen = warnung.get_warnungen(
+                    ort_filter=ort_filter_warnungen if ort_filter_warnungen != "Alle" else None,
+                    art_filter=art_filter_warnungen if art_filter_warnungen != "Alle" else None,
+                )
 
-                # ✅ Falls keine abgelaufenen Medikamente vorhanden sind
+                # ✅ Falls keine Warnungen vorhanden sind
                 if warnungen.empty:
-                    st.success("✅ Keine abgelaufenen Medikamente!")
-                    st.toast("✅ Keine abgelaufenen Medikamente im System.", icon="✅")
-                    datenbank.log_aktion("✅ Keine abgelaufenen Medikamente gefunden.")
+                    st.success("✅ Keine Warnungen!")
+                    st.toast("✅ Keine abgelaufenen Medikamente oder unterschrittenen Mindestbestände im System.", icon="✅")
+                    datenbank.log_aktion("✅ Keine Warnungen gefunden.", code=Aktion.ANSICHT)
                 else:
-                    st.warning(f"⚠️ Es gibt {len(warnungen)} abgelaufene Medikamente!")
-                    st.toast(f"⚠️ Achtung: {len(warnungen)} abgelaufene Medikamente gefunden!", icon="⚠️")
-                    datenbank.log_aktion(f"⚠️ Benutzer hat {len(warnungen)} abgelaufene Medikamente aufgerufen.")
+                    abgelaufen = int(warnungen["Status"].eq(STATUS_ABGELAUFEN).sum())
+                    unter_schwellenwert = len(warnungen) - abgelaufen
+                    st.warning(f"⚠️ Es gibt {abgelaufen} abgelaufene Medikamente und {unter_schwellenwert} unterschrittene Mindestbestände!")
+                    st.toast(f"⚠️ Achtung: {len(warnungen)} Warnungen gefunden!", icon="⚠️")
+                    datenbank.log_aktion(
+                        f"⚠️ Benutzer hat {abgelaufen} abgelaufene Medikamente und {unter_schwellenwert} unterschrittene Mindestbestände aufgerufen.",
+                        code=Aktion.ANSICHT,
+                    )
 
-                    # 📊 Zeige die Tabelle mit abgelaufenen Medikamenten
+                    # 📊 Zeige die Tabelle mit den Warnungen
                     st.dataframe(warnungen, use_container_width=True, height=300)
 
+                # 📉 Mindestbestände je Artikel für Lager und Automat festlegen
+                with st.expander("📉 Mindestbestände festlegen"):
+                    st.write("Unterschreitet der Bestand eines Artikels den Mindestbestand, erscheint eine Warnung. 0 entfernt den Mindestbestand.")
+                    _, _, mindest_artikel = waehle_artikelname("mindestbestand_artikel", alle="Bitte wählen", ohne_bestand=True)
+
+                    col1, col2 = st.columns([2, 2])
+                    with col1:
+                        mindest_ort = st.selectbox("📌 Ort", ["Lager", "Automat"], key="mindestbestand_ort")
+                    with col2:
+                        mindest_menge = st.number_input("🔢 Mindestbestand", min_value=0, step=1, value=0, key="mindestbestand_menge")
+
+                    if st.button("💾 Mindestbestand speichern", key="mindestbestand_speichern"):
+                        if mindest_artikel == "Bitte wählen":
+                            st.error("🚫 Fehler: Bitte einen Artikel auswählen!")
+                        else:
+                            meldung = warnung.set_mindestbestand(mindest_artikel, mindest_ort, int(mindest_menge))
+                            if meldung.startswith("✅"):
+                                st.success(meldung)
+                                datenbank.log_aktion(meldung, code=Aktion.SONSTIGE, ergebnis=Ergebnis.ERFOLG)
+                            else:
+                                st.error(meldung)
 
+                    mindestbestaende = warnung.get_mindestbestaende()
+                    if not mindestbestaende.empty:
+                        st.dataframe(mindestbestaende, use_container_width=True, height=200)
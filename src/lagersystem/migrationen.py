@@ -0,0 +1,387 @@
+import sqlite3
+import threading
+from barcodesuche import UMGEKEHRT_AUSDRUCK
+from namenssuche import NAMEN_ANWEISUNGEN
+from artikelbestand import ARTIKELBESTAND_ANWEISUNGEN
+from schwellenwerte import SCHWELLENWERT_ANWEISUNGEN, SCHWELLENWERT_TRIGGER_ANWEISUNGEN
+from ablaufwarnungen import ABLAUF_ANWEISUNGEN
+from kanaele import KANAL_ANWEISUNGEN
+from nachfuellung import NACHFUELL_ANWEISUNGEN, FEFO_WAREN
+from tabellenumbau import baue_tabelle_um
+
+# Älteste unterstützte SQLite-Version: generierte Spalten (Migrationen 4 und 11) gibt es erst ab SQLite 3.31
+MINDEST_SQLITE_VERSION = (3, 31, 0)
+
+# Spalten der Tabellen nach dem Umstieg auf den Artikelstamm (ohne Namensspalte, in der bisherigen Reihenfolge)
+# und die Spalten, die beim Umbau übernommen werden
+ARTIKEL_ID_TABELLEN = {
+    "lagerbestand": (
+        f"""
+        barcode TEXT PRIMARY KEY,
+        menge INTEGER,
+        verfallsdatum TEXT,
+        ort TEXT DEFAULT 'Lager',
+        kanal TEXT DEFAULT NULL,
+        barcode_umgekehrt TEXT GENERATED ALWAYS AS ({UMGEKEHRT_AUSDRUCK}) VIRTUAL,
+        artikel_id INTEGER REFERENCES artikel(id)
+        """,
+        ["barcode", "menge", "verfallsdatum", "ort", "kanal", "artikel_id"],
+    ),
+    "bestellungen": (
+        """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bestellgruppe_id INTEGER,
+        kundennummer TEXT,
+        barcode TEXT,
+        bestelldatum TEXT,
+        status TEXT DEFAULT 'Offen',
+        artikel_id INTEGER REFERENCES artikel(id)
+        """,
+        ["id", "bestellgruppe_id", "kundennummer", "barcode", "bestelldatum", "status", "artikel_id"],
+    ),
+    "warnungen": (
+        """
+        barcode TEXT PRIMARY KEY,
+        verfallsdatum TEXT,
+        ort TEXT,
+        status TEXT DEFAULT 'Offen',
+        artikel_id INTEGER REFERENCES artikel(id)
+        """,
+        ["barcode", "verfallsdatum", "ort", "status", "artikel_id"],
+    ),
+}
+
+# Jede Migration besteht aus Version, Beschreibung und SQL-Anweisungen (oder Umbaufunktionen) und wird genau einmal angewendet.
+# Neue Migrationen werden ausschließlich am Ende mit der nächsthöheren Version angehängt.
+LAGER_MIGRATIONEN = [
+    (1, "Grundschema", [
+        """
+        CREATE TABLE IF NOT EXISTS lagerbestand (
+            barcode TEXT PRIMARY KEY,
+            name TEXT,
+            menge INTEGER,
+            verfallsdatum TEXT,
+            ort TEXT DEFAULT 'Lager',
+            kanal TEXT DEFAULT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS automatenbestand (
+            barcode TEXT PRIMARY KEY,
+            name TEXT,
+            menge INTEGER,
+            verfallsdatum TEXT,
+            ort TEXT DEFAULT 'Automat',
+            FOREIGN KEY (barcode) REFERENCES lagerbestand(barcode)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS warnungen (
+            barcode TEXT PRIMARY KEY,
+            name TEXT,
+            verfallsdatum TEXT,
+            ort TEXT,
+            status TEXT DEFAULT 'Offen'
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS bestellungen (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bestellgruppe_id INTEGER,
+            kundennummer TEXT,
+            barcode TEXT,
+            name TEXT,
+            bestelldatum TEXT,
+            status TEXT DEFAULT 'Offen'
+        )
+        """,
+    ]),
+    (2, "Indizes für Filter- und Gruppierungsabfragen", [
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_ort_kanal ON lagerbestand (ort, kanal)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_name_ort ON lagerbestand (name, ort)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_verfallsdatum ON lagerbestand (verfallsdatum)",
+        "CREATE INDEX IF NOT EXISTS idx_bestellungen_kunde_status ON bestellungen (kundennummer, status)",
+        "CREATE INDEX IF NOT EXISTS idx_bestellungen_barcode_status ON bestellungen (barcode, status)",
+        "CREATE INDEX IF NOT EXISTS idx_bestellungen_gruppe ON bestellungen (bestellgruppe_id)",
+    ]),
+    (3, "Indizes für die seitenweise, sortierte Bestandsanzeige", [
+        # Der Barcode als eindeutiger Zusatzschlüssel macht die Sortierung stabil (Keyset-Paginierung)
+        "DROP INDEX IF EXISTS idx_lagerbestand_verfallsdatum",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_verfallsdatum_barcode ON lagerbestand (verfallsdatum, barcode)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_name_barcode ON lagerbestand (name, barcode)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_ort_barcode ON lagerbestand (ort, barcode)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_ort_name_barcode ON lagerbestand (ort, name, barcode)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_ort_verfallsdatum_barcode ON lagerbestand (ort, verfallsdatum, barcode)",
+    ]),
+    (4, "Umgekehrter Barcode für indizierte Suffix-Suchen", [
+        f"ALTER TABLE lagerbestand ADD COLUMN barcode_umgekehrt TEXT GENERATED ALWAYS AS ({UMGEKEHRT_AUSDRUCK}) VIRTUAL",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_barcode_umgekehrt ON lagerbestand (barcode_umgekehrt)",
+    ]),
+    (5, "Volltextindex (FTS5) für die Suche nach Medikamentennamen", [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS artikelnamen_fts USING fts5(
+            name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+        """,
+        "INSERT INTO artikelnamen_fts (name) SELECT DISTINCT name FROM lagerbestand WHERE name IS NOT NULL",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_einfuegen AFTER INSERT ON lagerbestand
+        WHEN NEW.name IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM lagerbestand WHERE name = NEW.name AND rowid <> NEW.rowid
+        ) BEGIN
+            INSERT INTO artikelnamen_fts (name) VALUES (NEW.name);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_loeschen AFTER DELETE ON lagerbestand
+        WHEN OLD.name IS NOT NULL AND NOT EXISTS (SELECT 1 FROM lagerbestand WHERE name = OLD.name) BEGIN
+            DELETE FROM artikelnamen_fts WHERE name = OLD.name;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_aendern AFTER UPDATE OF name ON lagerbestand
+        WHEN OLD.name IS NOT NEW.name BEGIN
+            DELETE FROM artikelnamen_fts
+            WHERE name = OLD.name AND NOT EXISTS (SELECT 1 FROM lagerbestand WHERE name = OLD.name);
+            INSERT INTO artikelnamen_fts (name) SELECT NEW.name
+            WHERE NEW.name IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM lagerbestand WHERE name = NEW.name AND rowid <> NEW.rowid
+            );
+        END
+        """,
+    ]),
+    (6, "Artikelstamm mit Integer-IDs statt Medikamentennamen in Bestand, Bestellungen und Warnungen", [
+        "CREATE TABLE IF NOT EXISTS artikel (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        """
+        INSERT OR IGNORE INTO artikel (name)
+        SELECT name FROM (
+            SELECT name FROM lagerbestand UNION SELECT name FROM bestellungen UNION SELECT name FROM warnungen
+        ) WHERE name IS NOT NULL ORDER BY name
+        """,
+        # Trigger und Indizes auf der Namensspalte müssen vor dem Entfernen der Spalte gelöscht werden
+        "DROP TRIGGER IF EXISTS trg_artikelnamen_einfuegen",
+        "DROP TRIGGER IF EXISTS trg_artikelnamen_loeschen",
+        "DROP TRIGGER IF EXISTS trg_artikelnamen_aendern",
+        "DROP INDEX IF EXISTS idx_lagerbestand_name_ort",
+        "DROP INDEX IF EXISTS idx_lagerbestand_name_barcode",
+        "DROP INDEX IF EXISTS idx_lagerbestand_ort_name_barcode",
+        *[
+            anweisung
+            for tabelle, (spalten_definition, spalten) in ARTIKEL_ID_TABELLEN.items()
+            for anweisung in (
+                f"ALTER TABLE {tabelle} ADD COLUMN artikel_id INTEGER REFERENCES artikel(id)",
+                f"UPDATE {tabelle} SET artikel_id = (SELECT id FROM artikel WHERE artikel.name = {tabelle}.name)",
+                baue_tabelle_um(tabelle, spalten_definition, spalten),
+            )
+        ],
+        # menge im Index macht die Summen je Artikel zu einem reinen Indexdurchlauf
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_artikel_ort_menge ON lagerbestand (artikel_id, ort, menge)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_artikel_barcode ON lagerbestand (artikel_id, barcode)",
+        "CREATE INDEX IF NOT EXISTS idx_lagerbestand_ort_artikel_barcode ON lagerbestand (ort, artikel_id, barcode)",
+        *NAMEN_ANWEISUNGEN,
+    ]),
+    (7, "Per Trigger fortgeschriebene Bestandssummen je Artikel und Ort", ARTIKELBESTAND_ANWEISUNGEN),
+    (8, "Stichtag der letzten vollständigen Warnungsauswertung", [
+        "CREATE TABLE IF NOT EXISTS warnungsauswertung (id INTEGER PRIMARY KEY CHECK (id = 1), stichtag TEXT)",
+        "INSERT OR IGNORE INTO warnungsauswertung (id, stichtag) VALUES (1, NULL)",
+    ]),
+    (9, "Mindestbestände je Artikel und Ort mit Warnungen bei Unterschreitung", SCHWELLENWERT_ANWEISUNGEN),
+    (10, "Warnungen per Trigger bei jeder Bestandsänderung fortschreiben", [
+        *ABLAUF_ANWEISUNGEN,
+        *SCHWELLENWERT_TRIGGER_ANWEISUNGEN,
+    ]),
+    (11, "Kanaltabelle des Automaten mit Kapazität, Belegung und Freilisten", KANAL_ANWEISUNGEN),
+    (12, "Index für die Nachfüllung nach Verfallsdatum je Artikel", NACHFUELL_ANWEISUNGEN),
+]
+
+USER_MIGRATIONEN = [
+    (1, "Benutzertabelle", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kundennummer TEXT UNIQUE,
+            username TEXT UNIQUE,
+            password_hash TEXT,
+            role TEXT DEFAULT 'user'
+        )
+        """,
+    ]),
+]
+
+PROTOKOLL_MIGRATIONEN = [
+    (1, "Protokolltabelle mit Indizes für Zeitraum, Benutzer und Aktionstyp", [
+        """
+        CREATE TABLE IF NOT EXISTS protokoll (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            zeitstempel TEXT NOT NULL,
+            kundennummer TEXT,
+            aktion TEXT,
+            aktionstyp TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_zeitstempel ON protokoll (zeitstempel)",
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_kunde_zeit ON protokoll (kundennummer, zeitstempel)",
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_typ_zeit ON protokoll (aktionstyp, zeitstempel)",
+    ]),
+    (2, "Typisierte Ereignisfelder (Aktionscode, Ergebnis, Barcode, Bestellgruppe, Dauer)", [
+        "ALTER TABLE protokoll ADD COLUMN code TEXT",
+        "ALTER TABLE protokoll ADD COLUMN ergebnis TEXT",
+        "ALTER TABLE protokoll ADD COLUMN barcode TEXT",
+        "ALTER TABLE protokoll ADD COLUMN bestellgruppe_id INTEGER",
+        "ALTER TABLE protokoll ADD COLUMN dauer_ms REAL",
+        """
+        UPDATE protokoll SET code = 'sonstige', ergebnis = CASE aktionstyp
+            WHEN 'Fehler' THEN 'fehler' WHEN 'Warnung' THEN 'warnung' WHEN 'Erfolg' THEN 'erfolg' ELSE 'info' END
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_code_zeit ON protokoll (code, zeitstempel)",
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_ergebnis_zeit ON protokoll (ergebnis, zeitstempel)",
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_barcode ON protokoll (barcode)",
+        "CREATE INDEX IF NOT EXISTS idx_protokoll_bestellgruppe ON protokoll (bestellgruppe_id)",
+    ]),
+]
+
+# Häufige Abfragen der Anwendung, deren Abfragepläne vor und nach einer Migration verglichen werden
+HAEUFIGE_ABFRAGEN = {
+    "Belegte Kanäle": (
+        "SELECT COUNT(*) FROM lagerbestand WHERE kanal = ? AND ort = 'Automat'", ("Kanal 1",)
+    ),
+    "Kanal eines Medikaments": (
+        "SELECT id FROM kanaele WHERE artikel_id = ? AND belegung < kapazitaet ORDER BY id LIMIT 1", (1,)
+    ),
+    "Freier Kanal": (
+        "SELECT id FROM kanaele WHERE artikel_id IS NULL ORDER BY id LIMIT 1", ()
+    ),
+    "Nachfüllung nach Verfallsdatum": (FEFO_WAREN, (1, "2000-01-01", 20)),
+    "Abgelaufene Medikamente": (
+        "SELECT barcode, verfallsdatum, ort FROM lagerbestand WHERE verfallsdatum < ?", ("2000-01-01",)
+    ),
+    "Bestellungen eines Kunden": (
+        "SELECT bestellgruppe_id, GROUP_CONCAT(name, ', ') FROM bestellungen JOIN artikel ON artikel.id = artikel_id "
+        "WHERE kundennummer = ? AND status = ? GROUP BY bestellgruppe_id", ("12345678", "Offen")
+    ),
+    "Barcode in offener Bestellung": (
+        "SELECT COUNT(*) FROM bestellungen WHERE barcode = ? AND status = 'Offen'", ("12345678",)
+    ),
+    "Bestellgruppe": (
+        "SELECT barcode, artikel_id FROM bestellungen WHERE bestellgruppe_id = ?", (123456,)
+    ),
+    "Bestandsseite nach Verfallsdatum": (
+        "SELECT barcode, name, menge, verfallsdatum, ort, kanal FROM lagerbestand JOIN artikel ON artikel.id = artikel_id "
+        "WHERE ort = ? AND (verfallsdatum, barcode) > (?, ?) ORDER BY verfallsdatum, barcode LIMIT 101", ("Lager", "2025-01-01", "")
+    ),
+    "Warnungen eines Orts": (
+        "SELECT barcode, name, verfallsdatum, ort, status FROM warnungen JOIN artikel ON artikel.id = warnungen.artikel_id "
+        "WHERE ort = ?", ("Lager",)
+    ),
+    "Bestandsseite nach Name": (
+        "SELECT barcode, name FROM artikel CROSS JOIN lagerbestand ON artikel.id = lagerbestand.artikel_id WHERE ort = ? "
+        "AND (name, barcode) > (?, ?) ORDER BY name, barcode LIMIT 101", ("Lager", "Aspirin", "")
+    ),
+}
+
+_migrations_lock = threading.Lock()
+
+
+def pruefe_sqlite_version(version=None):
+    """
+    Überprüft, ob die SQLite-Bibliothek von Python alle Funktionen der Migrationen unterstützt.
+
+    :param version: Die zu prüfende Version als Tupel, Standard: sqlite3.sqlite_version_info
+    :raises sqlite3.NotSupportedError: Wenn die Version älter als MINDEST_SQLITE_VERSION ist
+    """
+    version = version or sqlite3.sqlite_version_info
+    if version < MINDEST_SQLITE_VERSION:
+        raise sqlite3.NotSupportedError(
+            f"🚫 Fehler: SQLite {'.'.join(map(str, version))} wird nicht unterstützt, "
+            f"benötigt wird mindestens SQLite {'.'.join(map(str, MINDEST_SQLITE_VERSION))}!"
+        )
+
+
+def get_schema_version(cursor):
+    """
+    Liest die aktuelle Schema-Version einer Datenbank aus.
+
+    :param cursor: Ein Datenbank-Cursor
+    :return: Der Wert von PRAGMA user_version
+    """
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def get_abfrageplaene(cursor, abfragen=None):
+    """
+    Ermittelt die Abfragepläne (EXPLAIN QUERY PLAN) für häufige Abfragen.
+
+    :param cursor: Ein Datenbank-Cursor
+    :param abfragen: Optionales Dictionary Name -> (SQL, Parameter), Standard: HAEUFIGE_ABFRAGEN
+    :return: Dictionary Name -> Abfrageplan als Text
+    """
+    plaene = {}
+    for name, (sql, params) in (abfragen or HAEUFIGE_ABFRAGEN).items():
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plaene[name] = "; ".join(row[3] for row in cursor.fetchall())
+        except Exception as e:
+            # Tabelle existiert (noch) nicht
+            plaene[name] = f"nicht verfügbar ({e})"
+    return plaene
+
+
+def _wende_migrationen_an(cursor, migrationen):
+    """
+    Wendet alle ausstehenden Migrationen innerhalb einer laufenden Transaktion an.
+
+    :param cursor: Cursor der laufenden Transaktion
+    :param migrationen: Liste der Migrationen (Version, Beschreibung, Anweisungen oder Umbaufunktionen)
+    :return: Liste der angewendeten Migrationen als (Version, Beschreibung)
+    """
+    version = get_schema_version(cursor)
+    angewendet = []
+
+    for ziel_version, beschreibung, anweisungen in sorted(migrationen, key=lambda m: m[0]):
+        if ziel_version <= version:
+            continue
+        for anweisung in anweisungen:
+            # Umbauten, die mehrere Schritte brauchen, sind Funktionen, die den Cursor erhalten
+            if callable(anweisung):
+                anweisung(cursor)
+            else:
+                cursor.execute(anweisung)
+        cursor.execute(f"PRAGMA user_version = {int(ziel_version)}")
+        angewendet.append((ziel_version, beschreibung))
+
+    return angewendet
+
+
+def migriere(pool, migrationen, abfragen=None):
+    """
+    Bringt eine Datenbank auf den neuesten Schema-Stand. Ist die Datenbank bereits aktuell, wird nur die Version gelesen.
+    Wurden Migrationen angewendet, werden die Abfragepläne vor und nach der Migration ausgegeben.
+
+    :param pool: Verbindungspool der Datenbank
+    :param migrationen: Liste der Migrationen (Version, Beschreibung, Anweisungen)
+    :param abfragen: Optionale Abfragen für den Vergleich der Abfragepläne
+    :return: Dictionary mit angewendeten Migrationen und Abfrageplänen vorher/nachher
+    """
+    ziel_version = max(version for version, _, _ in migrationen)
+
+    with _migrations_lock:
+        with pool.verbindung() as conn:
+            cursor = conn.cursor()
+            if get_schema_version(cursor) >= ziel_version:
+                return {"angewendet": [], "vorher": {}, "nachher": {}}
+            vorher = get_abfrageplaene(cursor, abfragen) if abfragen is not None else {}
+
+        angewendet = pool.schreiben(lambda cursor: _wende_migrationen_an(cursor, migrationen))
+
+        nachher = {}
+        if abfragen is not None and angewendet:
+            with pool.verbindung() as conn:
+                nachher = get_abfrageplaene(conn.cursor(), abfragen)
+
+            for version, beschreibung in angewendet:
+                print(f"Migration {version} angewendet: {beschreibung}")
+            for name, plan in nachher.items():
+                print(f"Abfrageplan '{name}': vorher [{vorher.get(name)}] -> nachher [{plan}]")
+
+        return {"angewendet": angewendet, "vorher": vorher, "nachher": nachher}
@@ -0,0 +1,80 @@
+import kanaele
+
+# Nachfüllplan für den Automaten nach dem FEFO-Prinzip (first expired, first out).
+# Der Bedarf je Artikel ergibt sich aus den freien Plätzen seiner Kanäle und einem unterschrittenen Mindestbestand
+# im Automaten; beide Werte schreiben Trigger fort, sie werden also nur gelesen statt aus dem Bestand summiert.
+# Je Artikel liefert der Index (artikel_id, ort, verfallsdatum, barcode) die zuerst ablaufenden Waren im Lager
+# bereits sortiert, die Abfrage liest nur so viele Einträge, wie nachgefüllt werden.
+
+NACHFUELL_ANWEISUNGEN = [
+    "CREATE INDEX IF NOT EXISTS idx_lagerbestand_artikel_ort_verfallsdatum ON lagerbestand (artikel_id, ort, verfallsdatum, barcode)",
+]
+
+# Die zuerst ablaufenden, noch gültigen Waren eines Artikels im Lager
+FEFO_WAREN = """
+    SELECT barcode, verfallsdatum FROM lagerbestand
+    WHERE artikel_id = ? AND ort = 'Lager' AND verfallsdatum >= ? ORDER BY verfallsdatum, barcode LIMIT ?
+"""
+
+# Anzahl der noch gültigen Waren eines Artikels im Lager, über denselben Index
+FEFO_VORRAT = """
+    SELECT COUNT(*) FROM lagerbestand WHERE artikel_id = ? AND ort = 'Lager' AND verfallsdatum >= ?
+"""
+
+
+def _ermittle_bedarf(cursor, today):
+    """
+    Ermittelt je Artikel, wie viele Waren in den Automaten passen oder für den Mindestbestand fehlen.
+    Plätze in eigenen Kanälen werden vollständig aufgefüllt; was darüber hinaus für den Mindestbestand fehlt,
+    erhält nur so viele Plätze, wie freie und neue Kanäle des Automaten noch bieten. Ein Kanal wird nur
+    eingeplant, wenn das Lager noch gültige Waren für ihn enthält.
+
+    :param cursor: Ein Datenbank-Cursor
+    :param today: Das heutige Datum (YYYY-MM-DD), abgelaufene Waren zählen nicht zum Vorrat
+    :return: Liste von Tupeln (Artikel-ID, Name, Anzahl), nach Name sortiert
+    """
+    cursor.execute("""
+        SELECT artikel_id, name, SUM(plaetze), SUM(fehlmenge) FROM (
+            SELECT artikel_id, kapazitaet - belegung AS plaetze, 0 AS fehlmenge FROM kanaele
+            WHERE artikel_id IS NOT NULL AND belegung < kapazitaet
+            UNION ALL
+            SELECT artikel_id, 0, mindestbestand - bestand FROM bestandswarnungen WHERE ort = 'Automat'
+        ) JOIN artikel ON artikel.id = artikel_id
+        GROUP BY artikel_id ORDER BY name
+    """)
+    artikel = cursor.fetchall()
+
+    # Freie Kanäle in der Reihenfolge, in der weise_kanal_zu sie vergibt, danach neu anzulegende Kanäle
+    cursor.execute("SELECT kapazitaet FROM kanaele WHERE artikel_id IS NULL ORDER BY id")
+    freie_kanaele = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM kanaele")
+    freie_kanaele += [kanaele.KANAL_KAPAZITAET] * max(kanaele.MAX_KANAELE - cursor.fetchone()[0], 0)
+
+    bedarf = []
+    for artikel_id, name, plaetze, fehlmenge in artikel:
+        anzahl = plaetze
+        if fehlmenge > plaetze:
+            # Weitere Kanäle nur für Waren, die das Lager auch liefern kann
+            cursor.execute(FEFO_VORRAT, (artikel_id, today))
+            fehlmenge = min(fehlmenge, cursor.fetchone()[0])
+            # Ein neuer Kanal gehört ganz dem Artikel, auch wenn er nur teilweise gefüllt wird
+            while anzahl < fehlmenge and freie_kanaele:
+                anzahl += freie_kanaele.pop(0)
+        bedarf.append((artikel_id, name, min(anzahl, max(plaetze, fehlmenge))))
+    return bedarf
+
+
+def plane_nachfuellung(cursor, today):
+    """
+    Erstellt den Nachfüllplan: je Artikel die zuerst ablaufenden, noch gültigen Waren aus dem Lager,
+    höchstens so viele, wie in den Automaten passen oder für den Mindestbestand fehlen.
+
+    :param cursor: Ein Datenbank-Cursor
+    :param today: Das heutige Datum (YYYY-MM-DD), abgelaufene Waren werden nicht eingeplant
+    :return: Liste von Tupeln (Barcode, Name, Verfallsdatum), je Artikel nach Verfallsdatum sortiert
+    """
+    plan = []
+    for artikel_id, name, anzahl in _ermittle_bedarf(cursor, today):
+        cursor.execute(FEFO_WAREN, (artikel_id, today, anzahl))
+        plan.extend((barcode, name, verfallsdatum) for barcode, verfallsdatum in cursor.fetchall())
+    return plan
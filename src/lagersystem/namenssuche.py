@@ -0,0 +1,79 @@
+import re
+
+# Jeder Artikel mit Bestand steht genau einmal im Volltextindex, die rowid ist die Artikel-ID.
+# Präfixindizes für zwei und drei Zeichen beschleunigen die Autovervollständigung schon bei kurzen Eingaben.
+NAMEN_TABELLE = "artikelnamen_fts"
+
+NAMEN_ANWEISUNGEN = [
+    f"DELETE FROM {NAMEN_TABELLE}",
+    f"""
+    INSERT INTO {NAMEN_TABELLE} (rowid, name)
+    SELECT id, name FROM artikel WHERE EXISTS (SELECT 1 FROM lagerbestand WHERE artikel_id = artikel.id)
+    """,
+    # Ein Artikel wird nur beim ersten bzw. letzten Medikament geändert (Indexzugriff über artikel_id, barcode)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_einfuegen AFTER INSERT ON lagerbestand
+    WHEN NEW.artikel_id IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM lagerbestand WHERE artikel_id = NEW.artikel_id AND rowid <> NEW.rowid
+    ) BEGIN
+        INSERT INTO {NAMEN_TABELLE} (rowid, name) SELECT id, name FROM artikel WHERE id = NEW.artikel_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_loeschen AFTER DELETE ON lagerbestand
+    WHEN OLD.artikel_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM lagerbestand WHERE artikel_id = OLD.artikel_id) BEGIN
+        DELETE FROM {NAMEN_TABELLE} WHERE rowid = OLD.artikel_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_aendern AFTER UPDATE OF artikel_id ON lagerbestand
+    WHEN OLD.artikel_id IS NOT NEW.artikel_id BEGIN
+        DELETE FROM {NAMEN_TABELLE}
+        WHERE rowid = OLD.artikel_id AND NOT EXISTS (SELECT 1 FROM lagerbestand WHERE artikel_id = OLD.artikel_id);
+        INSERT INTO {NAMEN_TABELLE} (rowid, name) SELECT id, name FROM artikel
+        WHERE id = NEW.artikel_id AND NOT EXISTS (
+            SELECT 1 FROM lagerbestand WHERE artikel_id = NEW.artikel_id AND rowid <> NEW.rowid
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_artikelnamen_umbenennen AFTER UPDATE OF name ON artikel BEGIN
+        UPDATE {NAMEN_TABELLE} SET name = NEW.name WHERE rowid = NEW.id;
+    END
+    """,
+]
+
+
+def volltext_anfrage(suchtext):
+    """
+    Wandelt eine Benutzereingabe in eine FTS5-Präfixanfrage um.
+    Jedes Wort muss als Wortanfang im Namen vorkommen, "ibu 400" findet also "Ibuprofen 400mg".
+    Sonderzeichen der FTS5-Syntax werden dabei verworfen.
+
+    :param suchtext: Der eingegebene Suchtext
+    :return: Die Anfrage für MATCH oder None, wenn der Suchtext kein Wort enthält
+    """
+    woerter = re.findall(r"\w+", str(suchtext or ""))
+    if not woerter:
+        return None
+    return " ".join(f'"{wort}"*' for wort in woerter)
+
+
+def artikelstamm_bedingung(suchtext):
+    """
+    Baut für eine Benutzereingabe die Suchbedingung über den gesamten Artikelstamm, also auch über Artikel ohne Bestand,
+    die der Volltextindex nicht enthält. Wie bei volltext_anfrage muss jedes Wort als Wortanfang im Namen vorkommen.
+
+    :param suchtext: Der eingegebene Suchtext
+    :return: Tupel (SQL-Bedingung, Parameterliste) oder None, wenn der Suchtext kein Wort enthält
+    """
+    woerter = re.findall(r"\w+", str(suchtext or ""))
+    if not woerter:
+        return None
+    bedingungen = []
+    params = []
+    for wort in woerter:
+        wort = wort.replace("\\", "\\\\").replace("_", "\\_")
+        bedingungen.append("(name LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\')")
+        params.extend([f"{wort}%", f"% {wort}%"])
+    return " AND ".join(bedingungen), params
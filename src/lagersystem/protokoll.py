@@ -0,0 +1,421 @@
+import os
+import csv
+import time
+import queue
+import atexit
+import threading
+from logdateien import lies_logdateien, tages_ziel
+from ereignisse import Ereignis, Aktion, Ergebnis
+
+# Standardwerte für den Protokollschreiber, über Umgebungsvariablen anpassbar
+PROTOKOLL_PUFFER = int(os.environ.get("LAGER_PROTOKOLL_PUFFER", "10000"))
+PROTOKOLL_BATCH = int(os.environ.get("LAGER_PROTOKOLL_BATCH", "200"))
+PROTOKOLL_INTERVALL = float(os.environ.get("LAGER_PROTOKOLL_INTERVALL", "1.0"))
+
+# Überlaufstrategien bei vollem Puffer
+VERWERFEN = "verwerfen"    # Neuer Eintrag wird verworfen und gezählt, der Aufrufer wartet nie
+BLOCKIEREN = "blockieren"  # Aufrufer wartet kurz auf freien Platz, danach wird verworfen
+
+_FLUSH = object()  # Markierung für einen sofortigen Schreibvorgang
+
+# Aktionstypen für die Filterung im Protokoll, erkannt an den Symbolen der Meldungen (Reihenfolge = Vorrang)
+AKTIONSTYPEN = [
+    ("Fehler", ("🚫", "Fehler")),
+    ("Warnung", ("⚠️",)),
+    ("Erfolg", ("✅",)),
+    ("Abfrage", ("📊", "🔍", "📜", "👥", "📋")),
+]
+AKTIONSTYP_SONSTIGE = "Sonstige"
+
+IMPORT_BLOCKGROESSE = 5000
+
+
+def bestimme_aktionstyp(aktion):
+    """
+    Ordnet eine Protokollmeldung einem Aktionstyp zu.
+
+    :param aktion: Text der Aktion
+    :return: Der Aktionstyp (z.B. "Fehler", "Erfolg")
+    """
+    for aktionstyp, merkmale in AKTIONSTYPEN:
+        if any(merkmal in (aktion or "") for merkmal in merkmale):
+            return aktionstyp
+    return AKTIONSTYP_SONSTIGE
+
+
+def csv_ziel(log_path):
+    """
+    Erzeugt eine Schreibfunktion, die einen Block von Protokolleinträgen an eine CSV-Datei anhängt.
+
+    :param log_path: Pfad zur Logdatei
+    :return: Funktion, die eine Liste von Einträgen schreibt
+    """
+    def schreibe(eintraege):
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        with open(log_path, mode="a", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerows(
+                eintrag.als_zeile() if isinstance(eintrag, Ereignis) else eintrag for eintrag in eintraege
+            )
+
+    return schreibe
+
+
+def sqlite_ziel(pool):
+    """
+    Erzeugt eine Schreibfunktion, die einen Block von Protokolleinträgen in die Protokolltabelle einfügt.
+
+    :param pool: Verbindungspool der Protokolldatenbank
+    :return: Funktion, die eine Liste von Ereignissen (oder Zeilen im alten Format) schreibt
+    """
+    def schreibe(eintraege):
+        zeilen = []
+        for eintrag in eintraege:
+            ereignis = eintrag if isinstance(eintrag, Ereignis) else Ereignis.aus_zeile(eintrag)
+            zeilen.append((
+                ereignis.zeitstempel, ereignis.kundennummer, ereignis.text, bestimme_aktionstyp(ereignis.text),
+                ereignis.aktion.value, ereignis.ergebnis.value, ereignis.barcode, ereignis.bestellgruppe_id,
+                ereignis.dauer_ms,
+            ))
+        pool.schreiben(lambda cursor: cursor.executemany(
+            """
+            INSERT INTO protokoll (zeitstempel, kundennummer, aktion, aktionstyp, code, ergebnis,
+                                   barcode, bestellgruppe_id, dauer_ms)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, zeilen
+        ))
+
+    return schreibe
+
+
+def mehrfach_ziel(*ziele):
+    """
+    Erzeugt eine Schreibfunktion, die jeden Block an mehrere Ziele weitergibt.
+    Ein fehlerhaftes Ziel verhindert das Schreiben in die übrigen Ziele nicht.
+
+    :param ziele: Schreibfunktionen
+    :return: Funktion, die eine Liste von Einträgen an alle Ziele schreibt
+    """
+    def schreibe(eintraege):
+        fehler = None
+        for ziel in ziele:
+            try:
+                ziel(eintraege)
+            except Exception as e:
+                fehler = fehler or e
+        if fehler:
+            raise fehler
+
+    return schreibe
+
+
+def importiere_logdateien(pool, log_path):
+    """
+    Übernimmt bestehende Tagesdateien einmalig in die Protokolltabelle, sofern diese noch leer ist.
+
+    :param pool: Verbindungspool der Protokolldatenbank
+    :param log_path: Pfad der Logdatei, aus dem die Tagesdateien abgeleitet werden
+    :return: Anzahl der importierten Einträge
+    """
+    with pool.verbindung() as conn:
+        if conn.execute("SELECT 1 FROM protokoll LIMIT 1").fetchone():
+            return 0
+
+    ziel = sqlite_ziel(pool)
+    anzahl = 0
+    block = []
+    for ereignis in lies_logdateien(log_path):
+        block.append(ereignis)
+        if len(block) >= IMPORT_BLOCKGROESSE:
+            ziel(block)
+            anzahl += len(block)
+            block = []
+    if block:
+        ziel(block)
+        anzahl += len(block)
+
+    if anzahl:
+        print(f"Protokollimport: {anzahl} Einträge aus den Tagesdateien übernommen")
+    return anzahl
+
+
+def _protokoll_filter(von=None, bis=None, kundennummer=None, aktionstyp=None, suchtext=None,
+                      code=None, ergebnis=None, barcode=None, bestellgruppe_id=None):
+    """
+    Baut die WHERE-Bedingung für Protokollabfragen auf. Codes, Ergebnisse, Barcodes und Bestellgruppen
+    werden exakt verglichen und können dadurch Indizes nutzen.
+
+    :return: Tupel (SQL-Bedingung, Parameterliste)
+    """
+    bedingung = "WHERE 1=1"
+    params = []
+
+    if code:
+        bedingung += " AND code = ?"
+        params.append(Aktion(code).value)
+    if ergebnis:
+        bedingung += " AND ergebnis = ?"
+        params.append(Ergebnis(ergebnis).value)
+    if barcode:
+        bedingung += " AND barcode = ?"
+        params.append(str(barcode))
+    if bestellgruppe_id:
+        bedingung += " AND bestellgruppe_id = ?"
+        params.append(int(bestellgruppe_id))
+
+    if von:
+        bedingung += " AND zeitstempel >= ?"
+        params.append(von)
+    if bis:
+        bedingung += " AND zeitstempel <= ?"
+        params.append(bis)
+    if kundennummer:
+        bedingung += " AND kundennummer = ?"
+        params.append(kundennummer)
+    if aktionstyp:
+        bedingung += " AND aktionstyp = ?"
+        params.append(aktionstyp)
+    if suchtext:
+        bedingung += " AND aktion LIKE ?"
+        params.append(f"%{suchtext}%")
+
+    return bedingung, params
+
+
+def lies_protokoll(pool, von=None, bis=None, kundennummer=None, aktionstyp=None, suchtext=None, limit=None, **filterwerte):
+    """
+    Liest Protokolleinträge gefiltert aus der Datenbank. Zeitraum, Benutzer und Aktionstyp werden über Indizes gefiltert.
+
+    :param pool: Verbindungspool der Protokolldatenbank
+    :param von: Optionaler Beginn des Zeitraums ("YYYY-MM-DD HH:MM:SS", inklusive)
+    :param bis: Optionales Ende des Zeitraums ("YYYY-MM-DD HH:MM:SS", inklusive)
+    :param kundennummer: Optionaler Filter auf einen Benutzer
+    :param aktionstyp: Optionaler Filter auf einen Aktionstyp
+    :param suchtext: Optionaler Text, der in der Aktion enthalten sein muss
+    :param limit: Optionale maximale Anzahl Einträge
+    :param filterwerte: Optionale exakte Filter (code, ergebnis, barcode, bestellgruppe_id)
+    :return: Liste von Tupeln (Zeitstempel, Kundennummer, Aktion)
+    """
+    bedingung, params = _protokoll_filter(von, bis, kundennummer, aktionstyp, suchtext, **filterwerte)
+    query = f"SELECT zeitstempel, kundennummer, aktion FROM protokoll {bedingung} ORDER BY zeitstempel, id"
+    if limit:
+        query += " LIMIT ?"
+        params.append(int(limit))
+
+    with pool.verbindung() as conn:
+        return conn.execute(query, params).fetchall()
+
+
+def lies_protokoll_seite(pool, groesse=100, nach=None, **filterwerte):
+    """
+    Liest eine Seite von Protokolleinträgen mit Keyset-Paginierung, d.h. ohne OFFSET über alle vorherigen Seiten.
+
+    :param pool: Verbindungspool der Protokolldatenbank
+    :param groesse: Anzahl Einträge pro Seite
+    :param nach: Optionaler Cursor (Zeitstempel, ID) des letzten Eintrags der vorherigen Seite
+    :param filterwerte: Filter wie bei lies_protokoll (von, bis, kundennummer, aktionstyp, suchtext, code, ...)
+    :return: Tupel (Liste von (Zeitstempel, Kundennummer, Aktion), Cursor der nächsten Seite oder None)
+    """
+    bedingung, params = _protokoll_filter(**filterwerte)
+    if nach:
+        bedingung += " AND (zeitstempel, id) > (?, ?)"
+        params.extend(nach)
+
+    query = f"SELECT id, zeitstempel, kundennummer, aktion FROM protokoll {bedingung} ORDER BY zeitstempel, id LIMIT ?"
+    params.append(int(groesse) + 1)
+
+    with pool.verbindung() as conn:
+        zeilen = conn.execute(query, params).fetchall()
+
+    naechster = None
+    if len(zeilen) > groesse:
+        zeilen = zeilen[:groesse]
+        naechster = (zeilen[-1][1], zeilen[-1][0])
+    return [zeile[1:] for zeile in zeilen], naechster
+
+
+def zaehle_ereignisse(pool, von=None, bis=None, **filterwerte):
+    """
+    Zählt Protokolleinträge je Aktionscode und Ergebnis, z.B. für Auswertungen im Admin-Bereich.
+
+    :param pool: Verbindungspool der Protokolldatenbank
+    :param von: Optionaler Beginn des Zeitraums ("YYYY-MM-DD HH:MM:SS", inklusive)
+    :param bis: Optionales Ende des Zeitraums ("YYYY-MM-DD HH:MM:SS", inklusive)
+    :param filterwerte: Weitere Filter wie bei lies_protokoll
+    :return: Liste von Tupeln (Code, Ergebnis, Anzahl, durchschnittliche Dauer in ms)
+    """
+    bedingung, params = _protokoll_filter(von, bis, **filterwerte)
+    query = f"""
+        SELECT code, ergebnis, COUNT(*), AVG(dauer_ms) FROM protokoll {bedingung}
+        GROUP BY code, ergebnis ORDER BY code, ergebnis
+    """
+    with pool.verbindung() as conn:
+        return conn.execute(query, params).fetchall()
+
+
+class Protokollschreiber:
+    """
+    Diese Klasse schreibt Protokolleinträge asynchron in einem Hintergrund-Thread.
+    Einträge werden gepuffert und gesammelt geschrieben, sobald die Blockgröße oder das Zeitintervall erreicht ist.
+    """
+
+    def __init__(self, ziel, max_eintraege=PROTOKOLL_PUFFER, batch_groesse=PROTOKOLL_BATCH,
+                 intervall=PROTOKOLL_INTERVALL, ueberlauf=VERWERFEN, wartezeit=0.5):
+        """
+        Initialisiert den Puffer und startet den Hintergrund-Thread.
+
+        :param ziel: Funktion, die eine Liste von Einträgen dauerhaft speichert
+        :param max_eintraege: Maximale Anzahl gepufferter Einträge
+        :param batch_groesse: Anzahl Einträge, ab der sofort geschrieben wird
+        :param intervall: Maximale Zeit in Sekunden, die ein Eintrag im Puffer verbleibt
+        :param ueberlauf: Verhalten bei vollem Puffer (VERWERFEN oder BLOCKIEREN)
+        :param wartezeit: Maximale Wartezeit in Sekunden bei der Strategie BLOCKIEREN
+        """
+        if ueberlauf not in (VERWERFEN, BLOCKIEREN):
+            raise ValueError(f"Unbekannte Überlaufstrategie: {ueberlauf}")
+
+        self.ziel = ziel
+        self.batch_groesse = batch_groesse
+        self.intervall = intervall
+        self.ueberlauf = ueberlauf
+        self.wartezeit = wartezeit
+
+        self._puffer = queue.Queue(maxsize=max_eintraege)
+        self._statistik_lock = threading.Lock()
+        self._schreib_lock = threading.Lock()
+        self.geschrieben = 0
+        self.verworfen = 0
+        self.fehlgeschlagen = 0
+
+        self._gestoppt = threading.Event()
+        self._thread = threading.Thread(target=self._schreibschleife, name="Protokollschreiber", daemon=True)
+        self._thread.start()
+        atexit.register(self.stoppen)
+
+    def schreiben(self, eintrag):
+        """
+        Übergibt einen Eintrag an den Hintergrund-Thread, ohne auf das Schreiben zu warten.
+
+        :param eintrag: Der Protokolleintrag (Liste der Spaltenwerte)
+        :return: True, wenn der Eintrag gepuffert wurde, sonst False
+        """
+        if self._gestoppt.is_set():
+            # Nach dem Herunterfahren direkt schreiben, damit keine Einträge verloren gehen
+            self._schreibe_block([eintrag])
+            return True
+
+        try:
+            if self.ueberlauf == BLOCKIEREN:
+                self._puffer.put(eintrag, timeout=self.wartezeit)
+            else:
+                self._puffer.put_nowait(eintrag)
+            return True
+        except queue.Full:
+            with self._statistik_lock:
+                self.verworfen += 1
+            return False
+
+    def flush(self):
+        """
+        Schreibt alle bisher gepufferten Einträge und wartet, bis sie gespeichert sind.
+        """
+        if self._gestoppt.is_set() or not self._thread.is_alive():
+            return
+        self._puffer.put(_FLUSH)
+        self._puffer.join()
+
+    def stoppen(self):
+        """
+        Schreibt alle ausstehenden Einträge und beendet den Hintergrund-Thread (wird beim Beenden automatisch aufgerufen).
+        """
+        if self._gestoppt.is_set():
+            return
+        self.flush()
+        self._gestoppt.set()
+        self._puffer.put(_FLUSH)
+        self._thread.join(timeout=5)
+
+    def statistik(self):
+        """
+        Gibt Kennzahlen des Protokollschreibers zurück.
+
+        :return: Dictionary mit geschriebenen, verworfenen, fehlgeschlagenen und wartenden Einträgen
+        """
+        with self._statistik_lock:
+            return {
+                "Geschrieben": self.geschrieben,
+                "Verworfen": self.verworfen,
+                "Fehlgeschlagen": self.fehlgeschlagen,
+                "Wartend": self._puffer.qsize(),
+            }
+
+    def _schreibe_block(self, block):
+        """
+        Speichert einen Block von Einträgen. Fehler beim Schreiben beenden den Hintergrund-Thread nicht.
+
+        :param block: Liste von Einträgen
+        """
+        try:
+            with self._schreib_lock:
+                self.ziel(block)
+            with self._statistik_lock:
+                self.geschrieben += len(block)
+        except Exception as e:
+            with self._statistik_lock:
+                self.fehlgeschlagen += len(block)
+            print(f"🚫 Fehler beim Schreiben des Protokolls: {e}")
+
+    def _schreibschleife(self):
+        """
+        Sammelt Einträge aus dem Puffer und schreibt sie blockweise.
+        """
+        block = []
+        erledigt = 0  # Anzahl entnommener Puffer-Elemente, die noch bestätigt werden müssen
+        frist = None
+
+        while True:
+            timeout = None if frist is None else max(frist - time.monotonic(), 0)
+            try:
+                element = self._puffer.get(timeout=timeout)
+                erledigt += 1
+            except queue.Empty:
+                element = None
+
+            if element is not None and element is not _FLUSH:
+                block.append(element)
+                if frist is None:
+                    frist = time.monotonic() + self.intervall
+
+            faellig = frist is not None and time.monotonic() >= frist
+            if element is _FLUSH or len(block) >= self.batch_groesse or faellig:
+                if block:
+                    self._schreibe_block(block)
+                block = []
+                frist = None
+                for _ in range(erledigt):
+                    self._puffer.task_done()
+                erledigt = 0
+
+            if self._gestoppt.is_set() and self._puffer.empty():
+                if block:
+                    self._schreibe_block(block)
+                break
+
+
+_schreiber = {}
+_schreiber_lock = threading.Lock()
+
+
+def get_protokollschreiber(log_path, pool):
+    """
+    Gibt den prozessweit gemeinsamen Protokollschreiber für eine Logdatei und Protokolldatenbank zurück.
+    Jeder Eintrag wird in die Protokolltabelle und zusätzlich als Prüfpfad in die Tagesdatei (CSV) geschrieben.
+
+    :param log_path: Pfad zur Logdatei
+    :param pool: Verbindungspool der Protokolldatenbank
+    :return: Der Protokollschreiber
+    """
+    schluessel = (os.path.abspath(log_path), pool.db_path)
+    with _schreiber_lock:
+        if schluessel not in _schreiber:
+            _schreiber[schluessel] = Protokollschreiber(mehrfach_ziel(sqlite_ziel(pool), tages_ziel(log_path)))
+        return _schreiber[schluessel]
@@ -0,0 +1,84 @@
+# Mindestbestände je Artikel und Ort (Lager/Automat) und die Warnungen bei ihrer Unterschreitung.
+# Der Bestand wird aus den per Trigger fortgeschriebenen Summen (artikelbestand) gelesen,
+# der Abgleich kostet daher nur eine Zeile je festgelegtem Mindestbestand statt einen Durchlauf über den Lagerbestand.
+# Trigger auf artikelbestand und mindestbestand berechnen bei jeder Änderung nur den betroffenen Artikel und Ort neu.
+
+SCHWELLENWERT_ANWEISUNGEN = [
+    """
+    CREATE TABLE IF NOT EXISTS mindestbestand (
+        artikel_id INTEGER NOT NULL REFERENCES artikel(id),
+        ort TEXT NOT NULL CHECK (ort IN ('Lager', 'Automat')),
+        menge INTEGER NOT NULL CHECK (menge > 0),
+        PRIMARY KEY (artikel_id, ort)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS bestandswarnungen (
+        artikel_id INTEGER NOT NULL REFERENCES artikel(id),
+        ort TEXT NOT NULL,
+        bestand INTEGER NOT NULL,
+        mindestbestand INTEGER NOT NULL,
+        PRIMARY KEY (artikel_id, ort)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Alle Artikel und Orte, deren Bestand unter dem Mindestbestand liegt, in einer gruppierten Abfrage
+UNTER_SCHWELLENWERT = """
+    SELECT mindestbestand.artikel_id, mindestbestand.ort,
+           COALESCE(SUM(artikelbestand.menge), 0) AS bestand, mindestbestand.menge AS mindestmenge
+    FROM mindestbestand LEFT JOIN artikelbestand
+         ON artikelbestand.artikel_id = mindestbestand.artikel_id AND artikelbestand.ort = mindestbestand.ort
+    GROUP BY mindestbestand.artikel_id, mindestbestand.ort
+    HAVING bestand < mindestmenge
+"""
+
+
+def gleiche_bestandswarnungen_ab(cursor):
+    """
+    Gleicht die Warnungen für unterschrittene Mindestbestände ab. Muss innerhalb einer Schreibtransaktion aufgerufen werden.
+    Unveränderte Warnungen werden nicht neu geschrieben.
+
+    :param cursor: Cursor der laufenden Transaktion
+    """
+    cursor.execute(f"""
+        DELETE FROM bestandswarnungen
+        WHERE (artikel_id, ort) NOT IN (SELECT artikel_id, ort FROM ({UNTER_SCHWELLENWERT}))
+    """)
+    cursor.execute(f"""
+        INSERT INTO bestandswarnungen (artikel_id, ort, bestand, mindestbestand)
+        SELECT artikel_id, ort, bestand, mindestmenge FROM ({UNTER_SCHWELLENWERT}) WHERE 1
+        ON CONFLICT (artikel_id, ort) DO UPDATE SET bestand = excluded.bestand, mindestbestand = excluded.mindestbestand
+        WHERE bestandswarnungen.bestand IS NOT excluded.bestand
+           OR bestandswarnungen.mindestbestand IS NOT excluded.mindestbestand
+    """)
+
+
+def _bestandswarnung_neu_berechnen(zeile):
+    """
+    Berechnet die Warnung für einen Artikel und Ort neu, für den Rumpf eines Triggers.
+
+    :param zeile: NEW oder OLD, je nach Trigger
+    :return: Die SQL-Anweisungen des Triggerrumpfs
+    """
+    return f"""
+        DELETE FROM bestandswarnungen WHERE artikel_id = {zeile}.artikel_id AND ort = {zeile}.ort;
+        INSERT INTO bestandswarnungen (artikel_id, ort, bestand, mindestbestand)
+        SELECT mindestbestand.artikel_id, mindestbestand.ort, COALESCE(artikelbestand.menge, 0), mindestbestand.menge
+        FROM mindestbestand LEFT JOIN artikelbestand
+             ON artikelbestand.artikel_id = mindestbestand.artikel_id AND artikelbestand.ort = mindestbestand.ort
+        WHERE mindestbestand.artikel_id = {zeile}.artikel_id AND mindestbestand.ort = {zeile}.ort
+          AND COALESCE(artikelbestand.menge, 0) < mindestbestand.menge;
+    """
+
+
+# Jede Änderung der Summen oder Mindestbestände berechnet nur die Warnung des betroffenen Artikels und Orts neu
+SCHWELLENWERT_TRIGGER_ANWEISUNGEN = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{tabelle}_warnung_{name} AFTER {ereignis} ON {tabelle} BEGIN
+        {_bestandswarnung_neu_berechnen(zeile)}
+    END
+    """
+    for tabelle in ("artikelbestand", "mindestbestand")
+    for name, ereignis, zeile in (("einfuegen", "INSERT", "NEW"), ("aendern", "UPDATE", "NEW"), ("loeschen", "DELETE", "OLD"))
+]
@@ -0,0 +1,40 @@
+# Spalten werden ohne ALTER TABLE ... DROP COLUMN entfernt, das erst ab SQLite 3.35 zur Verfügung steht:
+# neue Tabelle anlegen, Daten kopieren, alte Tabelle löschen und die neue umbenennen (siehe sqlite.org/lang_altertable.html).
+# Indizes und Trigger der Tabelle verschwinden mit der alten Tabelle und werden danach unverändert wieder angelegt.
+
+
+def baue_tabelle_um(tabelle, spalten_definition, spalten):
+    """
+    Erstellt einen Migrationsschritt, der eine Tabelle mit einer neuen Spaltendefinition aufbaut.
+    Der AUTOINCREMENT-Zähler der Tabelle bleibt erhalten, damit gelöschte IDs nicht erneut vergeben werden.
+
+    :param tabelle: Name der Tabelle
+    :param spalten_definition: Spalten und Einschränkungen der neuen Tabelle (Inhalt von CREATE TABLE (...))
+    :param spalten: Die Spalten, die übernommen werden (ohne berechnete Spalten)
+    :return: Funktion, die den Umbau mit dem Cursor der laufenden Migration ausführt
+    """
+    def umbauen(cursor):
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL "
+            "ORDER BY type = 'trigger'", (tabelle,)
+        )
+        abhaengige = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'")
+        zaehler = None
+        if cursor.fetchone():
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabelle,))
+            zaehler = cursor.fetchone()
+
+        liste = ", ".join(spalten)
+        cursor.execute(f"CREATE TABLE {tabelle}_neu ({spalten_definition})")
+        cursor.execute(f"INSERT INTO {tabelle}_neu ({liste}) SELECT {liste} FROM {tabelle}")
+        cursor.execute(f"DROP TABLE {tabelle}")
+        cursor.execute(f"ALTER TABLE {tabelle}_neu RENAME TO {tabelle}")
+
+        if zaehler:
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (tabelle,))
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tabelle, zaehler[0]))
+        for sql in abhaengige:
+            cursor.execute(sql)
+
+    return umbauen
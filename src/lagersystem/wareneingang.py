@@ -0,0 +1,194 @@
+import io
+import os
+import csv
+from datetime import date, datetime
+
+try:
+    import openpyxl  # Optional: nur für den Import von Excel-Lieferscheinen benötigt
+except ImportError:
+    openpyxl = None
+
+BLOCKGROESSE = int(os.environ.get("WARENEINGANG_BLOCK", 2000))  # Zeilen je Transaktion
+
+# Spaltennamen aus Lieferscheinen, die auf die Felder des Lagers abgebildet werden
+SPALTEN = {
+    "barcode": "barcode", "ean": "barcode", "pzn": "barcode",
+    "name": "name", "bezeichnung": "name", "artikel": "name", "medikament": "name",
+    "verfallsdatum": "verfallsdatum", "mhd": "verfallsdatum", "ablaufdatum": "verfallsdatum",
+}
+DATUMSFORMATE = ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y", "%d/%m/%Y")
+
+
+def _normalisiere_barcode(wert):
+    """
+    Wandelt einen Barcode aus der Datei in Text um. Excel liefert lange Zahlen z.B. als 4006381333931.0.
+
+    :param wert: Zelleninhalt
+    :return: Barcode als Text
+    """
+    if isinstance(wert, float) and wert.is_integer():
+        wert = int(wert)
+    return str(wert).strip() if wert is not None else ""
+
+
+def _normalisiere_datum(wert):
+    """
+    Wandelt ein Verfallsdatum in das Format 'YYYY-MM-DD' um. Unbekannte Formate bleiben unverändert,
+    damit das Lager sie als ungültig meldet.
+
+    :param wert: Zelleninhalt (Text, date oder datetime)
+    :return: Datum als Text
+    """
+    if isinstance(wert, (date, datetime)):
+        return wert.strftime("%Y-%m-%d")
+    text = str(wert).strip() if wert is not None else ""
+    for muster in DATUMSFORMATE:
+        try:
+            return datetime.strptime(text, muster).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return text
+
+
+def _spaltenindex(kopfzeile):
+    """
+    Ermittelt die Position von Barcode, Name und Verfallsdatum in der Kopfzeile.
+
+    :param kopfzeile: Liste der Spaltennamen
+    :return: Tupel der Spaltenpositionen (barcode, name, verfallsdatum)
+    """
+    positionen = {}
+    for index, spalte in enumerate(kopfzeile):
+        feld = SPALTEN.get(str(spalte or "").strip().lower())
+        if feld and feld not in positionen:
+            positionen[feld] = index
+
+    fehlend = [feld for feld in ("barcode", "name", "verfallsdatum") if feld not in positionen]
+    if fehlend:
+        raise ValueError(f"🚫 Fehler: Spalte(n) fehlen in der Lieferung: {', '.join(fehlend)}")
+    return positionen["barcode"], positionen["name"], positionen["verfallsdatum"]
+
+
+def _csv_zeilen(datei):
+    """
+    Liest eine CSV-Datei zeilenweise. Das Trennzeichen (Komma oder Semikolon) wird aus dem Dateianfang bestimmt.
+
+    :param datei: Binäre Datei (z.B. Upload aus Streamlit)
+    :return: Generator von Tupeln (Zeile, Fortschritt zwischen 0 und 1)
+    """
+    datei.seek(0, os.SEEK_END)
+    groesse = datei.tell() or 1
+    datei.seek(0)
+
+    text = io.TextIOWrapper(datei, encoding="utf-8-sig", newline="")
+    try:
+        anfang = text.read(4096)
+        text.seek(0)
+        try:
+            dialekt = csv.Sniffer().sniff(anfang, delimiters=",;\t")
+        except csv.Error:
+            dialekt = csv.excel
+
+        for zeile in csv.reader(text, dialekt):
+            yield zeile, min(datei.tell() / groesse, 1.0)
+    finally:
+        # Der Upload selbst bleibt geöffnet, nur der Textaufsatz wird gelöst
+        text.detach()
+
+
+def _excel_zeilen(datei):
+    """
+    Liest das erste Tabellenblatt einer Excel-Datei zeilenweise im Nur-Lese-Modus.
+
+    :param datei: Binäre Datei (z.B. Upload aus Streamlit)
+    :return: Generator von Tupeln (Zeile, Fortschritt zwischen 0 und 1)
+    """
+    if openpyxl is None:
+        raise ValueError("🚫 Fehler: Für Excel-Dateien wird das Paket openpyxl benötigt!")
+
+    arbeitsmappe = openpyxl.load_workbook(datei, read_only=True, data_only=True)
+    try:
+        blatt = arbeitsmappe.worksheets[0]
+        gesamt = blatt.max_row or 1
+        for nummer, zeile in enumerate(blatt.iter_rows(values_only=True), start=1):
+            yield zeile, min(nummer / gesamt, 1.0)
+    finally:
+        arbeitsmappe.close()
+
+
+def lies_lieferung(datei, dateiname, blockgroesse=BLOCKGROESSE):
+    """
+    Liest eine Lieferung (CSV oder XLSX) blockweise, ohne die ganze Datei in den Speicher zu laden.
+
+    :param datei: Binäre Datei (z.B. Upload aus Streamlit)
+    :param dateiname: Name der Datei, aus dessen Endung das Format bestimmt wird
+    :param blockgroesse: Anzahl Zeilen je Block
+    :return: Generator von Tupeln (Zeilennummern, Zeilen (barcode, name, verfallsdatum), Fortschritt)
+    """
+    endung = os.path.splitext(dateiname)[1].lower()
+    if endung == ".csv":
+        zeilen = _csv_zeilen(datei)
+    elif endung in (".xlsx", ".xlsm"):
+        zeilen = _excel_zeilen(datei)
+    else:
+        raise ValueError(f"🚫 Fehler: Dateiformat {endung or dateiname} wird nicht unterstützt!")
+
+    kopfzeile, _ = next(zeilen, (None, 0))
+    if kopfzeile is None:
+        raise ValueError("🚫 Fehler: Die Lieferung ist leer!")
+    barcode_spalte, name_spalte, datum_spalte = _spaltenindex(kopfzeile)
+    breite = max(barcode_spalte, name_spalte, datum_spalte) + 1
+
+    nummern, block, fortschritt = [], [], 0
+    for nummer, (zeile, fortschritt) in enumerate(zeilen, start=2):
+        zeile = list(zeile) + [None] * (breite - len(zeile))
+        if not any(wert not in (None, "") for wert in zeile):
+            continue  # Leerzeilen am Dateiende überspringen
+
+        name = zeile[name_spalte]
+        nummern.append(nummer)
+        block.append((
+            _normalisiere_barcode(zeile[barcode_spalte]),
+            str(name).strip() if name is not None else "",
+            _normalisiere_datum(zeile[datum_spalte]),
+        ))
+        if len(block) >= blockgroesse:
+            yield nummern, block, fortschritt
+            nummern, block = [], []
+
+    if block:
+        yield nummern, block, fortschritt
+
+
+def importiere_lieferung(lager, datei, dateiname, blockgroesse=BLOCKGROESSE, fortschritt=None):
+    """
+    Importiert eine Lieferung blockweise in das Lager. Jeder Block wird in einer eigenen Transaktion gebucht.
+
+    :param lager: Lager-Instanz
+    :param datei: Binäre Datei (z.B. Upload aus Streamlit)
+    :param dateiname: Name der Datei (bestimmt das Format)
+    :param blockgroesse: Anzahl Zeilen je Transaktion
+    :param fortschritt: Optionale Funktion, die nach jedem Block mit (Anteil, Anzahl Zeilen) aufgerufen wird
+    :return: Liste von Tupeln (Zeilennummer in der Datei, Barcode, Meldung)
+    """
+    bericht = []
+    for nummern, block, anteil in lies_lieferung(datei, dateiname, blockgroesse):
+        ergebnisse = lager.ware_hinzufuegen_bulk(block)
+        bericht.extend((nummer, barcode, meldung) for nummer, (_, barcode, meldung) in zip(nummern, ergebnisse))
+        if fortschritt:
+            fortschritt(anteil, len(bericht))
+    return bericht
+
+
+def fehlerbericht_csv(bericht):
+    """
+    Erstellt aus einem Importbericht eine CSV-Datei mit allen nicht übernommenen Zeilen.
+
+    :param bericht: Liste von Tupeln (Zeilennummer, Barcode, Meldung)
+    :return: CSV-Inhalt als Bytes (UTF-8 mit BOM, damit Excel Umlaute korrekt anzeigt)
+    """
+    ausgabe = io.StringIO()
+    writer = csv.writer(ausgabe, delimiter=";")
+    writer.writerow(["Zeile", "Barcode", "Meldung"])
+    writer.writerows(zeile for zeile in bericht if not zeile[2].startswith("✅"))
+    return ausgabe.getvalue().encode("utf-8-sig")
@@ -2,99 +2,235 @@ import pandas as pd
 import sqlite3
 from datetime import datetime
 import os
+from datenbank import get_pool, TransaktionAbgebrochen
+from schwellenwerte import gleiche_bestandswarnungen_ab
+from ablaufwarnungen import STATUS_ABGELAUFEN, WARNUNGEN_ABGELAUFEN, WARNUNGEN_ABGELAUFEN_SEIT
+from benachrichtigungen import ABGELAUFEN, BALD_ABLAUFEND, UNTER_SCHWELLENWERT
+
+STATUS_UNTER_SCHWELLENWERT = "Unter Schwellenwert"
+
+# Arten von Warnungen für den Filter in get_warnungen
+ART_ABGELAUFEN = "Abgelaufen"
+ART_UNTER_SCHWELLENWERT = "Unter Schwellenwert"
+WARNUNGSARTEN = [ART_ABGELAUFEN, ART_UNTER_SCHWELLENWERT]
 
 
 class Warnung:
     """
     Eine Klasse zur Verwaltung von Warnungen für abgelaufene Medikamente und niedrige Bestände.
+    Beide Arten von Warnungen schreiben Trigger bei jeder Bestandsänderung fort, die Klasse liest sie nur
+    und rückt einmal pro Tag den Stichtag für abgelaufene Medikamente vor.
     """
 
-    def __init__(self):
+    def __init__(self, pool=None):
         """
-        Initialisiert die Datenbankverbindung und den Cursor.
+        Initialisiert den Zugriff auf den gemeinsamen Verbindungspool.
+
+        :param pool: Optionaler Verbindungspool (Standard: Pool der Lagerdatenbank)
         """
         base_dir = os.path.dirname(__file__)  # src/lagersystem
         db_path = os.path.join(base_dir, 'databases', 'lagerbestand.db')
 
-        # Verbindung herstellen
-        self.db_conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.db_conn.cursor()
+        # Verbindungen werden pro Anfrage aus dem Pool geliehen
+        self.pool = pool or get_pool(db_path)
 
-    def get_warnungen(self, ort_filter=None):
+    def get_warnungen(self, ort_filter=None, art_filter=None):
         """
-        Ruft Warnungen aus der Datenbank ab und filtert optional nach Ort.
+        Ruft Warnungen aus der Datenbank ab und filtert optional nach Ort und Art.
+        Warnungen für unterschrittene Mindestbestände beziehen sich auf einen Artikel und haben weder Barcode noch Verfallsdatum.
 
         :param ort_filter: Optionaler Filter für den Ort ("Lager" oder "Automat").
+        :param art_filter: Optionaler Filter für die Art (ART_ABGELAUFEN oder ART_UNTER_SCHWELLENWERT).
         :return: Ein DataFrame mit den Warnungen.
         """
-        self._pruefe_warnungen()
-
-        query = (
-            "SELECT barcode, name, verfallsdatum, ort, status FROM warnungen WHERE 1=1"
-        )
+        teile = []
         params = []
+        ort_bedingung = " WHERE ort = ?" if ort_filter in ["Lager", "Automat"] else ""
+
+        if art_filter in (None, ART_ABGELAUFEN):
+            teile.append(
+                "SELECT barcode, name, verfallsdatum, ort, status FROM warnungen "
+                "JOIN artikel ON artikel.id = warnungen.artikel_id" + ort_bedingung
+            )
+            params += [ort_filter] if ort_bedingung else []
 
-        if ort_filter in ["Lager", "Automat"]:
-            query += " AND ort = ?"
-            params.append(ort_filter)
+        if art_filter in (None, ART_UNTER_SCHWELLENWERT):
+            teile.append(
+                "SELECT NULL, name, NULL, ort, ? || ' (' || bestand || ' von mindestens ' || mindestbestand || ')' "
+                "FROM bestandswarnungen JOIN artikel ON artikel.id = bestandswarnungen.artikel_id" + ort_bedingung
+            )
+            params += [STATUS_UNTER_SCHWELLENWERT] + ([ort_filter] if ort_bedingung else [])
 
-        self.cursor.execute(query, params)
-        data = self.cursor.fetchall()
+        data = self.pool.abfragen(" UNION ALL ".join(teile), params) if teile else []
 
         return pd.DataFrame(
             data, columns=["Barcode", "Name", "Verfallsdatum", "Ort", "Status"]
         )
 
+    def get_warnungsstand(self, tage, today=None):
+        """
+        Zählt die Warnungen je Thema und Ort, für den Ablaufplaner und die Hinweise auf den Seiten.
+        Als bald ablaufend zählen Medikamente, deren Verfallsdatum in den nächsten Tagen erreicht wird.
+
+        :param tage: Anzahl Tage für bald ablaufende Medikamente
+        :param today: Optionales Datum im Format 'YYYY-MM-DD' (Standard: heute)
+        :return: Dictionary (Thema, Ort) -> Anzahl
+        """
+        today = today or datetime.today().strftime("%Y-%m-%d")
+        data = self.pool.abfragen("""
+            SELECT ?, ort, COUNT(*) FROM warnungen GROUP BY ort
+            UNION ALL
+            SELECT ?, ort, COUNT(*) FROM bestandswarnungen GROUP BY ort
+            UNION ALL
+            SELECT ?, ort, COUNT(*) FROM lagerbestand
+            WHERE verfallsdatum >= ? AND verfallsdatum < date(?, '+' || ? || ' days') GROUP BY ort
+        """, (ABGELAUFEN, UNTER_SCHWELLENWERT, BALD_ABLAUFEND, today, today, tage))
+        return {(thema, ort): anzahl for thema, ort, anzahl in data}
+
+    def set_mindestbestand(self, name, ort, menge):
+        """
+        Legt den Mindestbestand eines Artikels für Lager oder Automat fest, die Warnung schreibt ein Trigger sofort fort.
+
+        :param name: Der Name des Artikels.
+        :param ort: Der Ort ("Lager" oder "Automat").
+        :param menge: Die Mindestmenge, 0 entfernt den Mindestbestand.
+        :return: Eine Erfolgsmeldung oder eine Fehlermeldung
+        """
+        if ort not in ["Lager", "Automat"]:
+            return "🚫 Fehler: Ungültiger Ort! Erlaubt sind Lager und Automat."
+        if not isinstance(menge, int) or menge < 0:
+            return "🚫 Fehler: Der Mindestbestand muss eine ganze Zahl ab 0 sein!"
+
+        try:
+            self.pool.schreiben(lambda cursor: self._mindestbestand_buchen(cursor, name, ort, menge))
+        except TransaktionAbgebrochen as abbruch:
+            return str(abbruch)
+        except sqlite3.Error as e:
+            return f"🚫 Fehler bei der Datenbank: {str(e)}"
+
+        if menge == 0:
+            return f"✅ Erfolg: Mindestbestand für {name} ({ort}) entfernt."
+        return f"✅ Erfolg: Mindestbestand für {name} ({ort}) auf {menge} gesetzt."
+
+    def _mindestbestand_buchen(self, cursor, name, ort, menge):
+        """
+        Schreibt oder löscht einen Mindestbestand innerhalb einer laufenden Transaktion.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param name: Der Name des Artikels.
+        :param ort: Der Ort ("Lager" oder "Automat").
+        :param menge: Die Mindestmenge, 0 entfernt den Mindestbestand.
+        """
+        cursor.execute("SELECT id FROM artikel WHERE name = ?", (name,))
+        row = cursor.fetchone()
+        if not row:
+            raise TransaktionAbgebrochen(f"🚫 Fehler: Artikel {name} ist nicht bekannt!")
+
+        if menge == 0:
+            cursor.execute("DELETE FROM mindestbestand WHERE artikel_id = ? AND ort = ?", (row[0], ort))
+        else:
+            cursor.execute(
+                "INSERT INTO mindestbestand (artikel_id, ort, menge) VALUES (?, ?, ?) "
+                "ON CONFLICT (artikel_id, ort) DO UPDATE SET menge = excluded.menge",
+                (row[0], ort, menge),
+            )
+
+    def get_mindestbestaende(self):
+        """
+        Gibt alle festgelegten Mindestbestände mit dem aktuellen Bestand zurück.
+
+        :return: Ein DataFrame mit Name, Ort, Mindestbestand und Bestand.
+        """
+        data = self.pool.abfragen("""
+            SELECT name, mindestbestand.ort, mindestbestand.menge, COALESCE(artikelbestand.menge, 0)
+            FROM mindestbestand JOIN artikel ON artikel.id = mindestbestand.artikel_id
+            LEFT JOIN artikelbestand
+                 ON artikelbestand.artikel_id = mindestbestand.artikel_id AND artikelbestand.ort = mindestbestand.ort
+            ORDER BY name, mindestbestand.ort
+        """)
+        return pd.DataFrame(data, columns=["Name", "Ort", "Mindestbestand", "Bestand"])
+
     def _pruefe_warnungen(self):
         """
-        Überprüft die Datenbank auf abgelaufene Medikamente und niedrige Bestände, aktualisiert oder fügt neue Warnungen hinzu.
+        Wertet den gesamten Lagerbestand sofort neu aus, unabhängig vom Stichtag der letzten Auswertung.
+        Die Trigger halten die Warnungen aktuell, der vollständige Abgleich dient nur noch zur Reparatur.
         """
         today = datetime.today().strftime("%Y-%m-%d")
 
-        # Lösche veraltete Warnungen (z. B. wenn ein Medikament entfernt wurde)
-        self.cursor.execute(
-            "DELETE FROM warnungen WHERE barcode NOT IN (SELECT barcode FROM lagerbestand)"
-        )
+        self.pool.schreiben(lambda cursor: self._auswerten(cursor, today))
 
-        # Finde alle abgelaufenen Medikamente im Lagerbestand
-        self.cursor.execute(
-            "SELECT barcode, name, verfallsdatum, ort FROM lagerbestand WHERE verfallsdatum < ?",
-            (today,),
-        )
-        abgelaufene_medikamente = self.cursor.fetchall()
+    def get_stichtag(self):
+        """
+        Gibt den Tag der letzten vollständigen Auswertung zurück.
 
-        for barcode, name, verfallsdatum, ort in abgelaufene_medikamente:
-            self._update_or_insert_warnung(
-                barcode, name, verfallsdatum, ort, "Medikament abgelaufen"
-            )
+        :return: Datum im Format 'YYYY-MM-DD' oder None, wenn noch nie ausgewertet wurde
+        """
+        with self.pool.verbindung() as conn:
+            row = conn.execute("SELECT stichtag FROM warnungsauswertung").fetchone()
+        return row[0] if row else None
+
+    def tagesauswertung(self, today=None):
+        """
+        Tageswechsel: rückt den Stichtag höchstens einmal pro Kalendertag vor.
+        Ist der heutige Tag bereits ausgewertet, wird nur der Stichtag gelesen und nichts geschrieben.
+
+        :param today: Optionales Datum im Format 'YYYY-MM-DD' (Standard: heute)
+        :return: True, wenn der Stichtag vorgerückt wurde, sonst False
+        """
+        today = today or datetime.today().strftime("%Y-%m-%d")
+        stichtag = self.get_stichtag()
+        if stichtag is not None and stichtag >= today:
+            return False
+        return self.pool.schreiben(lambda cursor: self._tagesauswertung_buchen(cursor, today))
+
+    def _tagesauswertung_buchen(self, cursor, today):
+        """
+        Rückt den Stichtag innerhalb einer laufenden Transaktion vor, falls er älter als heute ist.
+        Ergänzt werden nur Waren, deren Verfallsdatum seit dem alten Stichtag erreicht wurde (Bereich im Index).
+        Ohne bisherigen Stichtag wird der gesamte Bestand ausgewertet.
 
-        self.db_conn.commit()
+        :param cursor: Cursor der laufenden Transaktion.
+        :param today: Das heutige Datum im Format 'YYYY-MM-DD'.
+        :return: True, wenn der Stichtag vorgerückt wurde, sonst False
+        """
+        cursor.execute("SELECT stichtag FROM warnungsauswertung")
+        row = cursor.fetchone()
+        stichtag = row[0] if row else None
+        if stichtag is not None and stichtag >= today:
+            return False
+        if stichtag is None:
+            self._auswerten(cursor, today)
+            return True
+
+        cursor.execute("UPDATE warnungsauswertung SET stichtag = ?", (today,))
+        cursor.execute(WARNUNGEN_ABGELAUFEN_SEIT, (STATUS_ABGELAUFEN, today, stichtag))
+        return True
+
+    def _auswerten(self, cursor, today):
+        """
+        Gleicht alle Warnungen ab und setzt den Stichtag auf heute.
 
-    def _update_or_insert_warnung(self, barcode, name, verfallsdatum, ort, status):
+        :param cursor: Cursor der laufenden Transaktion.
+        :param today: Das heutige Datum im Format 'YYYY-MM-DD'.
         """
-        Aktualisiert eine bestehende Warnung oder fügt eine neue hinzu.
+        cursor.execute("UPDATE warnungsauswertung SET stichtag = ?", (today,))
+        self._aktualisiere_warnungen(cursor, today)
+        gleiche_bestandswarnungen_ab(cursor)
 
-        :param barcode: Der Barcode des Medikaments.
-        :param name: Der Name des Medikaments.
-        :param verfallsdatum: Das Verfallsdatum des Medikaments.
-        :param ort: Der Lagerort des Medikaments.
-        :param status: Der Status der Warnung (abgelaufen oder unter Schwellenwert).
+    def _aktualisiere_warnungen(self, cursor, today):
         """
-        self.cursor.execute(
-            "SELECT ort, status FROM warnungen WHERE barcode = ?", (barcode,)
+        Gleicht die Warnungen innerhalb einer laufenden Transaktion mit dem Lagerbestand ab.
+        Alle abgelaufenen Medikamente werden mit einer einzigen Anweisung eingefügt oder aktualisiert,
+        unveränderte Warnungen werden dabei nicht neu geschrieben.
+
+        :param cursor: Cursor der laufenden Transaktion.
+        :param today: Das heutige Datum im Format 'YYYY-MM-DD'.
+        """
+        # Lösche veraltete Warnungen (z. B. wenn ein Medikament entfernt oder sein Verfallsdatum korrigiert wurde)
+        cursor.execute(
+            "DELETE FROM warnungen WHERE barcode NOT IN (SELECT barcode FROM lagerbestand WHERE verfallsdatum < ?)",
+            (today,),
         )
-        warnung = self.cursor.fetchone()
-
-        if warnung:
-            # Falls das Medikament bereits eine Warnung hat, aktualisiere den Ort oder Status
-            if warnung[0] != ort or warnung[1] != status:
-                self.cursor.execute(
-                    "UPDATE warnungen SET ort = ?, status = ? WHERE barcode = ?",
-                    (ort, status, barcode),
-                )
-        else:
-            # Falls es noch keine Warnung gibt, wird eine neue erstellt
-            self.cursor.execute(
-                "INSERT INTO warnungen (barcode, name, verfallsdatum, ort, status) VALUES (?, ?, ?, ?, ?)",
-                (barcode, name, verfallsdatum, ort, status),
-            )
+
+        # Füge Warnungen für alle abgelaufenen Medikamente ein oder aktualisiere Ort und Status bestehender Warnungen
+        cursor.execute(WARNUNGEN_ABGELAUFEN, (STATUS_ABGELAUFEN, today))
@@ -1,51 +1,3 @@
-import pytest
-import sqlite3
-import sys
-import os
-
-# src-Verzeichnis zum Pfad hinzufügen
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
-from lager import Lager
-
-
-@pytest.fixture
-def test_lager():
-    """Erstellt eine Testinstanz des Lagers mit einer In-Memory-Datenbank"""
-    lager = Lager()
-    lager.db_conn = sqlite3.connect(":memory:")  # Temporäre Test-Datenbank
-    lager.cursor = lager.db_conn.cursor()
-
-    # ✅ Tabellen für den Test erstellen
-    lager.cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS lagerbestand (
-            barcode TEXT PRIMARY KEY,
-            name TEXT,
-            menge INTEGER,
-            verfallsdatum TEXT,
-            ort TEXT DEFAULT 'Lager'
-        )
-    """
-    )
-
-    lager.cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS bestellungen (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            bestellgruppe_id INTEGER,
-            kundennummer TEXT,
-            barcode TEXT,
-            name TEXT,
-            bestelldatum TEXT,
-            status TEXT DEFAULT 'Offen'
-        )
-    """
-    )
-
-    lager.db_conn.commit()  # 🔥 Datenbank-Transaktionen speichern
-    return lager
-
-
 def test_wareneingang(test_lager):
     """Testet, ob der Wareneingang korrekt erfasst wird"""
     result = test_lager.ware_hinzufuegen("1234567890", "TestMedikament", "2026-12-31")
@@ -54,10 +6,10 @@ def test_wareneingang(test_lager):
     assert "Erfolg" in result
 
     # Überprüfung in der Datenbank
-    test_lager.cursor.execute(
-        "SELECT menge FROM lagerbestand WHERE barcode = '1234567890'"
-    )
-    menge = test_lager.cursor.fetchone()
+    with test_lager.pool.verbindung() as conn:
+        menge = conn.execute(
+            "SELECT menge FROM lagerbestand WHERE barcode = '1234567890'"
+        ).fetchone()
     print(f"DEBUG Datenbank Wareneingang: {menge}")  # 🛠 Debugging
     assert menge is not None and menge[0] == 1  # Der Bestand sollte 1 sein
 
@@ -71,10 +23,10 @@ def test_warenausgang(test_lager):
     assert "Erfolg" in result
 
     # Überprüfung in der Datenbank
-    test_lager.cursor.execute(
-        "SELECT COUNT(*) FROM lagerbestand WHERE barcode = '1234567890'"
-    )
-    count = test_lager.cursor.fetchone()[0]
+    with test_lager.pool.verbindung() as conn:
+        count = conn.execute(
+            "SELECT COUNT(*) FROM lagerbestand WHERE barcode = '1234567890'"
+        ).fetchone()[0]
     print(f"DEBUG Datenbank Warenausgang: {count}")  # 🛠 Debugging
     assert count == 0  # Ware sollte entfernt sein
 
@@ -100,10 +52,10 @@ def test_fehlbestandsrate(test_lager):
         )
 
     # 🔹 **Fehlbestände automatisch zählen**
-    test_lager.cursor.execute(
-        "SELECT COUNT(*) FROM lagerbestand WHERE barcode = '' OR menge <= 0 OR verfallsdatum IS NULL"
-    )
-    fehlbestand = test_lager.cursor.fetchone()[0]
+    with test_lager.pool.verbindung() as conn:
+        fehlbestand = conn.execute(
+            "SELECT COUNT(*) FROM lagerbestand WHERE barcode = '' OR menge <= 0 OR verfallsdatum IS NULL"
+        ).fetchone()[0]
 
     # 🔹 Gesamtartikel zählen
     bestand = test_lager.get_artikel_anzahl()
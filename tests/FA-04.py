@@ -36,8 +36,10 @@ class TestBestellungsZuverlaessigkeit(unittest.TestCase):
             barcode = f"900000{i:03d}"  # z. B. 900000000, 900000001, ...
             name = f"TestMedikament{i}"
             verfallsdatum = (heute + timedelta(days=365)).strftime("%Y-%m-%d")
+            cls.cursor.execute("INSERT OR IGNORE INTO artikel (name) VALUES (?)", (name,))
             cls.cursor.execute(
-                "INSERT INTO lagerbestand (barcode, name, menge, verfallsdatum, ort) VALUES (?, ?, 1, ?, 'Lager')",
+                "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) "
+                "VALUES (?, (SELECT id FROM artikel WHERE name = ?), 1, ?, 'Lager')",
                 (barcode, name, verfallsdatum)
             )
         cls.conn.commit()
@@ -0,0 +1,87 @@
+import io
+import time
+import pytest
+import sys
+import os
+from datetime import date, timedelta
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from wareneingang import importiere_lieferung, lies_lieferung, fehlerbericht_csv
+
+VERFALLSDATUM = date.today() + timedelta(days=365)
+GROSSHANDEL_LIEFERUNG = 20000
+
+
+def lieferschein(zeilen, kopf="EAN;Bezeichnung;MHD", trennzeichen=";"):
+    """Erstellt einen CSV-Lieferschein als Upload-Datei im Speicher."""
+    text = kopf + "\n" + "".join(trennzeichen.join(zeile) + "\n" for zeile in zeilen)
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def test_lieferung_mit_fehlerbericht(test_lager):
+    """Prüft, ob gültige Zeilen eingelagert und ungültige mit Zeilennummer gemeldet werden."""
+    datei = lieferschein([
+        ("10000001", "Ibuprofen", VERFALLSDATUM.strftime("%d.%m.%Y")),
+        ("123", "Aspirin", VERFALLSDATUM.strftime("%d.%m.%Y")),
+        ("10000002", "Paracetamol", "01.01.2020"),
+        ("", "", ""),
+        ("10000003", "Novalgin", VERFALLSDATUM.isoformat()),
+    ])
+
+    bericht = importiere_lieferung(test_lager, datei, "lieferung.csv")
+
+    assert [(zeile, barcode) for zeile, barcode, _ in bericht] == [
+        (2, "10000001"), (3, "123"), (4, "10000002"), (6, "10000003"),
+    ]
+    assert [meldung[0] for _, _, meldung in bericht] == ["✅", "🚫", "⚠", "✅"]
+    assert set(test_lager.get_lagerbestand()["Barcode"]) == {"10000001", "10000003"}
+
+    fehler = fehlerbericht_csv(bericht).decode("utf-8-sig").splitlines()
+    assert fehler[0] == "Zeile;Barcode;Meldung"
+    assert [zeile.split(";")[0] for zeile in fehler[1:]] == ["3", "4"]
+
+
+def test_fehlende_spalten_werden_gemeldet():
+    """Prüft, ob ein Lieferschein ohne Pflichtspalten abgelehnt wird."""
+    with pytest.raises(ValueError, match="verfallsdatum"):
+        list(lies_lieferung(lieferschein([("10000001", "Ibuprofen")], kopf="Barcode,Name", trennzeichen=","), "lieferung.csv"))
+
+    with pytest.raises(ValueError, match="nicht unterstützt"):
+        list(lies_lieferung(io.BytesIO(b""), "lieferung.pdf"))
+
+
+def test_grosshandelslieferung_in_sekunden(test_lager):
+    """Prüft, ob eine vollständige Großhandelslieferung blockweise mit Fortschrittsanzeige eingelagert wird."""
+    datei = lieferschein(
+        [(str(40000000 + i), f"Medikament {i % 100}", VERFALLSDATUM.isoformat()) for i in range(GROSSHANDEL_LIEFERUNG)],
+        kopf="Barcode,Name,Verfallsdatum", trennzeichen=",",
+    )
+    fortschritt = []
+
+    start_time = time.time()
+    bericht = importiere_lieferung(test_lager, datei, "lieferung.csv", blockgroesse=2500,
+                                   fortschritt=lambda anteil, anzahl: fortschritt.append((anteil, anzahl)))
+    dauer = time.time() - start_time
+
+    print(f"⏱ {GROSSHANDEL_LIEFERUNG} Zeilen importiert: {dauer:.5f} Sekunden")
+    assert len(bericht) == GROSSHANDEL_LIEFERUNG
+    assert all(meldung.startswith("✅") for _, _, meldung in bericht)
+    assert [anzahl for _, anzahl in fortschritt] == list(range(2500, GROSSHANDEL_LIEFERUNG + 1, 2500))
+    assert [anteil for anteil, _ in fortschritt] == sorted(anteil for anteil, _ in fortschritt)
+    assert dauer < 10
+
+
+def test_excel_lieferung(test_lager):
+    """Prüft den Import einer Excel-Datei, in der Barcodes als Zahlen und Daten als Datum gespeichert sind."""
+    openpyxl = pytest.importorskip("openpyxl")
+    arbeitsmappe = openpyxl.Workbook()
+    blatt = arbeitsmappe.active
+    blatt.append(["Barcode", "Name", "Verfallsdatum"])
+    blatt.append([4006381333931, "Ibuprofen", VERFALLSDATUM])
+    datei = io.BytesIO()
+    arbeitsmappe.save(datei)
+
+    bericht = importiere_lieferung(test_lager, datei, "lieferung.xlsx")
+
+    assert bericht == [(2, "4006381333931", "✅ Erfolg: Ibuprofen hinzugefügt.")]
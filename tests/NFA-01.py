@@ -1,4 +1,5 @@
 import os
+import sys
 import pandas as pd
 import pytest
 from datetime import datetime
@@ -7,26 +8,29 @@ from datetime import datetime
 
 # Dynamischer Pfad zur Logdatei relativ zum aktuellen Dateipfad (tests/)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem'))
-LOG_DATEI = os.path.join(BASE_DIR, 'logs', 'log_protokoll.csv')
+LOG_DATEI = os.path.join(BASE_DIR, 'logs', 'log_protokoll.csv')  # Basis-Pfad der Tagesdateien
 
-KRITISCHE_KEYWORDS = [
-    "App-Absturz", "Systemfehler", "Datenbankfehler", "nicht reagiert",
-    "Timeout", "unbehandelte Ausnahme", "500", "kritischer Fehler"
-]
+sys.path.insert(0, BASE_DIR)
+from logdateien import get_partitionen, lies_logdateien
+from ereignisse import Ergebnis
 
 MTBF_MINDESTWERT = 1000  # in Stunden (laut Anforderung)
 
 
 def lade_log():
-    assert os.path.exists(LOG_DATEI), f"❌ Logdatei nicht gefunden unter Pfad: {LOG_DATEI}"
-    df = pd.read_csv(LOG_DATEI, names=["Zeitstempel", "Kundennummer", "Aktion"])
+    assert get_partitionen(LOG_DATEI), f"❌ Keine Logdateien gefunden unter Pfad: {os.path.dirname(LOG_DATEI)}"
+    df = pd.DataFrame(
+        [(e.zeitstempel, e.kundennummer, e.text, e.ergebnis.value) for e in lies_logdateien(LOG_DATEI)],
+        columns=["Zeitstempel", "Kundennummer", "Aktion", "Ergebnis"],
+    )
     df["Zeitstempel"] = pd.to_datetime(df["Zeitstempel"], errors="coerce")
     df = df.dropna(subset=["Zeitstempel"])
     return df
 
 
 def berechne_mtbf(df: pd.DataFrame) -> float:
-    kritische_fehler = df[df["Aktion"].str.contains('|'.join(KRITISCHE_KEYWORDS), case=False, na=False)].copy()
+    # Kritische Fehler werden über das Ergebnis exakt erkannt statt über Schlüsselwörter im Text
+    kritische_fehler = df[df["Ergebnis"] == Ergebnis.KRITISCH.value].copy()
     kritische_fehler = kritische_fehler.sort_values("Zeitstempel")
     kritische_fehler["Delta"] = kritische_fehler["Zeitstempel"].diff().dt.total_seconds() / 3600
     return kritische_fehler["Delta"].mean() if len(kritische_fehler) > 1 else None
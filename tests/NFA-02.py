@@ -82,8 +82,8 @@ def test_reaktionszeit(db_path=DB_PATH, iterations=5):
 
             # Test 3: Dummy-Eintrag (zurückrollen)
             cursor.execute("""
-                INSERT INTO lagerbestand (barcode, name, menge, verfallsdatum, ort)
-                VALUES ('12345678', 'TestMedikament', 1, '2099-12-31', 'Lager')
+                INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort)
+                VALUES ('12345678', NULL, 1, '2099-12-31', 'Lager')
             """)
             conn.rollback()
 
@@ -0,0 +1,42 @@
+import time
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from dienste import get_dienste
+
+
+def test_dienste_werden_nur_einmal_erzeugt():
+    """Prüft, ob wiederholte Reruns dieselben Fachobjekte erhalten."""
+    erste = get_dienste()
+    zweite = get_dienste()
+
+    assert erste is zweite
+    assert erste.lager is zweite.lager
+    assert erste.automat is zweite.automat
+
+
+def test_gemeinsame_datenbankinstanz():
+    """Prüft, ob Lager, Automat und Admin dieselbe Datenbankinstanz teilen."""
+    dienste = get_dienste()
+
+    assert dienste.lager.datenbank is dienste.datenbank
+    assert dienste.automat.datenbank is dienste.datenbank
+    assert dienste.admin.datenbank is dienste.datenbank
+    assert dienste.lager.warnung is dienste.warnung
+    assert dienste.automat.warnung is dienste.warnung
+
+
+def test_warmstart_schneller_als_kaltstart():
+    """Vergleicht die Bereitstellungszeit eines Reruns mit dem Kaltstart."""
+    dienste = get_dienste()
+
+    start_time = time.time()
+    for _ in range(100):
+        get_dienste()
+    warm = (time.time() - start_time) / 100
+
+    zeiten = dienste.zeitmessung()
+    print(f"⏱ Kaltstart: {zeiten['Kaltstart'] * 1000:.2f} ms, Warmstart: {warm * 1000:.4f} ms")
+    assert warm < zeiten["Kaltstart"]
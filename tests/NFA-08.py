@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Verbindungspool, get_pool
+from lager import Lager
+
+
+def test_pool_wird_pro_datei_geteilt(test_datenbank):
+    """Prüft, ob alle Klassen denselben Pool für dieselbe Datei erhalten."""
+    lager = Lager(datenbank=test_datenbank)
+
+    assert get_pool(test_datenbank.db_path) is test_datenbank.pool
+    assert lager.pool is test_datenbank.pool
+    assert lager.warnung.pool is test_datenbank.pool
+
+
+def test_verbindungen_werden_wiederverwendet(tmp_path):
+    """Prüft, ob eine zurückgegebene Verbindung erneut ausgeliehen wird."""
+    pool = Verbindungspool(str(tmp_path / "pool.db"))
+
+    with pool.verbindung() as erste:
+        pass
+    with pool.verbindung() as zweite:
+        pass
+
+    assert erste is zweite
+
+
+def test_verschachtelte_ausleihe_im_selben_thread(tmp_path):
+    """Prüft, ob verschachtelte Aufrufe im selben Thread dieselbe Verbindung erhalten."""
+    pool = Verbindungspool(str(tmp_path / "pool.db"), max_verbindungen=1)
+
+    with pool.verbindung() as aussen:
+        with pool.verbindung() as innen:
+            assert aussen is innen
+
+
+def test_defekte_verbindung_wird_ersetzt(tmp_path):
+    """Prüft, ob der Gesundheitscheck geschlossene Verbindungen aussortiert."""
+    pool = Verbindungspool(str(tmp_path / "pool.db"))
+
+    with pool.verbindung() as conn:
+        pass
+    conn.close()
+
+    with pool.verbindung() as neue_conn:
+        assert neue_conn is not conn
+        assert neue_conn.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_pool_ist_begrenzt(tmp_path):
+    """Prüft, ob ein erschöpfter Pool nach der Wartezeit einen Datenbankfehler meldet."""
+    pool = Verbindungspool(str(tmp_path / "pool.db"), max_verbindungen=1, wartezeit=0.1)
+    belegt = threading.Event()
+    freigeben = threading.Event()
+
+    def halte_verbindung():
+        with pool.verbindung():
+            belegt.set()
+            freigeben.wait(5)
+
+    thread = threading.Thread(target=halte_verbindung)
+    thread.start()
+    belegt.wait(5)
+
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.verbindung():
+            pass
+
+    freigeben.set()
+    thread.join()
+
+
+def test_parallele_sitzungen(test_datenbank):
+    """Simuliert parallele Sitzungen, die gleichzeitig Ware einlagern und lesen."""
+    lager = Lager(datenbank=test_datenbank)
+    fehler = []
+
+    def sitzung(nummer):
+        for i in range(20):
+            barcode = str(10000000 + nummer * 100 + i)
+            result = lager.ware_hinzufuegen(barcode, f"Medikament {nummer}", "2099-12-31")
+            if "Erfolg" not in result:
+                fehler.append(result)
+            lager.get_lagerbestand(ort_filter="Lager")
+
+    threads = [threading.Thread(target=sitzung, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fehler == []
+    assert len(lager.get_lagerbestand()) == 160
@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+import time
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Verbindungspool, TransaktionAbgebrochen
+
+SCHREIBTRANSAKTIONEN = 10
+LESER = 4
+
+
+def erstelle_testdatenbank(db_path, journal_mode):
+    """Legt eine Testdatenbank mit etwas Lagerbestand im gewünschten Journal-Modus an."""
+    pool = Verbindungspool(db_path, journal_mode=journal_mode)
+    with pool.verbindung() as conn:
+        conn.execute("CREATE TABLE lagerbestand (barcode TEXT PRIMARY KEY, name TEXT, ort TEXT)")
+        conn.executemany(
+            "INSERT INTO lagerbestand VALUES (?, 'Testmedikament', 'Lager')",
+            [(str(10000000 + i),) for i in range(20000)],
+        )
+        conn.commit()
+    return pool
+
+
+def messe_lesezeiten(db_path, journal_mode):
+    """
+    Misst die Lesezeiten mehrerer Sitzungen, während eine Sitzung große Bestellungen schreibt.
+
+    :return: Sortierte Liste der Lesezeiten in Millisekunden
+    """
+    pool = erstelle_testdatenbank(db_path, journal_mode)
+    fertig = threading.Event()
+    lesezeiten = []
+
+    def schreibe_bestellung(cursor, runde):
+        # Kleiner Cache erzwingt frühes Schreiben in die Datei (wie bei großen Transaktionen)
+        cursor.execute("PRAGMA cache_size = 50")
+        cursor.executemany(
+            "INSERT INTO lagerbestand VALUES (?, ?, 'Lager')",
+            [(f"{runde:02d}{i:08d}", "Neues Medikament " * 10) for i in range(2000)],
+        )
+        time.sleep(0.05)
+
+    def schreiber():
+        for runde in range(SCHREIBTRANSAKTIONEN):
+            pool.schreiben(lambda cursor: schreibe_bestellung(cursor, runde))
+        fertig.set()
+
+    def leser():
+        while not fertig.is_set():
+            start_time = time.perf_counter()
+            with pool.verbindung() as conn:
+                conn.execute("SELECT COUNT(*) FROM lagerbestand WHERE ort = 'Lager'").fetchone()
+            lesezeiten.append((time.perf_counter() - start_time) * 1000)
+
+    threads = [threading.Thread(target=schreiber)] + [threading.Thread(target=leser) for _ in range(LESER)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return sorted(lesezeiten)
+
+
+def test_lesezugriffe_warten_nicht_auf_schreibvorgaenge(tmp_path):
+    """Vergleicht die Lesezeiten im Rollback-Journal mit dem WAL-Modus."""
+    rollback = messe_lesezeiten(str(tmp_path / "rollback.db"), "DELETE")
+    wal = messe_lesezeiten(str(tmp_path / "wal.db"), "WAL")
+
+    for modus, zeiten in (("DELETE", rollback), ("WAL", wal)):
+        p95 = zeiten[int(len(zeiten) * 0.95)]
+        print(f"⏱ {modus}: {len(zeiten)} Lesezugriffe, p95 = {p95:.2f} ms, max = {zeiten[-1]:.2f} ms")
+
+    assert wal[-1] < rollback[-1], "Im WAL-Modus dürfen Lesezugriffe nicht hinter Schreibvorgängen warten!"
+
+
+def test_schreibtransaktion_wird_bei_sperre_wiederholt(tmp_path):
+    """Prüft, ob eine gesperrte Schreibtransaktion nach kurzer Wartezeit erneut versucht wird."""
+    db_path = str(tmp_path / "sperre.db")
+    pool = Verbindungspool(db_path, busy_timeout_ms=10, schreib_versuche=8)
+    with pool.verbindung() as conn:
+        conn.execute("CREATE TABLE bestellungen (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.commit()
+
+    # Eine fremde Sitzung hält die Schreibsperre für kurze Zeit
+    fremde_sitzung = sqlite3.connect(db_path, check_same_thread=False)
+    fremde_sitzung.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.2, fremde_sitzung.commit).start()
+
+    pool.schreiben(lambda cursor: cursor.execute("INSERT INTO bestellungen (status) VALUES ('Offen')"))
+
+    with pool.verbindung() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM bestellungen").fetchone()[0] == 1
+    fremde_sitzung.close()
+
+
+def test_fachlicher_abbruch_rollt_zurueck(tmp_path):
+    """Prüft, ob eine abgebrochene Schreibtransaktion keine Teiländerungen hinterlässt."""
+    pool = Verbindungspool(str(tmp_path / "abbruch.db"))
+    with pool.verbindung() as conn:
+        conn.execute("CREATE TABLE bestellungen (id INTEGER PRIMARY KEY, status TEXT)")
+        conn.commit()
+
+    def buchen(cursor):
+        cursor.execute("INSERT INTO bestellungen (status) VALUES ('Offen')")
+        raise TransaktionAbgebrochen("🚫 Fehler: Abbruch")
+
+    try:
+        pool.schreiben(buchen)
+    except TransaktionAbgebrochen:
+        pass
+
+    with pool.verbindung() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM bestellungen").fetchone()[0] == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as verzeichnis:
+        for modus in ("DELETE", "WAL"):
+            zeiten = messe_lesezeiten(os.path.join(verzeichnis, f"{modus}.db"), modus)
+            print(f"{modus}: p50 = {zeiten[len(zeiten) // 2]:.2f} ms, p95 = {zeiten[int(len(zeiten) * 0.95)]:.2f} ms, max = {zeiten[-1]:.2f} ms")
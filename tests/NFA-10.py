@@ -0,0 +1,71 @@
+import sqlite3
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Datenbank, Verbindungspool
+from migrationen import migriere, get_schema_version, get_abfrageplaene, pruefe_sqlite_version, LAGER_MIGRATIONEN, HAEUFIGE_ABFRAGEN
+
+
+def test_neue_datenbank_erhaelt_aktuelle_version(tmp_path):
+    """Prüft, ob eine neue Datenbank alle Migrationen und Indizes erhält."""
+    datenbank = Datenbank(db_path=str(tmp_path / "lagerbestand.db"), user_db_path=str(tmp_path / "users.db"))
+
+    with datenbank.pool.verbindung() as conn:
+        cursor = conn.cursor()
+        assert get_schema_version(cursor) == LAGER_MIGRATIONEN[-1][0]
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+        indizes = {row[0] for row in cursor.fetchall()}
+
+    assert "idx_lagerbestand_ort_kanal" in indizes
+    assert "idx_bestellungen_gruppe" in indizes
+
+
+def test_bestehende_datenbank_wird_migriert(tmp_path):
+    """Prüft, ob eine Datenbank ohne Versionsnummer (Altbestand) ohne Datenverlust migriert wird."""
+    db_path = str(tmp_path / "alt.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE lagerbestand (barcode TEXT PRIMARY KEY, name TEXT, menge INTEGER, "
+                 "verfallsdatum TEXT, ort TEXT DEFAULT 'Lager', kanal TEXT DEFAULT NULL)")
+    conn.execute("INSERT INTO lagerbestand VALUES ('12345678', 'Aspirin', 1, '2099-12-31', 'Lager', NULL)")
+    conn.commit()
+    conn.close()
+
+    pool = Verbindungspool(db_path)
+    bericht = migriere(pool, LAGER_MIGRATIONEN, abfragen=HAEUFIGE_ABFRAGEN)
+
+    assert [version for version, _ in bericht["angewendet"]] == [version for version, _, _ in LAGER_MIGRATIONEN]
+    assert "SCAN" in bericht["vorher"]["Abgelaufene Medikamente"]
+    assert "idx_lagerbestand_verfallsdatum" in bericht["nachher"]["Abgelaufene Medikamente"]
+    with pool.verbindung() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM lagerbestand").fetchone()[0] == 1
+
+
+def test_migrationen_sind_idempotent(tmp_path):
+    """Prüft, ob ein zweiter Start keine Migration erneut anwendet."""
+    pool = Verbindungspool(str(tmp_path / "lagerbestand.db"))
+
+    assert migriere(pool, LAGER_MIGRATIONEN)["angewendet"]
+    assert migriere(pool, LAGER_MIGRATIONEN)["angewendet"] == []
+
+
+def test_zu_alte_sqlite_version_wird_abgewiesen():
+    """Prüft, ob eine SQLite-Version ohne generierte Spalten vor der Migration abgewiesen wird."""
+    pruefe_sqlite_version()
+    pruefe_sqlite_version((3, 31, 0))
+    with pytest.raises(sqlite3.NotSupportedError, match="mindestens SQLite 3.31.0"):
+        pruefe_sqlite_version((3, 30, 1))
+
+def test_haeufige_abfragen_nutzen_indizes(tmp_path):
+    """Prüft, ob keine der häufigen Abfragen nach der Migration einen vollständigen Tabellenscan benötigt."""
+    pool = Verbindungspool(str(tmp_path / "lagerbestand.db"))
+    migriere(pool, LAGER_MIGRATIONEN)
+
+    with pool.verbindung() as conn:
+        plaene = get_abfrageplaene(conn.cursor())
+
+    for name, plan in plaene.items():
+        print(f"{name}: {plan}")
+        assert "USING" in plan, f"Abfrage '{name}' verwendet keinen Index: {plan}"
@@ -0,0 +1,125 @@
+import csv
+import time
+import threading
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from protokoll import Protokollschreiber, csv_ziel, BLOCKIEREN
+from datenbank import Datenbank
+from logdateien import lies_logdateien
+
+AKTIONEN = 2000
+
+
+def lies_log(log_path):
+    with open(log_path, encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+def test_eintraege_werden_gesammelt_geschrieben(tmp_path):
+    """Prüft, ob Einträge blockweise geschrieben werden und nach flush vollständig vorliegen."""
+    bloecke = []
+    schreiber = Protokollschreiber(bloecke.append, batch_groesse=50, intervall=10)
+
+    for i in range(120):
+        schreiber.schreiben(["2025-01-01 12:00:00", "12345678", f"Aktion {i}"])
+    schreiber.flush()
+
+    assert sum(len(block) for block in bloecke) == 120
+    assert len(bloecke) < 120
+    assert schreiber.statistik()["Geschrieben"] == 120
+    schreiber.stoppen()
+
+
+def test_zeitintervall_loest_schreiben_aus(tmp_path):
+    """Prüft, ob ein einzelner Eintrag spätestens nach dem Zeitintervall geschrieben wird."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    schreiber = Protokollschreiber(csv_ziel(log_path), batch_groesse=1000, intervall=0.1)
+
+    schreiber.schreiben(["2025-01-01 12:00:00", "12345678", "✅ User-Login erfolgreich"])
+    time.sleep(0.5)
+
+    assert lies_log(log_path) == [["2025-01-01 12:00:00", "12345678", "✅ User-Login erfolgreich"]]
+    schreiber.stoppen()
+
+
+def test_ueberlauf_verwirft_und_zaehlt(tmp_path):
+    """Prüft, ob bei vollem Puffer Einträge verworfen und gezählt werden, ohne den Aufrufer zu blockieren."""
+    freigabe = threading.Event()
+    schreiber = Protokollschreiber(lambda block: freigabe.wait(5), max_eintraege=10, batch_groesse=1)
+
+    start_time = time.time()
+    ergebnisse = [schreiber.schreiben(["t", "k", f"Aktion {i}"]) for i in range(50)]
+    dauer = time.time() - start_time
+
+    assert ergebnisse.count(False) == schreiber.statistik()["Verworfen"] > 0
+    assert dauer < 0.5
+    freigabe.set()
+    schreiber.stoppen()
+
+
+def test_blockieren_wartet_auf_freien_platz():
+    """Prüft, ob die Strategie BLOCKIEREN keine Einträge verliert, solange der Schreiber nachkommt."""
+    bloecke = []
+    schreiber = Protokollschreiber(bloecke.append, max_eintraege=5, batch_groesse=5, ueberlauf=BLOCKIEREN)
+
+    for i in range(100):
+        schreiber.schreiben(["t", "k", f"Aktion {i}"])
+    schreiber.flush()
+
+    assert sum(len(block) for block in bloecke) == 100
+    assert schreiber.statistik()["Verworfen"] == 0
+    schreiber.stoppen()
+
+
+def test_stoppen_schreibt_ausstehende_eintraege(tmp_path):
+    """Prüft, ob beim Herunterfahren alle gepufferten Einträge geschrieben werden."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    schreiber = Protokollschreiber(csv_ziel(log_path), batch_groesse=1000, intervall=60)
+
+    for i in range(10):
+        schreiber.schreiben(["2025-01-01 12:00:00", "12345678", f"Aktion {i}"])
+    schreiber.stoppen()
+
+    assert len(lies_log(log_path)) == 10
+
+
+def test_log_aktion_wird_vollstaendig_geschrieben(tmp_path):
+    """Prüft, ob log_aktion über den gemeinsamen Protokollschreiber in die Tagesdatei schreibt."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    datenbank = Datenbank(
+        db_path=str(tmp_path / "lagerbestand.db"),
+        user_db_path=str(tmp_path / "users.db"),
+        log_path=log_path,
+    )
+
+    for i in range(10):
+        datenbank.log_aktion(f"Aktion {i}")
+    datenbank.protokoll.flush()
+
+    eintraege = list(lies_logdateien(log_path))
+    assert [eintrag.text for eintrag in eintraege] == [f"Aktion {i}" for i in range(10)]
+    assert all(eintrag.kundennummer == "Unbekannt" for eintrag in eintraege)
+
+
+def test_latenz_gepuffert_gegen_direkt(tmp_path):
+    """Vergleicht die Wartezeit des Aufrufers beim gepufferten und beim direkten Schreiben je Aktion."""
+    direkt = csv_ziel(str(tmp_path / "logs" / "direkt.csv"))
+    schreiber = Protokollschreiber(csv_ziel(str(tmp_path / "logs" / "gepuffert.csv")))
+
+    start_time = time.time()
+    for i in range(AKTIONEN):
+        direkt([["2025-01-01 12:00:00", "12345678", f"Aktion {i}"]])
+    dauer_direkt = time.time() - start_time
+
+    start_time = time.time()
+    for i in range(AKTIONEN):
+        schreiber.schreiben(["2025-01-01 12:00:00", "12345678", f"Aktion {i}"])
+    dauer_gepuffert = time.time() - start_time
+
+    schreiber.stoppen()
+    print(f"⏱ Direkt: {dauer_direkt:.5f} Sekunden, gepuffert: {dauer_gepuffert:.5f} Sekunden")
+    assert len(lies_log(str(tmp_path / "logs" / "gepuffert.csv"))) == AKTIONEN
+    assert dauer_gepuffert < dauer_direkt
@@ -0,0 +1,103 @@
+import csv
+import time
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Datenbank
+from admin import Admin
+from protokoll import bestimme_aktionstyp
+
+LOG_EINTRAEGE = 50000
+
+
+@pytest.fixture
+def test_admin(tmp_path):
+    """Erstellt einen Admin mit einer vorhandenen CSV-Logdatei, die beim Start importiert wird."""
+    log_path = tmp_path / "logs" / "log_protokoll.csv"
+    log_path.parent.mkdir()
+    with open(log_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        for i in range(LOG_EINTRAEGE):
+            tag = 1 + i % 28
+            writer.writerow([
+                f"2025-02-{tag:02d} {i % 24:02d}:{i % 60:02d}:00",
+                str(10000000 + i % 50),
+                "🚫 User-Login fehlgeschlagen" if i % 10 == 0 else f"✅ Medikament {i} wurde erfolgreich hinzugefügt.",
+            ])
+
+    datenbank = Datenbank(
+        db_path=str(tmp_path / "lagerbestand.db"),
+        user_db_path=str(tmp_path / "users.db"),
+        log_path=str(log_path),
+    )
+    return Admin(datenbank=datenbank)
+
+
+def test_csv_wird_einmalig_importiert(test_admin):
+    """Prüft, ob die bestehende CSV-Logdatei vollständig und nur einmal übernommen wird."""
+    Datenbank(
+        db_path=test_admin.db_path,
+        user_db_path=test_admin.user_db_path,
+        log_path=test_admin.log_path,
+    )
+
+    with test_admin.protokoll_pool.verbindung() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM protokoll").fetchone()[0] == LOG_EINTRAEGE
+
+
+def test_filter_werden_in_der_datenbank_ausgefuehrt(test_admin):
+    """Prüft die Filter nach Zeitraum, Benutzer und Aktionstyp."""
+    logs = test_admin.get_logdatei(von="2025-02-03 00:00:00", bis="2025-02-03 23:59:59")
+    assert len(logs) > 0
+    assert logs["Zeitstempel"].str.startswith("2025-02-03").all()
+
+    logs = test_admin.get_logdatei(von="2025-02-03 00:00:00", bis="2025-02-03 23:59:59", kundennummer="10000002")
+    assert (logs["Benutzer"] == "10000002").all()
+
+    logs = test_admin.get_logdatei(aktionstyp="Fehler")
+    assert len(logs) == LOG_EINTRAEGE // 10
+    assert logs["Aktion"].str.contains("fehlgeschlagen").all()
+
+
+def test_neue_eintraege_erscheinen_in_der_ansicht(test_admin):
+    """Prüft, ob neue Aktionen nach dem Schreiben in der Protokolldatenbank abrufbar sind."""
+    test_admin.datenbank.log_aktion("✅ Admin-Login erfolgreich")
+
+    logs = test_admin.get_logdatei(action_filter="Admin-Login")
+    assert len(logs) == 1
+    assert test_admin.hat_logeintraege()
+
+
+def test_bereichsabfragen_nutzen_indizes(test_admin):
+    """Prüft, ob Zeitraum-, Benutzer- und Aktionstyp-Filter keinen vollständigen Tabellenscan benötigen."""
+    with test_admin.protokoll_pool.verbindung() as conn:
+        for sql, params in (
+            ("SELECT * FROM protokoll WHERE zeitstempel >= ? AND zeitstempel <= ?", ("2025-02-03", "2025-02-04")),
+            ("SELECT * FROM protokoll WHERE kundennummer = ? AND zeitstempel >= ?", ("10000002", "2025-02-03")),
+            ("SELECT * FROM protokoll WHERE aktionstyp = ? AND zeitstempel >= ?", ("Fehler", "2025-02-03")),
+        ):
+            plan = "; ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            assert "USING INDEX" in plan, plan
+
+
+def test_antwortzeit_tagesansicht(test_admin):
+    """Misst die Antwortzeit der Tagesansicht im Protokoll."""
+    start_time = time.time()
+    logs = test_admin.get_logdatei(von="2025-02-14 08:00:00", bis="2025-02-14 12:00:00")
+    dauer = time.time() - start_time
+
+    print(f"⏱ Tagesansicht ({len(logs)} von {LOG_EINTRAEGE} Einträgen): {dauer:.5f} Sekunden")
+    assert dauer < 0.5
+
+
+def test_aktionstyp_wird_erkannt():
+    """Prüft die Zuordnung der Meldungen zu Aktionstypen."""
+    assert bestimme_aktionstyp("🚫 User-Login fehlgeschlagen") == "Fehler"
+    assert bestimme_aktionstyp("Bestellung: 🚫 Fehler: Keine Medikamente") == "Fehler"
+    assert bestimme_aktionstyp("⚠️ Benutzer hat Lagerbestand aufgerufen") == "Warnung"
+    assert bestimme_aktionstyp("✅ User-Login erfolgreich") == "Erfolg"
+    assert bestimme_aktionstyp("🔍 Keine Medikamente gefunden") == "Abfrage"
+    assert bestimme_aktionstyp("🗑 Benutzer hat den Warenkorb geleert") == "Sonstige"
@@ -0,0 +1,96 @@
+import csv
+import gzip
+import os
+import sys
+from datetime import date, timedelta
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from logdateien import tages_ziel, rotiere, get_partitionen, lies_logdateien, teile_altdatei, partition_pfad
+from conftest import messe
+
+TAGE = 60
+EINTRAEGE_PRO_TAG = 500
+
+
+def schreibe_historie(log_path, tage=TAGE):
+    """Schreibt Logeinträge für mehrere vergangene Tage in Tagesdateien."""
+    ziel = tages_ziel(log_path)
+    start = date.today() - timedelta(days=tage)
+    for tag in range(tage):
+        datum = (start + timedelta(days=tag)).isoformat()
+        ziel([[f"{datum} 12:{i % 60:02d}:00", "12345678", f"✅ Aktion {i}"] for i in range(EINTRAEGE_PRO_TAG)])
+    return start
+
+
+def test_eintraege_werden_nach_tag_aufgeteilt(tmp_path):
+    """Prüft, ob jeder Eintrag in der Datei seines Tages landet."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    heute = date.today().isoformat()
+    gestern = (date.today() - timedelta(days=1)).isoformat()
+
+    tages_ziel(log_path)([
+        [f"{gestern} 23:59:59", "12345678", "✅ User-Logout erfolgreich"],
+        [f"{heute} 00:00:01", "12345678", "✅ User-Login erfolgreich"],
+    ])
+
+    partitionen = get_partitionen(log_path)
+    assert [pfad.endswith(".gz") for _, pfad in partitionen] == [True, False]
+    assert [zeile.text for zeile in lies_logdateien(log_path, von=heute)] == ["✅ User-Login erfolgreich"]
+
+
+def test_abgeschlossene_tage_werden_komprimiert(tmp_path):
+    """Prüft, ob abgeschlossene Tage als gzip-Archiv gespeichert und transparent gelesen werden."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    start = schreibe_historie(log_path, tage=3)
+
+    assert not os.path.exists(partition_pfad(log_path, start))
+    with gzip.open(partition_pfad(log_path, start, komprimiert=True), "rt", encoding="utf-8") as file:
+        assert len(file.readlines()) == EINTRAEGE_PRO_TAG
+    assert len(list(lies_logdateien(log_path))) == 3 * EINTRAEGE_PRO_TAG
+
+
+def test_nachzuegler_werden_an_archiv_angehaengt(tmp_path):
+    """Prüft, ob verspätete Einträge für einen archivierten Tag erhalten bleiben."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    start = schreibe_historie(log_path, tage=2)
+
+    tages_ziel(log_path)([[f"{start.isoformat()} 23:00:00", "12345678", "✅ Nachzügler"]])
+    rotiere(log_path)
+
+    zeilen = list(lies_logdateien(log_path, von=start, bis=start))
+    assert len(zeilen) == EINTRAEGE_PRO_TAG + 1
+    assert zeilen[-1].text == "✅ Nachzügler"
+
+
+def test_nur_betroffene_tage_werden_geoeffnet(tmp_path):
+    """Prüft, ob für einen Zeitraum nur die überschneidenden Tagesdateien berücksichtigt werden."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    start = schreibe_historie(log_path)
+    von, bis = start + timedelta(days=10), start + timedelta(days=12)
+
+    partitionen = get_partitionen(log_path, von, bis)
+    assert [datum for datum, _ in partitionen] == [von, von + timedelta(days=1), bis]
+
+    zeilen, dauer_fenster = messe(lambda: list(lies_logdateien(log_path, von, bis)))
+    alle, dauer_gesamt = messe(lambda: list(lies_logdateien(log_path)))
+
+    print(f"⏱ 3 Tage: {dauer_fenster:.5f} Sekunden, {TAGE} Tage: {dauer_gesamt:.5f} Sekunden")
+    assert len(zeilen) == 3 * EINTRAEGE_PRO_TAG
+    assert len(alle) == TAGE * EINTRAEGE_PRO_TAG
+    assert dauer_fenster < dauer_gesamt
+
+
+def test_altdatei_wird_aufgeteilt(tmp_path):
+    """Prüft, ob eine bestehende einzelne Logdatei in Tagesdateien überführt wird."""
+    log_path = tmp_path / "logs" / "log_protokoll.csv"
+    log_path.parent.mkdir()
+    with open(log_path, "w", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows([
+            ["2025-02-01 10:00:00", "12345678", "✅ User-Login erfolgreich"],
+            ["2025-02-02 10:00:00", "12345678", "✅ User-Logout erfolgreich"],
+        ])
+
+    assert teile_altdatei(str(log_path)) == 2
+    assert not log_path.exists()
+    assert [str(datum) for datum, _ in get_partitionen(str(log_path))] == ["2025-02-01", "2025-02-02"]
@@ -0,0 +1,143 @@
+import os
+import sys
+import tracemalloc
+from datetime import date, timedelta
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from logdateien import tages_ziel, rotiere, streame_log, lies_seite, lies_neue_eintraege, lies_logdateien, partition_pfad
+from ereignisse import Ereignis
+from protokoll import sqlite_ziel, lies_protokoll, lies_protokoll_seite
+from datenbank import Verbindungspool
+from migrationen import migriere, PROTOKOLL_MIGRATIONEN
+
+TAGE = 5
+EINTRAEGE_PRO_TAG = 2000
+
+
+def erstelle_log(tmp_path, tage=TAGE, eintraege_pro_tag=EINTRAEGE_PRO_TAG):
+    """Schreibt Logeinträge für mehrere Tage bis einschließlich heute."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    ziel = tages_ziel(log_path)
+    for tag in range(tage - 1, -1, -1):
+        datum = (date.today() - timedelta(days=tag)).isoformat()
+        ziel([
+            [f"{datum} {i % 24:02d}:{i % 60:02d}:00", str(10000000 + i % 10),
+             "🚫 User-Login fehlgeschlagen" if i % 5 == 0 else f"✅ Medikament {i} hinzugefügt"]
+            for i in range(eintraege_pro_tag)
+        ])
+    return log_path
+
+
+def test_filter_beim_lesen(tmp_path):
+    """Prüft, ob Datum, Uhrzeit, Kundennummer und Aktion beim Streamen gefiltert werden."""
+    log_path = erstelle_log(tmp_path)
+    gestern = date.today() - timedelta(days=1)
+
+    treffer = [eintrag for _, eintrag in streame_log(
+        log_path, von=gestern, bis=gestern, zeit_von="08:00:00", zeit_bis="09:59:59",
+        kundennummer="10000000", aktion="FEHLGESCHLAGEN",
+    )]
+    erwartet = [
+        eintrag for eintrag in lies_logdateien(log_path, gestern, gestern)
+        if "08:00:00" <= eintrag.zeitstempel[11:19] <= "09:59:59" and eintrag.kundennummer == "10000000"
+        and "fehlgeschlagen" in eintrag.text
+    ]
+
+    assert treffer == erwartet
+    assert len(treffer) > 0
+
+
+def test_seitenweises_lesen_ist_vollstaendig(tmp_path):
+    """Prüft, ob die Seiten zusammen genau alle Einträge ohne Lücken und Doppelungen ergeben."""
+    log_path = erstelle_log(tmp_path)
+    seiten = []
+    cursor = None
+
+    while True:
+        eintraege, cursor = lies_seite(log_path, groesse=777, cursor=cursor, aktion="fehlgeschlagen")
+        seiten.extend(eintraege)
+        if cursor is None:
+            break
+
+    assert seiten == [eintrag for eintrag in lies_logdateien(log_path) if "fehlgeschlagen" in eintrag.text]
+
+
+def test_cursor_bleibt_nach_archivierung_gueltig(tmp_path):
+    """Prüft, ob ein Cursor in einer offenen Tagesdatei nach deren Komprimierung weiter passt."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    gestern = (date.today() - timedelta(days=1)).isoformat()
+    os.makedirs(os.path.dirname(log_path))
+    with open(log_path.replace(".csv", f"_{gestern}.csv"), "w", encoding="utf-8") as file:
+        file.writelines(f"{gestern} 10:00:{i:02d},12345678,Aktion {i}\n" for i in range(10))
+
+    erste_seite, cursor = lies_seite(log_path, groesse=4)
+    rotiere(log_path)
+    zweite_seite, _ = lies_seite(log_path, groesse=100, cursor=cursor)
+
+    assert [eintrag.text for eintrag in erste_seite + zweite_seite] == [f"Aktion {i}" for i in range(10)]
+
+
+def test_tail_liest_nur_neue_eintraege(tmp_path):
+    """Prüft, ob der Tail-Modus nur seit dem letzten Cursor angehängte Einträge liefert."""
+    log_path = erstelle_log(tmp_path, tage=1)
+    neue, cursor = lies_neue_eintraege(log_path)
+    assert neue == []
+
+    heute = date.today().isoformat()
+    tages_ziel(log_path)([[f"{heute} 23:59:00", "12345678", "✅ User-Logout erfolgreich"]])
+    neue, cursor = lies_neue_eintraege(log_path, cursor)
+    assert [eintrag.text for eintrag in neue] == ["✅ User-Logout erfolgreich"]
+
+    neue, cursor = lies_neue_eintraege(log_path, cursor)
+    assert neue == []
+
+
+def test_unvollstaendige_zeile_wird_spaeter_gelesen(tmp_path):
+    """Prüft, ob eine gerade geschriebene, unvollständige Zeile erst nach ihrem Abschluss geliefert wird."""
+    log_path = erstelle_log(tmp_path, tage=1, eintraege_pro_tag=1)
+    _, cursor = lies_neue_eintraege(log_path)
+    heute_pfad = partition_pfad(log_path, date.today())
+    zeile = Ereignis("Halbe Zeile", kundennummer="12345678").als_json()
+
+    with open(heute_pfad, "a", encoding="utf-8") as file:
+        file.write(zeile[:20])
+    neue, cursor = lies_neue_eintraege(log_path, cursor)
+    assert neue == []
+
+    with open(heute_pfad, "a", encoding="utf-8") as file:
+        file.write(zeile[20:] + "\n")
+    neue, cursor = lies_neue_eintraege(log_path, cursor)
+    assert [eintrag.text for eintrag in neue] == ["Halbe Zeile"]
+
+
+def test_speicherbedarf_unabhaengig_von_der_loggroesse(tmp_path):
+    """Prüft, ob der Speicherbedarf des Streamings nicht mit der Anzahl der Einträge wächst."""
+    spitzen = []
+    for tage in (2, 20):
+        log_path = erstelle_log(tmp_path / str(tage), tage=tage)
+        tracemalloc.start()
+        anzahl = sum(1 for _ in streame_log(log_path, aktion="fehlgeschlagen"))
+        spitzen.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        print(f"⏱ {tage} Tage: {anzahl} Treffer, Speicherspitze {spitzen[-1] / 1024:.1f} KiB")
+
+    assert spitzen[1] < spitzen[0] * 2
+
+
+def test_keyset_seiten_der_protokolldatenbank(tmp_path):
+    """Prüft die Keyset-Paginierung der Protokolltabelle, auch bei gleichen Zeitstempeln."""
+    pool = Verbindungspool(str(tmp_path / "protokoll.db"))
+    migriere(pool, PROTOKOLL_MIGRATIONEN)
+    sqlite_ziel(pool)([["2025-02-01 12:00:00", "12345678", f"Aktion {i}"] for i in range(250)])
+
+    seiten = []
+    nach = None
+    while True:
+        eintraege, nach = lies_protokoll_seite(pool, groesse=100, nach=nach)
+        seiten.append(eintraege)
+        if nach is None:
+            break
+
+    assert [len(seite) for seite in seiten] == [100, 100, 50]
+    assert sum(seiten, []) == lies_protokoll(pool)
@@ -0,0 +1,119 @@
+import os
+import sys
+from datetime import date
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from ereignisse import Ereignis, Aktion, Ergebnis
+from logdateien import tages_ziel, streame_log, lies_logdateien, partition_pfad
+from protokoll import sqlite_ziel, lies_protokoll, zaehle_ereignisse
+from datenbank import Verbindungspool
+from migrationen import migriere, get_abfrageplaene, PROTOKOLL_MIGRATIONEN
+
+
+def erstelle_ereignisse(anzahl=1000):
+    """Erzeugt gemischte Ereignisse mit Codes, Barcodes und Bestellgruppen."""
+    return [
+        Ereignis(
+            f"Aktion {i}",
+            aktion=Aktion.AUTOMAT_ZUGABE if i % 2 else Aktion.BESTELLUNG_AUFGEGEBEN,
+            ergebnis=Ergebnis.KRITISCH if i % 100 == 0 else Ergebnis.ERFOLG,
+            kundennummer="12345678",
+            zeitstempel=f"2025-02-01 12:{i % 60:02d}:00",
+            barcode=str(10000000 + i) if i % 2 else None,
+            bestellgruppe_id=None if i % 2 else 100000 + i,
+            dauer_ms=float(i % 10),
+        )
+        for i in range(anzahl)
+    ]
+
+
+def test_json_zeile_wird_verlustfrei_gelesen():
+    """Prüft, ob ein Ereignis als kompakte JSON-Zeile gespeichert und unverändert gelesen wird."""
+    ereignis = Ereignis("📦 Bestellung 123456 aufgegeben", aktion=Aktion.BESTELLUNG_AUFGEGEBEN,
+                        kundennummer="12345678", bestellgruppe_id=123456, dauer_ms=12.3456)
+
+    zeile = ereignis.als_json()
+    assert "\n" not in zeile and '"b"' not in zeile
+    assert Ereignis.aus_text(zeile) == ereignis
+    assert Ereignis.aus_text(zeile).ergebnis == Ergebnis.INFO
+
+
+def test_alte_csv_tagesdateien_bleiben_lesbar(tmp_path):
+    """Prüft, ob Tagesdateien im alten CSV-Format zusammen mit neuen JSON-Lines-Dateien gelesen werden."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    heute = date.today().isoformat()
+    os.makedirs(os.path.dirname(log_path))
+    with open(partition_pfad(log_path, heute, endung=".csv"), "w", encoding="utf-8") as file:
+        file.write(f'{heute} 10:00:00,12345678,"🚫 Fehler: Datenbank ist nicht verfügbar!"\n')
+
+    tages_ziel(log_path)([Ereignis("✅ User-Login erfolgreich", aktion=Aktion.USER_LOGIN, zeitstempel=f"{heute} 11:00:00")])
+
+    eintraege = list(lies_logdateien(log_path))
+    assert [eintrag.text for eintrag in eintraege] == ["🚫 Fehler: Datenbank ist nicht verfügbar!", "✅ User-Login erfolgreich"]
+    assert [eintrag.ergebnis for eintrag in eintraege] == [Ergebnis.KRITISCH, Ergebnis.ERFOLG]
+    assert [eintrag.aktion for eintrag in eintraege] == [Aktion.SONSTIGE, Aktion.USER_LOGIN]
+
+
+def test_exakte_filter_in_der_logdatei(tmp_path):
+    """Prüft, ob Code, Ergebnis, Barcode und Bestellgruppe beim Streamen exakt verglichen werden."""
+    log_path = str(tmp_path / "logs" / "log_protokoll.csv")
+    ereignisse = erstelle_ereignisse()
+    tages_ziel(log_path)(ereignisse)
+
+    treffer = [eintrag for _, eintrag in streame_log(log_path, code=Aktion.BESTELLUNG_AUFGEGEBEN, ergebnis="kritisch")]
+    assert treffer == [e for e in ereignisse if e.aktion == Aktion.BESTELLUNG_AUFGEGEBEN and e.ergebnis == Ergebnis.KRITISCH]
+
+    # Ein Barcode, der in anderen Barcodes enthalten ist, liefert nur genau seinen Eintrag
+    treffer = [eintrag for _, eintrag in streame_log(log_path, barcode="10000001")]
+    assert [eintrag.barcode for eintrag in treffer] == ["10000001"]
+
+
+def test_exakte_filter_und_auswertung_in_der_datenbank(tmp_path):
+    """Prüft die exakten Filter und die Zählung je Code und Ergebnis in der Protokolldatenbank."""
+    pool = Verbindungspool(str(tmp_path / "protokoll.db"))
+    migriere(pool, PROTOKOLL_MIGRATIONEN)
+    sqlite_ziel(pool)(erstelle_ereignisse())
+
+    assert lies_protokoll(pool, bestellgruppe_id=100010) == [("2025-02-01 12:10:00", "12345678", "Aktion 10")]
+    assert len(lies_protokoll(pool, code=Aktion.AUTOMAT_ZUGABE)) == 500
+
+    zaehlung = {(code, ergebnis): (anzahl, dauer) for code, ergebnis, anzahl, dauer in zaehle_ereignisse(pool)}
+    assert zaehlung[("bestellung_aufgegeben", "kritisch")][0] == 10
+    assert zaehlung[("bestellung_aufgegeben", "erfolg")][0] == 490
+    assert zaehlung[("automat_zugabe", "erfolg")] == (500, 5.0)
+
+
+def test_exakte_filter_nutzen_indizes(tmp_path):
+    """Prüft, ob Abfragen nach Code, Barcode und Bestellgruppe über einen Index laufen."""
+    pool = Verbindungspool(str(tmp_path / "protokoll.db"))
+    migriere(pool, PROTOKOLL_MIGRATIONEN)
+
+    abfragen = {
+        "code": ("SELECT * FROM protokoll WHERE code = ? ORDER BY zeitstempel", ("automat_zugabe",)),
+        "barcode": ("SELECT * FROM protokoll WHERE barcode = ?", ("10000001",)),
+        "bestellgruppe": ("SELECT * FROM protokoll WHERE bestellgruppe_id = ?", (100010,)),
+    }
+    with pool.verbindung() as conn:
+        plaene = get_abfrageplaene(conn.cursor(), abfragen)
+
+    for name, plan in plaene.items():
+        assert "USING INDEX" in plan, f"❌ {name} nutzt keinen Index: {plan}"
+
+
+def test_bestehende_eintraege_werden_migriert(tmp_path):
+    """Prüft, ob Einträge aus Schemaversion 1 beim Upgrade ein Ergebnis erhalten."""
+    pool = Verbindungspool(str(tmp_path / "protokoll.db"))
+    migriere(pool, PROTOKOLL_MIGRATIONEN[:1])
+    with pool.verbindung() as conn:
+        conn.executemany(
+            "INSERT INTO protokoll (zeitstempel, kundennummer, aktion, aktionstyp) VALUES (?, ?, ?, ?)",
+            [("2025-02-01 10:00:00", "1", "✅ User-Login erfolgreich", "Erfolg"),
+             ("2025-02-01 10:00:01", "1", "🚫 User-Login fehlgeschlagen", "Fehler")],
+        )
+        conn.commit()
+
+    assert [version for version, _ in migriere(pool, PROTOKOLL_MIGRATIONEN)["angewendet"]] == [2]
+    with pool.verbindung() as conn:
+        zeilen = conn.execute("SELECT code, ergebnis FROM protokoll ORDER BY id").fetchall()
+    assert zeilen == [("sonstige", "erfolg"), ("sonstige", "fehler")]
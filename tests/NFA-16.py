@@ -0,0 +1,82 @@
+import time
+import sys
+import os
+from datetime import date, timedelta
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+
+LIEFERUNG = 10000
+EINZELN = 300
+VERFALLSDATUM = (date.today() + timedelta(days=365)).isoformat()
+
+
+def anzahl_im_lager(lager):
+    with lager.pool.verbindung() as conn:
+        return conn.execute("SELECT COUNT(*) FROM lagerbestand").fetchone()[0]
+
+
+def test_bericht_je_zeile(test_lager):
+    """Prüft, ob jede Zeile dieselbe Meldung wie bei ware_hinzufuegen erhält."""
+    test_lager.ware_hinzufuegen("10000001", "Ibuprofen", VERFALLSDATUM)
+    with test_lager.pool.verbindung() as conn:
+        conn.execute(
+            "INSERT INTO bestellungen (barcode, kundennummer, bestelldatum, status, bestellgruppe_id) "
+            "VALUES ('10000002', '12345678', '2025-02-01 10:00:00', 'Offen', 123456)"
+        )
+        conn.commit()
+
+    bericht = test_lager.ware_hinzufuegen_bulk([
+        ("10000001", "Ibuprofen", VERFALLSDATUM),
+        ("10000002", "Aspirin", VERFALLSDATUM),
+        ("10000003", "Paracetamol", "2020-01-01"),
+        ("123", "Falsch", VERFALLSDATUM),
+        ("10000004", "", VERFALLSDATUM),
+        ("10000005", "Novalgin", date.today() + timedelta(days=30)),
+        ("10000005", "Novalgin", VERFALLSDATUM),
+    ])
+
+    assert bericht == [
+        (1, "10000001", "🚫 Fehler: Barcode 10000001 existiert bereits im Lager!"),
+        (2, "10000002", "🚫 Fehler: Dieser Barcode ist in einer offenen Bestellung!"),
+        (3, "10000003", "⚠️ Fehler: Verfallsdatum ungültig oder Ware ist abgelaufen!"),
+        (4, "123", "🚫 Fehler: Ungültiger Barcode! Er muss 8-13 Ziffern enthalten."),
+        (5, "10000004", "🚫 Fehler: Alle Felder müssen ausgefüllt sein!"),
+        (6, "10000005", "✅ Erfolg: Novalgin hinzugefügt."),
+        (7, "10000005", "🚫 Fehler: Barcode 10000005 ist mehrfach in der Lieferung enthalten!"),
+    ]
+    assert anzahl_im_lager(test_lager) == 2
+
+
+def test_lieferung_wird_in_einer_transaktion_gebucht(test_lager):
+    """Prüft, ob bei einem Datenbankfehler keine Zeile der Lieferung übernommen wird."""
+    with test_lager.pool.verbindung() as conn:
+        conn.execute(
+            "CREATE TRIGGER abbruch BEFORE INSERT ON lagerbestand WHEN NEW.barcode = '10000050' "
+            "BEGIN SELECT RAISE(ABORT, 'Testabbruch'); END"
+        )
+        conn.commit()
+
+    bericht = test_lager.ware_hinzufuegen_bulk([(str(10000000 + i), "Ibuprofen", VERFALLSDATUM) for i in range(100)])
+
+    assert all("Testabbruch" in meldung for _, _, meldung in bericht)
+    assert anzahl_im_lager(test_lager) == 0
+
+
+def test_benchmark_wareneingang(test_lager):
+    """Vergleicht den Wareneingang von 10.000 Packungen mit dem Einzelaufruf pro Packung."""
+    start_time = time.time()
+    for i in range(EINZELN):
+        test_lager.ware_hinzufuegen(str(20000000 + i), "Ibuprofen", VERFALLSDATUM)
+    einzeln = (time.time() - start_time) / EINZELN
+
+    lieferung = [(str(30000000 + i), f"Medikament {i % 50}", VERFALLSDATUM) for i in range(LIEFERUNG)]
+    start_time = time.time()
+    bericht = test_lager.ware_hinzufuegen_bulk(lieferung)
+    bulk = (time.time() - start_time) / LIEFERUNG
+
+    print(f"⏱ Einzeln: {einzeln * 1000:.4f} ms/Packung, Bulk: {bulk * 1000:.4f} ms/Packung "
+          f"({LIEFERUNG} Packungen in {bulk * LIEFERUNG:.5f} Sekunden)")
+    assert all(meldung.startswith("✅") for _, _, meldung in bericht)
+    assert anzahl_im_lager(test_lager) == EINZELN + LIEFERUNG
+    assert bulk * 5 < einzeln
@@ -0,0 +1,84 @@
+import time
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import SORTIERUNGEN
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 200000
+
+
+def fuelle_bestand(lager, anzahl):
+    """Fügt Medikamente mit vielen gleichen Namen und Verfallsdaten direkt in die Datenbank ein."""
+    fuege_bestand_ein(
+        lager.pool, [f"Medikament {k}" for k in range(37)],
+        (
+            (str(50000000 + i), 1 + i % 37, f"2030-{1 + i % 12:02d}-01", "Automat" if i % 10 == 0 else "Lager")
+            for i in range(anzahl)
+        ),
+    )
+
+
+def alle_seiten(lager, **kwargs):
+    """Liest alle Seiten nacheinander über die Cursor."""
+    zeilen, nach = [], None
+    while True:
+        seite, nach = lager.get_lagerbestand_seite(groesse=97, nach=nach, **kwargs)
+        zeilen.extend(seite.itertuples(index=False, name=None))
+        if nach is None:
+            return zeilen
+
+
+@pytest.mark.parametrize("sortierung", list(SORTIERUNGEN))
+@pytest.mark.parametrize("absteigend", [False, True])
+def test_seiten_sind_vollstaendig_und_sortiert(test_lager, sortierung, absteigend):
+    """Prüft, ob die Seiten zusammen genau den sortierten Bestand ohne Lücken und Doppelungen ergeben."""
+    fuelle_bestand(test_lager, 2000)
+
+    zeilen = alle_seiten(test_lager, sortierung=sortierung, absteigend=absteigend, ort_filter="Lager")
+
+    spalte = SORTIERUNGEN[sortierung]
+    erwartet = sorted(
+        (zeile for zeile in test_lager.get_lagerbestand(ort_filter="Lager").itertuples(index=False, name=None)),
+        key=lambda zeile: (zeile[spalte], zeile[0]), reverse=absteigend,
+    )
+    assert zeilen == erwartet
+    assert test_lager.zaehle_lagerbestand(ort_filter="Lager") == len(erwartet) == 1800
+
+
+def test_ungueltiger_filter(test_lager):
+    """Prüft, ob ein ungültiger Barcode-Filter wie bei get_lagerbestand gemeldet wird."""
+    seite, nach = test_lager.get_lagerbestand_seite(barcode_filter="abc")
+    assert seite == "🚫 Fehler: Ungültiger Barcode-Filter!" and nach is None
+    assert test_lager.zaehle_lagerbestand(barcode_filter="abc") == 0
+
+
+def test_seitenzeit_unabhaengig_von_der_position(test_lager):
+    """Prüft, ob eine tiefe Seite in einem großen Bestand so schnell geladen wird wie die erste."""
+    fuelle_bestand(test_lager, GROSSER_BESTAND)
+
+    def seite(nach):
+        return test_lager.get_lagerbestand_seite(groesse=100, nach=nach, sortierung="name", ort_filter="Lager")[0]
+
+    erste, dauer_erste = messe(lambda: seite(None))
+    tiefe, dauer_tief = messe(lambda: seite(("Medikament 9", "50190000")))
+
+    start_time = time.time()
+    komplett = test_lager.get_lagerbestand(ort_filter="Lager")
+    dauer_komplett = time.time() - start_time
+
+    print(f"⏱ Erste Seite: {dauer_erste:.5f} Sekunden, tiefe Seite: {dauer_tief:.5f} Sekunden, "
+          f"kompletter Bestand ({len(komplett)} Zeilen): {dauer_komplett:.5f} Sekunden")
+    assert len(erste) == len(tiefe) == 100
+    assert dauer_tief < dauer_erste * 5 + 0.01
+    assert dauer_tief * 10 < dauer_komplett
+
+    with test_lager.pool.verbindung() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT barcode, name FROM artikel CROSS JOIN lagerbestand ON artikel.id = artikel_id "
+            "WHERE ort = ? AND (name, barcode) > (?, ?) ORDER BY name, barcode LIMIT 101", ("Lager", "Medikament 9", "50190000"),
+        ).fetchall()
+    assert "TEMP B-TREE" not in str(plan)
@@ -0,0 +1,104 @@
+import random
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from barcodesuche import zerlege_suchbegriff, PRAEFIX, SUFFIX, TEIL
+from conftest import erstelle_datenbank, messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 200000
+
+
+@pytest.fixture(scope="module")
+def test_lager(tmp_path_factory):
+    """Erstellt ein Lager mit großem synthetischem Bestand und N-Gramm-Index."""
+    tmp_path = tmp_path_factory.mktemp("barcodesuche")
+    datenbank = erstelle_datenbank(tmp_path)
+    zufall = random.Random(42)
+    barcodes = {str(zufall.randrange(10 ** 7, 10 ** zufall.randint(8, 13))) for _ in range(GROSSER_BESTAND)}
+    fuege_bestand_ein(datenbank.pool, ["Medikament"], ((barcode, 1, "2030-01-01", "Lager") for barcode in barcodes))
+    datenbank.aktiviere_ngramm_index()
+    lager = Lager(datenbank=datenbank)
+    lager.barcodes = barcodes
+    return lager
+
+
+def suche(lager, suchbegriff):
+    """Liest alle Barcodes, die zu einem Suchbegriff passen."""
+    bedingung, params = lager._lagerbestand_filter(suchbegriff)
+    with lager.pool.verbindung() as conn:
+        return {row[0] for row in conn.execute(f"SELECT barcode FROM lagerbestand {bedingung}", params)}
+
+
+def messe_abfrage(lager, sql, params):
+    """Misst die beste von drei Ausführungen einer Abfrage."""
+    with lager.pool.verbindung() as conn:
+        return messe(lambda: conn.execute(sql, params).fetchall())[1]
+
+
+def test_suchbegriffe_werden_erkannt():
+    """Prüft die Zerlegung der Suchbegriffe in Suchart und Ziffern."""
+    assert zerlege_suchbegriff("4006") == (PRAEFIX, "4006")
+    assert zerlege_suchbegriff("*931") == (SUFFIX, "931")
+    assert zerlege_suchbegriff("*3813*") == (TEIL, "3813")
+    assert zerlege_suchbegriff("40a6") is None
+    assert zerlege_suchbegriff("12345678901234") is None
+
+
+@pytest.mark.parametrize("suchbegriff, passt", [
+    ("4006", lambda barcode: barcode.startswith("4006")),
+    ("*931", lambda barcode: barcode.endswith("931")),
+    ("*38133*", lambda barcode: "38133" in barcode),
+    ("*13*", lambda barcode: "13" in barcode),
+])
+def test_treffer_entsprechen_der_suchart(test_lager, suchbegriff, passt):
+    """Prüft, ob Präfix-, Suffix- und Teilstring-Suche genau die passenden Barcodes liefern."""
+    assert suche(test_lager, suchbegriff) == {barcode for barcode in test_lager.barcodes if passt(barcode)}
+
+
+def test_ngramm_index_folgt_aenderungen(test_lager):
+    """Prüft, ob Einfügen und Löschen den N-Gramm-Index über die Trigger aktualisieren."""
+    test_lager.ware_hinzufuegen("9876543210987", "Neu", "2099-12-31")
+    assert "9876543210987" in suche(test_lager, "*5432109*")
+
+    test_lager.ware_entfernen("9876543210987")
+    assert "9876543210987" not in suche(test_lager, "*5432109*")
+
+
+def test_ngramm_index_wird_ohne_einstellung_entfernt(tmp_path, monkeypatch):
+    """Prüft, ob ein früher angelegter N-Gramm-Index beim Start ohne BARCODE_NGRAMME=1 samt Triggern entfernt wird."""
+    import datenbank as datenbankmodul
+    monkeypatch.setattr(datenbankmodul, "NGRAMM_INDEX", True)
+    datenbank = erstelle_datenbank(tmp_path)
+    assert datenbank.ngramm_index
+    Lager(datenbank=datenbank).ware_hinzufuegen("12345678", "Ibuprofen", "2099-12-31")
+
+    monkeypatch.setattr(datenbankmodul, "NGRAMM_INDEX", False)
+    datenbank = erstelle_datenbank(tmp_path)
+    assert not datenbank.ngramm_index
+    with datenbank.pool.verbindung() as conn:
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%barcode_ngramme%'").fetchall() == []
+
+    # Teilstring-Suchen und Bestandsänderungen funktionieren ohne Index weiter
+    lager = Lager(datenbank=datenbank)
+    lager.ware_hinzufuegen("87654321", "Aspirin", "2099-12-31")
+    assert suche(lager, "*4567*") == {"12345678"}
+
+
+def test_benchmark_gegen_like(test_lager):
+    """Vergleicht die indizierten Suchen mit der bisherigen Abfrage barcode LIKE '%x%'."""
+    like = "SELECT barcode FROM lagerbestand WHERE barcode LIKE ?"
+    ergebnisse = {}
+    for name, suchbegriff in [("Präfix", "40063"), ("Suffix", "*40063"), ("Teilstring", "*40063*")]:
+        bedingung, params = test_lager._lagerbestand_filter(suchbegriff)
+        ergebnisse[name] = (
+            messe_abfrage(test_lager, f"SELECT barcode FROM lagerbestand {bedingung}", params),
+            messe_abfrage(test_lager, like, (f"%{suchbegriff.strip('*')}%",)),
+        )
+        print(f"⏱ {name}: indiziert {ergebnisse[name][0]:.5f} Sekunden, LIKE {ergebnisse[name][1]:.5f} Sekunden")
+
+    for name, (indiziert, bisher) in ergebnisse.items():
+        assert indiziert * 5 < bisher, f"❌ {name}-Suche ist nicht deutlich schneller als LIKE"
@@ -0,0 +1,65 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from namenssuche import volltext_anfrage
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 200000
+VERSCHIEDENE_NAMEN = 2000
+
+
+def test_suchtext_wird_zur_praefixanfrage():
+    """Prüft, ob Wörter als Präfixe gesucht und FTS5-Sonderzeichen verworfen werden."""
+    assert volltext_anfrage("ibu 400") == '"ibu"* "400"*'
+    assert volltext_anfrage('Asp"irin*') == '"Asp"* "irin"*'
+    assert volltext_anfrage("  -*") is None
+
+
+def test_index_folgt_dem_bestand(test_lager):
+    """Prüft, ob ein Name mit dem ersten Medikament erscheint und mit dem letzten wieder verschwindet."""
+    test_lager.ware_hinzufuegen("10000001", "Ibuprofen 400mg", "2099-12-31")
+    test_lager.ware_hinzufuegen("10000002", "Ibuprofen 400mg", "2099-12-31")
+    assert test_lager.suche_artikelnamen("ibu") == ["Ibuprofen 400mg"]
+
+    test_lager.ware_entfernen("10000001")
+    assert test_lager.suche_artikelnamen("ibu") == ["Ibuprofen 400mg"]
+
+    test_lager.ware_entfernen("10000002")
+    assert test_lager.suche_artikelnamen("ibu") == []
+
+    test_lager.ware_hinzufuegen("10000003", "Aspirin", "2099-12-31")
+    test_lager.pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE artikel SET name = 'Aspirin Complex' WHERE name = 'Aspirin'"
+    ))
+    assert test_lager.suche_artikelnamen("asp") == ["Aspirin Complex"]
+    assert test_lager.suche_artikelnamen("") == []
+
+
+def test_treffer_nach_relevanz(test_lager):
+    """Prüft Präfixsuche über mehrere Wörter, Umlaute und die Begrenzung der Vorschläge."""
+    for i, name in enumerate(["Paracetamol 500mg", "Paracetamol 1000mg", "Ibuprofen 400mg", "Pantoprazol 20mg", "Baldrian Dragées"]):
+        test_lager.ware_hinzufuegen(str(20000000 + i), name, "2099-12-31")
+
+    assert set(test_lager.suche_artikelnamen("pa")) == {"Paracetamol 500mg", "Paracetamol 1000mg", "Pantoprazol 20mg"}
+    assert test_lager.suche_artikelnamen("para 100") == ["Paracetamol 1000mg"]
+    assert test_lager.suche_artikelnamen("dragees") == ["Baldrian Dragées"]
+    assert len(test_lager.suche_artikelnamen("p", limit=2)) == 2
+
+
+def test_benchmark_gegen_namensliste(test_lager):
+    """Vergleicht die Vorschläge aus dem Volltextindex mit dem Laden aller Namen für eine Auswahlliste."""
+    fuege_bestand_ein(
+        test_lager.pool, [f"Medikament{k} Tabletten" for k in range(VERSCHIEDENE_NAMEN)],
+        ((str(50000000 + i), 1 + i % VERSCHIEDENE_NAMEN, "2030-01-01", "Lager") for i in range(GROSSER_BESTAND)),
+    )
+    test_lager.pool.lesecache.max_eintraege = 0  # Gemessen wird die Abfrage, nicht der Lesecache
+
+    vorschlaege, dauer_suche = messe(lambda: test_lager.suche_artikelnamen("medikament199", limit=20))
+    namen, dauer_liste = messe(test_lager.get_artikel_namen)
+
+    print(f"⏱ Vorschläge: {dauer_suche:.5f} Sekunden, alle Namen: {dauer_liste:.5f} Sekunden")
+    assert len(namen) == VERSCHIEDENE_NAMEN
+    assert set(vorschlaege) == {"Medikament199 Tabletten"} | {f"Medikament199{i} Tabletten" for i in range(10)}
+    assert dauer_suche * 5 < dauer_liste
@@ -0,0 +1,122 @@
+import os
+import sys
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Verbindungspool
+from lager import Lager
+from migrationen import migriere, LAGER_MIGRATIONEN
+from conftest import erstelle_datenbank, messe
+
+GROSSER_BESTAND = 100000
+VERSCHIEDENE_NAMEN = 500
+ALTE_AGGREGATION = "SELECT name, SUM(menge) FROM lagerbestand GROUP BY name ORDER BY name"
+
+
+def dateigroesse(pool):
+    """Komprimiert die Datenbank und gibt ihre Größe in Bytes zurück."""
+    with pool.verbindung() as conn:
+        conn.execute("VACUUM")
+        seiten = conn.execute("PRAGMA page_count").fetchone()[0]
+        return seiten * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def test_altbestand_wird_auf_artikelstamm_umgestellt(tmp_path):
+    """Prüft, ob die Migration Namen verlustfrei in den Artikelstamm überführt, die Datei verkleinert
+    und die Artikelübersicht über Integer-Schlüssel deutlich schneller ist als über Namen."""
+    db_path = str(tmp_path / "lagerbestand.db")
+    pool = Verbindungspool(db_path)
+    migriere(pool, [migration for migration in LAGER_MIGRATIONEN if migration[0] < 6])
+
+    def altbestand(cursor):
+        cursor.executemany(
+            "INSERT INTO lagerbestand (barcode, name, menge, verfallsdatum, ort) VALUES (?, ?, 1, '2030-01-01', ?)",
+            (
+                (str(50000000 + i), f"Medikament {i % VERSCHIEDENE_NAMEN} Filmtabletten 400mg", "Automat" if i % 10 == 0 else "Lager")
+                for i in range(GROSSER_BESTAND)
+            ),
+        )
+        cursor.execute(
+            "INSERT INTO bestellungen (bestellgruppe_id, kundennummer, barcode, name, bestelldatum) "
+            "VALUES (123456, '12345678', '40000001', 'Aspirin', '2025-02-01 10:00:00')"
+        )
+        cursor.execute(
+            "INSERT INTO warnungen (barcode, name, verfallsdatum, ort) "
+            "VALUES ('50000000', 'Medikament 0 Filmtabletten 400mg', '2020-01-01', 'Automat')"
+        )
+    pool.schreiben(altbestand)
+
+    groesse_vorher = dateigroesse(pool)
+
+    def alte_aggregation():
+        with pool.verbindung() as conn:
+            return conn.execute(ALTE_AGGREGATION).fetchall()
+
+    erwartet, dauer_vorher = messe(alte_aggregation)
+    pool.schliessen()
+
+    datenbank = erstelle_datenbank(tmp_path)
+    lager = Lager(datenbank=datenbank)
+    datenbank.pool.lesecache.max_eintraege = 0  # Gemessen wird die Abfrage, nicht der Lesecache
+    groesse_nachher = dateigroesse(datenbank.pool)
+    artikel_anzahl, dauer_nachher = messe(lager.get_artikel_anzahl)
+
+    print(f"⏱ Artikelübersicht über Namen: {dauer_vorher:.5f} Sekunden, über Artikel-IDs: {dauer_nachher:.5f} Sekunden; "
+          f"Datei {groesse_vorher} -> {groesse_nachher} Bytes")
+    assert list(artikel_anzahl[["Name", "Menge"]].itertuples(index=False, name=None)) == erwartet
+    assert groesse_nachher < groesse_vorher
+    assert dauer_nachher * 2 < dauer_vorher
+
+    with datenbank.pool.verbindung() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM artikel").fetchone()[0] == VERSCHIEDENE_NAMEN + 1
+        assert conn.execute(
+            "SELECT name FROM bestellungen JOIN artikel ON artikel.id = artikel_id WHERE barcode = '40000001'"
+        ).fetchone() == ("Aspirin",)
+        assert conn.execute(
+            "SELECT name FROM warnungen JOIN artikel ON artikel.id = artikel_id WHERE barcode = '50000000'"
+        ).fetchone() == ("Medikament 0 Filmtabletten 400mg",)
+
+
+def test_umbau_ohne_drop_column(tmp_path):
+    """Prüft, ob der Umbau auf Artikel-IDs ohne DROP COLUMN auskommt und Indizes und ID-Zähler der Tabellen erhält."""
+    pool = Verbindungspool(str(tmp_path / "lagerbestand.db"))
+    migriere(pool, [migration for migration in LAGER_MIGRATIONEN if migration[0] < 6])
+    pool.schreiben(lambda cursor: cursor.executemany(
+        "INSERT INTO bestellungen (bestellgruppe_id, kundennummer, barcode, name, bestelldatum) "
+        "VALUES (123456, '12345678', ?, 'Aspirin', '2025-02-01 10:00:00')", [("40000001",), ("40000002",)]
+    ))
+    pool.schreiben(lambda cursor: cursor.execute("DELETE FROM bestellungen WHERE barcode = '40000002'"))
+    with pool.verbindung() as conn:
+        indizes_vorher = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+
+    assert not any("DROP COLUMN" in anweisung for _, _, anweisungen in LAGER_MIGRATIONEN
+                   for anweisung in anweisungen if isinstance(anweisung, str))
+    migriere(pool, LAGER_MIGRATIONEN)
+    pool.schreiben(lambda cursor: cursor.execute(
+        "INSERT INTO bestellungen (bestellgruppe_id, kundennummer, barcode, artikel_id, bestelldatum) "
+        "VALUES (123457, '12345678', '40000003', 1, '2025-02-02 10:00:00')"
+    ))
+
+    with pool.verbindung() as conn:
+        indizes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+        assert indizes_vorher - indizes == {
+            "idx_lagerbestand_name_ort", "idx_lagerbestand_name_barcode", "idx_lagerbestand_ort_name_barcode"
+        }
+        assert conn.execute("SELECT id FROM bestellungen ORDER BY id").fetchall() == [(1,), (3,)]
+        assert not conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%\\_neu' ESCAPE '\\'").fetchall()
+        spalten = [row[1] for row in conn.execute("PRAGMA table_xinfo(lagerbestand)")]
+    assert "name" not in spalten and "barcode_umgekehrt" in spalten
+    pool.schliessen()
+
+
+def test_gleicher_name_gleiche_artikel_id(tmp_path):
+    """Prüft, ob Einzel- und Sammeleinlagerung denselben Artikel wiederverwenden."""
+    datenbank = erstelle_datenbank(tmp_path)
+    lager = Lager(datenbank=datenbank)
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    lager.ware_hinzufuegen_bulk([("10000002", "Ibuprofen", "2099-12-31"), ("10000003", "Aspirin", "2099-12-31")])
+
+    with datenbank.pool.verbindung() as conn:
+        assert conn.execute("SELECT name FROM artikel ORDER BY id").fetchall() == [("Ibuprofen",), ("Aspirin",)]
+    assert list(lager.get_artikel_anzahl().itertuples(index=False, name=None)) == [("Aspirin", 1, 1, 0), ("Ibuprofen", 2, 2, 0)]
+    assert lager.get_artikel_namen() == ["Aspirin", "Ibuprofen"]
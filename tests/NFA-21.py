@@ -0,0 +1,77 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from automat import Automat
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 200000
+VERSCHIEDENE_NAMEN = 500
+
+
+def summen(lager):
+    """Liest die Artikelübersicht als Liste von Tupeln."""
+    return list(lager.get_artikel_anzahl().itertuples(index=False, name=None))
+
+
+def test_trigger_schreiben_summen_fort(test_datenbank):
+    """Prüft, ob Einlagern, Verschieben, Mengenänderung und Entfernen die Summen je Ort aktualisieren."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    lager.ware_hinzufuegen_bulk([("10000002", "Ibuprofen", "2099-12-31"), ("10000003", "Aspirin", "2099-12-31")])
+    assert summen(lager) == [("Aspirin", 1, 1, 0), ("Ibuprofen", 2, 2, 0)]
+
+    automat.ware_zum_automaten_hinzufuegen("10000001")
+    assert summen(lager) == [("Aspirin", 1, 1, 0), ("Ibuprofen", 2, 1, 1)]
+
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute("UPDATE lagerbestand SET menge = 3 WHERE barcode = '10000002'"))
+    assert summen(lager) == [("Aspirin", 1, 1, 0), ("Ibuprofen", 4, 3, 1)]
+
+    automat.ware_aus_automaten_entfernen("10000001")
+    lager.ware_entfernen("10000003")
+    assert summen(lager) == [("Ibuprofen", 4, 4, 0)]
+    assert lager.pruefe_artikelbestand() == []
+
+
+def test_abweichung_wird_erkannt_und_behoben(test_datenbank):
+    """Prüft, ob die Konsistenzprüfung manipulierte Summen findet und der Neuaufbau sie behebt."""
+    lager = Lager(datenbank=test_datenbank)
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute("UPDATE artikelbestand SET menge = 99"))
+
+    assert len(lager.pruefe_artikelbestand()) == 2
+    assert lager.artikelbestand_neu_aufbauen().startswith("✅")
+    assert lager.pruefe_artikelbestand() == []
+    assert summen(lager) == [("Ibuprofen", 1, 1, 0)]
+
+
+def test_uebersicht_unabhaengig_von_der_bestandsgroesse(test_datenbank):
+    """Vergleicht die Artikelübersicht mit der Summenbildung über den gesamten Bestand."""
+    fuege_bestand_ein(
+        test_datenbank.pool,
+        [f"Medikament {k}" for k in range(VERSCHIEDENE_NAMEN)],
+        (
+            (str(50000000 + i), 1 + i % VERSCHIEDENE_NAMEN, "2030-01-01", "Automat" if i % 10 == 0 else "Lager")
+            for i in range(GROSSER_BESTAND)
+        ),
+    )
+    lager = Lager(datenbank=test_datenbank)
+    test_datenbank.pool.lesecache.max_eintraege = 0  # Gemessen wird die Abfrage, nicht der Lesecache
+
+    def summe_ueber_bestand():
+        with test_datenbank.pool.verbindung() as conn:
+            return conn.execute("SELECT artikel_id, SUM(menge) FROM lagerbestand GROUP BY artikel_id").fetchall()
+
+    uebersicht, dauer_uebersicht = messe(lager.get_artikel_anzahl)
+    summen_bestand, dauer_bestand = messe(summe_ueber_bestand)
+
+    print(f"⏱ Artikelübersicht: {dauer_uebersicht:.5f} Sekunden, Summe über den Bestand: {dauer_bestand:.5f} Sekunden")
+    assert len(uebersicht) == len(summen_bestand) == VERSCHIEDENE_NAMEN
+    assert uebersicht["Menge"].sum() == GROSSER_BESTAND
+    assert uebersicht["Automat"].sum() == GROSSER_BESTAND // 10
+    assert lager.pruefe_artikelbestand() == []
+    assert dauer_uebersicht * 5 < dauer_bestand
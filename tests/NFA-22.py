@@ -0,0 +1,112 @@
+import sqlite3
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from automat import Automat
+from warnung import Warnung
+from lesecache import Lesecache
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 100000
+
+
+def test_wiederholte_abfrage_aus_dem_cache(test_datenbank):
+    """Prüft, ob dieselbe Abfrage ohne Änderung aus dem Cache beantwortet wird."""
+    lager = Lager(datenbank=test_datenbank)
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    cache = test_datenbank.pool.lesecache
+
+    seite, _ = lager.get_lagerbestand_seite(groesse=10)
+    vorher = cache.statistik()
+    seite_erneut, _ = lager.get_lagerbestand_seite(groesse=10)
+    nachher = cache.statistik()
+
+    assert seite.equals(seite_erneut)
+    assert nachher["Treffer"] == vorher["Treffer"] + 1
+    assert nachher["Fehlzugriffe"] == vorher["Fehlzugriffe"]
+
+
+def test_schreiben_macht_cache_ungueltig(test_datenbank):
+    """Prüft, ob Änderungen über die Dienste den Cache für Bestand, Warnungen und Kanäle ungültig machen."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    assert lager.zaehle_lagerbestand() == 1
+    assert automat.get_belegte_kanaele() == []
+    assert warnung.get_warnungen().empty
+
+    lager.ware_hinzufuegen("10000002", "Aspirin", "2099-12-31")
+    test_datenbank.pool.schreiben(
+        lambda cursor: cursor.execute("UPDATE lagerbestand SET verfallsdatum = '2000-01-01' WHERE barcode = '10000002'")
+    )
+    automat.ware_zum_automaten_hinzufuegen("10000001")
+    warnung._pruefe_warnungen()
+
+    assert lager.zaehle_lagerbestand() == 2
+    assert len(automat.get_belegte_kanaele()) == 1
+    assert list(warnung.get_warnungen()["Barcode"]) == ["10000002"]
+    assert lager.get_artikel_namen() == ["Aspirin", "Ibuprofen"]
+
+
+def test_fremde_verbindung_macht_cache_ungueltig(test_datenbank):
+    """Prüft, ob auch Änderungen einer anderen Verbindung über PRAGMA data_version erkannt werden."""
+    lager = Lager(datenbank=test_datenbank)
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    assert lager.zaehle_lagerbestand() == 1
+
+    fremd = sqlite3.connect(test_datenbank.db_path)
+    fremd.execute(
+        "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) "
+        "SELECT '10000002', id, 1, '2099-12-31', 'Lager' FROM artikel WHERE name = 'Ibuprofen'"
+    )
+    fremd.commit()
+    fremd.close()
+
+    assert lager.zaehle_lagerbestand() == 2
+
+
+def test_lru_verdraengung_und_zeilengrenze(tmp_path):
+    """Prüft, ob der Cache die am längsten unbenutzten Einträge verdrängt und zu große Ergebnisse nicht speichert."""
+    conn = sqlite3.connect(str(tmp_path / "cache.db"))
+    cache = Lesecache(str(tmp_path / "cache.db"), max_eintraege=2, max_zeilen=5)
+
+    cache.lesen(conn, "SELECT ?", (1,))
+    cache.lesen(conn, "SELECT ?", (2,))
+    cache.lesen(conn, "SELECT ?", (1,))
+    cache.lesen(conn, "SELECT ?", (3,))  # verdrängt (2,)
+    assert cache.statistik()["Verdrängungen"] == 1
+    cache.lesen(conn, "SELECT ?", (1,))
+    cache.lesen(conn, "SELECT ?", (2,))
+
+    statistik = cache.statistik()
+    assert (statistik["Treffer"], statistik["Fehlzugriffe"]) == (2, 4)
+
+    assert cache.lesen(conn, "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 10) SELECT i FROM n")[-1] == (10,)
+    assert cache.statistik()["Zeilen"] <= 5
+    cache.schliessen()
+    conn.close()
+
+
+def test_cache_beschleunigt_wiederholte_bestandsabfragen(test_datenbank):
+    """Vergleicht eine wiederholte Bestandsabfrage aus dem Cache mit der Abfrage ohne Cache."""
+    fuege_bestand_ein(
+        test_datenbank.pool, ["Ibuprofen"], ((str(50000000 + i), 1, "2030-01-01", "Lager") for i in range(GROSSER_BESTAND))
+    )
+    lager = Lager(datenbank=test_datenbank)
+    cache = test_datenbank.pool.lesecache
+
+    def zaehle_mit_filter():
+        return lager.zaehle_lagerbestand(barcode_filter="*5*")
+
+    anzahl_mit_cache, dauer_mit_cache = messe(zaehle_mit_filter)
+    cache.max_eintraege = 0
+    anzahl_ohne_cache, dauer_ohne_cache = messe(zaehle_mit_filter)
+
+    print(f"⏱ Bestandszählung mit Lesecache: {dauer_mit_cache:.5f} Sekunden, ohne: {dauer_ohne_cache:.5f} Sekunden")
+    assert anzahl_mit_cache == anzahl_ohne_cache == GROSSER_BESTAND
+    assert dauer_mit_cache * 5 < dauer_ohne_cache
@@ -0,0 +1,93 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from warnung import Warnung
+from conftest import messe, fuege_bestand_ein
+
+ABGELAUFENE_EINHEITEN = 100000
+HEUTE = "2025-06-01"
+
+
+def zeilenweiser_abgleich(cursor, today):
+    """Der frühere Abgleich: eine Abfrage und ein UPDATE oder INSERT je abgelaufenem Medikament."""
+    cursor.execute("DELETE FROM warnungen WHERE barcode NOT IN (SELECT barcode FROM lagerbestand)")
+    cursor.execute(
+        "SELECT barcode, artikel_id, verfallsdatum, ort FROM lagerbestand WHERE verfallsdatum < ?", (today,)
+    )
+    for barcode, artikel_id, verfallsdatum, ort in cursor.fetchall():
+        cursor.execute("SELECT ort, status FROM warnungen WHERE barcode = ?", (barcode,))
+        warnung = cursor.fetchone()
+        if warnung:
+            if warnung[0] != ort or warnung[1] != "Medikament abgelaufen":
+                cursor.execute(
+                    "UPDATE warnungen SET ort = ?, status = ? WHERE barcode = ?",
+                    (ort, "Medikament abgelaufen", barcode),
+                )
+        else:
+            cursor.execute(
+                "INSERT INTO warnungen (barcode, artikel_id, verfallsdatum, ort, status) VALUES (?, ?, ?, ?, ?)",
+                (barcode, artikel_id, verfallsdatum, ort, "Medikament abgelaufen"),
+            )
+
+
+def warnungen(pool):
+    """Liest alle Warnungen sortiert nach Barcode."""
+    with pool.verbindung() as conn:
+        return conn.execute(
+            "SELECT barcode, artikel_id, verfallsdatum, ort, status FROM warnungen ORDER BY barcode"
+        ).fetchall()
+
+
+def test_abgleich_fuegt_ein_aktualisiert_und_bereinigt(test_datenbank):
+    """Prüft, ob neue Warnungen angelegt, verschobene aktualisiert und verwaiste gelöscht werden."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+    pool = test_datenbank.pool
+    for barcode in ("10000001", "10000002", "10000003"):
+        lager.ware_hinzufuegen(barcode, "Ibuprofen", "2099-12-31")
+    pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode IN ('10000001', '10000002')"
+    ))
+
+    pool.schreiben(lambda cursor: warnung._aktualisiere_warnungen(cursor, HEUTE))
+    assert [(zeile[0], zeile[3]) for zeile in warnungen(pool)] == [("10000001", "Lager"), ("10000002", "Lager")]
+
+    pool.schreiben(lambda cursor: cursor.execute("UPDATE lagerbestand SET ort = 'Automat' WHERE barcode = '10000001'"))
+    pool.schreiben(lambda cursor: cursor.execute("DELETE FROM lagerbestand WHERE barcode = '10000002'"))
+    pool.schreiben(lambda cursor: warnung._aktualisiere_warnungen(cursor, HEUTE))
+    assert warnungen(pool) == [("10000001", 1, "2020-01-01", "Automat", "Medikament abgelaufen")]
+
+    # Ein Abgleich ohne Änderungen schreibt nichts und lässt damit auch den Lesecache gültig
+    zaehler = pool.lesecache.schreibzaehler
+    pool.schreiben(lambda cursor: warnung._aktualisiere_warnungen(cursor, HEUTE))
+    assert pool.lesecache.schreibzaehler == zaehler
+
+
+def test_benchmark_mengenbasierter_abgleich(test_datenbank):
+    """Vergleicht den Abgleich von 100.000 abgelaufenen Einheiten mit dem zeilenweisen Abgleich."""
+    pool = test_datenbank.pool
+    warnung = Warnung(pool=pool)
+
+    fuege_bestand_ein(
+        pool, ["Ibuprofen"],
+        ((str(50000000 + i), 1, "2020-01-01", "Automat" if i % 10 == 0 else "Lager") for i in range(ABGELAUFENE_EINHEITEN)),
+    )
+
+    def abgleich(funktion):
+        # Bestes von drei Durchläufen mit jeweils leerer Warnungstabelle
+        _, dauer = messe(
+            lambda: pool.schreiben(lambda cursor: funktion(cursor, HEUTE)),
+            vorbereitung=lambda: pool.schreiben(lambda cursor: cursor.execute("DELETE FROM warnungen")),
+        )
+        return warnungen(pool), dauer
+
+    vorher, dauer_vorher = abgleich(zeilenweiser_abgleich)
+    nachher, dauer_nachher = abgleich(warnung._aktualisiere_warnungen)
+
+    print(f"⏱ Warnungsabgleich zeilenweise: {dauer_vorher:.5f} Sekunden, mengenbasiert: {dauer_nachher:.5f} Sekunden")
+    assert len(nachher) == ABGELAUFENE_EINHEITEN
+    assert nachher == vorher
+    assert dauer_nachher * 2 < dauer_vorher
@@ -0,0 +1,85 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 100000
+ABGELAUFENE_EINHEITEN = 10000
+
+
+def datenversion(pool):
+    """Liefert Schreibzähler und PRAGMA data_version, die sich bei jedem Schreibvorgang ändern."""
+    return pool.lesecache.version()
+
+
+def ablaufen_lassen(pool, barcode):
+    """Setzt das Verfallsdatum einer Ware direkt in der Datenbank in die Vergangenheit."""
+    pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode = ?", (barcode,)
+    ))
+
+
+def test_lesende_aufrufe_schreiben_nicht(test_datenbank):
+    """Prüft, ob Bestands- und Warnungsabfragen die Datenbank nicht verändern."""
+    lager = Lager(datenbank=test_datenbank)
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    ablaufen_lassen(test_datenbank.pool, "10000001")
+
+    vorher = datenversion(test_datenbank.pool)
+    lager.get_lagerbestand()
+    lager.get_lagerbestand_seite(groesse=10)
+    lager.warnung.get_warnungen()
+    lager.warnung.get_warnungen(ort_filter="Lager")
+    assert datenversion(test_datenbank.pool) == vorher
+
+
+def test_tagesauswertung_hoechstens_einmal_pro_tag(test_datenbank):
+    """Prüft, ob der vollständige Abgleich nur bei einem neuen Kalendertag läuft."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = lager.warnung
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2025-06-01' WHERE barcode = '10000001'"
+    ))
+
+    assert warnung.get_stichtag() is None
+    assert warnung.tagesauswertung("2025-06-01") is True
+    assert warnung.get_warnungen().empty
+
+    vorher = datenversion(test_datenbank.pool)
+    assert warnung.tagesauswertung("2025-06-01") is False
+    assert datenversion(test_datenbank.pool) == vorher
+
+    assert warnung.tagesauswertung("2025-06-02") is True
+    assert warnung.get_stichtag() == "2025-06-02"
+    assert list(warnung.get_warnungen()["Barcode"]) == ["10000001"]
+
+
+def test_seitenaufruf_ohne_auswertung_schneller(test_datenbank):
+    """Vergleicht den Aufruf der Automaten-Warnungen mit dem früheren Aufruf samt vollständiger Auswertung."""
+    fuege_bestand_ein(
+        test_datenbank.pool, ["Ibuprofen"],
+        (
+            (str(50000000 + i), 1, "2020-01-01" if i < ABGELAUFENE_EINHEITEN else "2099-12-31", "Lager")
+            for i in range(GROSSER_BESTAND)
+        ),
+    )
+    lager = Lager(datenbank=test_datenbank)
+    warnung = lager.warnung
+    warnung._pruefe_warnungen()
+    test_datenbank.pool.lesecache.max_eintraege = 0  # Gemessen wird die Abfrage, nicht der Lesecache
+
+    def mit_auswertung():
+        warnung._pruefe_warnungen()
+        return warnung.get_warnungen(ort_filter="Automat")
+
+    vorher, dauer_vorher = messe(mit_auswertung)
+    nachher, dauer_nachher = messe(lambda: warnung.get_warnungen(ort_filter="Automat"))
+
+    print(f"⏱ Warnungsseite mit Auswertung: {dauer_vorher:.5f} Sekunden, ohne: {dauer_nachher:.5f} Sekunden")
+    assert nachher.empty and vorher.empty
+    assert len(warnung.get_warnungen()) == ABGELAUFENE_EINHEITEN
+    assert dauer_nachher * 5 < dauer_vorher
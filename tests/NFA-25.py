@@ -0,0 +1,130 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from automat import Automat
+from warnung import ART_ABGELAUFEN, ART_UNTER_SCHWELLENWERT
+from schwellenwerte import gleiche_bestandswarnungen_ab
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 200000
+VERSCHIEDENE_NAMEN = 500
+
+
+def schwellenwarnungen(warnung, ort_filter=None):
+    """Liest die Warnungen für unterschrittene Mindestbestände als Liste (Name, Ort, Status)."""
+    warnungen = warnung.get_warnungen(ort_filter=ort_filter, art_filter=ART_UNTER_SCHWELLENWERT)
+    return list(warnungen[["Name", "Ort", "Status"]].itertuples(index=False, name=None))
+
+
+def test_mindestbestand_je_ort(test_datenbank):
+    """Prüft, ob Mindestbestände für Lager und Automat getrennt ausgewertet und bei Bewegungen fortgeschrieben werden."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank, warnung=lager.warnung)
+    warnung = lager.warnung
+    lager.ware_hinzufuegen_bulk([(str(10000001 + i), "Ibuprofen", "2099-12-31") for i in range(3)])
+
+    assert warnung.set_mindestbestand("Ibuprofen", "Lager", 3).startswith("✅")
+    assert warnung.set_mindestbestand("Ibuprofen", "Automat", 1).startswith("✅")
+    assert schwellenwarnungen(warnung) == [("Ibuprofen", "Automat", "Unter Schwellenwert (0 von mindestens 1)")]
+
+    automat.ware_zum_automaten_hinzufuegen("10000001")
+    assert schwellenwarnungen(warnung) == [("Ibuprofen", "Lager", "Unter Schwellenwert (2 von mindestens 3)")]
+    assert schwellenwarnungen(warnung, ort_filter="Automat") == []
+
+    lager.ware_entfernen("10000002")
+    assert schwellenwarnungen(warnung) == [("Ibuprofen", "Lager", "Unter Schwellenwert (1 von mindestens 3)")]
+
+    assert warnung.set_mindestbestand("Ibuprofen", "Lager", 0).startswith("✅")
+    assert schwellenwarnungen(warnung) == []
+    assert list(warnung.get_mindestbestaende().itertuples(index=False, name=None)) == [("Ibuprofen", "Automat", 1, 1)]
+
+
+def test_ungueltige_mindestbestaende(test_datenbank):
+    """Prüft die Fehlermeldungen für unbekannte Artikel, Orte und Mengen."""
+    warnung = Lager(datenbank=test_datenbank).warnung
+    assert warnung.set_mindestbestand("Unbekannt", "Lager", 2) == "🚫 Fehler: Artikel Unbekannt ist nicht bekannt!"
+    assert warnung.set_mindestbestand("Ibuprofen", "Keller", 2).startswith("🚫")
+    assert warnung.set_mindestbestand("Ibuprofen", "Lager", -1).startswith("🚫")
+    assert warnung.get_mindestbestaende().empty
+
+
+def test_mindestbestand_fuer_ausverkauften_artikel(test_datenbank):
+    """Prüft, ob die Namenssuche für Mindestbestände auch Artikel ohne Bestand findet."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = lager.warnung
+    lager.ware_hinzufuegen_bulk([("10000001", "Ibuprofen 400mg", "2099-12-31"), ("10000002", "Aspirin Complex", "2099-12-31")])
+    lager.ware_entfernen("10000001")
+
+    # Der Volltextindex kennt nur Artikel mit Bestand, der Artikelstamm alle
+    assert lager.suche_artikelnamen("ibu") == []
+    assert lager.suche_artikelnamen("ibu 400", ohne_bestand=True) == ["Ibuprofen 400mg"]
+    assert lager.suche_artikelnamen("compl", ohne_bestand=True) == ["Aspirin Complex"]
+    assert lager.suche_artikelnamen("400mg_", ohne_bestand=True) == []
+    assert lager.suche_artikelnamen("", ohne_bestand=True) == []
+
+    assert warnung.set_mindestbestand("Ibuprofen 400mg", "Lager", 2).startswith("✅")
+    assert schwellenwarnungen(warnung) == [("Ibuprofen 400mg", "Lager", "Unter Schwellenwert (0 von mindestens 2)")]
+
+
+def test_arten_filter(test_datenbank):
+    """Prüft, ob abgelaufene Medikamente und unterschrittene Mindestbestände getrennt gefiltert werden."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = lager.warnung
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode = '10000001'"
+    ))
+    warnung._pruefe_warnungen()
+    warnung.set_mindestbestand("Ibuprofen", "Lager", 5)
+
+    assert list(warnung.get_warnungen(art_filter=ART_ABGELAUFEN)["Barcode"]) == ["10000001"]
+    assert len(warnung.get_warnungen(art_filter=ART_UNTER_SCHWELLENWERT)) == 1
+    assert len(warnung.get_warnungen()) == 2
+    assert warnung.get_warnungen(ort_filter="Automat").empty
+
+
+def test_abgleich_unabhaengig_von_der_bestandsgroesse(test_datenbank):
+    """Vergleicht den Abgleich über die fortgeschriebenen Summen mit einer Gruppierung über den gesamten Bestand."""
+    pool = test_datenbank.pool
+    fuege_bestand_ein(
+        pool, [f"Medikament {k}" for k in range(VERSCHIEDENE_NAMEN)],
+        ((str(50000000 + i), 1 + i % VERSCHIEDENE_NAMEN, "2030-01-01", "Lager") for i in range(GROSSER_BESTAND)),
+    )
+    # Jeder zweite Artikel liegt unter seinem Mindestbestand
+    pool.schreiben(lambda cursor: cursor.executemany(
+        "INSERT INTO mindestbestand (artikel_id, ort, menge) VALUES (?, 'Lager', ?)",
+        ((1 + k, GROSSER_BESTAND // VERSCHIEDENE_NAMEN + k % 2) for k in range(VERSCHIEDENE_NAMEN)),
+    ))
+
+    def gruppierung_ueber_bestand(cursor):
+        cursor.execute("""
+            SELECT mindestbestand.artikel_id, mindestbestand.ort, COUNT(lagerbestand.barcode), mindestbestand.menge
+            FROM mindestbestand LEFT JOIN lagerbestand
+                 ON lagerbestand.artikel_id = mindestbestand.artikel_id AND lagerbestand.ort = mindestbestand.ort
+            GROUP BY mindestbestand.artikel_id, mindestbestand.ort
+            HAVING COUNT(lagerbestand.barcode) < mindestbestand.menge
+        """)
+        return cursor.fetchall()
+
+    def abgleich(funktion):
+        # Die Warnungen werden vor jedem Durchlauf geleert
+        return messe(
+            lambda: pool.schreiben(funktion),
+            lambda: pool.schreiben(lambda cursor: cursor.execute("DELETE FROM bestandswarnungen")),
+        )
+
+    erwartet, dauer_bestand = abgleich(gruppierung_ueber_bestand)
+    _, dauer_summen = abgleich(gleiche_bestandswarnungen_ab)
+
+    with pool.verbindung() as conn:
+        warnungen = conn.execute(
+            "SELECT artikel_id, ort, bestand, mindestbestand FROM bestandswarnungen ORDER BY artikel_id"
+        ).fetchall()
+
+    print(f"⏱ Mindestbestände über Summen: {dauer_summen:.5f} Sekunden, über den Bestand: {dauer_bestand:.5f} Sekunden")
+    assert len(warnungen) == VERSCHIEDENE_NAMEN // 2
+    assert warnungen == sorted(erwartet)
+    assert dauer_summen * 5 < dauer_bestand
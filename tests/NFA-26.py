@@ -0,0 +1,123 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from warnung import ART_ABGELAUFEN, ART_UNTER_SCHWELLENWERT
+from conftest import messe, fuege_bestand_ein
+
+GROSSER_BESTAND = 200000
+ABGELAUFENE_EINHEITEN = 20000
+NEU_ABGELAUFEN = 100
+
+
+def ausfuehren(pool, sql, params=()):
+    """Führt eine einzelne Anweisung direkt in einer Schreibtransaktion aus, ohne Fachlogik."""
+    pool.schreiben(lambda cursor: cursor.execute(sql, params))
+
+
+def abgelaufen(warnung):
+    """Liest die Warnungen für abgelaufene Medikamente als Liste (Barcode, Ort)."""
+    warnungen = warnung.get_warnungen(art_filter=ART_ABGELAUFEN)
+    return sorted(warnungen[["Barcode", "Ort"]].itertuples(index=False, name=None))
+
+
+def test_trigger_erzeugen_verschieben_und_entfernen_warnungen(test_datenbank):
+    """Prüft, ob Einfügen, Verschieben, Korrigieren und Löschen im Lagerbestand die Warnungen sofort fortschreiben."""
+    pool = test_datenbank.pool
+    lager = Lager(datenbank=test_datenbank)
+    warnung = lager.warnung
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    assert warnung.tagesauswertung("2025-06-01") is True
+
+    ausfuehren(pool, "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) "
+                     "VALUES ('10000002', 1, 1, '2025-05-31', 'Lager')")
+    assert abgelaufen(warnung) == [("10000002", "Lager")]
+
+    ausfuehren(pool, "UPDATE lagerbestand SET ort = 'Automat', kanal_id = 1 WHERE barcode = '10000002'")
+    assert abgelaufen(warnung) == [("10000002", "Automat")]
+
+    ausfuehren(pool, "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode = '10000001'")
+    ausfuehren(pool, "UPDATE lagerbestand SET verfallsdatum = '2099-12-31' WHERE barcode = '10000002'")
+    assert abgelaufen(warnung) == [("10000001", "Lager")]
+
+    lager.ware_entfernen("10000001")
+    assert abgelaufen(warnung) == []
+
+
+def test_tageswechsel_ergaenzt_nur_neu_abgelaufene(test_datenbank):
+    """Prüft, ob der Tageswechsel die seit dem letzten Stichtag abgelaufenen Waren ergänzt."""
+    pool = test_datenbank.pool
+    warnung = Lager(datenbank=test_datenbank).warnung
+    warnung.tagesauswertung("2025-06-01")
+    ausfuehren(pool, "INSERT INTO artikel (name) VALUES ('Ibuprofen')")
+    pool.schreiben(lambda cursor: cursor.executemany(
+        "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) VALUES (?, 1, 1, ?, 'Lager')",
+        [("10000001", "2025-05-01"), ("10000002", "2025-06-01"), ("10000003", "2025-06-02"), ("10000004", "2025-06-03")],
+    ))
+    assert abgelaufen(warnung) == [("10000001", "Lager")]
+
+    assert warnung.tagesauswertung("2025-06-03") is True
+    assert abgelaufen(warnung) == [("10000001", "Lager"), ("10000002", "Lager"), ("10000003", "Lager")]
+    assert warnung.tagesauswertung("2025-06-03") is False
+
+
+def test_mindestbestand_per_trigger(test_datenbank):
+    """Prüft, ob Bestandsänderungen ohne Fachlogik die Warnungen für Mindestbestände fortschreiben."""
+    pool = test_datenbank.pool
+    lager = Lager(datenbank=test_datenbank)
+    warnung = lager.warnung
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    warnung.set_mindestbestand("Ibuprofen", "Lager", 2)
+    assert len(warnung.get_warnungen(art_filter=ART_UNTER_SCHWELLENWERT)) == 1
+
+    ausfuehren(pool, "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) "
+                     "VALUES ('10000002', 1, 1, '2099-12-31', 'Lager')")
+    assert warnung.get_warnungen(art_filter=ART_UNTER_SCHWELLENWERT).empty
+
+    ausfuehren(pool, "DELETE FROM lagerbestand WHERE barcode = '10000002'")
+    assert list(warnung.get_warnungen(art_filter=ART_UNTER_SCHWELLENWERT)["Status"]) == [
+        "Unter Schwellenwert (1 von mindestens 2)"
+    ]
+
+
+def test_warnungen_eines_orts_ueber_index(test_datenbank):
+    """Prüft, ob die Warnungen eines Orts über einen Index gelesen werden."""
+    with test_datenbank.pool.verbindung() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT barcode, name, verfallsdatum, ort, status FROM warnungen "
+            "JOIN artikel ON artikel.id = warnungen.artikel_id WHERE ort = ?", ("Lager",)
+        ).fetchall()
+    assert "idx_warnungen_ort" in " ".join(row[3] for row in plan)
+
+
+def test_tageswechsel_schneller_als_vollstaendiger_abgleich(test_datenbank):
+    """Vergleicht den Tageswechsel mit einem vollständigen Abgleich des gesamten Bestands."""
+    pool = test_datenbank.pool
+    warnung = Lager(datenbank=test_datenbank).warnung
+
+    fuege_bestand_ein(
+        pool, ["Ibuprofen"],
+        (
+            (str(50000000 + i), 1, "2020-01-01" if i < ABGELAUFENE_EINHEITEN
+             else "2025-06-01" if i < ABGELAUFENE_EINHEITEN + NEU_ABGELAUFEN else "2099-12-31", "Lager")
+            for i in range(GROSSER_BESTAND)
+        ),
+    )
+
+    def abgleich(funktion):
+        # Jeder Durchlauf geht vom Stichtag 2025-06-01 aus
+        _, dauer = messe(
+            lambda: pool.schreiben(funktion),
+            lambda: pool.schreiben(lambda cursor: warnung._auswerten(cursor, "2025-06-01")),
+        )
+        return abgelaufen(warnung), dauer
+
+    vollstaendig, dauer_vollstaendig = abgleich(lambda cursor: warnung._auswerten(cursor, "2025-06-02"))
+    tageswechsel, dauer_tageswechsel = abgleich(lambda cursor: warnung._tagesauswertung_buchen(cursor, "2025-06-02"))
+
+    print(f"⏱ Vollständiger Abgleich: {dauer_vollstaendig:.5f} Sekunden, Tageswechsel: {dauer_tageswechsel:.5f} Sekunden")
+    assert len(tageswechsel) == ABGELAUFENE_EINHEITEN + NEU_ABGELAUFEN
+    assert tageswechsel == vollstaendig
+    assert dauer_tageswechsel * 5 < dauer_vollstaendig
@@ -0,0 +1,120 @@
+import time
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from warnung import Warnung
+from benachrichtigungen import Benachrichtigungen, Ablaufplaner, ABGELAUFEN, BALD_ABLAUFEND, UNTER_SCHWELLENWERT
+from conftest import messe
+
+HEUTE = "2030-06-01"
+ABONNENTEN = 1000
+
+
+def test_ereignisse_an_alle_abonnenten(test_datenbank):
+    """Prüft, ob jedes Abonnement jedes Ereignis genau einmal erhält und nach Themen filtern kann."""
+    benachrichtigungen = Benachrichtigungen()
+    benachrichtigungen.veroeffentlichen(ABGELAUFEN, "vor dem Abonnieren")
+    alle = benachrichtigungen.abonnieren()
+    weitere = benachrichtigungen.abonnieren()
+    nur_schwellenwerte = benachrichtigungen.abonnieren([UNTER_SCHWELLENWERT])
+
+    benachrichtigungen.veroeffentlichen(ABGELAUFEN, "eins")
+    benachrichtigungen.veroeffentlichen(UNTER_SCHWELLENWERT, "zwei")
+
+    assert [e["Text"] for e in benachrichtigungen.abholen(alle)] == ["eins", "zwei"]
+    assert [e["Text"] for e in benachrichtigungen.abholen(weitere)] == ["eins", "zwei"]
+    assert [e["Text"] for e in benachrichtigungen.abholen(nur_schwellenwerte)] == ["zwei"]
+    assert benachrichtigungen.abholen(alle) == []
+
+
+def test_puffer_ist_begrenzt(test_datenbank):
+    """Prüft, ob nur die neuesten Ereignisse vorgehalten und verpasste gezählt werden."""
+    benachrichtigungen = Benachrichtigungen(max_ereignisse=3)
+    abonnement = benachrichtigungen.abonnieren()
+    for i in range(5):
+        benachrichtigungen.veroeffentlichen(ABGELAUFEN, str(i))
+
+    assert [e["Text"] for e in benachrichtigungen.abholen(abonnement)] == ["2", "3", "4"]
+    assert benachrichtigungen.verpasst == 2
+
+
+def test_planer_meldet_neue_warnungen(test_datenbank):
+    """Prüft, ob der Planer abgelaufene und bald ablaufende Medikamente sowie unterschrittene Mindestbestände meldet."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+    benachrichtigungen = Benachrichtigungen()
+    abonnement = benachrichtigungen.abonnieren()
+    planer = Ablaufplaner(warnung, benachrichtigungen, vorlauf_tage=7, starten=False)
+    planer.pruefen(HEUTE)
+
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    lager.ware_hinzufuegen("10000002", "Aspirin", "2099-12-31")
+    test_datenbank.pool.schreiben(lambda cursor: cursor.executemany(
+        "UPDATE lagerbestand SET verfallsdatum = ? WHERE barcode = ?",
+        [("2030-05-01", "10000001"), ("2030-06-03", "10000002")],
+    ))
+    assert warnung.set_mindestbestand("Aspirin", "Lager", 5).startswith("✅")
+
+    assert len(planer.pruefen(HEUTE)) == 3
+    assert planer.get_stand() == {(ABGELAUFEN, "Lager"): 1, (BALD_ABLAUFEND, "Lager"): 1, (UNTER_SCHWELLENWERT, "Lager"): 1}
+    assert sorted(e["Thema"] for e in benachrichtigungen.abholen(abonnement)) == [ABGELAUFEN, BALD_ABLAUFEND, UNTER_SCHWELLENWERT]
+
+    # Weniger Warnungen werden nicht gemeldet
+    lager.ware_entfernen("10000001")
+    assert planer.pruefen(HEUTE) == []
+    assert (ABGELAUFEN, "Lager") not in planer.get_stand()
+
+
+def test_planer_zaehlt_nur_nach_aenderungen(test_datenbank):
+    """Prüft, ob der Planer ohne Datenänderung und am selben Tag keine Auswertung ausführt."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+    planer = Ablaufplaner(warnung, Benachrichtigungen(), starten=False)
+    planer.pruefen(HEUTE)
+    auswertungen = planer.auswertungen
+
+    planer.pruefen(HEUTE)
+    planer.pruefen(HEUTE)
+    assert planer.auswertungen == auswertungen
+
+    lager.ware_hinzufuegen("10000001", "Ibuprofen", "2099-12-31")
+    planer.pruefen(HEUTE)
+    assert planer.auswertungen == auswertungen + 1
+
+    planer.pruefen("2030-06-02")
+    assert planer.auswertungen == auswertungen + 2
+
+
+def test_planer_thread_startet_und_stoppt(test_datenbank):
+    """Prüft, ob der Hintergrund-Thread regelmäßig prüft und sich beenden lässt."""
+    planer = Ablaufplaner(Warnung(pool=test_datenbank.pool), Benachrichtigungen(), intervall=0.01)
+    time.sleep(0.2)
+    planer.stoppen()
+
+    assert planer.pruefungen > 1
+    assert planer.fehlgeschlagen == 0
+    assert not planer._thread.is_alive()
+
+
+def test_abholen_ohne_neue_ereignisse(test_datenbank):
+    """Vergleicht die Prüfung aller Abonnements ohne neue Ereignisse mit der Abfrage der Warnungen je Sitzung."""
+    lager = Lager(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+    lager.ware_hinzufuegen_bulk([(str(10000000 + i), f"Medikament {i % 50}", "2099-12-31") for i in range(2000)])
+    test_datenbank.pool.lesecache.max_eintraege = 0  # Gemessen wird die Abfrage, nicht der Lesecache
+
+    benachrichtigungen = Benachrichtigungen()
+    abonnements = [benachrichtigungen.abonnieren() for _ in range(ABONNENTEN)]
+    benachrichtigungen.veroeffentlichen(ABGELAUFEN, "Test")
+    for abonnement in abonnements:
+        assert len(benachrichtigungen.abholen(abonnement)) == 1
+
+    _, dauer_abo = messe(lambda: [benachrichtigungen.abholen(abonnement) for abonnement in abonnements])
+    _, dauer_abfrage = messe(lambda: [warnung.get_warnungen(ort_filter="Lager") for _ in range(ABONNENTEN // 10)])
+
+    print(f"⏱ {ABONNENTEN} Abonnements prüfen: {dauer_abo:.5f} Sekunden, "
+          f"{ABONNENTEN // 10} Warnungsabfragen: {dauer_abfrage:.5f} Sekunden")
+    assert dauer_abo * 5 < dauer_abfrage
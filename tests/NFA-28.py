@@ -0,0 +1,164 @@
+import sqlite3
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Verbindungspool
+from migrationen import migriere, LAGER_MIGRATIONEN
+from lager import Lager
+from automat import Automat
+from conftest import messe, fuege_bestand_ein
+from kanaele import KANAL_KAPAZITAET
+
+VIELE_KANAELE = 2000
+WAREN_JE_KANAL = 10
+
+
+def kanaele(automat):
+    """Liest die Kanalübersicht als Liste von Tupeln."""
+    return list(automat.get_kanal_liste().itertuples(index=False, name=None))
+
+
+def test_kanal_je_artikel_und_freiliste(test_datenbank):
+    """Prüft, ob Waren eines Artikels denselben Kanal teilen und geleerte Kanäle wiederverwendet werden."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    lager.ware_hinzufuegen_bulk([
+        ("10000001", "Ibuprofen", "2099-12-31"), ("10000002", "Ibuprofen", "2099-12-31"),
+        ("10000003", "Aspirin", "2099-12-31"), ("10000004", "Paracetamol", "2099-12-31"),
+    ])
+
+    assert "Kanal 1" in automat.ware_zum_automaten_hinzufuegen("10000001")
+    assert "Kanal 1" in automat.ware_zum_automaten_hinzufuegen("10000002")
+    assert "Kanal 2" in automat.ware_zum_automaten_hinzufuegen("10000003")
+    assert kanaele(automat) == [("Kanal 1", "Ibuprofen", 2, KANAL_KAPAZITAET), ("Kanal 2", "Aspirin", 1, KANAL_KAPAZITAET)]
+
+    # Erneutes Verschieben belegt keinen weiteren Platz
+    assert "bereits im Automaten" in automat.ware_zum_automaten_hinzufuegen("10000001")
+    assert kanaele(automat)[0][2] == 2
+
+    # Ein geleerter Kanal wird frei und als kleinster freier Kanal zuerst vergeben
+    automat.ware_aus_automaten_entfernen("10000001")
+    automat.ware_aus_automaten_entfernen("10000002")
+    assert kanaele(automat)[0][2] == 0
+    assert automat.get_belegte_kanaele() == ["Kanal 2"]
+    assert "Kanal 1" in automat.ware_zum_automaten_hinzufuegen("10000004")
+    assert automat.get_belegte_kanaele() == ["Kanal 1", "Kanal 2"]
+    assert automat.pruefe_kanalbelegung() == []
+
+
+def test_kapazitaet_wird_eingehalten(test_datenbank):
+    """Prüft, ob ein voller Kanal einen weiteren Kanal für denselben Artikel öffnet und Bestellungen Platz freigeben."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    lager.ware_hinzufuegen_bulk([(str(10000001 + i), "Ibuprofen", "2099-12-31") for i in range(3)])
+
+    assert automat.set_kanal_kapazitaet(1, 2).startswith("✅")
+    for i in range(3):
+        automat.ware_zum_automaten_hinzufuegen(str(10000001 + i))
+    assert kanaele(automat) == [("Kanal 1", "Ibuprofen", 2, 2), ("Kanal 2", "Ibuprofen", 1, KANAL_KAPAZITAET)]
+
+    assert "Fehler" in automat.set_kanal_kapazitaet(1, 1)
+    assert "Fehler" in automat.set_kanal_kapazitaet(0, 5)
+
+    # Entnahme über eine Bestellung (Löschen aus dem Bestand) senkt die Belegung in derselben Transaktion
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute("DELETE FROM lagerbestand WHERE barcode = '10000001'"))
+    assert kanaele(automat)[0][2] == 1
+    assert automat.pruefe_kanalbelegung() == []
+
+    # Die Belegung kann die Kapazität auch bei direkten Änderungen nicht überschreiten
+    with pytest.raises(sqlite3.IntegrityError):
+        test_datenbank.pool.schreiben(lambda cursor: cursor.execute(
+            "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort, kanal_id) "
+            "VALUES ('10000004', 1, 1, '2099-12-31', 'Automat', 1), ('10000005', 1, 1, '2099-12-31', 'Automat', 1)"
+        ))
+    assert kanaele(automat)[0][2] == 1
+
+
+def test_automat_ist_voll(test_datenbank, monkeypatch):
+    """Prüft, ob ohne freien Kanal eine Fehlermeldung erscheint und nichts verschoben wird."""
+    import kanaele as kanalmodul
+    monkeypatch.setattr(kanalmodul, "MAX_KANAELE", 1)
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    lager.ware_hinzufuegen_bulk([("10000001", "Ibuprofen", "2099-12-31"), ("10000002", "Aspirin", "2099-12-31")])
+
+    automat.ware_zum_automaten_hinzufuegen("10000001")
+    assert "Kein freier Kanal" in automat.ware_zum_automaten_hinzufuegen("10000002")
+    assert automat.get_belegte_kanaele() == ["Kanal 1"]
+
+
+def test_bestehende_kanaele_werden_migriert(tmp_path):
+    """Prüft, ob Kanäle aus dem bisherigen Textfeld mit ihrer Belegung übernommen werden."""
+    db_path = str(tmp_path / "alt.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE lagerbestand (barcode TEXT PRIMARY KEY, name TEXT, menge INTEGER, "
+                 "verfallsdatum TEXT, ort TEXT DEFAULT 'Lager', kanal TEXT DEFAULT NULL)")
+    conn.executemany("INSERT INTO lagerbestand VALUES (?, ?, 1, '2099-12-31', ?, ?)", [
+        ("10000001", "Aspirin", "Automat", "Kanal 3"), ("10000002", "Aspirin", "Automat", "Kanal 3"),
+        ("10000003", "Ibuprofen", "Automat", "Kanal 1"), ("10000004", "Ibuprofen", "Lager", None),
+    ])
+    conn.commit()
+    conn.close()
+
+    pool = Verbindungspool(db_path)
+    migriere(pool, LAGER_MIGRATIONEN)
+    with pool.verbindung() as conn:
+        assert conn.execute(
+            "SELECT kanaele.id, name, belegung FROM kanaele JOIN artikel ON artikel.id = artikel_id ORDER BY kanaele.id"
+        ).fetchall() == [(1, "Ibuprofen", 1), (3, "Aspirin", 2)]
+        assert conn.execute("SELECT barcode, kanal FROM lagerbestand WHERE kanal_id IS NOT NULL ORDER BY barcode").fetchall() == [
+            ("10000001", "Kanal 3"), ("10000002", "Kanal 3"), ("10000003", "Kanal 1"),
+        ]
+
+    # Der Umbau der Tabelle legt dieselben Indizes und Trigger an wie eine neue Datenbank
+    neu = Verbindungspool(str(tmp_path / "neu.db"))
+    migriere(neu, LAGER_MIGRATIONEN)
+    def schema(pool):
+        with pool.verbindung() as conn:
+            return conn.execute(
+                "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY type, name"
+            ).fetchall()
+    assert schema(pool) == schema(neu)
+
+
+def test_zuweisung_unabhaengig_von_der_kanalanzahl(test_datenbank, monkeypatch):
+    """Vergleicht die Zuweisung über die Freilisten mit der bisherigen Suche über alle belegten Kanäle."""
+    import kanaele as kanalmodul
+    monkeypatch.setattr(kanalmodul, "MAX_KANAELE", VIELE_KANAELE + 10)
+
+    pool = test_datenbank.pool
+    fuege_bestand_ein(
+        pool, [f"Medikament {k}" for k in range(VIELE_KANAELE + 1)],
+        [(str(50000000 + i), 1 + i % VIELE_KANAELE, "2099-12-31", "Lager") for i in range(VIELE_KANAELE * WAREN_JE_KANAL)]
+        + [("10000001", VIELE_KANAELE + 1, "2099-12-31", "Lager")],
+    )
+
+    # Je Kanal ein Artikel, dessen Waren bereits im Automaten liegen
+    def in_kanaele(cursor):
+        cursor.executemany("INSERT INTO kanaele (id, artikel_id) VALUES (?, ?)", ((k, k) for k in range(1, VIELE_KANAELE + 1)))
+        cursor.execute("UPDATE lagerbestand SET ort = 'Automat', kanal_id = artikel_id WHERE artikel_id <= ?", (VIELE_KANAELE,))
+    pool.schreiben(in_kanaele)
+    automat = Automat(datenbank=test_datenbank)
+    assert automat.pruefe_kanalbelegung() == []
+
+    def bisherige_suche(cursor):
+        # Früher: alle belegten Kanäle lesen und die erste freie Nummer suchen
+        cursor.execute("SELECT DISTINCT 'Kanal ' || kanal_id FROM lagerbestand WHERE ort = 'Automat'")
+        vorhandene_kanaele = {row[0] for row in cursor.fetchall()}
+        nummer = 1
+        while f"Kanal {nummer}" in vorhandene_kanaele:
+            nummer += 1
+        return nummer
+
+    def zuweisung(cursor):
+        return kanalmodul.weise_kanal_zu(cursor, VIELE_KANAELE + 1)
+
+    nummer, dauer_bisher = messe(lambda: pool.schreiben(bisherige_suche))
+    kanal_id, dauer_zuweisung = messe(lambda: pool.schreiben(zuweisung))
+
+    print(f"⏱ Kanalzuweisung: {dauer_zuweisung:.5f} Sekunden, bisherige Suche: {dauer_bisher:.5f} Sekunden")
+    assert nummer == kanal_id == VIELE_KANAELE + 1
+    assert dauer_zuweisung * 5 < dauer_bisher
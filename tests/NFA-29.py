@@ -0,0 +1,114 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from automat import Automat
+from conftest import erstelle_datenbank, messe
+
+BEFUELLUNG = 500
+VERSCHIEDENE_NAMEN = 50
+
+
+def test_bericht_je_barcode(test_datenbank):
+    """Prüft, ob jeder gescannte Barcode in der Eingabereihenfolge eine passende Meldung erhält."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    lager.ware_hinzufuegen_bulk([
+        ("10000001", "Ibuprofen", "2099-12-31"), ("10000002", "Ibuprofen", "2099-12-31"),
+        ("10000003", "Aspirin", "2099-12-31"), ("10000004", "Aspirin", "2099-12-31"),
+    ])
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode = '10000004'"
+    ))
+    automat.ware_zum_automaten_hinzufuegen("10000003")
+
+    bericht = automat.befuellen_bulk(["10000001", "abc", "10000002", "10000001", "99999999", "10000003", "10000004", ""])
+
+    assert [(zeile, barcode) for zeile, barcode, _ in bericht] == [
+        (1, "10000001"), (2, "abc"), (3, "10000002"), (4, "10000001"), (5, "99999999"), (6, "10000003"), (7, "10000004"), (8, ""),
+    ]
+    meldungen = [meldung for _, _, meldung in bericht]
+    assert "Kanal 2" in meldungen[0] and "Kanal 2" in meldungen[2]
+    assert "Ungültiger Barcode" in meldungen[1]
+    assert "mehrfach gescannt" in meldungen[3]
+    assert "nicht im Lagerbestand" in meldungen[4]
+    assert "bereits im Automaten" in meldungen[5]
+    assert "abgelaufen" in meldungen[6]
+    assert "leer" in meldungen[7]
+
+    assert automat.get_belegte_kanaele() == ["Kanal 1", "Kanal 2"]
+    assert automat.pruefe_kanalbelegung() == []
+    assert lager.pruefe_artikelbestand() == []
+
+
+def test_kanaele_wie_bei_einzelnen_verschiebungen(test_datenbank, tmp_path):
+    """Prüft, ob die Befüllung dieselben Kanäle wählt wie einzelne Verschiebungen, auch bei vollen Kanälen."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    waren = [(str(10000001 + i), f"Medikament {i % 3}", "2099-12-31") for i in range(12)]
+    lager.ware_hinzufuegen_bulk(waren)
+    automat.set_kanal_kapazitaet(1, 3)
+    automat.ware_zum_automaten_hinzufuegen("10000001")
+    automat.ware_aus_automaten_entfernen("10000001")
+
+    vergleich = erstelle_datenbank(tmp_path, "vergleich")
+    Lager(datenbank=vergleich).ware_hinzufuegen_bulk(waren)
+    einzeln = Automat(datenbank=vergleich)
+    einzeln.set_kanal_kapazitaet(1, 3)
+    einzeln.ware_zum_automaten_hinzufuegen("10000001")
+    einzeln.ware_aus_automaten_entfernen("10000001")
+
+    bericht = automat.befuellen_bulk([barcode for barcode, _, _ in waren])
+    meldungen_einzeln = [einzeln.ware_zum_automaten_hinzufuegen(barcode) for barcode, _, _ in waren]
+
+    assert [meldung for _, _, meldung in bericht] == meldungen_einzeln
+    assert automat.get_kanal_liste().equals(einzeln.get_kanal_liste())
+    assert automat.pruefe_kanalbelegung() == []
+
+
+def test_automat_voll_verschiebt_nur_teilweise(test_datenbank, monkeypatch):
+    """Prüft, ob ohne freien Kanal nur die übrigen Waren verschoben werden."""
+    import kanaele as kanalmodul
+    monkeypatch.setattr(kanalmodul, "MAX_KANAELE", 1)
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    lager.ware_hinzufuegen_bulk([("10000001", "Ibuprofen", "2099-12-31"), ("10000002", "Aspirin", "2099-12-31")])
+
+    bericht = automat.befuellen_bulk(["10000001", "10000002"])
+    assert bericht[0][2].startswith("✅")
+    assert "Kein freier Kanal" in bericht[1][2]
+    assert automat.get_belegte_kanaele() == ["Kanal 1"]
+
+
+def test_befuellung_schneller_als_einzeln(test_datenbank, tmp_path, monkeypatch):
+    """Vergleicht die Befüllung in einer Transaktion mit einzelnen Verschiebungen je Barcode."""
+    import kanaele as kanalmodul
+    monkeypatch.setattr(kanalmodul, "MAX_KANAELE", 1000)
+    waren = [(str(10000000 + i), f"Medikament {i % VERSCHIEDENE_NAMEN}", "2099-12-31") for i in range(BEFUELLUNG)]
+    barcodes = [barcode for barcode, _, _ in waren]
+
+    def frischer_bestand(name):
+        # Jeder Durchlauf beginnt auf einem eigenen, frisch befüllten Bestand
+        automaten = []
+        def vorbereitung():
+            datenbank = erstelle_datenbank(tmp_path, f"{name}_{len(automaten)}")
+            Lager(datenbank=datenbank).ware_hinzufuegen_bulk(waren)
+            automaten.append(Automat(datenbank=datenbank))
+        return automaten, vorbereitung
+
+    automaten_einzeln, vorbereitung = frischer_bestand("einzeln")
+    meldungen_einzeln, dauer_einzeln = messe(
+        lambda: [automaten_einzeln[-1].ware_zum_automaten_hinzufuegen(barcode) for barcode in barcodes], vorbereitung
+    )
+    automaten_bulk, vorbereitung = frischer_bestand("gesammelt")
+    meldungen_bulk, dauer_bulk = messe(
+        lambda: [meldung for _, _, meldung in automaten_bulk[-1].befuellen_bulk(barcodes)], vorbereitung
+    )
+
+    print(f"⏱ Befüllung mit {BEFUELLUNG} Barcodes: {dauer_bulk:.5f} Sekunden, einzeln: {dauer_einzeln:.5f} Sekunden")
+    assert meldungen_bulk == meldungen_einzeln
+    assert all(meldung.startswith("✅") for meldung in meldungen_bulk)
+    assert automaten_bulk[-1].pruefe_kanalbelegung() == []
+    assert dauer_bulk * 5 < dauer_einzeln
@@ -0,0 +1,150 @@
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from lager import Lager
+from automat import Automat
+from warnung import Warnung
+from nachfuellung import plane_nachfuellung
+from conftest import messe, fuege_bestand_ein
+
+HEUTE = "2030-06-01"
+ARTIKEL = 200
+WAREN_JE_ARTIKEL = 250
+ARTIKEL_IM_AUTOMATEN = 20
+
+
+def test_zuerst_ablaufende_waren_fuer_freie_plaetze(test_datenbank):
+    """Prüft, ob der Plan die freien Plätze eines Kanals mit den zuerst ablaufenden, gültigen Waren füllt."""
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    lager.ware_hinzufuegen_bulk([
+        ("10000001", "Ibuprofen", "2099-12-31"), ("10000002", "Ibuprofen", "2099-03-01"),
+        ("10000003", "Ibuprofen", "2099-01-01"), ("10000004", "Ibuprofen", "2099-06-01"),
+        ("10000005", "Ibuprofen", "2099-02-01"), ("10000006", "Aspirin", "2099-01-01"),
+    ])
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode = '10000003'"
+    ))
+    automat.set_kanal_kapazitaet(1, 3)
+    automat.ware_zum_automaten_hinzufuegen("10000001")
+
+    # Zwei freie Plätze für Ibuprofen; abgelaufene Waren und Artikel ohne Kanal werden nicht eingeplant
+    plan = automat.get_nachfuellplan()
+    assert list(plan.itertuples(index=False, name=None)) == [
+        ("10000005", "Ibuprofen", "2099-02-01"), ("10000002", "Ibuprofen", "2099-03-01"),
+    ]
+
+    bericht = automat.nachfuellen()
+    assert [barcode for _, barcode, _ in bericht] == ["10000005", "10000002"]
+    assert all(meldung.startswith("✅") for _, _, meldung in bericht)
+    assert automat.get_kanal_liste()["Belegung"].tolist() == [3]
+    assert automat.get_nachfuellplan().empty
+    assert automat.nachfuellen() == []
+    assert automat.pruefe_kanalbelegung() == []
+
+
+def test_mindestbestand_im_automaten(test_datenbank, monkeypatch):
+    """Prüft, ob ein fehlender Mindestbestand neue Kanäle nur einplant, solange der Automat Platz hat."""
+    import kanaele as kanalmodul
+    monkeypatch.setattr(kanalmodul, "MAX_KANAELE", 2)
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+    lager.ware_hinzufuegen_bulk(
+        [(str(10000001 + i), "Aspirin", f"2099-01-{10 + i}") for i in range(5)]
+        + [(str(20000001 + i), "Ibuprofen", "2099-12-31") for i in range(5)]
+        + [(str(30000001 + i), "Paracetamol", "2099-12-31") for i in range(5)]
+    )
+    automat.set_kanal_kapazitaet(1, 2)
+    automat.ware_zum_automaten_hinzufuegen("20000001")
+    automat.ware_zum_automaten_hinzufuegen("20000002")
+
+    warnung.set_mindestbestand("Aspirin", "Automat", 3)
+    warnung.set_mindestbestand("Paracetamol", "Automat", 2)
+
+    # Aspirin erhält den letzten Kanal, für Paracetamol bleibt kein Platz
+    plan = automat.get_nachfuellplan()
+    assert plan["Barcode"].tolist() == ["10000001", "10000002", "10000003"]
+
+    assert all(meldung.startswith("✅") for _, _, meldung in automat.nachfuellen())
+    assert automat.get_belegte_kanaele() == ["Kanal 1", "Kanal 2"]
+    # Der neue Kanal gehört jetzt Aspirin und wird wie jeder andere Kanal aufgefüllt
+    assert automat.get_nachfuellplan()["Barcode"].tolist() == ["10000004", "10000005"]
+
+
+def test_kein_kanal_fuer_artikel_ohne_vorrat(test_datenbank, monkeypatch):
+    """Prüft, ob ein Artikel ohne gültige Waren im Lager keinen Kanal für Artikel mit Vorrat blockiert."""
+    import kanaele as kanalmodul
+    monkeypatch.setattr(kanalmodul, "MAX_KANAELE", 1)
+    lager = Lager(datenbank=test_datenbank)
+    automat = Automat(datenbank=test_datenbank)
+    warnung = Warnung(pool=test_datenbank.pool)
+    lager.ware_hinzufuegen_bulk([
+        ("10000001", "Aspirin", "2099-12-31"),
+        ("20000001", "Ibuprofen", "2099-02-01"), ("20000002", "Ibuprofen", "2099-01-01"),
+    ])
+    # Aspirin ist nur noch abgelaufen vorrätig
+    test_datenbank.pool.schreiben(lambda cursor: cursor.execute(
+        "UPDATE lagerbestand SET verfallsdatum = '2020-01-01' WHERE barcode = '10000001'"
+    ))
+
+    warnung.set_mindestbestand("Aspirin", "Automat", 5)
+    warnung.set_mindestbestand("Ibuprofen", "Automat", 2)
+
+    assert automat.get_nachfuellplan()["Barcode"].tolist() == ["20000002", "20000001"]
+    assert all(meldung.startswith("✅") for _, _, meldung in automat.nachfuellen())
+    assert automat.get_kanal_liste()["Name"].tolist() == ["Ibuprofen"]
+
+
+def test_plan_schneller_als_gesamten_bestand_sortieren(test_datenbank):
+    """Vergleicht den indizierten Plan mit dem Sortieren des gesamten Lagerbestands nach Verfallsdatum."""
+    pool = test_datenbank.pool
+    fuege_bestand_ein(
+        pool, [f"Medikament {k:03d}" for k in range(1, ARTIKEL + 1)],
+        (
+            (str(50000000 + i), 1 + i % ARTIKEL, f"{2029 + (i // ARTIKEL) % 5}-{1 + (i * 7) % 12:02d}-15", "Lager")
+            for i in range(ARTIKEL * WAREN_JE_ARTIKEL)
+        ),
+    )
+
+    # Je Artikel im Automaten ein Kanal mit einer Ware und freien Plätzen
+    def in_kanaele(cursor):
+        cursor.executemany("INSERT INTO kanaele (id, artikel_id) VALUES (?, ?)", ((k, k) for k in range(1, ARTIKEL_IM_AUTOMATEN + 1)))
+        cursor.executemany(
+            "UPDATE lagerbestand SET ort = 'Automat', kanal_id = ? WHERE barcode = ?",
+            ((k, str(50000000 + k - 1)) for k in range(1, ARTIKEL_IM_AUTOMATEN + 1)),
+        )
+    pool.schreiben(in_kanaele)
+    pool.schreiben(lambda cursor: cursor.execute("ANALYZE"))
+
+    def lesend(funktion):
+        with pool.verbindung() as conn:
+            return funktion(conn.cursor())
+
+    def gesamten_bestand_sortieren(cursor):
+        # Ohne Planer: gesamten Lagerbestand lesen, nach Verfallsdatum sortieren und je Artikel die ersten Waren nehmen
+        cursor.execute("SELECT id, kapazitaet - belegung FROM kanaele WHERE artikel_id IS NOT NULL")
+        frei = {f"Medikament {kanal_id:03d}": plaetze for kanal_id, plaetze in cursor.fetchall()}
+        cursor.execute(
+            "SELECT barcode, name, verfallsdatum FROM lagerbestand JOIN artikel ON artikel.id = artikel_id "
+            "WHERE ort = 'Lager' AND verfallsdatum >= ?", (HEUTE,)
+        )
+        plan = []
+        for barcode, name, verfallsdatum in sorted(cursor.fetchall(), key=lambda ware: (ware[1], ware[2], ware[0])):
+            if frei.get(name, 0) > 0:
+                frei[name] -= 1
+                plan.append((barcode, name, verfallsdatum))
+        return plan
+
+    def planer(cursor):
+        return plane_nachfuellung(cursor, HEUTE)
+
+    plan_bisher, dauer_bisher = messe(lambda: lesend(gesamten_bestand_sortieren))
+    plan, dauer_plan = messe(lambda: lesend(planer))
+
+    print(f"⏱ Nachfüllplan mit {len(plan)} Waren: {dauer_plan:.5f} Sekunden, gesamten Bestand sortieren: {dauer_bisher:.5f} Sekunden")
+    assert plan == plan_bisher
+    assert len(plan) == ARTIKEL_IM_AUTOMATEN * 19
+    assert dauer_plan * 5 < dauer_bisher
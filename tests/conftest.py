@@ -0,0 +1,71 @@
+import time
+import pytest
+import sys
+import os
+
+# src-Verzeichnis zum Pfad hinzufügen
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'lagersystem')))
+from datenbank import Datenbank
+from lager import Lager
+
+
+def erstelle_datenbank(verzeichnis, name="lagerbestand"):
+    """
+    Erstellt eine Datenbank mit Benutzerdatenbank und Protokoll in einem temporären Verzeichnis.
+
+    :param verzeichnis: Das Verzeichnis (z.B. tmp_path)
+    :param name: Dateiname der Lagerdatenbank ohne Endung, für mehrere Datenbanken in einem Test
+    :return: Die Datenbankinstanz
+    """
+    return Datenbank(
+        db_path=str(verzeichnis / f"{name}.db"),
+        user_db_path=str(verzeichnis / "users.db"),
+        log_path=str(verzeichnis / "logs" / "log_protokoll.csv"),
+    )
+
+
+@pytest.fixture
+def test_datenbank(tmp_path):
+    """Erstellt eine temporäre Datenbank mit Protokoll."""
+    return erstelle_datenbank(tmp_path)
+
+
+@pytest.fixture
+def test_lager(test_datenbank):
+    """Erstellt ein Lager mit temporärer Datenbank und Protokoll."""
+    return Lager(datenbank=test_datenbank)
+
+
+def messe(funktion, vorbereitung=None, durchlaeufe=3):
+    """
+    Misst die beste von mehreren Ausführungen, damit kurzzeitige Lastspitzen das Ergebnis nicht verfälschen.
+
+    :param funktion: Die zu messende Funktion ohne Argumente
+    :param vorbereitung: Optionale Funktion, die vor jedem Durchlauf außerhalb der Messung ausgeführt wird
+    :param durchlaeufe: Anzahl der Durchläufe
+    :return: Tupel (Ergebnis des letzten Durchlaufs, kürzeste Dauer in Sekunden)
+    """
+    dauern = []
+    for _ in range(durchlaeufe):
+        if vorbereitung is not None:
+            vorbereitung()
+        start_time = time.time()
+        ergebnis = funktion()
+        dauern.append(time.time() - start_time)
+    return ergebnis, min(dauern)
+
+
+def fuege_bestand_ein(pool, namen, waren):
+    """
+    Schreibt einen synthetischen Bestand direkt in die Datenbank, ohne die Prüfungen des Lagers.
+
+    :param pool: Der Verbindungspool der Lagerdatenbank
+    :param namen: Die Artikelnamen, der n-te Name erhält die Artikel-ID n (ab 1)
+    :param waren: Iterierbare Tupel (Barcode, Artikel-ID, Verfallsdatum, Ort), jeweils mit Menge 1
+    """
+    def einfuegen(cursor):
+        cursor.executemany("INSERT INTO artikel (id, name) VALUES (?, ?)", enumerate(namen, start=1))
+        cursor.executemany(
+            "INSERT INTO lagerbestand (barcode, artikel_id, menge, verfallsdatum, ort) VALUES (?, ?, 1, ?, ?)", waren
+        )
+    pool.schreiben(einfuegen)